@@ -4,24 +4,32 @@ Handles Groq function calling issues with fallback
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, AsyncGenerator, Iterable
 from groq import Groq
+import asyncio
 import json
+import os
 import re
+import threading
 from ai_agent_tools import AIAgentTools
+from ultimate_ai.memory.session_store import DEFAULT_SPILL_DIR, SessionStore
 
 router = APIRouter(prefix="/ai-agent", tags=["AI Agent"])
 
 # Groq client
-<<<<<<< HEAD
 groq_client = Groq(api_key=os.getenv("GROQ_API_KEY", ""))
-=======
-groq_client = Groq(api_key="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")
->>>>>>> 78d29253 (Initial commit: Pawa AI with 2M token Gemini context)
 
-# Store active agent sessions
-agent_sessions: Dict[str, AIAgentTools] = {}
+# Store active agent sessions (bounded; idle sessions are spilled to disk)
+agent_sessions = SessionStore(
+    "agent_sessions",
+    max_sessions=500,
+    max_bytes=32 * 1024 * 1024,
+    ttl=12 * 3600,
+    idle_after=30 * 60,
+    spill_dir=DEFAULT_SPILL_DIR
+)
 
 AI_AGENT_FALLBACK_PROMPT = """You are Pawa AI Code Agent - an ELITE software architect and engineer with 20 years of experience.
 
@@ -181,63 +189,201 @@ class CodeChatResponse(BaseModel):
     context_summary: Optional[str] = None
 
 
+class FileBlockParser:
+    """
+    Incremental parser for FILE: markers followed by fenced code blocks
+
+    Feed it text as tokens arrive; it works line by line and returns each
+    (file_path, content) as soon as the block's closing fence is seen.
+    Fences with a language inside a file (e.g. a README's examples) are
+    treated as nested, so they don't end the file early.
+    """
+
+    FILE_MARKER = re.compile(r'FILE:\s*(.+)$')
+
+    def __init__(self):
+        self.pending = ""  # Incomplete last line
+        self.file_path: Optional[str] = None
+        self.in_block = False
+        self.depth = 0
+        self.lines: List[str] = []
+
+    def feed(self, text: str) -> List[tuple]:
+        """
+        Add streamed text
+
+        Returns:
+            Files completed by this text, as (file_path, content)
+        """
+        self.pending += text
+        *lines, self.pending = self.pending.split("\n")
+        completed = []
+        for line in lines:
+            block = self._line(line)
+            if block:
+                completed.append(block)
+        return completed
+
+    def finish(self) -> List[tuple]:
+        """Flush the last line at the end of the stream"""
+        completed = []
+        if self.pending:
+            block = self._line(self.pending)
+            self.pending = ""
+            if block:
+                completed.append(block)
+        return completed
+
+    @property
+    def current_file(self) -> Optional[str]:
+        """File whose block is being streamed"""
+        return self.file_path if self.in_block else None
+
+    def _line(self, line: str) -> Optional[tuple]:
+        fence = line.strip()
+
+        if self.in_block:
+            if fence.startswith("```"):
+                if fence != "```":
+                    self.depth += 1
+                elif self.depth:
+                    self.depth -= 1
+                else:
+                    block = (self.file_path, "\n".join(self.lines).strip())
+                    self.file_path, self.in_block, self.lines = None, False, []
+                    return block
+            self.lines.append(line)
+            return None
+
+        if self.file_path is not None and fence.startswith("```"):
+            # The fence must follow the FILE: line (blank lines allowed)
+            self.in_block, self.depth, self.lines = True, 0, []
+            return None
+
+        match = self.FILE_MARKER.search(line)
+        if match:
+            self.file_path = match.group(1).strip()
+        elif fence:
+            self.file_path = None
+        return None
+
+
+def create_file(agent: AIAgentTools, file_path: str, content: str) -> Dict[str, Any]:
+    """Write one parsed file and return its tool call record"""
+    print(f"📝 Creating file: {file_path} ({len(content)} chars)")
+
+    result = agent.write_file(file_path, content)
+    if result.get("success"):
+        print(f"   ✅ Success: {file_path}")
+    else:
+        print(f"   ❌ Failed: {result.get('error')}")
+
+    return {
+        "tool": "write_file",
+        "arguments": {"file_path": file_path},
+        "result": result
+    }
+
+
 def parse_and_create_files(ai_response: str, agent: AIAgentTools) -> tuple:
     """Parse AI response for FILE: markers and create files"""
-    # Pattern to match FILE: path followed by code block
-    file_pattern = r'FILE:\s*([^\n]+)\n```(?:\w+\n)?(.*?)```'
-    matches = re.findall(file_pattern, ai_response, re.DOTALL)
+    parser = FileBlockParser()
+    blocks = parser.feed(ai_response) + parser.finish()
 
     tool_calls_made = []
     files_modified = []
 
-    for file_path, content in matches:
-        file_path = file_path.strip()
-        content = content.strip()
-
-        print(f"📝 Creating file: {file_path} ({len(content)} chars)")
-
-        result = agent.write_file(file_path, content)
-        tool_calls_made.append({
-            "tool": "write_file",
-            "arguments": {"file_path": file_path},
-            "result": result
-        })
-
-        if result.get("success"):
+    for file_path, content in blocks:
+        tool_call = create_file(agent, file_path, content)
+        tool_calls_made.append(tool_call)
+        if tool_call["result"].get("success"):
             files_modified.append(file_path)
-            print(f"   ✅ Success: {file_path}")
-        else:
-            print(f"   ❌ Failed: {result.get('error')}")
 
     return tool_calls_made, files_modified
 
 
+async def iterate_in_thread(iterable: Iterable) -> AsyncGenerator[Any, None]:
+    """
+    Consume a blocking iterator (e.g. a Groq stream) without blocking the event loop
+
+    Closing the generator early (client disconnected) stops the producer
+    thread and closes the iterable, which for a Groq stream releases the
+    upstream connection instead of reading the completion to the end.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in iterable:
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        except Exception as e:
+            if not stop.is_set():
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            if not stop.is_set():
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+    producer = loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        await producer
+    finally:
+        if not producer.done():
+            stop.set()
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    print(f"Closing upstream stream failed: {e}")
+
+
+def build_messages(request: "CodeChatRequest") -> List[Dict[str, str]]:
+    """System prompt, recent history and the new message"""
+    messages = [
+        {"role": "system", "content": AI_AGENT_FALLBACK_PROMPT}
+    ]
+
+    # Add conversation history
+    for msg in request.conversation_history[-10:]:
+        messages.append(msg)
+
+    # Add current message
+    messages.append({
+        "role": "user",
+        "content": request.message
+    })
+    return messages
+
+
+def get_agent(request: "CodeChatRequest") -> AIAgentTools:
+    """Get or create agent session"""
+    if request.session_id not in agent_sessions:
+        agent_sessions[request.session_id] = AIAgentTools(project_root=request.project_path)
+    return agent_sessions[request.session_id]
+
+
 @router.post("/chat", response_model=CodeChatResponse)
 async def ai_agent_chat(request: CodeChatRequest):
     """AI agent chat with fallback file creation"""
     try:
-        # Get or create agent session
-        if request.session_id not in agent_sessions:
-            agent_sessions[request.session_id] = AIAgentTools(project_root=request.project_path)
-
-        agent = agent_sessions[request.session_id]
+        agent = get_agent(request)
 
         print(f"🤖 AI Agent processing: {request.message}")
 
         # Use fallback approach (more reliable than function calling with Groq)
-        messages = [
-            {"role": "system", "content": AI_AGENT_FALLBACK_PROMPT}
-        ]
-
-        # Add conversation history
-        for msg in request.conversation_history[-10:]:
-            messages.append(msg)
-
-        # Add current message
-        messages.append({
-            "role": "user",
-            "content": request.message
-        })
+        messages = build_messages(request)
 
         # Get AI response
         response = groq_client.chat.completions.create(
@@ -274,6 +420,108 @@ async def ai_agent_chat(request: CodeChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def sse(event: Dict[str, Any]) -> str:
+    return f"data: {json.dumps(event)}\n\n"
+
+
+async def stream_agent_chat(request: CodeChatRequest) -> AsyncGenerator[str, None]:
+    """
+    Stream the agent's response and write each file as soon as its block closes
+
+    Events: content (tokens), file_started, file_created, done, error
+    """
+    try:
+        agent = get_agent(request)
+        print(f"🤖 AI Agent streaming: {request.message}")
+
+        # Opening the stream waits for the response headers: keep it off the loop
+        stream = await asyncio.to_thread(
+            groq_client.chat.completions.create,
+            model="llama-3.3-70b-versatile",
+            messages=build_messages(request),
+            temperature=0.7,
+            max_tokens=8000,
+            stream=True
+        )
+
+        parser = FileBlockParser()
+        tool_calls_made = []
+        files_modified = []
+        response_parts = []
+
+        async def write(blocks):
+            for file_path, content in blocks:
+                tool_call = await asyncio.to_thread(create_file, agent, file_path, content)
+                tool_calls_made.append(tool_call)
+                success = bool(tool_call["result"].get("success"))
+                if success:
+                    files_modified.append(file_path)
+                yield sse({
+                    "type": "file_created",
+                    "file_path": file_path,
+                    "success": success,
+                    "chars": len(content),
+                    "error": tool_call["result"].get("error")
+                })
+
+        chunks = iterate_in_thread(stream)
+        try:
+            async for chunk in chunks:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                content = chunk.choices[0].delta.content
+                response_parts.append(content)
+                yield sse({"type": "content", "content": content})
+
+                before = parser.current_file
+                blocks = parser.feed(content)
+                async for event in write(blocks):
+                    yield event
+                if parser.current_file and parser.current_file != before:
+                    yield sse({"type": "file_started", "file_path": parser.current_file})
+        finally:
+            # Client gone or error: stop reading from Groq now
+            await chunks.aclose()
+
+        async for event in write(parser.finish()):
+            yield event
+        if parser.current_file:
+            # Generation stopped mid-file (e.g. max_tokens): don't write a truncated file
+            yield sse({"type": "file_incomplete", "file_path": parser.current_file})
+
+        print(f"✅ AI Agent stream completed - Created {len(files_modified)} files")
+        yield sse({
+            "type": "done",
+            "files_modified": files_modified,
+            "tool_calls": tool_calls_made,
+            "context_summary": agent.get_context_summary(),
+            "response_chars": sum(len(part) for part in response_parts)
+        })
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        yield sse({"type": "error", "error": str(e)})
+
+
+@router.post("/chat-stream")
+async def ai_agent_chat_stream(request: CodeChatRequest):
+    """
+    Streaming agent mode (Server-Sent Events)
+
+    Files land on disk while the model is still generating the rest of
+    the scaffold, instead of after the whole completion.
+    """
+    return StreamingResponse(
+        stream_agent_chat(request),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.post("/reset-session")
 async def reset_session(session_id: str = "default"):
     """Reset an agent session"""
@@ -282,6 +530,12 @@ async def reset_session(session_id: str = "default"):
     return {"message": f"Session {session_id} reset"}
 
 
+@router.get("/sessions/stats")
+async def get_session_stats():
+    """Session count, memory and eviction gauges"""
+    return agent_sessions.get_stats()
+
+
 @router.get("/available-tools")
 async def get_available_tools():
     """Get list of available tools"""
@@ -4,13 +4,15 @@ Allows users to choose between different AI providers and models
 Supports: OpenAI (GPT-4), Anthropic (Claude), Groq (Llama)
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional
+import asyncio
+import json
 import os
-from groq import Groq
+import time
 import httpx
-from datetime import datetime
+from smart_model_router import smart_router
 
 router = APIRouter(prefix="/ai-models", tags=["AI Models"])
 
@@ -19,9 +21,6 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY", "gsk_nLZQWflyPVkFnY4Q6qYMWGdyb3FYtsYGl9
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 
-# Initialize clients
-groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
-
 
 class ChatMessage(BaseModel):
     role: str
@@ -158,126 +157,310 @@ AVAILABLE_MODELS = {
 }
 
 
-async def call_groq_model(messages: List[ChatMessage], model_name: str, temperature: float, max_tokens: int) -> Dict[str, Any]:
-    """Call Groq API"""
-    if not groq_client:
-        raise HTTPException(status_code=500, detail="Groq API key not configured")
+class ProviderError(Exception):
+    """Non-200 answer from a provider API"""
 
-    start_time = datetime.now()
+    def __init__(self, response: httpx.Response, detail: str):
+        super().__init__(f"HTTP {response.status_code}: {detail}")
+        self.status_code = response.status_code
+        self.response = response
 
-    try:
-        response = groq_client.chat.completions.create(
-            model=model_name,
-            messages=[{"role": msg.role, "content": msg.content} for msg in messages],
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
 
-        latency = (datetime.now() - start_time).total_seconds() * 1000
+class ProviderAdapter:
+    """
+    One long-lived async HTTP client per provider
 
-        return {
-            "content": response.choices[0].message.content,
-            "tokens_used": response.usage.total_tokens if hasattr(response, 'usage') else None,
-            "latency_ms": int(latency)
-        }
+    Connections (TLS sessions included) are pooled and reused across
+    requests instead of opening a fresh client per call. complete() is a
+    plain request; stream_complete() streams the answer and also measures
+    time to first token and output throughput.
+    """
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Groq API error: {str(e)}")
+    name = ""
+    display_name = ""
+
+    def __init__(self, api_key: str, base_url: str):
+        self.api_key = api_key
+        self.base_url = base_url
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            # Pooled connections belong to the loop that opened them
+            self._close_stale_client()
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers(),
+                timeout=httpx.Timeout(60.0, connect=10.0),
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60)
+            )
+            self._loop = loop
+        return self._client
+
+    def _close_stale_client(self):
+        """Close a client left over from another event loop, on that loop"""
+        old, old_loop = self._client, self._loop
+        self._client = None
+        if old is None or old.is_closed:
+            return
+        if old_loop is not None and not old_loop.is_closed():
+            # Runs now if that loop is running in another thread, else when it next runs
+            old_loop.call_soon_threadsafe(lambda: old_loop.create_task(old.aclose()))
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def headers(self) -> Dict[str, str]:
+        raise NotImplementedError
+
+    def payload(self, messages: List[ChatMessage], model_name: str, temperature: float,
+                max_tokens: int, system_prompt: Optional[str], stream: bool) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def complete(self, messages: List[ChatMessage], model_name: str, temperature: float,
+                       max_tokens: int, system_prompt: Optional[str] = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def stream_complete(self, messages: List[ChatMessage], model_name: str, temperature: float,
+                              max_tokens: int, system_prompt: Optional[str] = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self.client.post(path, json=payload)
+        if response.status_code != 200:
+            raise ProviderError(response, response.text)
+        return response.json()
+
+    async def _stream_events(self, path: str, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """JSON payloads of a Server-Sent Events response"""
+        async with self.client.stream("POST", path, json=payload) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise ProviderError(response, body.decode("utf-8", errors="ignore"))
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                if data:
+                    yield json.loads(data)
+
+
+def _stream_result(content: List[str], start: float, first_token: Optional[float],
+                   output_tokens: int, total_tokens: Optional[int]) -> Dict[str, Any]:
+    end = time.perf_counter()
+    generation = end - (first_token or end)
+    return {
+        "content": "".join(content),
+        "tokens_used": total_tokens,
+        "output_tokens": output_tokens,
+        "latency_ms": int((end - start) * 1000),
+        "ttft_ms": int((first_token - start) * 1000) if first_token else None,
+        # Rate after the first token; a burst delivered all at once has no meaningful rate
+        "tokens_per_sec": round((output_tokens - 1) / generation, 1) if output_tokens > 1 and generation >= 0.01 else None
+    }
 
 
-async def call_openai_model(messages: List[ChatMessage], model_name: str, temperature: float, max_tokens: int) -> Dict[str, Any]:
-    """Call OpenAI API"""
-    if not OPENAI_API_KEY:
-        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+class OpenAICompatibleAdapter(ProviderAdapter):
+    """OpenAI chat completions API (also spoken by Groq)"""
 
-    start_time = datetime.now()
+    def __init__(self, name: str, display_name: str, api_key: str, base_url: str):
+        super().__init__(api_key, base_url)
+        self.name = name
+        self.display_name = display_name
 
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {OPENAI_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": model_name,
-                    "messages": [{"role": msg.role, "content": msg.content} for msg in messages],
-                    "temperature": temperature,
-                    "max_tokens": max_tokens
-                },
-                timeout=60.0
-            )
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
 
-            if response.status_code != 200:
-                raise HTTPException(status_code=response.status_code, detail=response.text)
+    def payload(self, messages, model_name, temperature, max_tokens, system_prompt, stream):
+        chat = [{"role": msg.role, "content": msg.content} for msg in messages]
+        payload = {
+            "model": model_name,
+            "messages": chat,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        if stream:
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+        return payload
+
+    async def complete(self, messages, model_name, temperature, max_tokens, system_prompt=None):
+        start = time.perf_counter()
+        data = await self._post(
+            "/chat/completions",
+            self.payload(messages, model_name, temperature, max_tokens, system_prompt, stream=False)
+        )
+        return {
+            "content": data["choices"][0]["message"]["content"],
+            "tokens_used": data.get("usage", {}).get("total_tokens"),
+            "latency_ms": int((time.perf_counter() - start) * 1000)
+        }
+
+    async def stream_complete(self, messages, model_name, temperature, max_tokens, system_prompt=None):
+        start = time.perf_counter()
+        first_token = None
+        content: List[str] = []
+        chunks = 0
+        usage = None
+
+        payload = self.payload(messages, model_name, temperature, max_tokens, system_prompt, stream=True)
+        async for event in self._stream_events("/chat/completions", payload):
+            # Groq reports usage under x_groq on the last chunk
+            usage = event.get("usage") or event.get("x_groq", {}).get("usage") or usage
+            for choice in event.get("choices", []):
+                delta = choice.get("delta", {}).get("content")
+                if delta:
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    content.append(delta)
+                    chunks += 1
+
+        # Without usage, each streamed delta is roughly one token
+        output_tokens = (usage or {}).get("completion_tokens") or chunks
+        return _stream_result(content, start, first_token, output_tokens, (usage or {}).get("total_tokens"))
+
+
+class AnthropicAdapter(ProviderAdapter):
+    """Anthropic Messages API"""
+
+    name = "anthropic"
+    display_name = "Anthropic"
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01",
+            "Content-Type": "application/json"
+        }
+
+    def payload(self, messages, model_name, temperature, max_tokens, system_prompt, stream):
+        # System messages handled separately
+        payload = {
+            "model": model_name,
+            "messages": [{"role": msg.role, "content": msg.content} for msg in messages if msg.role != "system"],
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        if system_prompt:
+            payload["system"] = system_prompt
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    async def complete(self, messages, model_name, temperature, max_tokens, system_prompt=None):
+        start = time.perf_counter()
+        data = await self._post(
+            "/v1/messages",
+            self.payload(messages, model_name, temperature, max_tokens, system_prompt, stream=False)
+        )
+        usage = data.get("usage", {})
+        return {
+            "content": data["content"][0]["text"],
+            "tokens_used": usage.get("input_tokens", 0) + usage.get("output_tokens", 0),
+            "latency_ms": int((time.perf_counter() - start) * 1000)
+        }
 
-            data = response.json()
-            latency = (datetime.now() - start_time).total_seconds() * 1000
+    async def stream_complete(self, messages, model_name, temperature, max_tokens, system_prompt=None):
+        start = time.perf_counter()
+        first_token = None
+        content: List[str] = []
+        input_tokens = output_tokens = 0
+
+        payload = self.payload(messages, model_name, temperature, max_tokens, system_prompt, stream=True)
+        async for event in self._stream_events("/v1/messages", payload):
+            if event.get("type") == "message_start":
+                input_tokens = event["message"].get("usage", {}).get("input_tokens", 0)
+            elif event.get("type") == "content_block_delta":
+                text = event.get("delta", {}).get("text")
+                if text:
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    content.append(text)
+            elif event.get("type") == "message_delta":
+                output_tokens = event.get("usage", {}).get("output_tokens", output_tokens)
+
+        return _stream_result(content, start, first_token, output_tokens, input_tokens + output_tokens)
+
+
+PROVIDERS: Dict[str, ProviderAdapter] = {
+    # Base URLs follow the official SDKs' env overrides (e.g. mock_llm_server.py for load tests)
+    "groq": OpenAICompatibleAdapter(
+        "groq", "Groq", GROQ_API_KEY,
+        os.getenv("GROQ_BASE_URL", "https://api.groq.com").rstrip("/") + "/openai/v1"
+    ),
+    "openai": OpenAICompatibleAdapter(
+        "openai", "OpenAI", OPENAI_API_KEY, os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+    ),
+    "anthropic": AnthropicAdapter(ANTHROPIC_API_KEY, os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com"))
+}
 
-            return {
-                "content": data["choices"][0]["message"]["content"],
-                "tokens_used": data.get("usage", {}).get("total_tokens"),
-                "latency_ms": int(latency)
-            }
 
+async def call_provider(
+    provider: str,
+    messages: List[ChatMessage],
+    model_name: str,
+    temperature: float,
+    max_tokens: int,
+    system_prompt: Optional[str] = None,
+    stream: bool = False
+) -> Dict[str, Any]:
+    """Call a provider through its pooled adapter; outcomes feed the smart router"""
+    adapter = PROVIDERS.get(provider)
+    if adapter is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported provider: {provider}")
+    if not adapter.available:
+        raise HTTPException(status_code=500, detail=f"{adapter.display_name} API key not configured")
+
+    start = time.perf_counter()
+    try:
+        if stream:
+            result = await adapter.stream_complete(messages, model_name, temperature, max_tokens, system_prompt)
+        else:
+            result = await adapter.complete(messages, model_name, temperature, max_tokens, system_prompt)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"OpenAI API error: {str(e)}")
+        smart_router.record_result(model_name, (time.perf_counter() - start) * 1000, error=e)
+        raise HTTPException(status_code=500, detail=f"{adapter.display_name} API error: {str(e)}")
 
+    smart_router.record_result(
+        model_name,
+        result["latency_ms"],
+        ttft_ms=result.get("ttft_ms"),
+        tokens=result.get("output_tokens") or 0
+    )
+    return result
 
-async def call_anthropic_model(messages: List[ChatMessage], model_name: str, temperature: float, max_tokens: int, system_prompt: Optional[str] = None) -> Dict[str, Any]:
-    """Call Anthropic API"""
-    if not ANTHROPIC_API_KEY:
-        raise HTTPException(status_code=500, detail="Anthropic API key not configured")
 
-    start_time = datetime.now()
+async def call_groq_model(messages: List[ChatMessage], model_name: str, temperature: float, max_tokens: int) -> Dict[str, Any]:
+    """Call Groq API"""
+    return await call_provider("groq", messages, model_name, temperature, max_tokens)
 
-    try:
-        # Convert messages format for Anthropic
-        anthropic_messages = []
-        for msg in messages:
-            if msg.role != "system":  # System messages handled separately
-                anthropic_messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
-
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "model": model_name,
-                "messages": anthropic_messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens
-            }
-
-            if system_prompt:
-                payload["system"] = system_prompt
-
-            response = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": ANTHROPIC_API_KEY,
-                    "anthropic-version": "2023-06-01",
-                    "Content-Type": "application/json"
-                },
-                json=payload,
-                timeout=60.0
-            )
 
-            if response.status_code != 200:
-                raise HTTPException(status_code=response.status_code, detail=response.text)
+async def call_openai_model(messages: List[ChatMessage], model_name: str, temperature: float, max_tokens: int) -> Dict[str, Any]:
+    """Call OpenAI API"""
+    return await call_provider("openai", messages, model_name, temperature, max_tokens)
 
-            data = response.json()
-            latency = (datetime.now() - start_time).total_seconds() * 1000
 
-            return {
-                "content": data["content"][0]["text"],
-                "tokens_used": data.get("usage", {}).get("input_tokens", 0) + data.get("usage", {}).get("output_tokens", 0),
-                "latency_ms": int(latency)
-            }
+async def call_anthropic_model(messages: List[ChatMessage], model_name: str, temperature: float, max_tokens: int, system_prompt: Optional[str] = None) -> Dict[str, Any]:
+    """Call Anthropic API"""
+    return await call_provider("anthropic", messages, model_name, temperature, max_tokens, system_prompt)
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Anthropic API error: {str(e)}")
+
+@router.on_event("shutdown")
+async def close_provider_clients():
+    """Close the pooled provider connections"""
+    for adapter in PROVIDERS.values():
+        await adapter.close()
 
 
 def calculate_cost(tokens: int, model_provider: str, model_name: str) -> float:
@@ -308,30 +491,14 @@ async def chat_with_model(request: ChatRequest):
     """
     try:
         # Route to appropriate provider
-        if request.model_provider == "groq":
-            result = await call_groq_model(
-                request.messages,
-                request.model_name,
-                request.temperature,
-                request.max_tokens
-            )
-        elif request.model_provider == "openai":
-            result = await call_openai_model(
-                request.messages,
-                request.model_name,
-                request.temperature,
-                request.max_tokens
-            )
-        elif request.model_provider == "anthropic":
-            result = await call_anthropic_model(
-                request.messages,
-                request.model_name,
-                request.temperature,
-                request.max_tokens,
-                request.system_prompt
-            )
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported provider: {request.model_provider}")
+        result = await call_provider(
+            request.model_provider,
+            request.messages,
+            request.model_name,
+            request.temperature,
+            request.max_tokens,
+            request.system_prompt
+        )
 
         # Calculate cost
         cost = calculate_cost(
@@ -358,48 +525,76 @@ async def chat_with_model(request: ChatRequest):
         )
 
 
+COMPARE_MODELS = {
+    "groq": "llama-3.3-70b-versatile",
+    "openai": "gpt-3.5-turbo",
+    "anthropic": "claude-3-haiku-20240307"
+}
+
+
+async def compare_one(provider: str, model: str, messages: List[ChatMessage],
+                      max_tokens: int, deadline: float) -> Dict[str, Any]:
+    """Stream one provider's answer within its deadline"""
+    entry = {"provider": provider, "model": model}
+    try:
+        result = await asyncio.wait_for(
+            call_provider(provider, messages, model, 0.7, max_tokens, stream=True),
+            timeout=deadline
+        )
+    except asyncio.TimeoutError:
+        smart_router.record_result(model, deadline * 1000, error=TimeoutError())
+        entry["error"] = f"Timed out after {deadline}s"
+        return entry
+    except HTTPException as e:
+        entry["error"] = e.detail
+        return entry
+
+    entry.update({
+        "response": result["content"][:500],  # First 500 chars
+        "latency_ms": result.get("latency_ms"),
+        "ttft_ms": result.get("ttft_ms"),
+        "tokens_per_sec": result.get("tokens_per_sec"),
+        "output_tokens": result.get("output_tokens"),
+        "tokens": result.get("tokens_used")
+    })
+    return entry
+
+
 @router.get("/compare")
-async def compare_models(prompt: str):
+async def compare_models(
+    prompt: str,
+    deadline: float = Query(30.0, gt=0, le=120),
+    max_tokens: int = Query(1000, gt=0, le=8000)
+):
     """
     Compare responses from multiple models for the same prompt
     Useful for testing which model works best for specific tasks
+
+    All providers run concurrently and stream their answers, so the
+    comparison takes as long as the slowest provider (capped at deadline
+    seconds each) and doubles as a live benchmark: time to first token,
+    total latency and output tokens/sec per provider.
     """
     messages = [ChatMessage(role="user", content=prompt)]
 
     # Test with one model from each available provider
-    test_models = []
-    if GROQ_API_KEY:
-        test_models.append(("groq", "llama-3.3-70b-versatile"))
-    if OPENAI_API_KEY:
-        test_models.append(("openai", "gpt-3.5-turbo"))
-    if ANTHROPIC_API_KEY:
-        test_models.append(("anthropic", "claude-3-haiku-20240307"))
-
-    results = []
-    for provider, model in test_models:
-        try:
-            if provider == "groq":
-                result = await call_groq_model(messages, model, 0.7, 1000)
-            elif provider == "openai":
-                result = await call_openai_model(messages, model, 0.7, 1000)
-            elif provider == "anthropic":
-                result = await call_anthropic_model(messages, model, 0.7, 1000)
-
-            results.append({
-                "provider": provider,
-                "model": model,
-                "response": result["content"][:500],  # First 500 chars
-                "latency_ms": result.get("latency_ms"),
-                "tokens": result.get("tokens_used")
-            })
-        except Exception as e:
-            results.append({
-                "provider": provider,
-                "model": model,
-                "error": str(e)
-            })
-
-    return {"prompt": prompt, "comparisons": results}
+    test_models = [
+        (provider, model)
+        for provider, model in COMPARE_MODELS.items()
+        if PROVIDERS[provider].available
+    ]
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        compare_one(provider, model, messages, max_tokens, deadline)
+        for provider, model in test_models
+    ))
+
+    return {
+        "prompt": prompt,
+        "comparisons": list(results),
+        "wall_time_ms": int((time.perf_counter() - started) * 1000)
+    }
 
 
 @router.get("/status")
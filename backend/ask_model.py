@@ -5,12 +5,17 @@ This allows you to chat with your model directly from the command line.
 
 import sys
 import io
-import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from pathlib import Path
 
 # Fix Windows console encoding
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from genius_ai.inference.engine import SamplingParams
+from genius_ai.inference.registry import model_registry
+
 print("=" * 70)
 print("GENIUS AI - Interactive Chat with Your Custom Model")
 print("=" * 70)
@@ -19,16 +24,12 @@ print("=" * 70)
 print("\nLoading your custom trained model...")
 model_path = "./tiny_genius_model"
 
-tokenizer = AutoTokenizer.from_pretrained(model_path)
-tokenizer.pad_token = tokenizer.eos_token
-model = AutoModelForCausalLM.from_pretrained(
-    model_path,
-    torch_dtype=torch.float32,
-)
-model = model.to("cpu")
-model.eval()
+# int8 quantized; earlier turns stay in the KV cache so only new text is prefilled
+engine = model_registry.get(model_path)
+params = SamplingParams(max_new_tokens=150, temperature=0.7, top_p=0.9, top_k=50)
+transcript = ""
 
-print("[OK] Model loaded and ready!")
+print(f"[OK] Model loaded and ready! ({engine.load_seconds:.1f}s, int8)")
 print("\n" + "=" * 70)
 print("Ask me anything about Python programming!")
 print("Type 'quit' or 'exit' to end the conversation")
@@ -54,36 +55,20 @@ while True:
     if not question.strip():
         continue
 
-    # Format prompt
-    prompt = f"Q: {question}\nA:"
+    # Format prompt (the whole conversation, so the cached prefix is reused)
+    prompt = f"{transcript}Q: {question}\nA:"
 
-    # Tokenize
-    inputs = tokenizer(prompt, return_tensors="pt")
-
-    # Generate response
+    # Generate response, printing tokens as they arrive
     print("\nAI: ", end="", flush=True)
 
-    with torch.no_grad():
-        outputs = model.generate(
-            **inputs,
-            max_new_tokens=150,
-            temperature=0.7,
-            do_sample=True,
-            top_p=0.9,
-            top_k=50,
-            pad_token_id=tokenizer.eos_token_id,
-            eos_token_id=tokenizer.eos_token_id,
-        )
-
-    # Decode response
-    response = tokenizer.decode(outputs[0], skip_special_tokens=True)
-
-    # Remove prompt from response
-    if response.startswith(prompt):
-        response = response[len(prompt):].strip()
-
-    # Print response
-    print(response)
+    pieces = []
+    for piece in engine.stream(prompt, params, session_id="cli"):
+        pieces.append(piece)
+        print(piece, end="", flush=True)
+    print()
+
+    response = "".join(pieces).strip()
+    transcript = f"{prompt} {response}\n"
 
     conversation_count += 1
 
@@ -0,0 +1,184 @@
+"""Latency/recall benchmark for RAG retrieval modes over the study guides.
+
+Indexes the study guides into a scratch Chroma collection and compares
+dense, sparse (BM25), hybrid (RRF) and optionally hybrid + cross-encoder
+retrieval on two query sets built from the corpus itself:
+
+- section queries: a chunk's heading plus its rarest terms -> that chunk
+- exact-term queries: rare tokens such as formulas (H2SO4) or Kiswahili
+  words -> any chunk containing the token
+
+Both sets are derived from lexical features, so they flatter BM25 in
+absolute terms; use them to compare modes and track regressions.
+
+Usage:
+    python benchmark_retrieval.py --guides-path .. --k 5 --queries 200
+    python benchmark_retrieval.py --rerank-model cross-encoder/ms-marco-MiniLM-L-6-v2
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+# Technical guides that are not study material (same filter as SimpleRAGSystem)
+EXCLUDE_KEYWORDS = [
+    "SETUP", "DEPLOYMENT", "CLOUD", "VISION_MODELING",
+    "INTELLIGENCE_BOOST", "COMPLETE_SETUP", "USER_GUIDE",
+    "CUSTOM_MODEL", "COLAB", "EASY", "QUICK", "USE_REAL"
+]
+
+
+def find_guides(guides_path: str) -> list[str]:
+    files = set(glob.glob(os.path.join(guides_path, "*GUIDE.md")))
+    return sorted(
+        f for f in files
+        if not any(keyword in os.path.basename(f).upper() for keyword in EXCLUDE_KEYWORDS)
+    )
+
+
+def build_queries(chunks, n_queries: int, seed: int) -> list[dict]:
+    """Section and exact-term queries with their relevant chunk texts."""
+    from genius_ai.rag.sparse import tokenize
+
+    rng = random.Random(seed)
+    chunk_terms = [Counter(tokenize(chunk.content)) for chunk in chunks]
+    df = Counter(term for terms in chunk_terms for term in terms)
+    n = len(chunks)
+
+    def idf(term: str) -> float:
+        return math.log(n / df[term])
+
+    queries = []
+
+    # Section queries
+    candidates = [i for i, chunk in enumerate(chunks) if chunk.metadata.get("section")]
+    for i in rng.sample(candidates, min(n_queries // 2, len(candidates))):
+        heading = chunks[i].metadata["section"].split(" > ")[-1]
+        rare = sorted(chunk_terms[i], key=idf, reverse=True)[:3]
+        queries.append({
+            "type": "section",
+            "query": f"{heading} {' '.join(rare)}",
+            "relevant": {chunks[i].content},
+        })
+
+    # Exact-term queries: formulas/codes (letters + digits) first, then other rare words
+    rare_terms = [term for term, count in df.items() if count <= 3 and len(term) > 3]
+    formulas = [term for term in rare_terms if any(c.isdigit() for c in term) and any(c.isalpha() for c in term)]
+    words = [term for term in rare_terms if term.isalpha()]
+    rng.shuffle(formulas)
+    rng.shuffle(words)
+    for term in (formulas + words)[:n_queries - len(queries)]:
+        queries.append({
+            "type": "exact_term",
+            "query": term,
+            "relevant": {chunk.content for chunk, terms in zip(chunks, chunk_terms) if term in terms},
+        })
+
+    return queries
+
+
+async def evaluate(retriever, queries: list[dict], mode: str, k: int) -> dict:
+    latencies, hits, reciprocal_ranks = [], [], []
+    by_type: dict[str, list[int]] = {}
+
+    await retriever.retrieve(queries[0]["query"], top_k=k, mode=mode)  # Warm up
+    for query in queries:
+        start = time.perf_counter()
+        results = await retriever.retrieve(query["query"], top_k=k, mode=mode)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        rank = next(
+            (i for i, result in enumerate(results, 1) if result["document"] in query["relevant"]),
+            None,
+        )
+        hits.append(1 if rank else 0)
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+        by_type.setdefault(query["type"], []).append(1 if rank else 0)
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        f"recall@{k}": round(sum(hits) / len(hits), 3),
+        "mrr": round(sum(reciprocal_ranks) / len(reciprocal_ranks), 3),
+        **{f"recall@{k}_{kind}": round(sum(v) / len(v), 3) for kind, v in by_type.items()},
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--guides-path", default=str(Path(__file__).parent.parent))
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--rerank-model", default=None)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    from genius_ai.rag.chunker import DocumentChunker
+    from genius_ai.rag.reranker import CrossEncoderReranker
+    from genius_ai.rag.retriever import RAGRetriever
+    from genius_ai.rag.vector_store import VectorStore
+
+    guides = find_guides(args.guides_path)
+    if not guides:
+        print(f"No study guides found in {args.guides_path}")
+        return
+
+    chunker = DocumentChunker()
+    chunks = []
+    for path in guides:
+        chunks.extend(chunker.chunk_file(path, {"source": os.path.basename(path)}))
+    print(f"{len(guides)} guides -> {len(chunks)} chunks")
+
+    store = VectorStore(collection_name="retrieval_benchmark")
+    retriever = RAGRetriever(vector_store=store, mode="hybrid")
+    await retriever.initialize()
+    await store.clear()
+    retriever.sparse_index.clear()
+
+    start = time.perf_counter()
+    await retriever.add_documents(chunks, chunk=False)
+    print(f"Indexed in {time.perf_counter() - start:.1f}s")
+
+    queries = build_queries(chunks, args.queries, args.seed)
+    print(f"{len(queries)} queries ({sum(q['type'] == 'exact_term' for q in queries)} exact-term)\n")
+
+    rows = []
+    try:
+        for mode in ["dense", "sparse", "hybrid"]:
+            rows.append(await evaluate(retriever, queries, mode, args.k))
+
+        if args.rerank_model:
+            retriever.reranker = CrossEncoderReranker(args.rerank_model)
+            row = await evaluate(retriever, queries, "hybrid", args.k)
+            row["mode"] = "hybrid+rerank"
+            rows.append(row)
+    finally:
+        await store.clear()
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    columns = list(rows[0].keys())
+    print("  ".join(f"{column:>22}" for column in columns))
+    for row in rows:
+        print("  ".join(f"{str(row.get(column, '')):>22}" for column in columns))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -13,6 +13,7 @@ import ast
 import re
 from collections import defaultdict
 from groq import Groq
+from ultimate_ai.memory.session_store import DEFAULT_SPILL_DIR, SessionStore
 
 router = APIRouter(prefix="/codebase", tags=["Codebase Intelligence"])
 
@@ -199,8 +200,16 @@ Respond with only the summary, no additional text."""
             return f"Code file: {Path(file_path).name}"
 
 
-# Global index (in production, use Redis or similar)
-codebase_indexes: Dict[str, CodebaseIndex] = {}
+# Indexes by project path. They hold every indexed file's contents, so only a
+# few stay in memory; idle ones are spilled to disk and reloaded on demand.
+codebase_indexes = SessionStore(
+    "codebase_indexes",
+    max_sessions=10,
+    max_bytes=512 * 1024 * 1024,
+    ttl=7 * 24 * 3600,
+    idle_after=30 * 60,
+    spill_dir=DEFAULT_SPILL_DIR
+)
 
 
 @router.post("/index")
@@ -376,6 +385,7 @@ async def get_file_summary(project_path: str, file_path: str):
     if file_path in index.file_contents:
         summary = index.generate_file_summary(file_path, index.file_contents[file_path])
         index.file_summaries[file_path] = summary
+        codebase_indexes.touch(project_path, grown_by=len(summary))
         return {"file_path": file_path, "summary": summary}
 
     raise HTTPException(status_code=404, detail="File not found in index")
@@ -434,3 +444,9 @@ async def get_project_context(project_path: str):
         "key_files": [{"path": path, "summary": summary} for path, summary in key_files],
         "indexed": True
     }
+
+
+@router.get("/index-stats")
+async def get_index_stats():
+    """Indexes held in memory / spilled to disk, and their approximate size"""
+    return codebase_indexes.get_stats()
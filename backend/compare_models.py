@@ -6,12 +6,17 @@ how much better the enhanced model performs.
 
 import sys
 import io
-import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from pathlib import Path
 
 # Fix Windows console encoding
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from genius_ai.inference.engine import SamplingParams
+from genius_ai.inference.registry import model_registry
+
 print("=" * 70)
 print("MODEL COMPARISON: Old (5 examples) vs Enhanced (50 examples)")
 print("=" * 70)
@@ -31,10 +36,7 @@ print("\nLoading models...")
 # Load old model
 try:
     print("  Loading OLD model (5 examples)...")
-    old_model = AutoModelForCausalLM.from_pretrained("./tiny_genius_model", torch_dtype=torch.float32)
-    old_tokenizer = AutoTokenizer.from_pretrained("./tiny_genius_model")
-    old_tokenizer.pad_token = old_tokenizer.eos_token
-    old_model.eval()
+    old_model = model_registry.get("./tiny_genius_model")
     print("    [OK] Old model loaded")
 except Exception as e:
     print(f"    [ERROR] Could not load old model: {e}")
@@ -43,10 +45,7 @@ except Exception as e:
 # Load enhanced model
 try:
     print("  Loading ENHANCED model (50 examples)...")
-    new_model = AutoModelForCausalLM.from_pretrained("./genius_model_enhanced", torch_dtype=torch.float32)
-    new_tokenizer = AutoTokenizer.from_pretrained("./genius_model_enhanced")
-    new_tokenizer.pad_token = new_tokenizer.eos_token
-    new_model.eval()
+    new_model = model_registry.get("./genius_model_enhanced")
     print("    [OK] Enhanced model loaded")
 except Exception as e:
     print(f"    [ERROR] Could not load enhanced model: {e}")
@@ -57,6 +56,16 @@ if not old_model or not new_model:
     print("\n[ERROR] Could not load both models. Exiting.")
     sys.exit(1)
 
+# Generate all answers up front: one batched decode per model
+params = SamplingParams(max_new_tokens=100, temperature=0.7)
+prompts = [f"Q: {question}\nA:" for question in test_questions]
+
+print("\nGenerating answers (batched)...")
+old_outputs = old_model.generate_batch(prompts, params)
+new_outputs = new_model.generate_batch(prompts, params)
+print(f"  Old model: {old_outputs[0].latency_ms / 1000:.1f}s for {len(prompts)} questions")
+print(f"  Enhanced model: {new_outputs[0].latency_ms / 1000:.1f}s for {len(prompts)} questions")
+
 print("\n" + "=" * 70)
 print("SIDE-BY-SIDE COMPARISON")
 print("=" * 70)
@@ -66,37 +75,13 @@ for i, question in enumerate(test_questions, 1):
     print(f"QUESTION {i}: {question}")
     print('='*70)
 
-    prompt = f"Q: {question}\nA:"
-
-    # Get response from old model
+    # Response from old model
     print("\n[OLD MODEL - 5 examples]")
-    inputs = old_tokenizer(prompt, return_tensors="pt")
-    with torch.no_grad():
-        outputs = old_model.generate(
-            **inputs,
-            max_new_tokens=100,
-            temperature=0.7,
-            do_sample=True,
-            pad_token_id=old_tokenizer.eos_token_id
-        )
-    old_response = old_tokenizer.decode(outputs[0], skip_special_tokens=True)
-    old_response = old_response[len(prompt):].strip()
-    print(f"{old_response}")
-
-    # Get response from enhanced model
+    print(f"{old_outputs[i - 1].text}")
+
+    # Response from enhanced model
     print("\n[ENHANCED MODEL - 50 examples]")
-    inputs = new_tokenizer(prompt, return_tensors="pt")
-    with torch.no_grad():
-        outputs = new_model.generate(
-            **inputs,
-            max_new_tokens=100,
-            temperature=0.7,
-            do_sample=True,
-            pad_token_id=new_tokenizer.eos_token_id
-        )
-    new_response = new_tokenizer.decode(outputs[0], skip_special_tokens=True)
-    new_response = new_response[len(prompt):].strip()
-    print(f"{new_response}")
+    print(f"{new_outputs[i - 1].text}")
 
     print("\n" + "-"*70)
 
@@ -0,0 +1,358 @@
+"""
+CPU Training Profile
+Shared CPU settings for train_massive.py, train_enhanced.py and train_minimal.py
+
+Sets intra-op/inter-op thread counts, turns on bf16 autocast when the CPU
+supports it, enables gradient checkpointing and DataLoader workers, and
+reports samples/sec, peak RSS and how much wall-clock time is real compute.
+Checkpoints are written from a background thread so saving does not stall
+the training loop.
+"""
+
+import copy
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import torch
+from transformers import TrainerCallback, TrainingArguments
+
+
+def physical_core_count() -> int:
+    """Number of physical cores (hyperthreads hurt GEMM-heavy training)"""
+    try:
+        import psutil
+
+        cores = psutil.cpu_count(logical=False)
+        if cores:
+            return cores
+    except ImportError:
+        pass
+    logical = os.cpu_count() or 1
+    return max(1, logical // 2)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS reports bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    except ImportError:
+        return 0.0
+
+
+def cpu_supports_bf16() -> bool:
+    """True if this CPU can run bf16 autocast at native speed (AVX512-BF16 / AMX)"""
+    for probe in ("_is_avx512_bf16_supported", "_is_amx_tile_supported"):
+        check = getattr(torch.cpu, probe, None)
+        if check is None:
+            continue
+        try:
+            if check():
+                return True
+        except Exception:
+            continue
+    return False
+
+
+def default_dataloader_workers() -> int:
+    """
+    DataLoader workers for CPU training
+
+    The training scripts have no __main__ guard, so on platforms that spawn
+    workers (Windows, macOS) each worker would re-run the whole script.
+    Workers are only enabled where fork is the start method.
+    """
+    if multiprocessing.get_start_method(allow_none=True) not in (None, "fork"):
+        return 0
+    if sys.platform in ("win32", "darwin"):
+        return 0
+    return min(4, max(1, (os.cpu_count() or 1) // 8))
+
+
+@dataclass
+class CPUTrainingProfile:
+    """CPU training settings shared by the train_*.py scripts"""
+
+    intra_op_threads: int = field(default_factory=physical_core_count)
+    inter_op_threads: int = 2
+    use_bf16: Optional[bool] = None  # None = auto-detect
+    gradient_checkpointing: bool = True
+    dataloader_workers: int = field(default_factory=default_dataloader_workers)
+    async_checkpoints: bool = True
+    log_file: str = "cpu_profile.jsonl"
+
+    def __post_init__(self):
+        # Filled in by training_arguments() for callbacks()
+        self._output_dir = "."
+        self._save_strategy = "steps"
+        self._save_steps = 500
+        self._save_total_limit: Optional[int] = None
+
+    def apply(self) -> "CPUTrainingProfile":
+        """Configure torch threading; call before the model is loaded"""
+        torch.set_num_threads(self.intra_op_threads)
+        try:
+            torch.set_num_interop_threads(self.inter_op_threads)
+        except RuntimeError:
+            # Only settable once, before any inter-op work has started
+            pass
+        if self.use_bf16 is None:
+            self.use_bf16 = cpu_supports_bf16()
+        return self
+
+    def describe(self) -> str:
+        """One-line summary for the script banners"""
+        return (
+            f"CPU profile: {self.intra_op_threads} intra-op / {self.inter_op_threads} inter-op threads, "
+            f"bf16={'on' if self.use_bf16 else 'off'}, "
+            f"grad checkpointing={'on' if self.gradient_checkpointing else 'off'}, "
+            f"dataloader workers={self.dataloader_workers}, "
+            f"async checkpoints={'on' if self.async_checkpoints else 'off'}"
+        )
+
+    def training_arguments(self, output_dir: str, **overrides: Any) -> TrainingArguments:
+        """
+        Build TrainingArguments for CPU training
+
+        When async checkpoints are on, the Trainer's own (blocking) saving is
+        disabled and AsyncCheckpointCallback takes over using the same
+        save_steps / save_strategy / save_total_limit values.
+        """
+        if self.use_bf16 is None:
+            self.apply()
+
+        args: Dict[str, Any] = {
+            "output_dir": output_dir,
+            "no_cuda": True,
+            "fp16": False,
+            "bf16": bool(self.use_bf16),
+            "gradient_checkpointing": self.gradient_checkpointing,
+            "dataloader_num_workers": self.dataloader_workers,
+            "dataloader_pin_memory": False,
+            "report_to": "none",
+        }
+        args.update(overrides)
+
+        self._save_strategy = str(args.pop("save_strategy", "steps"))
+        self._save_steps = int(args.pop("save_steps", 500))
+        self._save_total_limit = args.pop("save_total_limit", None)
+        if self.async_checkpoints:
+            args["save_strategy"] = "no"
+        else:
+            args["save_strategy"] = self._save_strategy
+            args["save_steps"] = self._save_steps
+            args["save_total_limit"] = self._save_total_limit
+
+        self._output_dir = output_dir
+        return TrainingArguments(**args)
+
+    def callbacks(self) -> List[TrainerCallback]:
+        """Callbacks to pass to Trainer(callbacks=...)"""
+        callbacks: List[TrainerCallback] = [
+            ThroughputCallback(log_path=Path(self._output_dir) / self.log_file)
+        ]
+        if self.async_checkpoints:
+            callbacks.append(
+                AsyncCheckpointCallback(
+                    output_dir=self._output_dir,
+                    save_steps=self._save_steps,
+                    save_strategy=self._save_strategy,
+                    save_total_limit=self._save_total_limit,
+                )
+            )
+        return callbacks
+
+
+class ThroughputCallback(TrainerCallback):
+    """
+    Per-step samples/sec and peak RSS, plus a compute vs wall-clock summary
+
+    Time between on_step_begin and on_step_end is forward + backward +
+    optimizer step; everything else (data loading, logging, saving) is
+    overhead. Each step is appended to a JSONL log, and a short line is
+    printed at the Trainer's logging cadence.
+    """
+
+    def __init__(self, log_path: Optional[Path] = None):
+        self.log_path = Path(log_path) if log_path else None
+        self._log_handle = None
+        self._train_start = 0.0
+        self._step_start = 0.0
+        self._compute_seconds = 0.0
+        self._samples = 0
+        self._samples_per_step = 1
+
+    def on_train_begin(self, args, state, control, **kwargs):
+        self._samples_per_step = (
+            args.per_device_train_batch_size * args.gradient_accumulation_steps * max(1, args.world_size)
+        )
+        self._compute_seconds = 0.0
+        self._samples = 0
+        if self.log_path is not None:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._log_handle = open(self.log_path, "a", encoding="utf-8")
+        self._train_start = time.perf_counter()
+
+    def on_step_begin(self, args, state, control, **kwargs):
+        self._step_start = time.perf_counter()
+
+    def on_step_end(self, args, state, control, **kwargs):
+        step_seconds = time.perf_counter() - self._step_start
+        self._compute_seconds += step_seconds
+        self._samples += self._samples_per_step
+
+        record = {
+            "step": state.global_step,
+            "step_seconds": round(step_seconds, 4),
+            "samples_per_sec": round(self._samples_per_step / step_seconds, 3) if step_seconds else 0.0,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+        if self._log_handle is not None:
+            self._log_handle.write(json.dumps(record) + "\n")
+
+        if args.logging_steps and state.global_step % args.logging_steps == 0:
+            print(
+                f"  step {record['step']}: {record['samples_per_sec']} samples/sec, "
+                f"peak RSS {record['peak_rss_mb']} MB"
+            )
+
+    def on_train_end(self, args, state, control, **kwargs):
+        wall_seconds = time.perf_counter() - self._train_start
+        summary = self.summary(wall_seconds)
+        if self._log_handle is not None:
+            self._log_handle.write(json.dumps({"summary": summary}) + "\n")
+            self._log_handle.close()
+            self._log_handle = None
+
+        print()
+        print(f"Throughput: {summary['samples_per_sec']} samples/sec over {summary['samples']} samples")
+        print(
+            f"Compute: {summary['compute_seconds']}s of {summary['wall_seconds']}s wall-clock "
+            f"({summary['compute_percent']}%), peak RSS {summary['peak_rss_mb']} MB"
+        )
+
+    def summary(self, wall_seconds: float) -> Dict[str, Any]:
+        """Totals for the whole run"""
+        return {
+            "samples": self._samples,
+            "wall_seconds": round(wall_seconds, 2),
+            "compute_seconds": round(self._compute_seconds, 2),
+            "compute_percent": round(100 * self._compute_seconds / wall_seconds, 1) if wall_seconds else 0.0,
+            "samples_per_sec": round(self._samples / wall_seconds, 3) if wall_seconds else 0.0,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+
+
+class AsyncCheckpointCallback(TrainerCallback):
+    """
+    Save checkpoints from a background thread
+
+    The state dict is copied on the training thread (cheap memcpy), then
+    serialised to disk on a single worker thread while training continues.
+    Only one save is in flight at a time; the next save waits for it.
+
+    Each checkpoint-<step> directory holds what Trainer writes itself
+    (weights, tokenizer, optimizer.pt, scheduler.pt, rng_state.pth and
+    trainer_state.json), so it works with
+    trainer.train(resume_from_checkpoint=...). The optimizer state is
+    copied along with the weights, which roughly triples the snapshot for
+    Adam.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        save_steps: int = 500,
+        save_strategy: str = "steps",
+        save_total_limit: Optional[int] = None,
+    ):
+        self.output_dir = Path(output_dir)
+        self.save_steps = save_steps
+        self.save_strategy = save_strategy
+        self.save_total_limit = save_total_limit
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint")
+        self._pending: Optional[Future] = None
+        self._lock = threading.Lock()
+        self._saved: List[Path] = []
+
+    def on_step_end(self, args, state, control, **kwargs):
+        if self.save_strategy == "steps" and self.save_steps and state.global_step % self.save_steps == 0:
+            self._save(state, **kwargs)
+
+    def on_epoch_end(self, args, state, control, **kwargs):
+        if self.save_strategy == "epoch":
+            self._save(state, **kwargs)
+
+    def on_train_end(self, args, state, control, **kwargs):
+        self.wait()
+        self._executor.shutdown(wait=True)
+
+    def wait(self) -> None:
+        """Block until the in-flight checkpoint (if any) is on disk"""
+        with self._lock:
+            pending = self._pending
+        if pending is not None:
+            pending.result()
+
+    def _save(self, state, model=None, tokenizer=None, optimizer=None, lr_scheduler=None, **kwargs) -> None:
+        if model is None:
+            return
+        self.wait()
+        snapshot = {name: tensor.detach().clone() for name, tensor in model.state_dict().items()}
+        # Everything else resume needs, copied before training moves on
+        extras = {
+            "trainer_state": copy.deepcopy(state),
+            "optimizer": copy.deepcopy(optimizer.state_dict()) if optimizer is not None else None,
+            "scheduler": copy.deepcopy(lr_scheduler.state_dict()) if lr_scheduler is not None else None,
+            "rng_state": {
+                "python": random.getstate(),
+                "numpy": np.random.get_state(),
+                "cpu": torch.random.get_rng_state(),
+            },
+        }
+        target = self.output_dir / f"checkpoint-{state.global_step}"
+        with self._lock:
+            self._pending = self._executor.submit(self._write, model, tokenizer, snapshot, extras, target)
+
+    def _write(self, model, tokenizer, snapshot: Dict[str, torch.Tensor], extras: Dict[str, Any], target: Path) -> None:
+        target.mkdir(parents=True, exist_ok=True)
+        model.save_pretrained(str(target), state_dict=snapshot)
+        if tokenizer is not None:
+            tokenizer.save_pretrained(str(target))
+        if extras["optimizer"] is not None:
+            torch.save(extras["optimizer"], target / "optimizer.pt")
+        if extras["scheduler"] is not None:
+            torch.save(extras["scheduler"], target / "scheduler.pt")
+        torch.save(extras["rng_state"], target / "rng_state.pth")
+        # Written last, so a directory with trainer_state.json is a complete checkpoint
+        extras["trainer_state"].save_to_json(str(target / "trainer_state.json"))
+        self._saved.append(target)
+        self._rotate()
+
+    def _rotate(self) -> None:
+        if not self.save_total_limit:
+            return
+        while len(self._saved) > self.save_total_limit:
+            oldest = self._saved.pop(0)
+            shutil.rmtree(oldest, ignore_errors=True)
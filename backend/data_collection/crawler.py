@@ -0,0 +1,255 @@
+"""Async crawler framework for the data collectors.
+
+Shared by wikipedia_downloader.py and stackoverflow_scraper.py:
+- One pooled aiohttp session (connection reuse across all requests)
+- Token-bucket rate limiter shared by every request of a crawl
+- Bounded concurrency with a semaphore
+- Results appended to JSONL as they arrive (nothing held in memory)
+- Checkpoint (done-key log + state file) so an interrupted crawl resumes
+  where it stopped without duplicating records
+
+Point `api_url`/`api_base` at a local fake server to test a collector.
+"""
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+
+import aiohttp
+
+
+class TokenBucket:
+    """Async token-bucket rate limiter.
+
+    Allows short bursts up to `capacity` and a sustained `rate` requests/sec.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def pause(self, seconds):
+        """Block every caller for `seconds` (server-requested backoff)."""
+        async with self._lock:
+            await asyncio.sleep(seconds)
+            self._tokens = 0
+            self._updated = time.monotonic()
+
+
+class Checkpoint:
+    """Crawl progress on disk: completed keys plus free-form state.
+
+    Completed keys are appended to a log (<name>_done.jsonl) as each item
+    finishes, so marking one is O(1) however long the crawl. On startup the
+    keys are also rebuilt from the crawl's own JSONL output: a record
+    written just before a crash counts as done even if its key never
+    reached the log, so a resumed crawl can never append it twice. The
+    small state dict is written atomically (temp file + rename) so a crash
+    mid-write never corrupts it.
+    """
+
+    def __init__(self, path, records=None, record_key=None):
+        """
+        Args:
+            path: State file (JSON)
+            records: JSONL output of the crawl, if any
+            record_key: Maps a record from `records` to its item key
+        """
+        self.path = Path(path)
+        self.done_path = self.path.with_name(self.path.stem + "_done.jsonl")
+        self.done = set()
+        self.state = {}
+
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.state = data.get("state", {})
+            if data.get("done"):
+                # Checkpoint from before the done log: move its keys over
+                for key in data["done"]:
+                    self.mark_done(key)
+                self.save()
+
+        if self.done_path.exists():
+            self.done.update(self._read_jsonl(self.done_path))
+        if records is not None and record_key is not None and Path(records).exists():
+            self.done.update(record_key(record) for record in self._read_jsonl(records))
+
+    @staticmethod
+    def _read_jsonl(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    pass  # Line torn by a crash mid-write
+
+    def is_done(self, key):
+        return key in self.done
+
+    def mark_done(self, key):
+        if key in self.done:
+            return
+        self.done.add(key)
+        with open(self.done_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(key, ensure_ascii=False) + "\n")
+
+    def save(self):
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"state": self.state}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        self.done.clear()
+        self.state.clear()
+        for path in (self.path, self.done_path):
+            if path.exists():
+                path.unlink()
+
+
+class JsonlWriter:
+    """Append-only JSONL output, flushed after every record."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self.written = 0
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.written += 1
+
+    def close(self):
+        self._file.close()
+
+    def count(self):
+        """Records in the file (including ones from earlier runs)."""
+        if not self.path.exists():
+            return 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            return sum(1 for line in f if line.strip())
+
+    def export_json(self, json_path):
+        """Write the JSONL records as one JSON array, streaming line by line.
+
+        Keeps the single-file JSON output that build_world_class_ai.py reads.
+        """
+        if not self._file.closed:
+            self._file.flush()
+        tmp = Path(str(json_path) + ".tmp")
+        with open(self.path, "r", encoding="utf-8") as src, open(tmp, "w", encoding="utf-8") as dst:
+            dst.write("[\n")
+            first = True
+            for line in src:
+                line = line.strip()
+                if not line:
+                    continue
+                if not first:
+                    dst.write(",\n")
+                dst.write(line)
+                first = False
+            dst.write("\n]\n")
+        os.replace(tmp, json_path)
+
+
+class AsyncCrawler:
+    """Base class for rate-limited, concurrent, resumable API crawls."""
+
+    def __init__(self, output_dir, rate=10, concurrency=8, timeout=30, max_retries=3):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.bucket = TokenBucket(rate)
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_retries = max_retries
+        self.request_count = 0
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers={"User-Agent": "GeniusAI-DataCollector/1.0"},
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+        self._session = None
+
+    async def fetch_json(self, url, params=None):
+        """GET a JSON document with rate limiting, bounded concurrency and retries.
+
+        Retries 429 and 5xx responses with exponential backoff (honouring
+        Retry-After). Returns None when the request ultimately fails.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            async with self._semaphore:
+                self.request_count += 1
+                try:
+                    async with self._session.get(url, params=params) as response:
+                        if response.status == 200:
+                            data = await response.json(content_type=None)
+                            await self.on_response(data)
+                            return data
+                        retryable = response.status == 429 or response.status >= 500
+                        retry_after = response.headers.get("Retry-After")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    retryable, retry_after = True, None
+                    print(f"  Request error ({e.__class__.__name__}): {url}")
+
+            if not retryable or attempt == self.max_retries:
+                return None
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+            await asyncio.sleep(delay)
+        return None
+
+    async def on_response(self, data):
+        """Hook for API-specific handling of successful responses."""
+
+    async def run_tasks(self, items, handler, checkpoint, key=lambda item: item):
+        """Run `handler` for every item not yet in the checkpoint, concurrently.
+
+        The handler is responsible for writing its results. Items are marked
+        done only after their handler completes, so an interrupted crawl
+        redoes at most the in-flight items. A handler returning False (e.g.
+        the request failed) leaves the item to be retried on the next run.
+        """
+        pending = [item for item in items if not checkpoint.is_done(key(item))]
+
+        async def worker(item):
+            if await handler(item) is not False:
+                checkpoint.mark_done(key(item))
+
+        try:
+            await asyncio.gather(*(worker(item) for item in pending))
+        finally:
+            checkpoint.save()
+        return len(pending)
@@ -7,26 +7,43 @@ Target: 40,000 programming examples
 Cost: $0
 """
 
-import requests
-import time
-import json
-import os
-from datetime import datetime
-
-class StackOverflowScraper:
-    def __init__(self, output_dir="data/stackoverflow"):
-        self.output_dir = output_dir
-        os.makedirs(output_dir, exist_ok=True)
-
-        # StackExchange API (free, no auth needed for read)
-        self.api_base = "https://api.stackexchange.com/2.3"
+import asyncio
+
+from crawler import AsyncCrawler, Checkpoint, JsonlWriter
+
+class StackOverflowScraper(AsyncCrawler):
+    def __init__(self, output_dir="data/stackoverflow", api_base="https://api.stackexchange.com/2.3",
+                 rate=10, concurrency=8):
+        # StackExchange throttles above 30 requests/sec per IP
+        super().__init__(output_dir, rate=rate, concurrency=concurrency)
+
+        # StackExchange API (free, no auth needed for read); override to test against a fake server
+        self.api_base = api_base
         self.site = "stackoverflow"
 
         # Rate limit: 300 requests per day (free tier)
-        self.request_count = 0
         self.max_requests_per_day = 300
+        self.quota_remaining = None
+
+    @property
+    def budget_exhausted(self):
+        return self.request_count >= self.max_requests_per_day or self.quota_remaining == 0
 
-    def search_questions(self, tags, min_score=10, page=1, pagesize=100):
+    async def fetch_json(self, url, params=None):
+        if self.budget_exhausted:
+            return None
+        return await super().fetch_json(url, params)
+
+    async def on_response(self, data):
+        """Track the API quota and honour StackExchange's `backoff` field."""
+        if isinstance(data, dict):
+            self.quota_remaining = data.get("quota_remaining", self.quota_remaining)
+            backoff = data.get("backoff")
+            if backoff:
+                print(f"  API requested backoff of {backoff}s")
+                await self.bucket.pause(backoff)
+
+    async def search_questions(self, tags, min_score=10, page=1, pagesize=100):
         """Search for high-quality questions by tag.
 
         Args:
@@ -47,16 +64,12 @@ class StackOverflowScraper:
             "pagesize": pagesize
         }
 
-        response = requests.get(url, params=params)
-        self.request_count += 1
-
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Error: {response.status_code}")
-            return None
+        result = await self.fetch_json(url, params)
+        if result is None:
+            print(f"Error: question search failed (page {page})")
+        return result
 
-    def get_answers(self, question_id):
+    async def get_answers(self, question_id):
         """Get answers for a specific question.
 
         Args:
@@ -70,13 +83,7 @@ class StackOverflowScraper:
             "filter": "withbody"  # Include answer body
         }
 
-        response = requests.get(url, params=params)
-        self.request_count += 1
-
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return None
+        return await self.fetch_json(url, params)
 
     def clean_html(self, html_text):
         """Remove HTML tags and clean text."""
@@ -121,85 +128,130 @@ class StackOverflowScraper:
             }
         }
 
-    def scrape_by_tags(self, tags, max_questions=1000, min_question_score=10, min_answer_score=5):
+    @staticmethod
+    def pick_best_answer(answers, min_answer_score):
+        """Accepted answer, else the highest-scored one above the threshold."""
+        best_answer = None
+        for answer in answers:
+            if answer.get('is_accepted', False):
+                return answer
+            if answer.get('score', 0) >= min_answer_score:
+                if not best_answer or answer['score'] > best_answer['score']:
+                    best_answer = answer
+        return best_answer
+
+    async def scrape_by_tags(self, tags, max_questions=1000, min_question_score=10, min_answer_score=5,
+                             combined=None):
         """Scrape Q&A pairs for specific tags.
 
+        Answers for a page of questions are fetched concurrently. Examples
+        are appended to <tags>.jsonl as they arrive and progress (next page,
+        finished questions) is checkpointed, so a re-run - e.g. the next day,
+        with a fresh API quota - carries on where this one stopped.
+
         Args:
             tags: List of tags to search
             max_questions: Maximum questions to scrape
             min_question_score: Minimum question upvotes
             min_answer_score: Minimum answer upvotes
+            combined: Optional JsonlWriter that also receives every example
+
+        Returns:
+            Number of examples collected for these tags (all runs)
         """
-        examples = []
-        page = 1
+        tag_name = "_".join(tags)
+        output = self.output_dir / f"{tag_name}.jsonl"
+        # Questions already in the output count as done even if the crawl
+        # stopped before logging them, so nothing is appended twice
+        checkpoint = Checkpoint(self.output_dir / f"{tag_name}_checkpoint.json", records=output,
+                                record_key=lambda record: record["metadata"]["question_id"])
+        writer = JsonlWriter(output)
+        previous = writer.count()
+        page = checkpoint.state.get("next_page", 1)
 
         print(f"Scraping StackOverflow for tags: {tags}")
-        print(f"Target: {max_questions} questions")
+        print(f"Target: {max_questions} questions ({previous} already collected)")
 
-        while len(examples) < max_questions and self.request_count < self.max_requests_per_day:
-            # Get questions
-            result = self.search_questions(tags, min_question_score, page)
+        async def handle(question):
+            answers_result = await self.get_answers(question['question_id'])
+            if answers_result is None:
+                return False  # Failed or out of quota - retry on the next run
 
-            if not result or 'items' not in result:
-                break
+            best_answer = self.pick_best_answer(answers_result.get('items', []), min_answer_score)
+            if best_answer:
+                example = self.format_training_example(question, best_answer)
+                writer.write(example)
+                if combined is not None:
+                    combined.write(example)
 
-            questions = result['items']
+                if writer.written % 10 == 0:
+                    print(f"  Collected {previous + writer.written} examples...")
 
-            if not questions:
-                break
+        try:
+            while previous + writer.written < max_questions and not self.budget_exhausted:
+                # Get questions
+                result = await self.search_questions(tags, min_question_score, page)
 
-            for question in questions:
-                if len(examples) >= max_questions:
+                if not result or not result.get('items'):
                     break
 
-                # Get answers for this question
-                answers_result = self.get_answers(question['question_id'])
-
-                if answers_result and 'items' in answers_result:
-                    answers = answers_result['items']
-
-                    # Find best answer (accepted or highest score)
-                    best_answer = None
-                    for answer in answers:
-                        if answer.get('is_accepted', False):
-                            best_answer = answer
-                            break
-                        if answer.get('score', 0) >= min_answer_score:
-                            if not best_answer or answer['score'] > best_answer['score']:
-                                best_answer = answer
+                remaining = max_questions - previous - writer.written
+                questions = [q for q in result['items'] if not checkpoint.is_done(q['question_id'])]
+                await self.run_tasks(questions[:remaining], handle, checkpoint,
+                                     key=lambda q: q['question_id'])
 
-                    if best_answer:
-                        example = self.format_training_example(question, best_answer)
-                        examples.append(example)
-
-                        if len(examples) % 10 == 0:
-                            print(f"  Collected {len(examples)} examples...")
-
-                # Rate limiting (30 requests per second max)
-                time.sleep(0.1)
-
-            page += 1
-
-            # StackExchange requires backoff between page requests
-            time.sleep(2)
+                # Only move on once every question on the page is done
+                if not all(checkpoint.is_done(q['question_id']) for q in result['items']):
+                    break
 
-        # Save to file
-        tag_name = "_".join(tags)
-        filename = f"{self.output_dir}/{tag_name}_{datetime.now().strftime('%Y%m%d')}.json"
+                page += 1
+                checkpoint.state["next_page"] = page
+                checkpoint.save()
 
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(examples, f, indent=2, ensure_ascii=False)
+                if not result.get('has_more', True):
+                    break
+        finally:
+            writer.close()
 
-        print(f"\nSaved {len(examples)} examples to {filename}")
+        total = previous + writer.written
+        print(f"\nSaved {writer.written} new examples to {writer.path} ({total} total)")
         print(f"API requests used: {self.request_count}/{self.max_requests_per_day}")
 
-        return examples
+        return total
+
+
+async def scrape(tag_groups):
+    async with StackOverflowScraper() as scraper:
+        combined = JsonlWriter(scraper.output_dir / "combined_stackoverflow.jsonl")
+        try:
+            for tags in tag_groups:
+                print(f"\n{'='*70}")
+                await scraper.scrape_by_tags(
+                    tags,
+                    max_questions=200,  # 200 per tag group
+                    min_question_score=15,  # Higher quality
+                    min_answer_score=10,
+                    combined=combined
+                )
+
+                print(f"Total collected so far: {combined.count()}")
+                print(f"{'='*70}\n")
+
+                # Don't exceed daily limit
+                if scraper.budget_exhausted or scraper.request_count >= scraper.max_requests_per_day - 20:
+                    print("Approaching daily API limit. Stopping for today.")
+                    break
+        finally:
+            combined.close()
+
+        # Save combined file
+        combined_file = scraper.output_dir / "combined_stackoverflow.json"
+        combined.export_json(combined_file)
+        return combined.count(), combined_file
 
 
 def main():
     """Scrape popular programming topics."""
-    scraper = StackOverflowScraper()
-
     # Define tags to scrape (prioritize popular, high-quality)
     tag_groups = [
         # Python (10,000 examples)
@@ -226,39 +278,14 @@ def main():
         ["algorithms"],
     ]
 
-    all_examples = []
-
-    for tags in tag_groups:
-        print(f"\n{'='*70}")
-        examples = scraper.scrape_by_tags(
-            tags,
-            max_questions=200,  # 200 per tag group
-            min_question_score=15,  # Higher quality
-            min_answer_score=10
-        )
-        all_examples.extend(examples)
-
-        print(f"Total collected so far: {len(all_examples)}")
-        print(f"{'='*70}\n")
-
-        # Don't exceed daily limit
-        if scraper.request_count >= scraper.max_requests_per_day - 20:
-            print("Approaching daily API limit. Stopping for today.")
-            break
-
-        # Be respectful to API
-        time.sleep(5)
-
-    # Save combined file
-    combined_file = f"{scraper.output_dir}/combined_stackoverflow.json"
-    with open(combined_file, 'w', encoding='utf-8') as f:
-        json.dump(all_examples, f, indent=2, ensure_ascii=False)
+    total, combined_file = asyncio.run(scrape(tag_groups))
 
     print(f"\n\nFINAL SUMMARY")
     print(f"="*70)
-    print(f"Total examples collected: {len(all_examples)}")
+    print(f"Total examples collected: {total}")
     print(f"Saved to: {combined_file}")
     print(f"\nRun this script daily to collect 2,000-3,000 examples/day")
+    print(f"Each run resumes from the saved checkpoints")
     print(f"Target of 40,000 examples in ~2 weeks!")
     print(f"="*70)
 
@@ -6,56 +6,67 @@ Target: 6M+ articles, 50GB+ of knowledge
 Cost: $0 (just bandwidth and disk space)
 """
 
-import requests
-import json
-import os
-from pathlib import Path
+import asyncio
 
-class WikipediaDownloader:
-    def __init__(self, output_dir="data/wikipedia"):
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+from crawler import AsyncCrawler, Checkpoint, JsonlWriter
 
-        # Wikipedia API (free, no auth)
-        self.api_url = "https://en.wikipedia.org/w/api.php"
+class WikipediaDownloader(AsyncCrawler):
+    def __init__(self, output_dir="data/wikipedia", api_url="https://en.wikipedia.org/w/api.php",
+                 rate=20, concurrency=8):
+        super().__init__(output_dir, rate=rate, concurrency=concurrency)
 
-    def get_article(self, title):
+        # Wikipedia API (free, no auth); override to test against a fake server
+        self.api_url = api_url
+
+    async def get_article(self, title):
         """Get a single Wikipedia article.
 
         Args:
             title: Article title (e.g., "Python (programming language)")
         """
+        return self._parse_article(await self._query_article(title))
+
+    async def _query_article(self, title):
         params = {
             "action": "query",
             "format": "json",
             "titles": title,
             "prop": "extracts",
-            "explaintext": True,  # Plain text, no HTML
+            "explaintext": 1,  # Plain text, no HTML
             "exsectionformat": "plain"
         }
-
-        response = requests.get(self.api_url, params=params)
-
-        if response.status_code == 200:
-            data = response.json()
-            pages = data.get("query", {}).get("pages", {})
-
-            for page_id, page in pages.items():
-                if "extract" in page:
-                    return {
-                        "title": page["title"],
-                        "text": page["extract"],
-                        "page_id": page_id
-                    }
+        return await self.fetch_json(self.api_url, params)
+
+    @staticmethod
+    def _parse_article(data):
+        if not data:
+            return None
+
+        pages = data.get("query", {}).get("pages", {})
+        for page_id, page in pages.items():
+            if "extract" in page:
+                return {
+                    "title": page["title"],
+                    "text": page["extract"],
+                    "page_id": page_id
+                }
 
         return None
 
-    def search_articles(self, query, limit=10):
+    @staticmethod
+    def _record_key(record):
+        """Checkpoint key (the requested title) of a saved article."""
+        metadata = record.get("metadata", {})
+        return metadata.get("search_title", metadata.get("title"))
+
+    async def search_articles(self, query, limit=10):
         """Search for articles by query.
 
         Args:
             query: Search term
             limit: Number of results
+
+        Returns None if the request failed (so a resumed crawl retries it).
         """
         params = {
             "action": "opensearch",
@@ -64,23 +75,20 @@ class WikipediaDownloader:
             "limit": limit
         }
 
-        response = requests.get(self.api_url, params=params)
+        data = await self.fetch_json(self.api_url, params)
+        if data is None:
+            return None
 
-        if response.status_code == 200:
-            data = response.json()
-            # Returns: [query, [titles], [descriptions], [urls]]
-            return data[1] if len(data) > 1 else []
+        # Returns: [query, [titles], [descriptions], [urls]]
+        return data[1] if len(data) > 1 else []
 
-        return []
-
-    def get_category_articles(self, category, limit=500):
+    async def get_category_articles(self, category, limit=500):
         """Get articles in a category.
 
         Args:
             category: Category name (e.g., "Category:Python (programming language)")
             limit: Maximum articles to fetch
         """
-        articles = []
         params = {
             "action": "query",
             "format": "json",
@@ -90,68 +98,94 @@ class WikipediaDownloader:
             "cmtype": "page"  # Only articles, not subcategories
         }
 
-        response = requests.get(self.api_url, params=params)
-
-        if response.status_code == 200:
-            data = response.json()
-            members = data.get("query", {}).get("categorymembers", [])
+        data = await self.fetch_json(self.api_url, params)
+        if not data:
+            return []
 
-            for member in members:
-                articles.append(member["title"])
+        members = data.get("query", {}).get("categorymembers", [])
+        return [member["title"] for member in members]
 
-        return articles
-
-    def download_topics(self, topics, articles_per_topic=100):
+    async def download_topics(self, topics, articles_per_topic=100):
         """Download articles for specific topics.
 
+        Searches and article fetches run concurrently under the shared rate
+        limit. Each article is appended to wikipedia_knowledge.jsonl as soon
+        as it arrives; progress lives in wikipedia_checkpoint.json, so
+        re-running after an interruption only fetches what is missing.
+
         Args:
             topics: List of topics to download
             articles_per_topic: Max articles per topic
-        """
-        all_examples = []
 
+        Returns:
+            Total number of articles in the output
+        """
+        output = self.output_dir / "wikipedia_knowledge.jsonl"
+        checkpoint = Checkpoint(self.output_dir / "wikipedia_checkpoint.json", records=output,
+                                record_key=self._record_key)
+        writer = JsonlWriter(output)
+        searches = checkpoint.state.setdefault("searches", {})
+
+        async def search(topic):
+            titles = await self.search_articles(topic, limit=articles_per_topic)
+            if titles is not None:
+                searches[topic] = titles
+                print(f"  {topic}: {len(titles)} articles")
+
+        print("Searching topics...")
+        await asyncio.gather(*(search(topic) for topic in topics if topic not in searches))
+        checkpoint.save()
+
+        # An article found under several topics is only downloaded once,
+        # credited to the first topic that found it
+        first_topic = {}
         for topic in topics:
-            print(f"\nDownloading articles for: {topic}")
-            print("-" * 70)
-
-            # Search for articles about this topic
-            article_titles = self.search_articles(topic, limit=articles_per_topic)
-
-            for i, title in enumerate(article_titles, 1):
-                article = self.get_article(title)
-
-                if article and article["text"]:
-                    # Split into Q&A format
-                    # Use first paragraph as summary
-                    paragraphs = article["text"].split("\n\n")
-                    summary = paragraphs[0] if paragraphs else article["text"][:500]
-
-                    example = {
-                        "prompt": f"What is {article['title']}? Explain in detail.",
-                        "response": summary[:1000],  # Limit length for training
-                        "full_text": article["text"][:5000],  # Store more for RAG
-                        "metadata": {
-                            "source": "wikipedia",
-                            "title": article["title"],
-                            "page_id": article["page_id"],
-                            "topic": topic
-                        }
+            for title in searches.get(topic, []):
+                first_topic.setdefault(title, topic)
+        items = [(topic, title) for title, topic in first_topic.items()]
+
+        async def fetch(item):
+            topic, title = item
+            data = await self._query_article(title)
+            if data is None:
+                return False  # Request failed - retry on the next run
+
+            article = self._parse_article(data)
+            if article and article["text"]:
+                # Split into Q&A format
+                # Use first paragraph as summary
+                paragraphs = article["text"].split("\n\n")
+                summary = paragraphs[0] if paragraphs else article["text"][:500]
+
+                writer.write({
+                    "prompt": f"What is {article['title']}? Explain in detail.",
+                    "response": summary[:1000],  # Limit length for training
+                    "full_text": article["text"][:5000],  # Store more for RAG
+                    "metadata": {
+                        "source": "wikipedia",
+                        "title": article["title"],
+                        "search_title": title,  # As requested; the API may normalise it
+                        "page_id": article["page_id"],
+                        "topic": topic
                     }
+                })
 
-                    all_examples.append(example)
+                if writer.written % 100 == 0:
+                    print(f"  Downloaded {writer.written} articles...")
 
-                    if i % 10 == 0:
-                        print(f"  Downloaded {i}/{len(article_titles)} articles...")
+        print(f"\nDownloading articles ({len(checkpoint.done)} already done)...")
+        try:
+            await self.run_tasks(items, fetch, checkpoint, key=lambda item: item[1])
+        finally:
+            writer.close()
 
-            print(f"Completed {topic}: {len(article_titles)} articles")
-
-        # Save to file
+        # Single JSON file for build_world_class_ai.py
         output_file = self.output_dir / "wikipedia_knowledge.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_examples, f, indent=2, ensure_ascii=False)
+        writer.export_json(output_file)
 
-        print(f"\nSaved {len(all_examples)} articles to {output_file}")
-        return all_examples
+        total = writer.count()
+        print(f"\nSaved {total} articles to {output_file} ({self.request_count} requests this run)")
+        return total
 
     def download_full_dump(self):
         """Download complete Wikipedia dump (advanced).
@@ -167,7 +201,6 @@ class WikipediaDownloader:
 
 def main():
     """Download Wikipedia articles for key topics."""
-    downloader = WikipediaDownloader()
 
     # Topics to download (customize for your needs)
     topics = [
@@ -214,15 +247,19 @@ def main():
     print("=" * 70)
     print(f"\nDownloading articles for {len(topics)} topics")
     print(f"Target: ~5,000 articles (100 per topic)")
-    print(f"This will take ~30-60 minutes...")
+    print(f"Interrupted runs resume from the checkpoint")
     print("\n" + "=" * 70 + "\n")
 
-    examples = downloader.download_topics(topics, articles_per_topic=100)
+    async def run():
+        async with WikipediaDownloader() as downloader:
+            return await downloader.download_topics(topics, articles_per_topic=100)
+
+    total = asyncio.run(run())
 
     print("\n" + "=" * 70)
     print("DOWNLOAD COMPLETE!")
     print("=" * 70)
-    print(f"Total articles: {len(examples)}")
+    print(f"Total articles: {total}")
     print(f"Output: data/wikipedia/wikipedia_knowledge.json")
     print("\nThese articles are now ready for:")
     print("  1. Training data (Q&A pairs)")
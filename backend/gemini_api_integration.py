@@ -13,6 +13,7 @@ import aiohttp
 import asyncio
 from bs4 import BeautifulSoup
 import re
+from long_context import ContextPiece, LongContextPipeline
 
 router = APIRouter(prefix="/gemini", tags=["gemini"])
 
@@ -181,8 +182,8 @@ async def gemini_chat(request: GeminiChatRequest):
 
 Answer the question using the current information provided above. Be specific with dates and facts."""
 
-            # Send message
-            response = chat.send_message(enhanced_message)
+            # Send message (blocking SDK call, keep it off the event loop)
+            response = await asyncio.to_thread(chat.send_message, enhanced_message)
 
             # Count tokens (approximate)
             prompt_tokens = len(request.message.split()) * 1.3  # Rough estimate
@@ -248,7 +249,8 @@ Answer the question using the current information provided above. Be specific wi
 
         messages.append({"role": "user", "content": enhanced_message})
 
-        completion = groq_client.chat.completions.create(
+        completion = await asyncio.to_thread(
+            groq_client.chat.completions.create,
             model="llama-3.3-70b-versatile",
             messages=messages,
             temperature=request.temperature,
@@ -276,14 +278,37 @@ Answer the question using the current information provided above. Be specific wi
         )
 
 
+def render_codebase(pieces: List[ContextPiece], question: str) -> str:
+    """Prompt with files as fenced sections, built in one join"""
+    sections = [f"## File: {piece.name}\n```\n{piece.text}\n```\n" for piece in pieces]
+    return "# Complete Codebase\n\n" + "\n".join(sections) + f"\n\n# Question:\n{question}"
+
+
+def render_document(pieces: List[ContextPiece], question: str) -> str:
+    """Prompt with a document (or some of its sections)"""
+    return "Document:\n\n" + "\n\n".join(piece.text for piece in pieces) + f"\n\nQuestion: {question}"
+
+
+def document_sections(document: str) -> List[ContextPiece]:
+    """Split a document on headings / page breaks so sections can be ranked"""
+    parts = re.split(r"\n(?=#{1,3} |\f|--- Page \d+ ---)", document)
+    return [ContextPiece(name=f"Section {i + 1}", text=part) for i, part in enumerate(parts) if part.strip()]
+
+
 @router.post("/analyze-large-codebase")
 async def analyze_large_codebase(
     files: Dict[str, str],  # filename: content
-    question: str
+    question: str,
+    mode: str = "auto",
+    model_name: str = "gemini-2.0-flash"
 ):
     """
     Analyze entire codebase at once (up to 2M tokens!)
 
+    Inputs that do not fit the context window are either trimmed to the
+    most relevant files (mode="select") or processed in concurrent chunks
+    and combined (mode="auto" / "map_reduce").
+
     Example:
     {
         "files": {
@@ -297,22 +322,15 @@ async def analyze_large_codebase(
     try:
         configure_gemini()
 
-        # Combine all files into one context
-        codebase_context = "# Complete Codebase\n\n"
-        for filename, content in files.items():
-            codebase_context += f"## File: {filename}\n```\n{content}\n```\n\n"
-
-        # Add question
-        full_prompt = f"{codebase_context}\n\n# Question:\n{question}"
-
-        # Use Gemini
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(full_prompt)
+        pipeline = LongContextPipeline(genai.GenerativeModel(model_name), model_name)
+        pieces = [ContextPiece(name=filename, text=content) for filename, content in files.items()]
+        result = await pipeline.run(pieces, question, render_codebase, mode=mode)
 
         return {
-            "answer": response.text,
-            "files_analyzed": len(files),
-            "total_tokens": len(full_prompt.split()) * 1.3  # Rough estimate
+            "answer": result.answer,
+            "files_analyzed": result.sources_used,
+            "total_tokens": result.input_tokens,
+            "context": result.to_dict()
         }
 
     except Exception as e:
@@ -322,7 +340,9 @@ async def analyze_large_codebase(
 @router.post("/analyze-long-document")
 async def analyze_long_document(
     document: str,
-    question: str
+    question: str,
+    mode: str = "auto",
+    model_name: str = "gemini-2.0-flash"
 ):
     """
     Analyze very long documents (up to 1500 pages!)
@@ -336,15 +356,14 @@ async def analyze_long_document(
     try:
         configure_gemini()
 
-        prompt = f"Document:\n\n{document}\n\nQuestion: {question}"
-
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(prompt)
+        pipeline = LongContextPipeline(genai.GenerativeModel(model_name), model_name)
+        result = await pipeline.run(document_sections(document), question, render_document, mode=mode)
 
         return {
-            "answer": response.text,
+            "answer": result.answer,
             "document_length": len(document),
-            "estimated_tokens": len(document.split()) * 1.3
+            "estimated_tokens": result.input_tokens,
+            "context": result.to_dict()
         }
 
     except Exception as e:
@@ -384,25 +403,7 @@ async def list_gemini_models():
     }
 
 
-@router.post("/code-review-full-project")
-async def code_review_full_project(
-    project_files: Dict[str, str]
-):
-    """
-    Review an entire project at once!
-    No need to split into chunks - Gemini handles it all!
-    """
-    try:
-        configure_gemini()
-
-        # Build complete project view
-        project_context = "# Complete Project for Review\n\n"
-        for filename, content in project_files.items():
-            project_context += f"## {filename}\n```\n{content}\n```\n\n"
-
-        prompt = f"""{project_context}
-
-Please review this entire codebase and provide:
+REVIEW_INSTRUCTIONS = """Please review this entire codebase and provide:
 1. Overall architecture assessment
 2. Code quality issues
 3. Security concerns
@@ -412,13 +413,35 @@ Please review this entire codebase and provide:
 
 Be thorough and specific."""
 
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(prompt)
+
+def render_review(pieces: List[ContextPiece], instructions: str) -> str:
+    """Prompt for a project review"""
+    sections = [f"## {piece.name}\n```\n{piece.text}\n```\n" for piece in pieces]
+    return "# Complete Project for Review\n\n" + "\n".join(sections) + f"\n\n{instructions}"
+
+
+@router.post("/code-review-full-project")
+async def code_review_full_project(
+    project_files: Dict[str, str],
+    model_name: str = "gemini-2.0-flash"
+):
+    """
+    Review an entire project at once!
+    Projects larger than the context window are reviewed in concurrent
+    chunks and the findings merged.
+    """
+    try:
+        configure_gemini()
+
+        pipeline = LongContextPipeline(genai.GenerativeModel(model_name), model_name)
+        pieces = [ContextPiece(name=filename, text=content) for filename, content in project_files.items()]
+        result = await pipeline.run(pieces, REVIEW_INSTRUCTIONS, render_review, mode="map_reduce")
 
         return {
-            "review": response.text,
+            "review": result.answer,
             "files_reviewed": len(project_files),
-            "lines_of_code": sum(len(content.split('\n')) for content in project_files.values())
+            "lines_of_code": sum(len(content.split('\n')) for content in project_files.values()),
+            "context": result.to_dict()
         }
 
     except Exception as e:
@@ -439,7 +462,7 @@ async def gemini_health_check():
         # Test with minimal request
         configure_gemini()
         model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content("Hi")
+        response = await asyncio.to_thread(model.generate_content, "Hi")
 
         return {
             "status": "healthy",
@@ -0,0 +1,216 @@
+"""
+Hedged Router - Race model candidates with staggered starts and circuit breakers
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class ModelHealth:
+    """Rolling health of one model, used for ordering and circuit breaking"""
+    success_rate: float = 1.0  # EWMA of successes (optimistic prior)
+    latency: Optional[float] = None  # EWMA of seconds per answer
+    consecutive_failures: int = 0
+    open_until: float = 0.0  # Circuit open (model skipped) until this time
+    half_open: bool = False  # One trial call allowed after the cooldown
+    probing: bool = False  # That trial call is in flight
+    calls: int = 0
+    failures: int = 0
+
+    def state(self, now: float) -> str:
+        if self.open_until > now:
+            return "open"
+        return "half-open" if self.half_open else "closed"
+
+    def score(self) -> float:
+        """Higher is better: likely to answer, and quickly"""
+        latency = self.latency if self.latency is not None else 1.0
+        return self.success_rate / max(latency, 0.05)
+
+
+class HedgedRouter:
+    """
+    Runs a request against ranked model candidates with hedging
+
+    The best candidate starts at once. If it has not answered after
+    hedge_delay seconds (or as soon as it fails) the next one starts too;
+    the first good answer wins and the others are cancelled. Each model
+    carries a circuit breaker: after failure_threshold consecutive failures
+    it is skipped for cooldown seconds, then gets a single trial call;
+    concurrent requests skip it until that trial resolves.
+
+    Losers are cancelled on the event loop only: if `call` runs a blocking
+    client in a thread (asyncio.to_thread), the upstream request carries on
+    to completion and still spends quota. Keep hedge_delay well above the
+    usual latency for such clients so hedges stay rare.
+    """
+
+    def __init__(
+        self,
+        hedge_delay: float = 4.0,
+        attempt_timeout: float = 60.0,
+        failure_threshold: int = 3,
+        cooldown: float = 120.0,
+        alpha: float = 0.3,
+    ):
+        self.hedge_delay = hedge_delay
+        self.attempt_timeout = attempt_timeout
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self.health: Dict[str, ModelHealth] = {}
+        self.hedges_launched = 0
+
+    def _health(self, model_id: str) -> ModelHealth:
+        if model_id not in self.health:
+            self.health[model_id] = ModelHealth()
+        return self.health[model_id]
+
+    def rank(self, candidates: List[str]) -> List[str]:
+        """
+        Order candidates by health, dropping models whose circuit is open
+
+        Args:
+            candidates: Model IDs in the caller's preference order (tie-break)
+
+        Returns:
+            Candidates to try, best first
+        """
+        now = time.time()
+        available = []
+        for position, model_id in enumerate(candidates):
+            health = self._health(model_id)
+            if health.open_until > now:
+                continue
+            if health.open_until and not health.half_open:
+                health.half_open = True  # Cooldown over: allow one trial call
+            if health.probing:
+                continue  # Another request holds the trial call
+            available.append((-health.score(), position, model_id))
+        return [model_id for _, _, model_id in sorted(available)]
+
+    def _admit(self, model_id: str) -> bool:
+        """Claim a call; a half-open model admits only its single trial call"""
+        health = self._health(model_id)
+        if health.open_until > time.time() or health.probing:
+            return False
+        if health.half_open:
+            health.probing = True
+        return True
+
+    def record_success(self, model_id: str, latency: float) -> None:
+        health = self._health(model_id)
+        health.calls += 1
+        health.success_rate = self.alpha + (1 - self.alpha) * health.success_rate
+        health.latency = latency if health.latency is None else \
+            self.alpha * latency + (1 - self.alpha) * health.latency
+        health.consecutive_failures = 0
+        health.open_until = 0.0
+        health.half_open = False
+        health.probing = False
+
+    def record_failure(self, model_id: str, latency: float) -> None:
+        health = self._health(model_id)
+        health.calls += 1
+        health.failures += 1
+        health.success_rate = (1 - self.alpha) * health.success_rate
+        health.consecutive_failures += 1
+        health.probing = False
+        if health.half_open or health.consecutive_failures >= self.failure_threshold:
+            health.open_until = time.time() + self.cooldown
+            health.half_open = False
+            print(f"Circuit open for {model_id} ({health.consecutive_failures} consecutive failures)")
+
+    def record_overtaken(self, model_id: str, elapsed: float) -> None:
+        """A cancelled loser took at least this long: fold it into its latency"""
+        health = self._health(model_id)
+        if health.latency is None or elapsed > health.latency:
+            health.latency = elapsed if health.latency is None else \
+                self.alpha * elapsed + (1 - self.alpha) * health.latency
+        health.probing = False
+        if health.half_open:
+            # Trial call never finished: give it another trial next time
+            health.half_open = False
+
+    async def run(
+        self,
+        candidates: List[str],
+        call: Callable[[str], Awaitable[Any]],
+    ) -> Tuple[Optional[str], Any]:
+        """
+        Hedged execution across candidates
+
+        Args:
+            candidates: Model IDs in preference order
+            call: Coroutine factory; a falsy result or an exception is a failure
+
+        Returns:
+            (model_id, result) of the first good answer, or (None, None)
+        """
+        queue = self.rank(candidates)
+        running: Dict[asyncio.Task, Tuple[str, float]] = {}
+        loop = asyncio.get_running_loop()
+
+        def launch() -> bool:
+            # Ranked before other requests claimed a trial call: skip those
+            while queue:
+                model_id = queue.pop(0)
+                if self._admit(model_id):
+                    task = asyncio.ensure_future(asyncio.wait_for(call(model_id), self.attempt_timeout))
+                    running[task] = (model_id, loop.time())
+                    return True
+            return False
+
+        try:
+            if queue:
+                launch()
+            while running:
+                timeout = self.hedge_delay if queue else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Slow answer: hedge with the next candidate
+                    if launch():
+                        self.hedges_launched += 1
+                    continue
+
+                for task in done:
+                    model_id, started = running.pop(task)
+                    elapsed = loop.time() - started
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        print(f"Model {model_id} failed: {type(e).__name__}: {e}")
+                        result = None
+                    if result:
+                        self.record_success(model_id, elapsed)
+                        return model_id, result
+                    self.record_failure(model_id, elapsed)
+                    if queue:
+                        launch()  # Failed: replace it now rather than after the hedge delay
+            return None, None
+        finally:
+            for task, (model_id, started) in running.items():
+                task.cancel()
+                self.record_overtaken(model_id, loop.time() - started)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-model health for the stats endpoint"""
+        now = time.time()
+        return {
+            "hedge_delay": self.hedge_delay,
+            "hedges_launched": self.hedges_launched,
+            "models": {
+                model_id: {
+                    "state": health.state(now),
+                    "success_rate": round(health.success_rate, 3),
+                    "latency_s": round(health.latency, 2) if health.latency is not None else None,
+                    "calls": health.calls,
+                    "failures": health.failures,
+                }
+                for model_id, health in self.health.items()
+            },
+        }
@@ -0,0 +1,315 @@
+"""
+Image Pipeline - Decode once, resize per vision model, recompress, cache vision results
+"""
+
+import asyncio
+import base64
+import hashlib
+import io
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+
+# Longest side (px) each vision model can actually use; larger images are
+# downscaled by the provider anyway, so sending more only costs upload time.
+MODEL_MAX_SIDE = {
+    "meta-llama/llama-4-scout-17b-16e-instruct": 1568,
+    "meta-llama/llama-4-maverick-17b-128e-instruct": 1568,
+    "llama-3.2-11b-vision-preview": 1120,
+    "llama-3.2-90b-vision-preview": 1120,
+    "llava-v1.5-7b-4096-preview": 672,
+    "gpt-4-vision-preview": 2048,
+    "gpt-4o": 2048,
+}
+DEFAULT_MAX_SIDE = 1568
+JPEG_QUALITY = 85
+
+# Scale at which to rasterise PDF pages for vision (was a fixed 2x)
+PDF_PAGE_MAX_SIDE = 1568
+
+
+@dataclass
+class PreparedImage:
+    """An uploaded image decoded once, with everything derived from it"""
+    image: Image.Image
+    raw_bytes: bytes
+    content_type: str
+    content_hash: str
+    metadata: Dict[str, Any]
+    _encoded: Dict[int, Tuple[str, int]] = field(default_factory=dict, repr=False)
+
+    def data_url_for(self, model_id: Optional[str] = None) -> str:
+        """
+        Data URL sized for a vision model
+
+        Args:
+            model_id: Vision model the image is sent to
+
+        Returns:
+            data: URL of the resized, recompressed image
+        """
+        max_side = MODEL_MAX_SIDE.get(model_id or "", DEFAULT_MAX_SIDE)
+        if max_side not in self._encoded:
+            self._encoded[max_side] = self._encode(max_side)
+        return self._encoded[max_side][0]
+
+    async def data_url_async(self, model_id: Optional[str] = None) -> str:
+        """data_url_for() in a worker thread; resizing and re-encoding are CPU-bound"""
+        return await asyncio.to_thread(self.data_url_for, model_id)
+
+    def encoded_size(self, model_id: Optional[str] = None) -> int:
+        """Bytes actually sent for a model"""
+        self.data_url_for(model_id)
+        return self._encoded[MODEL_MAX_SIDE.get(model_id or "", DEFAULT_MAX_SIDE)][1]
+
+    def _encode(self, max_side: int) -> Tuple[str, int]:
+        image = self.image
+        if max(image.size) > max_side:
+            image = image.copy()
+            image.thumbnail((max_side, max_side), Image.LANCZOS)
+        elif self.content_type in ("image/jpeg", "image/png", "image/webp") and \
+                len(self.raw_bytes) < 512 * 1024:
+            # Already small enough: keep the original bytes
+            return _data_url(self.raw_bytes, self.content_type), len(self.raw_bytes)
+
+        flat = _flatten(image)
+        buffer = io.BytesIO()
+        flat.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+        encoded, encoded_type = buffer.getvalue(), "image/jpeg"
+
+        if self.content_type == "image/png":
+            # Screenshots and scanned text often compress better as PNG
+            buffer = io.BytesIO()
+            flat.save(buffer, format="PNG", optimize=True)
+            if buffer.tell() < len(encoded):
+                encoded, encoded_type = buffer.getvalue(), "image/png"
+
+        if len(encoded) >= len(self.raw_bytes) and image is self.image and \
+                self.content_type in ("image/jpeg", "image/png", "image/webp"):
+            return _data_url(self.raw_bytes, self.content_type), len(self.raw_bytes)
+        return _data_url(encoded, encoded_type), len(encoded)
+
+
+def _data_url(data: bytes, content_type: str) -> str:
+    return f"data:{content_type};base64,{base64.b64encode(data).decode('utf-8')}"
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """RGB/L image suitable for JPEG (transparency composited on white)"""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        rgba = image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.split()[-1])
+        return background
+    if image.mode not in ("RGB", "L"):
+        return image.convert("RGB")
+    return image
+
+
+def split_data_url(image_data: str) -> Tuple[bytes, Optional[str]]:
+    """Decode a data URL or bare base64 string into bytes and its content type"""
+    content_type = None
+    if image_data.startswith("data:") and "," in image_data:
+        header, image_data = image_data.split(",", 1)
+        content_type = header[5:].split(";")[0] or None
+    elif "," in image_data:
+        image_data = image_data.split(",", 1)[1]
+    return base64.b64decode(image_data), content_type
+
+
+def prepare_image(data, content_type: Optional[str] = None) -> PreparedImage:
+    """
+    Decode an uploaded image once
+
+    Args:
+        data: Raw bytes, a data URL or a bare base64 string
+        content_type: MIME type when known (e.g. from the upload)
+
+    Returns:
+        PreparedImage with content hash, metadata and per-model encodings
+    """
+    if isinstance(data, str):
+        raw_bytes, url_type = split_data_url(data)
+        content_type = content_type or url_type
+    else:
+        raw_bytes = bytes(data)
+
+    image = Image.open(io.BytesIO(raw_bytes))
+    image_format = image.format
+    image = ImageOps.exif_transpose(image)  # Phone photos: apply EXIF rotation
+    image.load()
+
+    content_type = content_type or Image.MIME.get(image_format or "", "image/png")
+    return PreparedImage(
+        image=image,
+        raw_bytes=raw_bytes,
+        content_type=content_type,
+        content_hash=hashlib.sha256(raw_bytes).hexdigest(),
+        metadata=image_metadata(image, image_format, len(raw_bytes)),
+    )
+
+
+async def prepare_image_async(data, content_type: Optional[str] = None) -> PreparedImage:
+    """prepare_image() in a worker thread, so decoding a large upload doesn't block the event loop"""
+    return await asyncio.to_thread(prepare_image, data, content_type)
+
+
+def prepare_pdf_page(page, max_side: int = PDF_PAGE_MAX_SIDE) -> PreparedImage:
+    """
+    Rasterise a PyMuPDF page just large enough for the vision model
+
+    Args:
+        page: fitz.Page
+        max_side: Target longest side in pixels
+
+    Returns:
+        PreparedImage of the rendered page
+    """
+    import fitz  # PyMuPDF
+
+    rect = page.rect
+    scale = max_side / max(rect.width, rect.height, 1)
+    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+    mode = "RGB" if pix.n >= 3 else "L"
+    image = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return prepare_image(buffer.getvalue(), "image/jpeg")
+
+
+def image_metadata(image: Image.Image, image_format: Optional[str], byte_size: int) -> Dict[str, Any]:
+    """Comprehensive image metadata from an already decoded image"""
+    width, height = image.size
+    aspect_ratio = width / height if height > 0 else 1
+
+    # Determine aspect ratio name
+    aspect_name = "Unknown"
+    if 1.76 < aspect_ratio < 1.79:
+        aspect_name = "16:9 (Widescreen)"
+    elif 1.32 < aspect_ratio < 1.34:
+        aspect_name = "4:3 (Standard)"
+    elif 0.9 < aspect_ratio < 1.1:
+        aspect_name = "1:1 (Square)"
+    elif 1.49 < aspect_ratio < 1.51:
+        aspect_name = "3:2 (DSLR)"
+
+    # Resolution category
+    pixel_count = width * height
+    if pixel_count >= 8000000:  # 8MP+
+        resolution_category = "Ultra High (4K+)"
+    elif pixel_count >= 2000000:  # 2MP+
+        resolution_category = "High (Full HD)"
+    elif pixel_count >= 500000:
+        resolution_category = "Medium (HD)"
+    else:
+        resolution_category = "Low (SD)"
+
+    return {
+        "format": image_format or "Unknown",
+        "mode": image.mode,
+        "width": width,
+        "height": height,
+        "aspect_ratio": aspect_ratio,
+        "aspect_name": aspect_name,
+        "pixel_count": pixel_count,
+        "resolution_category": resolution_category,
+        "file_size_kb": byte_size / 1024,
+        "file_size_mb": byte_size / (1024 * 1024),
+        "has_transparency": image.mode in ('RGBA', 'LA', 'P'),
+        "color_mode_detail": {
+            "RGB": "Full Color",
+            "RGBA": "Full Color with Transparency",
+            "L": "Grayscale",
+            "LA": "Grayscale with Transparency",
+            "P": "Palette Mode"
+        }.get(image.mode, "Other"),
+        "bits_per_pixel": len(image.mode) * 8,
+        "estimated_quality": "High" if pixel_count and byte_size / pixel_count > 0.5 else "Compressed"
+    }
+
+
+@dataclass
+class _CacheEntry:
+    result: Any
+    created: float
+
+
+class VisionResultCache:
+    """
+    Cache of vision model answers keyed by image identity and task
+
+    - Hits only on identical bytes (SHA-256). There is deliberately no
+      perceptual (near-duplicate) matching: different documents on the
+      same template (forms, exam papers, invoices) hash and downscale
+      almost identically, and serving one user's answer for another
+      user's page would leak its contents.
+    - LRU bounded with a TTL
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[Tuple[str, str], _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def task_key(model_id: str, task: str) -> str:
+        """Normalise the task so cosmetic prompt differences still hit"""
+        return f"{model_id}|{' '.join(task.lower().split())}"
+
+    def get(self, image: PreparedImage, model_id: str, task: str) -> Optional[Any]:
+        """
+        Look up a prior result for this exact image and task
+
+        Args:
+            image: Prepared image
+            model_id: Vision model (results are not shared across models)
+            task: Normalised task/prompt the result answered
+
+        Returns:
+            Cached result or None
+        """
+        key = (self.task_key(model_id, task), image.content_hash)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry.created <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.result
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, image: PreparedImage, model_id: str, task: str, result: Any) -> None:
+        """Store a result for this image and task"""
+        key = (self.task_key(model_id, task), image.content_hash)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = _CacheEntry(result=result, created=time.time())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+# Shared cache for all vision endpoints in this process
+vision_cache = VisionResultCache()
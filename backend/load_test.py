@@ -0,0 +1,403 @@
+"""Load test for the FastAPI apps against the mock LLM provider.
+
+Drives chat, streaming chat, RAG chat and upload endpoints at a series of
+concurrency levels and reports, per scenario and level:
+
+- latency p50/p95/p99 and time to first token (first streamed event;
+  first response byte for non-streaming endpoints)
+- throughput (completed requests/sec) and error counts by status
+- server event-loop lag: a probe requests /health every --probe-interval
+  while the load runs. /health does no work, so any probe latency above the
+  idle baseline is time the server's loop was blocked or queued.
+- client loop lag, to tell when the harness itself is the bottleneck
+
+With --spawn, the harness starts mock_llm_server.py and the target app
+(GROQ_BASE_URL pointed at the mock, rate limiting relaxed) so no real
+provider quota is used. Results are saved as JSON for tracking regressions.
+
+Targets:
+    super   super_intelligent_endpoint.py: /chat, /rag-chat, /upload and
+            /streaming/chat (streaming_ai_agent.py)
+    genius  src/genius_ai/api/server.py: /chat, /chat/stream
+
+Usage:
+    python load_test.py --target super --spawn --concurrency 1,8,32 --requests 200
+    python load_test.py --target genius --base-url http://localhost:8000 --scenarios chat
+    python load_test.py --target super --spawn --mock-error-rate 0.05 --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import aiohttp
+
+BACKEND_DIR = Path(__file__).parent
+
+PROMPTS = [
+    "Explain how photosynthesis converts light into chemical energy.",
+    "Write a Python function that checks whether a string is a palindrome.",
+    "What is the difference between molarity and molality?",
+    "Summarize the causes of the First World War in a few sentences.",
+]
+
+UPLOAD_TEXT = ("Chapter 1: Moles and molar mass.\n" * 200).encode()
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    streaming: bool = False
+    build: Callable[[int], Dict[str, Any]] = field(default=lambda i: {})
+
+
+def prompt(i: int) -> str:
+    return f"{PROMPTS[i % len(PROMPTS)]} (request {i})"
+
+
+def upload_form(i: int) -> Dict[str, Any]:
+    form = aiohttp.FormData()
+    form.add_field("file", UPLOAD_TEXT, filename=f"notes-{i}.txt", content_type="text/plain")
+    form.add_field("message", "Summarize this document")
+    return {"data": form}
+
+
+TARGETS: Dict[str, Dict[str, Any]] = {
+    "super": {
+        "app": "super_intelligent_endpoint:app",
+        "cwd": BACKEND_DIR,
+        "scenarios": [
+            Scenario("chat", "POST", "/chat", build=lambda i: {"json": {
+                "message": prompt(i), "use_chain_of_thought": False, "max_tokens": 512
+            }}),
+            Scenario("chat-stream", "POST", "/streaming/chat", streaming=True, build=lambda i: {"json": {
+                "messages": [{"role": "user", "content": prompt(i)}], "max_tokens": 512
+            }}),
+            Scenario("rag-chat", "POST", "/rag-chat", build=lambda i: {"json": {
+                "message": prompt(i), "max_tokens": 512
+            }}),
+            Scenario("upload", "POST", "/upload", build=upload_form),
+        ],
+    },
+    "genius": {
+        "app": "genius_ai.api.server:app",
+        "cwd": BACKEND_DIR / "src",
+        "scenarios": [
+            Scenario("chat", "POST", "/chat", build=lambda i: {"json": {
+                "message": prompt(i), "max_tokens": 512
+            }}),
+            Scenario("chat-stream", "POST", "/chat/stream", streaming=True, build=lambda i: {"json": {
+                "message": prompt(i), "max_tokens": 512
+            }}),
+        ],
+    },
+}
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return round(ordered[index], 1)
+
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "mean": round(statistics.fmean(values), 1) if values else None,
+        "max": round(max(values), 1) if values else None,
+    }
+
+
+def stream_event_error(payload: str) -> Optional[str]:
+    """Error text if an SSE data payload reports a failure"""
+    if payload.startswith("[ERROR]"):
+        return payload
+    try:
+        event = json.loads(payload)
+    except ValueError:
+        return None
+    if isinstance(event, dict) and event.get("type") == "error":
+        return str(event.get("error", "error event"))
+    return None
+
+
+async def run_request(session: aiohttp.ClientSession, base_url: str, scenario: Scenario, i: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    first: Optional[float] = None
+    try:
+        async with session.request(scenario.method, base_url + scenario.path, **scenario.build(i)) as response:
+            if not scenario.streaming:
+                await response.content.readany()
+                first = time.perf_counter()
+                await response.read()
+                error = None if response.status == 200 else f"HTTP {response.status}"
+            else:
+                error = None if response.status == 200 else f"HTTP {response.status}"
+                async for raw in response.content:
+                    line = raw.decode("utf-8", errors="ignore").strip()
+                    if not line.startswith("data:"):
+                        continue
+                    payload = line[5:].strip()
+                    if payload == "[DONE]":
+                        continue
+                    error = error or stream_event_error(payload)
+                    if first is None:
+                        first = time.perf_counter()
+            status = response.status
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return {"ok": False, "status": type(e).__name__, "latency_ms": (time.perf_counter() - start) * 1000}
+
+    end = time.perf_counter()
+    return {
+        "ok": error is None,
+        "status": status if error is None or error.startswith("HTTP") else "stream_error",
+        "latency_ms": (end - start) * 1000,
+        "ttft_ms": (first - start) * 1000 if first else None,
+    }
+
+
+async def probe_loop(session: aiohttp.ClientSession, base_url: str, interval: float,
+                     samples: List[float], stop: asyncio.Event):
+    """/health latency while the load runs (server event-loop lag proxy)"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            async with session.get(base_url + "/health") as response:
+                await response.read()
+            samples.append((time.perf_counter() - start) * 1000)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def client_lag_loop(interval: float, samples: List[float], stop: asyncio.Event):
+    """How late this process's own loop wakes up"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, (time.perf_counter() - start - interval) * 1000))
+
+
+async def idle_baseline(base_url: str, count: int = 20) -> Dict[str, Optional[float]]:
+    samples: List[float] = []
+    async with aiohttp.ClientSession() as session:
+        for _ in range(count):
+            start = time.perf_counter()
+            async with session.get(base_url + "/health") as response:
+                await response.read()
+            samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+async def run_level(base_url: str, scenario: Scenario, concurrency: int, total: int,
+                    timeout: float, probe_interval: float) -> Dict[str, Any]:
+    connector = aiohttp.TCPConnector(limit=concurrency + 4)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    results: List[Dict[str, Any]] = []
+    probes: List[float] = []
+    client_lag: List[float] = []
+    stop = asyncio.Event()
+    counter = iter(range(total))
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as session:
+        async def worker():
+            for i in counter:
+                results.append(await run_request(session, base_url, scenario, i))
+
+        monitors = [
+            asyncio.ensure_future(probe_loop(session, base_url, probe_interval, probes, stop)),
+            asyncio.ensure_future(client_lag_loop(probe_interval, client_lag, stop)),
+        ]
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await asyncio.gather(*monitors)
+
+    ok = [r for r in results if r["ok"]]
+    return {
+        "scenario": scenario.name,
+        "path": scenario.path,
+        "concurrency": concurrency,
+        "requests": len(results),
+        "succeeded": len(ok),
+        "errors": dict(Counter(str(r["status"]) for r in results if not r["ok"])),
+        "duration_s": round(elapsed, 2),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else None,
+        "latency_ms": summarize([r["latency_ms"] for r in ok]),
+        "ttft_ms": summarize([r["ttft_ms"] for r in ok if r.get("ttft_ms") is not None]),
+        "event_loop_lag_ms": summarize(probes),
+        "client_loop_lag_ms": summarize(client_lag),
+    }
+
+
+async def wait_until_up(url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(url) as response:
+                    if response.status < 500:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def spawn(args: argparse.Namespace, target: Dict[str, Any]) -> List[subprocess.Popen]:
+    """Start the mock provider and the target app wired to it"""
+    mock = subprocess.Popen([
+        sys.executable, str(BACKEND_DIR / "mock_llm_server.py"),
+        "--port", str(args.mock_port),
+        "--ttft-ms", str(args.mock_ttft_ms),
+        "--tokens-per-sec", str(args.mock_tokens_per_sec),
+        "--output-tokens", str(args.mock_output_tokens),
+        "--error-rate", str(args.mock_error_rate),
+        "--rate-limit-rate", str(args.mock_rate_limit_rate),
+    ], cwd=BACKEND_DIR)
+
+    mock_url = f"http://127.0.0.1:{args.mock_port}"
+    env = {
+        **os.environ,
+        "GROQ_BASE_URL": mock_url,
+        "GROQ_API_KEY": "mock",
+        "OPENAI_BASE_URL": f"{mock_url}/v1",
+        "OPENAI_API_KEY": "mock",
+        "RATE_LIMIT_REQUESTS": "1000000",
+    }
+    app = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", target["app"],
+        "--host", "127.0.0.1", "--port", str(args.app_port), "--log-level", "warning",
+    ], cwd=target["cwd"], env=env)
+    return [mock, app]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    target = TARGETS[args.target]
+    scenarios = [s for s in target["scenarios"] if not args.scenarios or s.name in args.scenarios]
+    if not scenarios:
+        raise SystemExit(f"No matching scenarios for {args.target}: {[s.name for s in target['scenarios']]}")
+    concurrency_levels = [int(level) for level in args.concurrency.split(",")]
+
+    processes: List[subprocess.Popen] = []
+    base_url = args.base_url
+    if args.spawn:
+        processes = spawn(args, target)
+        base_url = f"http://127.0.0.1:{args.app_port}"
+    try:
+        if args.spawn:
+            await wait_until_up(f"http://127.0.0.1:{args.mock_port}/health", 30)
+            await wait_until_up(f"{base_url}/health", args.startup_timeout)
+
+        report = {
+            "target": args.target,
+            "base_url": base_url,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mock": {
+                "ttft_ms": args.mock_ttft_ms,
+                "tokens_per_sec": args.mock_tokens_per_sec,
+                "output_tokens": args.mock_output_tokens,
+                "error_rate": args.mock_error_rate,
+                "rate_limit_rate": args.mock_rate_limit_rate,
+            } if args.spawn else None,
+            "idle_health_ms": await idle_baseline(base_url),
+            "results": [],
+        }
+
+        for scenario in scenarios:
+            for concurrency in concurrency_levels:
+                total = max(args.requests, concurrency)
+                print(f"{scenario.name:<12} c={concurrency:<4} {total} requests ...", flush=True)
+                row = await run_level(base_url, scenario, concurrency, total, args.timeout, args.probe_interval)
+                report["results"].append(row)
+                print_row(row)
+        return report
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_row(row: Dict[str, Any]):
+    latency, ttft, lag = row["latency_ms"], row["ttft_ms"], row["event_loop_lag_ms"]
+    print(
+        f"  {row['succeeded']}/{row['requests']} ok  {row['throughput_rps']} req/s  "
+        f"latency p50/p95/p99 {latency['p50']}/{latency['p95']}/{latency['p99']} ms  "
+        f"ttft p50 {ttft['p50']} ms  loop lag p99 {lag['p99']} ms"
+        + (f"  errors {row['errors']}" if row["errors"] else "")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--target", choices=sorted(TARGETS), default="super")
+    parser.add_argument("--scenarios", type=lambda value: value.split(","), default=None,
+                        help="Comma-separated scenario names (default: all for the target)")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per scenario and level")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout (s)")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="Event-loop probe interval (s)")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Running app (without --spawn)")
+    parser.add_argument("--spawn", action="store_true", help="Start the mock provider and the app")
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--mock-port", type=int, default=9100)
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--mock-ttft-ms", type=float, default=300.0)
+    parser.add_argument("--mock-tokens-per-sec", type=float, default=200.0)
+    parser.add_argument("--mock-output-tokens", type=int, default=200)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--mock-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--output", default=None,
+                        help="JSON results file (default: load_test_results/<target>-<timestamp>.json)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    output = Path(args.output) if args.output else (
+        BACKEND_DIR / "load_test_results" / f"{args.target}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nSaved results to {output}")
+
+
+if __name__ == "__main__":
+    main()
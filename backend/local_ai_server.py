@@ -6,15 +6,18 @@ NO API costs, completely FREE!
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Any, List, Optional, Dict
+from typing import Any, AsyncIterator, List, Optional, Dict, Tuple
 import uvicorn
 import json
 import os
 import requests
 from uuid import uuid4
 
+from ultimate_ai.ollama_client import OllamaClient, OllamaConnectionError
+
 # Create FastAPI app
 app = FastAPI(
     title="Genius AI - Local Intelligence",
@@ -68,6 +71,9 @@ class LocalAI:
     def __init__(self):
         self.ollama_url = OLLAMA_URL
         self.model = MODEL_NAME
+        self.client = OllamaClient(self.ollama_url, self.model, timeout=60)
+        # conversation_id -> (Ollama KV context, history length it covers)
+        self.contexts: Dict[str, Tuple[List[int], int]] = {}
         self.check_ollama()
 
     def check_ollama(self):
@@ -90,43 +96,75 @@ class LocalAI:
             print(f"  Starting in fallback mode. Install Ollama for true AI!")
             print(f"  Visit: https://ollama.com/download")
 
-    async def generate(self, message: str, history: List[Dict] = None, images: List[str] = None) -> str:
+    async def generate(
+        self,
+        message: str,
+        history: List[Dict] = None,
+        images: List[str] = None,
+        conversation_id: Optional[str] = None
+    ) -> str:
         """
         Generate response using local AI model
         """
+        pieces = []
+        async for piece in self.generate_stream(message, history, images, conversation_id):
+            pieces.append(piece)
+        return "".join(pieces).strip()
+
+    async def generate_stream(
+        self,
+        message: str,
+        history: List[Dict] = None,
+        images: List[str] = None,
+        conversation_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream response tokens from the local AI model as they are generated
+        """
+        history = history or []
+        prompt, context = self._prompt_with_context(message, history, conversation_id)
+        received = False
 
         try:
-            # Build conversation context
-            prompt = self._build_prompt(message, history)
-
-            # Call Ollama API
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.8,
-                        "num_predict": 500,  # Max tokens
-                    }
+            async for chunk in self.client.stream_generate(
+                prompt,
+                options={
+                    "temperature": 0.8,
+                    "num_predict": 500,  # Max tokens
                 },
-                timeout=60
-            )
-
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("response", "").strip()
-            else:
-                print(f"Ollama error: {response.status_code}")
-                return await self._fallback_response(message)
-
-        except requests.exceptions.ConnectionError:
+                images=images,
+                context=context,
+            ):
+                if chunk.text:
+                    received = True
+                    yield chunk.text
+                if chunk.done and conversation_id and chunk.context:
+                    # The caller appends the assistant reply after this turn
+                    self.contexts[conversation_id] = (chunk.context, len(history) + 1)
+
+        except OllamaConnectionError:
             print("⚠ Ollama not running. Using fallback.")
-            return await self._fallback_response(message)
+            self.contexts.pop(conversation_id, None)
+            if not received:
+                yield await self._fallback_response(message)
         except Exception as e:
-            print(f"Error: {e}")
-            return await self._fallback_response(message)
+            print(f"Ollama error: {e}")
+            self.contexts.pop(conversation_id, None)
+            if not received:
+                yield await self._fallback_response(message)
+
+    def _prompt_with_context(
+        self,
+        message: str,
+        history: List[Dict],
+        conversation_id: Optional[str]
+    ) -> Tuple[str, Optional[List[int]]]:
+        """Reuse Ollama's KV context when it covers everything before this message"""
+        cached = self.contexts.get(conversation_id) if conversation_id else None
+        # history already ends with the current user message
+        if cached and cached[1] == len(history) - 1:
+            return f"User: {message}\nAssistant:", cached[0]
+        return self._build_prompt(message, history), None
 
     def _build_prompt(self, message: str, history: List[Dict] = None) -> str:
         """Build conversation prompt"""
@@ -203,9 +241,9 @@ async def root():
 async def health():
     # Check if Ollama is available
     try:
-        response = requests.get(f"{OLLAMA_URL}/api/tags", timeout=2)
-        ollama_status = "running" if response.status_code == 200 else "not running"
-    except:
+        await ai.client.list_models()
+        ollama_status = "running"
+    except Exception:
         ollama_status = "not running"
 
     return HealthResponse(
@@ -238,7 +276,7 @@ async def chat(request: ChatRequest):
         history.append({"role": "user", "content": request.message})
 
         # Generate response with local AI
-        response_text = await ai.generate(request.message, history, request.images)
+        response_text = await ai.generate(request.message, history, request.images, conv_id)
 
         # Add to history
         history.append({"role": "assistant", "content": response_text})
@@ -255,13 +293,43 @@ async def chat(request: ChatRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Chat with local AI model, streaming tokens as server-sent events"""
+    conv_id = request.conversation_id or str(uuid4())
+
+    if conv_id not in conversations:
+        conversations[conv_id] = []
+
+    history = conversations[conv_id]
+    history.append({"role": "user", "content": request.message})
+
+    async def event_stream():
+        pieces = []
+        async for piece in ai.generate_stream(request.message, history, request.images, conv_id):
+            pieces.append(piece)
+            yield f"data: {json.dumps({'type': 'token', 'content': piece})}\n\n"
+
+        history.append({"role": "assistant", "content": "".join(pieces).strip()})
+        if len(history) > 40:
+            conversations[conv_id] = history[-40:]
+
+        yield f"data: {json.dumps({'type': 'done', 'conversation_id': conv_id})}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @app.delete("/conversations/{conversation_id}")
 async def delete_conversation(conversation_id: str):
     if conversation_id in conversations:
         del conversations[conversation_id]
+        ai.contexts.pop(conversation_id, None)
         return {"message": "Conversation cleared"}
     raise HTTPException(status_code=404, detail="Conversation not found")
 
+@app.on_event("shutdown")
+async def shutdown():
+    await ai.client.close()
+
 # ============================
 # STARTUP
 # ============================
@@ -0,0 +1,351 @@
+"""
+Long Context Pipeline - Token budgeting, relevance-ranked packing and map-reduce for Gemini
+"""
+
+import asyncio
+import hashlib
+import math
+import os
+import re
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Input context windows (tokens)
+CONTEXT_WINDOWS = {
+    "gemini-2.5-pro": 1048576,
+    "gemini-2.5-flash": 1048576,
+    "gemini-2.0-flash": 1048576,
+    "gemini-1.5-pro": 2097152,
+    "gemini-1.5-flash": 1048576,
+}
+DEFAULT_CONTEXT_WINDOW = 1048576
+OUTPUT_RESERVE = 8192  # Room left for the answer
+SAFETY_MARGIN = 0.95  # Calibrated estimates may still be slightly off
+MAP_CONCURRENCY = 4  # Calls in flight per model, across all requests
+REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "15"))  # Free tier
+CHARS_PER_TOKEN = 4.0  # Initial guess before calibration against the API
+
+_STOPWORDS = {
+    "the", "a", "an", "and", "or", "of", "to", "in", "is", "are", "how", "what", "does",
+    "do", "this", "that", "it", "for", "on", "with", "be", "can", "why", "where", "which",
+}
+
+
+_counters: Dict[str, "TokenCounter"] = {}
+_limiters: Dict[str, "RateLimiter"] = {}
+
+
+def _fingerprint(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+class TokenCounter:
+    """
+    Token counts from the model's own tokenizer
+
+    Exact counts come from model.count_tokens (run in a thread) and are
+    cached by content. For many small pieces a single exact count of the
+    whole input calibrates a chars-per-token ratio that is then applied to
+    the pieces, so packing 5,000 files costs one API call, not 5,000.
+    """
+
+    def __init__(self, model, cache_size: int = 1024):
+        self.model = model
+        self.chars_per_token = CHARS_PER_TOKEN
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._cache_size = cache_size
+
+    async def count(self, text: str) -> int:
+        """Exact token count (falls back to the estimate if the API fails)"""
+        key = _fingerprint(text)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        try:
+            result = await asyncio.to_thread(self.model.count_tokens, text)
+            tokens = result.total_tokens
+        except Exception as e:
+            print(f"⚠️ count_tokens failed, using estimate: {str(e)}")
+            return self.estimate(text)
+
+        if tokens and len(text) > 1000:
+            self.chars_per_token = len(text) / tokens
+        self._cache[key] = tokens
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return tokens
+
+    def estimate(self, text: str) -> int:
+        """Calibrated estimate"""
+        return math.ceil(len(text) / self.chars_per_token)
+
+
+class RateLimiter:
+    """
+    Process-wide limit on calls to one model
+
+    Gemini quotas are per model and API key, not per request, so every
+    pipeline for a model shares one limiter: at most `concurrency` calls in
+    flight and `per_minute` started in any 60 seconds.
+    """
+
+    def __init__(self, concurrency: int = MAP_CONCURRENCY, per_minute: int = REQUESTS_PER_MINUTE):
+        self.per_minute = per_minute
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._lock = asyncio.Lock()
+        self._started: deque = deque()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a call slot, waiting for the per-minute window if needed"""
+        async with self._semaphore:
+            async with self._lock:  # Waiters take window slots in order
+                while True:
+                    now = time.monotonic()
+                    while self._started and now - self._started[0] >= 60:
+                        self._started.popleft()
+                    if len(self._started) < self.per_minute:
+                        break
+                    await asyncio.sleep(60 - (now - self._started[0]))
+                self._started.append(now)
+            yield
+
+
+@dataclass
+class ContextPiece:
+    """One unit of input: a file or a document section"""
+    name: str
+    text: str
+    score: float = 0.0
+    tokens: int = 0
+    source: str = ""  # Original piece this was split from, if any
+
+    @property
+    def origin(self) -> str:
+        return self.source or self.name
+
+
+@dataclass
+class LongContextResult:
+    """Answer plus how the input was fitted"""
+    answer: str
+    mode: str  # "single", "selected" or "map_reduce"
+    input_tokens: int
+    pieces_used: int
+    pieces_skipped: List[str] = field(default_factory=list)
+    chunks: int = 1
+    sources_used: int = 0  # Distinct input pieces that contributed (split parts count once)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "input_tokens": self.input_tokens,
+            "pieces_used": self.pieces_used,
+            "sources_used": self.sources_used,
+            "pieces_skipped": self.pieces_skipped,
+            "chunks": self.chunks,
+        }
+
+
+def _terms(text: str) -> List[str]:
+    # Split identifiers too: getUserToken -> get user token, auth_service -> auth service
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if len(t) > 1 and t not in _STOPWORDS]
+
+
+def rank_pieces(pieces: List[ContextPiece], question: str) -> List[ContextPiece]:
+    """
+    Order pieces by relevance to the question (BM25 over content, boosted by name)
+
+    Args:
+        pieces: Files or sections
+        question: User question
+
+    Returns:
+        Pieces sorted best first (scores stored on each piece)
+    """
+    query = set(_terms(question))
+    if not pieces:
+        return []
+
+    doc_terms = [Counter(_terms(piece.text)) for piece in pieces]
+    avg_len = sum(sum(tf.values()) for tf in doc_terms) / len(pieces) or 1
+    df = Counter(term for tf in doc_terms for term in tf)
+    k1, b = 1.2, 0.75
+
+    for piece, tf in zip(pieces, doc_terms):
+        length = sum(tf.values())
+        score = 0.0
+        for term in query:
+            if term not in tf:
+                continue
+            idf = math.log(1 + (len(pieces) - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * tf[term] * (k1 + 1) / (tf[term] + k1 * (1 - b + b * length / avg_len))
+        # Matching file/section names is a strong signal
+        score += 2.0 * len(query & set(_terms(piece.name)))
+        piece.score = score
+
+    return sorted(pieces, key=lambda piece: piece.score, reverse=True)
+
+
+def pack(pieces: List[ContextPiece], budget: int) -> Tuple[List[ContextPiece], List[ContextPiece]]:
+    """Greedy fit of ranked pieces into a token budget: (kept, skipped)"""
+    kept, skipped, used = [], [], 0
+    for piece in pieces:
+        if used + piece.tokens <= budget:
+            kept.append(piece)
+            used += piece.tokens
+        else:
+            skipped.append(piece)
+    return kept, skipped
+
+
+def split_text(name: str, text: str, max_tokens: int, counter: TokenCounter) -> List[ContextPiece]:
+    """Split one oversized text on paragraph, then line boundaries"""
+    max_chars = int(max_tokens * counter.chars_per_token)
+    parts, current = [], ""
+    for block in re.split(r"(\n\s*\n)", text):
+        while len(block) > max_chars:  # A single huge paragraph: cut on lines
+            cut = block.rfind("\n", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(block[:cut])
+            block = block[cut:]
+        if len(current) + len(block) > max_chars and current:
+            parts.append(current)
+            current = ""
+        current += block
+    if current.strip():
+        parts.append(current)
+
+    return [
+        ContextPiece(name=f"{name} (part {i + 1}/{len(parts)})" if len(parts) > 1 else name,
+                     text=part, tokens=counter.estimate(part), source=name)
+        for i, part in enumerate(parts)
+    ]
+
+
+class LongContextPipeline:
+    """
+    Fits arbitrarily large inputs to a Gemini model
+
+    - Fits: one call with everything (exact token count)
+    - Too large, mode "select": the most relevant pieces that fit
+    - Too large, mode "map_reduce": every piece, packed into window-sized
+      chunks answered concurrently, then one reduce call over the partial
+      answers (reduced again in rounds if those do not fit either)
+
+    All model calls run in worker threads, under a rate limiter shared by
+    every pipeline for the same model.
+    """
+
+    def __init__(self, model, model_name: str, context_window: Optional[int] = None):
+        self.model = model
+        self.model_name = model_name
+        self.context_window = context_window or CONTEXT_WINDOWS.get(model_name, DEFAULT_CONTEXT_WINDOW)
+        # Shared per model so exact counts and calibration survive across requests
+        self.counter = _counters.setdefault(model_name, TokenCounter(model))
+        if model_name not in _limiters:
+            _limiters[model_name] = RateLimiter()
+        self.limiter = _limiters[model_name]
+
+    @property
+    def budget(self) -> int:
+        return int((self.context_window - OUTPUT_RESERVE) * SAFETY_MARGIN)
+
+    async def generate(self, prompt: str) -> str:
+        async with self.limiter.slot():
+            response = await asyncio.to_thread(self.model.generate_content, prompt)
+        return response.text
+
+    async def run(
+        self,
+        pieces: List[ContextPiece],
+        question: str,
+        render,
+        mode: str = "auto",
+    ) -> LongContextResult:
+        """
+        Answer a question over pieces that may exceed the context window
+
+        Args:
+            pieces: Files or sections
+            question: Question or instruction
+            render: Callable(pieces, question) -> prompt string
+            mode: "auto" (map_reduce when too large), "select" or "map_reduce"
+
+        Returns:
+            LongContextResult
+        """
+        full_prompt = render(pieces, question)
+        total = await self.counter.count(full_prompt)  # One exact count, also calibrates
+        if total <= self.budget:
+            answer = await self.generate(full_prompt)
+            return LongContextResult(answer, "single", total, len(pieces), sources_used=len(pieces))
+
+        overhead = self.counter.estimate(render([], question))
+        piece_budget = self.budget - overhead
+        sized = []
+        for piece in pieces:
+            piece.tokens = self.counter.estimate(render([piece], "")) - self.counter.estimate(render([], ""))
+            sized.extend([piece] if piece.tokens <= piece_budget
+                         else split_text(piece.name, piece.text, piece_budget, self.counter))
+        ranked = rank_pieces(sized, question)
+
+        if mode == "select":
+            kept, skipped = pack(ranked, piece_budget)
+            prompt = render(kept, question)
+            answer = await self.generate(prompt)
+            return LongContextResult(answer, "selected", await self.counter.count(prompt),
+                                     len(kept), [piece.name for piece in skipped],
+                                     sources_used=len({piece.origin for piece in kept}))
+
+        # Map: fill chunks in relevance order so related pieces stay together
+        chunks: List[List[ContextPiece]] = []
+        remaining = ranked
+        while remaining:
+            chunk, remaining = pack(remaining, piece_budget)
+            if not chunk:  # Cannot happen after splitting, but never loop forever
+                chunk, remaining = [remaining[0]], remaining[1:]
+            chunks.append(chunk)
+
+        def map_question(part: int) -> str:
+            return (f"{question}\n\nYou are seeing part {part} of {len(chunks)} of the input. "
+                    "Answer using only this part; note what is relevant and say so briefly if nothing is.")
+
+        partials = await asyncio.gather(*[
+            self.generate(render(chunk, map_question(i + 1)))
+            for i, chunk in enumerate(chunks)
+        ])
+
+        answer = await self._reduce(list(partials), question)
+        return LongContextResult(answer, "map_reduce", total, len(pieces), chunks=len(chunks),
+                                 sources_used=len(pieces))
+
+    async def _reduce(self, partials: List[str], question: str) -> str:
+        """Combine partial answers, in rounds if they do not fit one call"""
+        def reduce_prompt(parts: List[str]) -> str:
+            joined = "\n\n".join(f"### Partial answer {i + 1}\n{part}" for i, part in enumerate(parts))
+            return (f"The input was too large for one pass, so it was analysed in parts.\n\n{joined}\n\n"
+                    f"# Question:\n{question}\n\nCombine the partial answers into one complete, "
+                    "consistent answer. Remove duplication and resolve contradictions.")
+
+        while True:
+            prompt = reduce_prompt(partials)
+            if self.counter.estimate(prompt) <= self.budget or len(partials) == 1:
+                return await self.generate(prompt)
+
+            groups: List[List[str]] = [[]]
+            for part in partials:
+                if groups[-1] and self.counter.estimate(reduce_prompt(groups[-1] + [part])) > self.budget:
+                    groups.append([])
+                groups[-1].append(part)
+            if len(groups) == len(partials):  # No progress possible: send as is
+                return await self.generate(prompt)
+            partials = list(await asyncio.gather(*[self.generate(reduce_prompt(group)) for group in groups]))
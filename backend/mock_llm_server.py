@@ -0,0 +1,355 @@
+"""
+Mock LLM Provider Server
+Local stand-in for the Groq, OpenAI and Ollama APIs, for load tests
+
+Speaks just enough of each API for our apps and clients:
+- Groq:   POST /openai/v1/chat/completions  (point the SDK at it with GROQ_BASE_URL)
+- OpenAI: POST /v1/chat/completions         (OPENAI_BASE_URL=http://host:port/v1)
+- Ollama: POST /api/generate, /api/chat, GET /api/tags
+
+Answers are filler text produced at a configurable time-to-first-token
+and token rate, with optional injected 500s and 429s. Streaming follows
+each provider's wire format (SSE chunks, NDJSON lines). Behaviour can be
+changed at runtime with POST /mock/config; GET /mock/stats shows counts.
+
+Note that the Groq and OpenAI SDKs retry 429/5xx on their own, so
+injected errors also show up as extra latency on the calling side.
+
+Usage:
+    python mock_llm_server.py --port 9100 --ttft-ms 300 --tokens-per-sec 200
+    GROQ_BASE_URL=http://127.0.0.1:9100 GROQ_API_KEY=mock python super_intelligent_endpoint.py
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+FILLER = (
+    "The answer depends on a few factors that are worth walking through step by step. "
+    "First consider the inputs and what they imply, then check each assumption against "
+    "the result so the reasoning stays sound and easy to follow."
+).split()
+
+
+class MockConfig(BaseModel):
+    ttft_ms: float = 300.0
+    jitter_ms: float = 50.0
+    tokens_per_sec: float = 200.0
+    output_tokens: int = 200
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: int = 1
+
+
+class MockConfigUpdate(BaseModel):
+    ttft_ms: Optional[float] = None
+    jitter_ms: Optional[float] = None
+    tokens_per_sec: Optional[float] = None
+    output_tokens: Optional[int] = None
+    error_rate: Optional[float] = None
+    rate_limit_rate: Optional[float] = None
+    retry_after: Optional[int] = None
+
+
+app = FastAPI(title="Mock LLM Provider", version="1.0")
+
+config = MockConfig()
+stats: Counter = Counter()
+in_flight = 0
+
+
+def injected_error() -> Optional[JSONResponse]:
+    """A 429 or 500 according to the configured rates, else None"""
+    roll = random.random()
+    if roll < config.rate_limit_rate:
+        stats["rate_limited"] += 1
+        return JSONResponse(
+            {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_exceeded"}},
+            status_code=429,
+            headers={"Retry-After": str(config.retry_after)}
+        )
+    if roll < config.rate_limit_rate + config.error_rate:
+        stats["errors"] += 1
+        return JSONResponse(
+            {"error": {"message": "Injected failure (mock)", "type": "server_error"}},
+            status_code=500
+        )
+    return None
+
+
+def count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def output_length(max_tokens: Optional[int]) -> int:
+    return max(1, min(config.output_tokens, max_tokens or config.output_tokens))
+
+
+async def generate_tokens(count: int) -> AsyncIterator[str]:
+    """
+    Filler tokens paced at ttft (+/- jitter) then tokens_per_sec
+
+    Token i is due at start + ttft + i / rate; the loop sleeps only when it
+    is ahead of schedule, so high rates don't cost one timer per token.
+    """
+    start = time.perf_counter()
+    ttft = max(0.0, config.ttft_ms + random.uniform(-config.jitter_ms, config.jitter_ms)) / 1000
+    rate = max(config.tokens_per_sec, 0.001)
+
+    for i in range(count):
+        delay = start + ttft + i / rate - time.perf_counter()
+        if delay > 0.001:
+            await asyncio.sleep(delay)
+        yield FILLER[i % len(FILLER)] + " "
+
+
+async def collect(count: int) -> str:
+    return "".join([token async for token in generate_tokens(count)])
+
+
+def track(endpoint: str):
+    stats[f"requests:{endpoint}"] += 1
+
+
+# ---- OpenAI / Groq chat completions ----
+
+def prompt_tokens(messages: List[Dict[str, Any]]) -> int:
+    return sum(count_tokens(str(m.get("content", ""))) for m in messages)
+
+
+def usage(prompt: int, completion: int) -> Dict[str, int]:
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+async def chat_completions(body: Dict[str, Any], endpoint: str):
+    global in_flight
+    track(endpoint)
+    error = injected_error()
+    if error is not None:
+        return error
+
+    model = body.get("model", "mock-model")
+    count = output_length(body.get("max_tokens"))
+    prompt = prompt_tokens(body.get("messages", []))
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+    created = int(time.time())
+
+    if not body.get("stream"):
+        in_flight += 1
+        try:
+            text = await collect(count)
+        finally:
+            in_flight -= 1
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop" if count < (body.get("max_tokens") or count + 1) else "length"
+            }],
+            "usage": usage(prompt, count)
+        }
+
+    include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, **extra) -> str:
+        data = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            **extra
+        }
+        return f"data: {json.dumps(data)}\n\n"
+
+    async def stream() -> AsyncIterator[str]:
+        global in_flight
+        in_flight += 1
+        try:
+            first = True
+            async for token in generate_tokens(count):
+                delta = {"role": "assistant", "content": token} if first else {"content": token}
+                first = False
+                yield chunk(delta)
+            # Groq reports usage on the final chunk under x_groq
+            yield chunk({}, "stop", x_groq={"id": completion_id, "usage": usage(prompt, count)})
+            if include_usage:
+                data = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [],
+                    "usage": usage(prompt, count)
+                }
+                yield f"data: {json.dumps(data)}\n\n"
+            yield "data: [DONE]\n\n"
+        finally:
+            in_flight -= 1
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+@app.post("/openai/v1/chat/completions")
+async def groq_chat_completions(request: Request):
+    return await chat_completions(await request.json(), "groq")
+
+
+@app.post("/v1/chat/completions")
+async def openai_chat_completions(request: Request):
+    return await chat_completions(await request.json(), "openai")
+
+
+# ---- Ollama ----
+
+def ollama_stats(start: float, prompt: int, count: int) -> Dict[str, Any]:
+    total_ns = int((time.perf_counter() - start) * 1e9)
+    return {
+        "total_duration": total_ns,
+        "load_duration": 0,
+        "prompt_eval_count": prompt,
+        "eval_count": count,
+        "eval_duration": total_ns
+    }
+
+
+async def ollama_response(body: Dict[str, Any], endpoint: str, text_field: str, prompt: int):
+    global in_flight
+    track(endpoint)
+    error = injected_error()
+    if error is not None:
+        return error
+
+    model = body.get("model", "llama3.2")
+    count = output_length((body.get("options") or {}).get("num_predict"))
+    start = time.perf_counter()
+
+    def piece(text: str, done: bool) -> Dict[str, Any]:
+        data = {"model": model, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "done": done}
+        if text_field == "message":
+            data["message"] = {"role": "assistant", "content": text}
+        else:
+            data["response"] = text
+        return data
+
+    def final(text: str) -> Dict[str, Any]:
+        data = {**piece(text, True), **ollama_stats(start, prompt, count), "done_reason": "stop"}
+        if text_field == "response":
+            # KV context handle, echoed back by clients on the next turn
+            data["context"] = list(range(prompt + count))[:64]
+        return data
+
+    if body.get("stream") is False:
+        in_flight += 1
+        try:
+            text = await collect(count)
+        finally:
+            in_flight -= 1
+        return final(text)
+
+    async def stream() -> AsyncIterator[str]:
+        global in_flight
+        in_flight += 1
+        try:
+            async for token in generate_tokens(count):
+                yield json.dumps(piece(token, False)) + "\n"
+            yield json.dumps(final("")) + "\n"
+        finally:
+            in_flight -= 1
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.post("/api/generate")
+async def ollama_generate(request: Request):
+    body = await request.json()
+    prompt = count_tokens(body.get("prompt", "")) + count_tokens(body.get("system", "") or "")
+    return await ollama_response(body, "ollama_generate", "response", prompt)
+
+
+@app.post("/api/chat")
+async def ollama_chat(request: Request):
+    body = await request.json()
+    return await ollama_response(body, "ollama_chat", "message", prompt_tokens(body.get("messages", [])))
+
+
+@app.get("/api/tags")
+async def ollama_tags():
+    return {"models": [{"name": name, "model": name} for name in ["llama3.2", "llama3.2:latest", "llava"]]}
+
+
+# ---- Control ----
+
+@app.get("/mock/config")
+async def get_config():
+    return config
+
+
+@app.post("/mock/config")
+async def update_config(update: MockConfigUpdate):
+    """Change latency, rate or error injection without restarting"""
+    global config
+    config = config.model_copy(update=update.model_dump(exclude_none=True))
+    return config
+
+
+@app.get("/mock/stats")
+async def get_stats():
+    return {"in_flight": in_flight, **stats}
+
+
+@app.post("/mock/reset")
+async def reset_stats():
+    stats.clear()
+    return {"status": "reset"}
+
+
+@app.get("/health")
+async def health():
+    return {"status": "healthy", "mock": True}
+
+
+def main():
+    global config
+    parser = argparse.ArgumentParser(description="Mock Groq/OpenAI/Ollama server for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--ttft-ms", type=float, default=config.ttft_ms)
+    parser.add_argument("--jitter-ms", type=float, default=config.jitter_ms)
+    parser.add_argument("--tokens-per-sec", type=float, default=config.tokens_per_sec)
+    parser.add_argument("--output-tokens", type=int, default=config.output_tokens)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        ttft_ms=args.ttft_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        output_tokens=args.output_tokens,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate
+    )
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,19 @@
 """
 Smart Model Router - Intelligently selects the best AI model based on task
+
+Static model specs give each model a prior; live observations (time to first
+token, tokens/sec, errors, 429s) recorded through record_result()/measure()
+replace the priors as traffic flows, and per-model circuit breakers route
+around providers that are failing or rate limiting right now.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from collections import deque
+from contextlib import contextmanager
 from enum import Enum
 import re
+import threading
+import time
 
 
 class TaskType(Enum):
@@ -28,6 +37,207 @@ class ModelProvider(Enum):
     LOCAL = "local"
 
 
+# Priors used until a model has live samples: (time to first token in ms, tokens/sec)
+SPEED_PRIORS = {
+    "very_fast": (250.0, 500.0),
+    "fast": (400.0, 250.0),
+    "medium": (800.0, 80.0),
+    "slow": (1500.0, 30.0),
+}
+
+QUALITY_SCORES = {"medium": 0.6, "high": 0.8, "best": 1.0}
+
+# How much quality vs. expected latency counts for each urgency
+URGENCY_WEIGHTS = {
+    "fast": (0.25, 0.75),
+    "balanced": (0.5, 0.5),
+    "quality": (0.85, 0.15),
+}
+
+
+class ModelHealth:
+    """
+    Live performance figures and circuit breaker for one model
+
+    Latency and throughput are tracked as EWMAs (plus a window of recent
+    samples for percentiles); the error rate is an EWMA of 0/1 outcomes.
+    After failure_threshold consecutive failures, or any 429, the breaker
+    opens: the model is skipped until the cooldown (or Retry-After) passes,
+    then a single probe request is let through (half-open).
+
+    Figures decay back towards the priors (half_life seconds) while a model
+    gets no traffic, so a model that was slow or failing earlier is tried
+    again instead of being starved forever.
+    """
+
+    def __init__(
+        self,
+        ttft_prior_ms: float,
+        tps_prior: float,
+        alpha: float = 0.2,
+        window: int = 200,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        half_life: float = 300.0
+    ):
+        self.ttft_prior_ms = ttft_prior_ms
+        self.tps_prior = tps_prior
+        self.ttft_ms = ttft_prior_ms
+        self.tokens_per_sec = tps_prior
+        self.half_life = half_life
+        self.last_sample = 0.0
+        self.error_rate = 0.0
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self.ttft_samples: deque = deque(maxlen=window)
+        self.latency_samples: deque = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probe_started = 0.0
+
+    def _ewma(self, current: float, sample: float) -> float:
+        return current + self.alpha * (sample - current)
+
+    def _freshness(self) -> float:
+        """1.0 right after a sample, halving every half_life seconds"""
+        if not self.last_sample:
+            return 1.0
+        return 0.5 ** ((time.time() - self.last_sample) / self.half_life)
+
+    def _settle(self):
+        """Fold the decay into the stored figures before a new sample"""
+        freshness = self._freshness()
+        self.error_rate *= freshness
+        self.ttft_ms = self.ttft_prior_ms + (self.ttft_ms - self.ttft_prior_ms) * freshness
+        self.tokens_per_sec = self.tps_prior + (self.tokens_per_sec - self.tps_prior) * freshness
+        self.last_sample = time.time()
+
+    def current_error_rate(self) -> float:
+        return self.error_rate * self._freshness()
+
+    def record_success(self, ttft_ms: Optional[float], duration_ms: float, tokens: int):
+        self._settle()
+        self.requests += 1
+        self.error_rate = self._ewma(self.error_rate, 0.0)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+        self.latency_samples.append(duration_ms)
+        if ttft_ms is not None:
+            self.ttft_ms = self._ewma(self.ttft_ms, ttft_ms)
+            self.ttft_samples.append(ttft_ms)
+        generation_ms = duration_ms - (ttft_ms or 0.0)
+        if tokens > 1 and generation_ms >= 10:
+            self.tokens_per_sec = self._ewma(self.tokens_per_sec, tokens / (generation_ms / 1000))
+
+    def record_failure(self, rate_limited: bool = False, retry_after: Optional[float] = None):
+        self._settle()
+        now = time.time()
+        self.requests += 1
+        self.errors += 1
+        self.error_rate = self._ewma(self.error_rate, 1.0)
+        self.consecutive_failures += 1
+
+        if rate_limited:
+            self.rate_limited += 1
+            self.open_until = now + (retry_after if retry_after else self.cooldown)
+        elif self.consecutive_failures >= self.failure_threshold:
+            # Back off longer while the model keeps failing its probes
+            streak = self.consecutive_failures - self.failure_threshold
+            self.open_until = now + self.cooldown * min(2 ** streak, 8)
+
+    def breaker_state(self) -> str:
+        if self.open_until == 0.0:
+            return "closed"
+        return "open" if time.time() < self.open_until else "half_open"
+
+    def allow_request(self) -> bool:
+        """Closed, or half-open with no probe in flight"""
+        state = self.breaker_state()
+        if state == "closed":
+            return True
+        # A probe that never reported back stops blocking after one cooldown
+        return state == "half_open" and time.time() - self.probe_started > self.cooldown
+
+    def try_acquire(self) -> bool:
+        """Admit a request about to be sent; half-open admits a single probe"""
+        if not self.allow_request():
+            return False
+        if self.breaker_state() == "half_open":
+            self.probe_started = time.time()
+        return True
+
+    def expected_latency_ms(self, output_tokens: int) -> float:
+        freshness = self._freshness()
+        ttft = self.ttft_prior_ms + (self.ttft_ms - self.ttft_prior_ms) * freshness
+        tps = self.tps_prior + (self.tokens_per_sec - self.tps_prior) * freshness
+        return ttft + output_tokens / max(tps, 1.0) * 1000
+
+    @staticmethod
+    def _percentile(samples: deque, pct: float) -> Optional[float]:
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return round(ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))], 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ttft_ms": round(self.ttft_ms, 1),
+            "tokens_per_sec": round(self.tokens_per_sec, 1),
+            "error_rate": round(self.current_error_rate(), 3),
+            "ttft_p50_ms": self._percentile(self.ttft_samples, 50),
+            "ttft_p95_ms": self._percentile(self.ttft_samples, 95),
+            "latency_p50_ms": self._percentile(self.latency_samples, 50),
+            "latency_p95_ms": self._percentile(self.latency_samples, 95),
+            "requests": self.requests,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "breaker": self.breaker_state()
+        }
+
+
+class CallMeasurement:
+    """Timing handle yielded by SmartModelRouter.measure()"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.ttft_ms: Optional[float] = None
+        self.tokens = 0
+
+    def first_token(self):
+        if self.ttft_ms is None:
+            self.ttft_ms = (time.perf_counter() - self.start) * 1000
+
+    def add_tokens(self, count: int = 1):
+        self.first_token()
+        self.tokens += count
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+
+def _error_details(error: BaseException) -> Tuple[Optional[int], Optional[float]]:
+    """(HTTP status, Retry-After seconds) from an SDK / httpx exception"""
+    status = getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+
+    retry_after = None
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        try:
+            retry_after = float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+    return status, retry_after
+
+
 class SmartModelRouter:
     """
     Intelligently routes requests to the best AI model based on:
@@ -47,7 +257,8 @@ class SmartModelRouter:
                 "context_window": 8192,
                 "speed": "fast",
                 "quality": "high",
-                "cost": "free"
+                "cost": "free",
+                "cost_per_1k_tokens": 0.0
             },
             "llama-3.2-90b-vision-preview": {
                 "provider": ModelProvider.GROQ_LLAMA,
@@ -55,7 +266,8 @@ class SmartModelRouter:
                 "context_window": 8192,
                 "speed": "medium",
                 "quality": "high",
-                "cost": "free"
+                "cost": "free",
+                "cost_per_1k_tokens": 0.0
             },
             "llama-3.1-8b-instant": {
                 "provider": ModelProvider.GROQ_LLAMA,
@@ -63,7 +275,8 @@ class SmartModelRouter:
                 "context_window": 8192,
                 "speed": "very_fast",
                 "quality": "medium",
-                "cost": "free"
+                "cost": "free",
+                "cost_per_1k_tokens": 0.0
             },
 
             # Claude Models (Premium, Best Quality)
@@ -73,7 +286,8 @@ class SmartModelRouter:
                 "context_window": 200000,
                 "speed": "medium",
                 "quality": "best",
-                "cost": "paid"
+                "cost": "paid",
+                "cost_per_1k_tokens": 0.009  # USD, blended input/output
             },
             "claude-3-opus-20240229": {
                 "provider": ModelProvider.CLAUDE,
@@ -81,7 +295,8 @@ class SmartModelRouter:
                 "context_window": 200000,
                 "speed": "slow",
                 "quality": "best",
-                "cost": "paid"
+                "cost": "paid",
+                "cost_per_1k_tokens": 0.045  # USD, blended input/output
             },
             "claude-3-haiku-20240307": {
                 "provider": ModelProvider.CLAUDE,
@@ -89,7 +304,8 @@ class SmartModelRouter:
                 "context_window": 200000,
                 "speed": "very_fast",
                 "quality": "high",
-                "cost": "paid"
+                "cost": "paid",
+                "cost_per_1k_tokens": 0.00075  # USD, blended input/output
             },
 
             # Google Gemini Models (FREE, Massive Context!)
@@ -99,7 +315,8 @@ class SmartModelRouter:
                 "context_window": 2000000,  # 2 MILLION tokens!
                 "speed": "medium",
                 "quality": "best",
-                "cost": "free"
+                "cost": "free",
+                "cost_per_1k_tokens": 0.0
             },
             "gemini-1.5-flash-latest": {
                 "provider": ModelProvider.GEMINI,
@@ -107,10 +324,18 @@ class SmartModelRouter:
                 "context_window": 1000000,  # 1 MILLION tokens
                 "speed": "fast",
                 "quality": "high",
-                "cost": "free"
+                "cost": "free",
+                "cost_per_1k_tokens": 0.0
             }
         }
 
+        # Live figures per model, seeded from the static speed ratings
+        self.health: Dict[str, ModelHealth] = {
+            model_id: ModelHealth(*SPEED_PRIORS.get(spec["speed"], SPEED_PRIORS["medium"]))
+            for model_id, spec in self.model_specs.items()
+        }
+        self._lock = threading.Lock()
+
     def detect_task_type(self, message: str, has_image: bool = False, has_document: bool = False) -> TaskType:
         """Detect what type of task the user is requesting"""
         message_lower = message.lower()
@@ -160,7 +385,7 @@ class SmartModelRouter:
         # Default to explanation
         return TaskType.EXPLANATION
 
-    def select_best_model(
+    def _preferred_model(
         self,
         task_type: TaskType,
         urgency: str = "balanced",  # fast, balanced, quality
@@ -168,7 +393,7 @@ class SmartModelRouter:
         context_size: int = 0
     ) -> str:
         """
-        Select the best model based on task and preferences
+        Rule-based pick for a task; ranked first unless live data says otherwise
 
         Args:
             task_type: The type of task
@@ -211,6 +436,245 @@ class SmartModelRouter:
         # Default
         return "llama-3.3-70b-versatile"
 
+    def _exclusion_reason(
+        self,
+        model_id: str,
+        task_type: TaskType,
+        use_paid: bool,
+        context_size: int,
+        estimated_cost: float,
+        max_cost: Optional[float],
+        providers: Optional[Iterable[ModelProvider]] = None
+    ) -> Optional[str]:
+        """Why a model can't serve this request, or None"""
+        spec = self.model_specs[model_id]
+        if providers is not None and spec["provider"] not in providers:
+            return "provider not available"
+        is_vision = "vision" in spec["strengths"]
+        if (task_type == TaskType.IMAGE_ANALYSIS) != is_vision:
+            return "needs vision model" if not is_vision else "vision-only model"
+        if spec["context_window"] < context_size:
+            return "context window too small"
+        if spec["cost"] == "paid" and not use_paid:
+            return "paid models disabled"
+        if max_cost is not None and estimated_cost > max_cost:
+            return "over cost budget"
+        return None
+
+    def rank_models(
+        self,
+        task_type: TaskType,
+        urgency: str = "balanced",
+        use_paid: bool = False,
+        context_size: int = 0,
+        max_cost: Optional[float] = None,
+        expected_output_tokens: int = 500,
+        providers: Optional[Iterable[ModelProvider]] = None
+    ) -> Dict[str, Any]:
+        """
+        Score every eligible model on quality vs. live latency and reliability
+
+        Ranking has no side effects; a half-open model's probe is only
+        admitted when the caller actually sends (see models_to_try()).
+
+        Args:
+            task_type: The type of task
+            urgency: Speed preference (fast/balanced/quality)
+            use_paid: Whether to use paid models like Claude
+            context_size: Size of context in tokens
+            max_cost: Per-request budget in USD (None = no limit)
+            expected_output_tokens: Output length used for latency/cost estimates
+            providers: Providers the caller can reach (None = all)
+
+        Returns:
+            Decision dict: chosen model, ordered fallbacks and every
+            candidate's score inputs (or why it was excluded)
+        """
+        providers = set(providers) if providers is not None else None
+        preferred = self._preferred_model(task_type, urgency, use_paid, context_size)
+        quality_weight, latency_weight = URGENCY_WEIGHTS.get(urgency, URGENCY_WEIGHTS["balanced"])
+        tokens = context_size + expected_output_tokens
+
+        candidates = []
+        with self._lock:
+            for model_id, spec in self.model_specs.items():
+                health = self.health[model_id]
+                estimated_cost = round(spec["cost_per_1k_tokens"] * tokens / 1000, 6)
+                expected_ms = health.expected_latency_ms(expected_output_tokens)
+                candidate = {
+                    "model": model_id,
+                    "provider": spec["provider"].value,
+                    "expected_latency_ms": round(expected_ms, 1),
+                    "estimated_cost": estimated_cost,
+                    **health.snapshot()
+                }
+
+                reason = self._exclusion_reason(
+                    model_id, task_type, use_paid, context_size, estimated_cost, max_cost, providers
+                )
+                if reason is None and not health.allow_request():
+                    reason = "circuit open"
+                if reason is not None:
+                    candidate["excluded"] = reason
+                    candidates.append(candidate)
+                    continue
+
+                # Latency score is 1.0 at zero and 0.5 at two seconds
+                latency_score = 2000 / (2000 + expected_ms)
+                quality_score = QUALITY_SCORES.get(spec["quality"], 0.8)
+                score = quality_weight * quality_score + latency_weight * latency_score
+                if model_id == preferred:
+                    score += 0.15
+                elif task_type.value in spec["strengths"]:
+                    score += 0.05
+                score *= 1 - health.current_error_rate()
+                candidate["score"] = round(score, 4)
+                candidates.append(candidate)
+
+            eligible = sorted(
+                (c for c in candidates if "score" in c),
+                key=lambda c: c["score"],
+                reverse=True
+            )
+            # A half-open model gets its probe whatever its score: the error
+            # penalty that tripped it would otherwise keep it from ever winning
+            probe = next((c for c in eligible if c["breaker"] == "half_open"), None)
+            if probe is not None:
+                eligible.remove(probe)
+                eligible.insert(0, probe)
+                probe["probe"] = True
+            if eligible:
+                model_id = eligible[0]["model"]
+            else:
+                # Everything is excluded or tripped: the rule-based pick is the least bad option
+                model_id = preferred
+
+        return {
+            "model": model_id,
+            "preferred": preferred,
+            "fallbacks": [c["model"] for c in eligible[1:]],
+            "urgency": urgency,
+            "max_cost": max_cost,
+            "expected_output_tokens": expected_output_tokens,
+            "candidates": candidates
+        }
+
+    def select_best_model(
+        self,
+        task_type: TaskType,
+        urgency: str = "balanced",  # fast, balanced, quality
+        use_paid: bool = False,  # Whether to use paid models (Claude)
+        context_size: int = 0,
+        max_cost: Optional[float] = None
+    ) -> str:
+        """
+        Select the best model based on task, preferences and live performance
+
+        Args:
+            task_type: The type of task
+            urgency: Speed preference (fast/balanced/quality)
+            use_paid: Whether to use paid models like Claude
+            context_size: Size of context in tokens
+            max_cost: Per-request budget in USD (None = no limit)
+
+        Returns:
+            Model ID string
+        """
+        return self.rank_models(task_type, urgency, use_paid, context_size, max_cost)["model"]
+
+    def record_result(
+        self,
+        model_id: str,
+        duration_ms: float,
+        ttft_ms: Optional[float] = None,
+        tokens: int = 0,
+        error: Optional[BaseException] = None,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None
+    ):
+        """
+        Feed one completed (or failed) call back into the routing figures
+
+        Args:
+            model_id: Model that served the call
+            duration_ms: Wall-clock time of the whole call
+            ttft_ms: Time to first token (streaming calls)
+            tokens: Output tokens produced
+            error: Exception the call raised, if any
+            status_code: HTTP status (taken from error when not given)
+            retry_after: Retry-After seconds on a 429 (taken from error when not given)
+        """
+        if error is not None:
+            error_status, error_retry = _error_details(error)
+            status_code = status_code or error_status
+            retry_after = retry_after or error_retry
+
+        with self._lock:
+            health = self.health.get(model_id)
+            if health is None:
+                return
+            if error is None and (status_code is None or status_code < 400):
+                health.record_success(ttft_ms, duration_ms, tokens)
+            else:
+                health.record_failure(rate_limited=status_code == 429, retry_after=retry_after)
+
+    @contextmanager
+    def measure(self, model_id: str) -> Iterator[CallMeasurement]:
+        """
+        Time a model call and record it
+
+            with smart_router.measure(model) as call:
+                response = client.create(model=model, ...)
+                call.tokens = response.usage.completion_tokens
+
+        Exceptions are recorded as failures and re-raised.
+        """
+        call = CallMeasurement()
+        try:
+            yield call
+        except Exception as e:
+            self.record_result(model_id, call.elapsed_ms(), error=e)
+            raise
+        self.record_result(model_id, call.elapsed_ms(), call.ttft_ms, call.tokens)
+
+    def admit(self, model_id: str) -> bool:
+        """
+        Claim a model for a request that is about to be sent
+
+        False while its breaker is open, or half-open with the single probe
+        already in flight. Models the router does not know are always admitted.
+        """
+        with self._lock:
+            health = self.health.get(model_id)
+            return health is None or health.try_acquire()
+
+    def models_to_try(self, route: Dict[str, Any]) -> Iterator[str]:
+        """
+        Models of a route_request() result in order, admitting each just before use
+
+            for model in smart_router.models_to_try(route):
+                try:
+                    ...call model...
+                    break
+                except Exception:
+                    continue  # Recorded as a failure; try the next one
+
+        If nothing can be admitted the routed model is tried anyway, as the
+        least bad option.
+        """
+        tried = False
+        for model_id in [route["model"], *route["fallbacks"]]:
+            if self.admit(model_id):
+                tried = True
+                yield model_id
+        if not tried:
+            yield route["model"]
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Live figures and breaker state per model"""
+        with self._lock:
+            return {model_id: health.snapshot() for model_id, health in self.health.items()}
+
     def route_request(
         self,
         message: str,
@@ -218,30 +682,49 @@ class SmartModelRouter:
         has_document: bool = False,
         urgency: str = "balanced",
         use_paid: bool = False,
-        context_size: int = 0
+        context_size: int = 0,
+        max_cost: Optional[float] = None,
+        expected_output_tokens: int = 500,
+        requested_model: Optional[str] = None,
+        providers: Optional[Iterable[ModelProvider]] = None
     ) -> Dict[str, Any]:
         """
         Main routing function - analyzes request and returns best model + metadata
 
+        A requested_model (the client's choice) is routed first, with the
+        ranked models as its fallbacks. Send through models_to_try() so an
+        open breaker moves on to the next model.
+
         Returns:
             {
                 "model": "model-id",
                 "task_type": "coding",
                 "provider": "groq_llama",
-                "reasoning": "Selected because..."
+                "reasoning": "Selected because...",
+                "fallbacks": ["next-best-model", ...],
+                "decision": {...}  # scores and live inputs per candidate
             }
         """
 
         # Detect task type
         task_type = self.detect_task_type(message, has_image, has_document)
 
-        # Select best model
-        model_id = self.select_best_model(
+        # Rank models on task fit and live performance
+        decision = self.rank_models(
             task_type=task_type,
             urgency=urgency,
             use_paid=use_paid,
-            context_size=context_size
+            context_size=context_size,
+            max_cost=max_cost,
+            expected_output_tokens=expected_output_tokens,
+            providers=providers
         )
+        model_id = decision["model"]
+        fallbacks: List[str] = decision["fallbacks"]
+        if requested_model:
+            ranked = [model_id, *fallbacks]
+            model_id = requested_model
+            fallbacks = [m for m in ranked if m != requested_model]
 
         model_info = self.model_specs.get(model_id, {})
 
@@ -249,17 +732,27 @@ class SmartModelRouter:
             "model": model_id,
             "task_type": task_type.value,
             "provider": model_info.get("provider", ModelProvider.GROQ_LLAMA).value,
-            "reasoning": self._get_selection_reasoning(task_type, model_id, urgency),
+            "reasoning": self._get_selection_reasoning(task_type, model_id, urgency, decision),
             "estimated_speed": model_info.get("speed", "medium"),
-            "estimated_quality": model_info.get("quality", "high")
+            "estimated_quality": model_info.get("quality", "high"),
+            "fallbacks": fallbacks,
+            "decision": decision
         }
 
-    def _get_selection_reasoning(self, task_type: TaskType, model_id: str, urgency: str) -> str:
+    def _get_selection_reasoning(
+        self,
+        task_type: TaskType,
+        model_id: str,
+        urgency: str,
+        decision: Optional[Dict[str, Any]] = None
+    ) -> str:
         """Generate human-readable reasoning for model selection"""
         reasons = []
 
         if "claude" in model_id:
             reasons.append("Using Claude for highest quality")
+        elif "gemini" in model_id:
+            reasons.append("Using free Gemini model")
         else:
             reasons.append("Using free Llama model")
 
@@ -275,6 +768,13 @@ class SmartModelRouter:
         elif urgency == "quality":
             reasons.append("prioritizing quality")
 
+        if decision and decision["preferred"] != model_id:
+            preferred = next(c for c in decision["candidates"] if c["model"] == decision["preferred"])
+            if "excluded" in preferred:
+                reasons.append(f"rerouted from {decision['preferred']} ({preferred['excluded']})")
+            else:
+                reasons.append(f"rerouted from {decision['preferred']} (slower or failing right now)")
+
         return " - ".join(reasons)
 
 
@@ -8,6 +8,7 @@ from typing import Any
 from uuid import uuid4
 
 from genius_ai.core.logger import logger
+from genius_ai.core.metrics import metrics
 from genius_ai.models.base import BaseModel, GenerationConfig
 
 
@@ -136,6 +137,13 @@ class BaseAgent(ABC):
         """
         full_prompt = f"{self.system_prompt}\n\n{prompt}"
         response = await self.model.generate(full_prompt, config)
+
+        usage = getattr(response, "usage", None) or {}
+        metrics.record_tokens(
+            self.role.value,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+        )
         return response.text
 
     def get_thoughts(self) -> list[AgentThought]:
@@ -332,14 +340,20 @@ Use chain-of-thought reasoning for complex problems. Think step by step."""
             ]
         }
 
-    async def process(
+    def decompose(
         self,
         input_text: str,
         context: dict[str, Any] | None = None,
-    ) -> AgentResponse:
-        """Process input with real problem decomposition."""
-        self._add_thought(f"Analyzing: {input_text[:100]}...")
+    ) -> tuple[str, dict[str, Any]]:
+        """Classify and decompose input without calling the model.
 
+        Args:
+            input_text: Input to analyze
+            context: Additional context
+
+        Returns:
+            Input type and decomposition structure
+        """
         # Step 1: Classify input type
         input_type = self._classify_input_type(input_text)
         self._add_thought(f"Classified as: {input_type}")
@@ -349,6 +363,26 @@ Use chain-of-thought reasoning for complex problems. Think step by step."""
         decomposition = decomposition_func(input_text, context)
         self._add_thought(f"Decomposed into {len(decomposition.get('reasoning_steps', []))} reasoning steps")
 
+        return input_type, decomposition
+
+    async def process(
+        self,
+        input_text: str,
+        context: dict[str, Any] | None = None,
+    ) -> AgentResponse:
+        """Process input with real problem decomposition.
+
+        A decomposition already computed with decompose() can be passed as
+        context["decomposition"].
+        """
+        self._add_thought(f"Analyzing: {input_text[:100]}...")
+
+        decomposition = (context or {}).get("decomposition")
+        if decomposition:
+            input_type = decomposition["type"]
+        else:
+            input_type, decomposition = self.decompose(input_text, context)
+
         # Step 3: Build enhanced prompt with decomposition
         prompt = f"""Task: {input_text}
 
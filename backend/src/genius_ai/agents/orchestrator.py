@@ -1,5 +1,6 @@
 """Orchestrator agent that coordinates other agents."""
 
+import time
 from typing import Any, AsyncIterator
 
 from genius_ai.agents.base import (
@@ -11,10 +12,17 @@ from genius_ai.agents.base import (
     ReflectionAgent,
     AgentThought,
 )
+from genius_ai.agents.scheduler import Stage, StageScheduler, StageSkipped
+from genius_ai.agents.triage import RequestTier, TriageDecision, request_classifier
+from genius_ai.core.config import settings
 from genius_ai.core.logger import logger
+from genius_ai.core.metrics import metrics
 from genius_ai.models.base import BaseModel
 from genius_ai.memory.learning import learning_system
 
+# Questions up to this many words skip the reflection pass
+SIMPLE_INPUT_MAX_WORDS = 12
+
 
 class OrchestratorAgent(BaseAgent):
     """Coordinates multiple specialized agents to solve complex tasks."""
@@ -25,6 +33,8 @@ class OrchestratorAgent(BaseAgent):
         enable_reflection: bool = True,
         enable_tools: bool = True,
         rag_retriever: Any = None,
+        latency_budget: float | None = None,
+        enable_triage: bool = True,
     ):
         """Initialize orchestrator.
 
@@ -33,11 +43,19 @@ class OrchestratorAgent(BaseAgent):
             enable_reflection: Whether to use reflection agent
             enable_tools: Whether to use tool execution
             rag_retriever: RAG retriever instance for knowledge base
+            latency_budget: Seconds per request before optional stages are dropped
+                (defaults to settings.agent_latency_budget)
+            enable_triage: Route trivial and simple messages around the full pipeline
         """
         super().__init__(AgentRole.ORCHESTRATOR, model)
         self.enable_reflection = enable_reflection
         self.enable_tools = enable_tools
         self.rag_retriever = rag_retriever
+        self.enable_triage = enable_triage
+        self._full_latency: float | None = None  # EWMA of full-pipeline latency
+        self.scheduler = StageScheduler(
+            latency_budget=latency_budget if latency_budget is not None else settings.agent_latency_budget
+        )
 
         # Initialize sub-agents
         self.reasoning_agent = ReasoningAgent(model)
@@ -93,9 +111,140 @@ Coordinate these agents effectively to produce the best possible response."""
         self,
         input_text: str,
         context: dict[str, Any] | None = None,
+    ) -> AgentResponse:
+        """Process input on the cheapest path that can handle it.
+
+        The request classifier sends greetings and acknowledgements to a
+        canned reply (no model call), short factual questions to a single
+        model call, and everything else to the full multi-agent pipeline.
+        The tier, model calls saved and estimated latency saved are reported
+        in metadata["routing"].
+
+        Args:
+            input_text: User input
+            context: Additional context
+
+        Returns:
+            Agent response
+        """
+        start = time.perf_counter()
+        if self.enable_triage:
+            decision = request_classifier.classify(input_text)
+        else:
+            decision = TriageDecision(RequestTier.FULL, "triage disabled")
+        metrics.triage_requests.inc(tier=decision.tier.value)
+
+        if decision.tier == RequestTier.SOCIAL:
+            response = AgentResponse(
+                content=decision.reply,
+                confidence=1.0,
+                metadata={"problem_type": "social", "approach": "Canned reply"},
+            )
+        elif decision.tier == RequestTier.SIMPLE:
+            response = await self._direct_response(input_text, context)
+        else:
+            response = await self._run_pipeline(input_text, context)
+
+        elapsed = time.perf_counter() - start
+        if decision.tier == RequestTier.FULL:
+            self._full_latency = (
+                elapsed if self._full_latency is None
+                else 0.2 * elapsed + 0.8 * self._full_latency
+            )
+
+        routing = decision.to_dict()
+        routing["latency_ms"] = round(elapsed * 1000, 1)
+        if decision.tier != RequestTier.FULL and self._full_latency is not None:
+            routing["estimated_latency_saved_ms"] = round(max(0.0, self._full_latency - elapsed) * 1000, 1)
+        response.metadata["routing"] = routing
+        return response
+
+    async def _direct_response(
+        self,
+        input_text: str,
+        context: dict[str, Any] | None = None,
+    ) -> AgentResponse:
+        """Answer a simple question with one model call (plus RAG if available).
+
+        Args:
+            input_text: User input
+            context: Additional context
+
+        Returns:
+            Agent response
+        """
+        self._iteration_count = 0
+        thought = self._add_thought("Simple question - answering directly")
+        await self._emit_thought(thought)
+
+        enhanced_context = context or {}
+        if self.rag_retriever and "knowledge" not in enhanced_context:
+            try:
+                with metrics.stage("rag"):
+                    retrieved_context = await self.rag_retriever.retrieve_context(
+                        query=input_text,
+                        top_k=5,
+                    )
+                if retrieved_context:
+                    enhanced_context["knowledge"] = retrieved_context
+            except Exception as e:
+                logger.error(f"RAG retrieval error: {e}")
+
+        prompt = f"Question: {input_text}\n"
+        if enhanced_context.get("knowledge"):
+            prompt += f"\nRelevant Knowledge:\n{enhanced_context['knowledge'][:2000]}\n"
+        if enhanced_context.get("history"):
+            prompt += f"\nConversation so far:\n{enhanced_context['history']}\n"
+        prompt += "\nAnswer the question directly and accurately. Be concise."
+
+        with metrics.stage("direct"):
+            answer = await self._generate(prompt)
+
+        thought = self._add_thought("Direct answer complete")
+        await self._emit_thought(thought)
+
+        rag_used = "knowledge" in enhanced_context
+        approach_summary = "Direct: single call" + (" + RAG" if rag_used else "")
+        learning_system.record_strategy(
+            problem_type="question",
+            approach=approach_summary,
+            success=True,  # Assume success initially
+            confidence=0.9,
+            metadata={"rag_used": rag_used, "timestamp": thought.timestamp.isoformat()},
+        )
+
+        return AgentResponse(
+            content=answer,
+            thoughts=self.get_thoughts(),
+            confidence=0.9,
+            metadata={
+                "tools_used": [],
+                "rag_used": rag_used,
+                "iterations": self._iteration_count,
+                "problem_type": "question",
+                "approach": approach_summary,
+            },
+        )
+
+    async def _run_pipeline(
+        self,
+        input_text: str,
+        context: dict[str, Any] | None = None,
     ) -> AgentResponse:
         """Process input using intelligent multi-agent coordination with RAG and tools.
 
+        Stages run as a dependency graph on the stage scheduler:
+
+            rag ─────► tools ─┐
+            reasoning ────────┼─► synthesis ─► reflection ─► improvement
+            planning (spec.) ─┘
+
+        The decomposition is computed up front without the model, so
+        reasoning, RAG/tools and planning run concurrently. Planning is
+        speculative: it works from the decomposition instead of waiting for
+        the reasoning text. Reflection is skipped for short, simple inputs,
+        and optional stages give way when the latency budget runs out.
+
         Args:
             input_text: User input
             context: Additional context
@@ -109,9 +258,17 @@ Coordinate these agents effectively to produce the best possible response."""
 
         # Enhanced context with RAG retrieval
         enhanced_context = context or {}
+        base_context = dict(enhanced_context)
+
+        # Deterministic decomposition: tells us which stages are needed
+        input_type, decomposition = self.reasoning_agent.decompose(input_text, base_context)
+        needs_tools = decomposition.get("requires_tools", False)
+        simple_input = self._is_simple_input(input_text, input_type)
+
+        async def rag_stage(results: dict[str, Any]) -> str | None:
+            if not self.rag_retriever or "knowledge" in enhanced_context:
+                raise StageSkipped("not needed")
 
-        # Step 0: RAG Retrieval (if available and not already in context)
-        if self.rag_retriever and "knowledge" not in enhanced_context:
             thought = self._add_thought("Retrieving relevant knowledge from database")
             await self._emit_thought(thought)
 
@@ -120,131 +277,160 @@ Coordinate these agents effectively to produce the best possible response."""
                     query=input_text,
                     top_k=5,
                 )
-                if retrieved_context:
-                    enhanced_context["knowledge"] = retrieved_context
-                    thought = self._add_thought(f"Retrieved {len(retrieved_context.split('---'))} relevant documents")
-                    await self._emit_thought(thought)
-                else:
-                    thought = self._add_thought("No relevant documents found in knowledge base")
-                    await self._emit_thought(thought)
             except Exception as e:
                 logger.error(f"RAG retrieval error: {e}")
                 thought = self._add_thought(f"RAG retrieval failed: {str(e)}")
                 await self._emit_thought(thought)
+                raise StageSkipped("retrieval failed")
 
-        # Step 1: Reasoning - Analyze the task with RAG context
-        thought = self._add_thought("Engaging reasoning agent for structured analysis")
-        await self._emit_thought(thought)
+            if retrieved_context:
+                enhanced_context["knowledge"] = retrieved_context
+                thought = self._add_thought(f"Retrieved {len(retrieved_context.split('---'))} relevant documents")
+            else:
+                thought = self._add_thought("No relevant documents found in knowledge base")
+            await self._emit_thought(thought)
+            return retrieved_context
 
-        reasoning_response = await self.reasoning_agent.process(input_text, enhanced_context)
-        logger.info("Reasoning analysis complete")
+        async def reasoning_stage(results: dict[str, Any]) -> AgentResponse:
+            thought = self._add_thought("Engaging reasoning agent for structured analysis")
+            await self._emit_thought(thought)
 
-        # Emit reasoning thoughts
-        for rt in reasoning_response.thoughts:
-            await self._emit_thought(rt)
+            response = await self.reasoning_agent.process(
+                input_text,
+                {**base_context, "decomposition": decomposition},
+            )
+            logger.info("Reasoning analysis complete")
 
-        thought = self._add_thought(
-            f"Reasoning complete: classified as {reasoning_response.metadata.get('input_type', 'unknown')}"
-        )
-        await self._emit_thought(thought)
+            # Emit reasoning thoughts
+            for rt in response.thoughts:
+                await self._emit_thought(rt)
 
-        # Step 2: Check if tools are needed
-        tool_response = None
-        decomposition = reasoning_response.metadata.get("decomposition", {})
-        needs_tools = decomposition.get("requires_tools", False)
+            thought = self._add_thought(f"Reasoning complete: classified as {input_type}")
+            await self._emit_thought(thought)
+            return response
+
+        async def tools_stage(results: dict[str, Any]) -> AgentResponse:
+            if not (self.enable_tools and self.tool_user_agent and needs_tools):
+                raise StageSkipped("not needed")
 
-        if self.enable_tools and self.tool_user_agent and needs_tools:
             thought = self._add_thought("Task requires tools - engaging tool user agent")
             await self._emit_thought(thought)
 
-            tool_response = await self.tool_user_agent.process(input_text, enhanced_context)
+            response = await self.tool_user_agent.process(input_text, enhanced_context)
 
             # Emit tool thoughts
-            for tt in tool_response.thoughts:
+            for tt in response.thoughts:
                 await self._emit_thought(tt)
 
-            if tool_response.actions:
-                thought = self._add_thought(f"Executed {len(tool_response.actions)} tool(s)")
+            if response.actions:
+                thought = self._add_thought(f"Executed {len(response.actions)} tool(s)")
                 await self._emit_thought(thought)
+            return response
 
-                # Add tool results to context
-                enhanced_context["tool_results"] = {
-                    "count": len(tool_response.actions),
-                    "tools_used": tool_response.metadata.get("tools_used", []),
-                    "summary": tool_response.content,
-                }
-
-        # Step 3: Planning - Create action plan
-        thought = self._add_thought("Engaging planning agent for action plan")
-        await self._emit_thought(thought)
+        async def planning_stage(results: dict[str, Any]) -> AgentResponse:
+            # Speculative: plan from the decomposition while reasoning runs
+            thought = self._add_thought("Engaging planning agent for action plan")
+            await self._emit_thought(thought)
 
-        planning_context = {
-            "reasoning": reasoning_response.content,
-            "decomposition": decomposition,
-            **enhanced_context,
-        }
+            response = await self.planning_agent.process(
+                input_text,
+                {"decomposition": decomposition, **base_context},
+            )
+            logger.info("Action plan created")
 
-        planning_response = await self.planning_agent.process(input_text, planning_context)
-        logger.info("Action plan created")
+            # Emit planning thoughts
+            for pt in response.thoughts:
+                await self._emit_thought(pt)
+            return response
 
-        # Emit planning thoughts
-        for pt in planning_response.thoughts:
-            await self._emit_thought(pt)
+        async def synthesis_stage(results: dict[str, Any]) -> str:
+            thought = self._add_thought("Synthesizing final response from all agent outputs")
+            await self._emit_thought(thought)
 
-        # Step 4: Generate initial response synthesizing all information
-        thought = self._add_thought("Synthesizing final response from all agent outputs")
-        await self._emit_thought(thought)
+            tool_response = results.get("tools")
+            planning_response = results.get("planning")
+            return await self._generate_response(
+                input_text,
+                results["reasoning"].content,
+                planning_response.content if planning_response else "",
+                tool_results=tool_response.content if tool_response else None,
+                knowledge=enhanced_context.get("knowledge"),
+            )
 
-        initial_response = await self._generate_response(
-            input_text,
-            reasoning_response.content,
-            planning_response.content,
-            tool_results=tool_response.content if tool_response else None,
-            knowledge=enhanced_context.get("knowledge"),
-        )
+        async def reflection_stage(results: dict[str, Any]) -> AgentResponse:
+            if not (self.enable_reflection and self.reflection_agent):
+                raise StageSkipped("disabled")
+            if simple_input:
+                raise StageSkipped("simple input")
 
-        # Step 5: Reflection (if enabled)
-        final_response = initial_response
-        if self.enable_reflection and self.reflection_agent:
             thought = self._add_thought("Engaging reflection agent for quality improvement")
             await self._emit_thought(thought)
 
+            tool_response = results.get("tools")
+            planning_response = results.get("planning")
             reflection_context = {
                 "original_task": input_text,
-                "reasoning": reasoning_response.content,
-                "plan": planning_response.content,
+                "reasoning": results["reasoning"].content,
+                "plan": planning_response.content if planning_response else None,
                 "tool_results": tool_response.content if tool_response else None,
             }
-            reflection_response = await self.reflection_agent.process(
-                initial_response,
+            response = await self.reflection_agent.process(
+                results["synthesis"],
                 reflection_context,
             )
             logger.info("Reflection complete")
 
             # Emit reflection thoughts
-            for reft in reflection_response.thoughts:
+            for reft in response.thoughts:
                 await self._emit_thought(reft)
+            return response
 
+        async def improvement_stage(results: dict[str, Any]) -> str:
             # Check if improvements are suggested
-            if "improve" in reflection_response.content.lower():
-                thought = self._add_thought("Applying improvements from reflection")
-                await self._emit_thought(thought)
+            reflection_response = results.get("reflection")
+            if not reflection_response or "improve" not in reflection_response.content.lower():
+                raise StageSkipped("no improvements suggested")
 
-                final_response = await self._apply_improvements(
-                    initial_response,
-                    reflection_response.content,
-                )
+            thought = self._add_thought("Applying improvements from reflection")
+            await self._emit_thought(thought)
+
+            return await self._apply_improvements(
+                results["synthesis"],
+                reflection_response.content,
+            )
+
+        schedule = await self.scheduler.run([
+            Stage("rag", rag_stage, optional=True),
+            Stage("reasoning", reasoning_stage),
+            Stage("tools", tools_stage, deps=("rag",)),
+            Stage("planning", planning_stage, optional=True),
+            Stage("synthesis", synthesis_stage, deps=("rag", "reasoning", "tools", "planning")),
+            Stage("reflection", reflection_stage, deps=("synthesis",), optional=True),
+            Stage("improvement", improvement_stage, deps=("reflection",), optional=True),
+        ])
+        results = schedule.results
+        reasoning_response = results["reasoning"]
+        tool_response = results.get("tools")
+        planning_response = results.get("planning")
+        reflection_response = results.get("reflection")
+        final_response = results.get("improvement") or results["synthesis"]
+
+        if schedule.skipped:
+            logger.debug(f"Skipped stages: {schedule.skipped}")
 
         thought = self._add_thought("Multi-agent processing complete")
         await self._emit_thought(thought)
 
         # Collect all thoughts from sub-agents
-        all_thoughts = self.get_thoughts() + reasoning_response.thoughts + planning_response.thoughts
+        all_thoughts = self.get_thoughts() + reasoning_response.thoughts
+
+        if planning_response:
+            all_thoughts += planning_response.thoughts
 
         if tool_response:
             all_thoughts += tool_response.thoughts
 
-        if self.enable_reflection and self.reflection_agent:
+        if reflection_response:
             all_thoughts += reflection_response.thoughts
 
         # Collect all actions
@@ -254,12 +440,14 @@ Coordinate these agents effectively to produce the best possible response."""
 
         # Learning: Record the strategy used
         problem_type = reasoning_response.metadata.get("input_type", "unknown")
-        approach_summary = f"Multi-agent: reasoning + planning"
+        approach_summary = f"Multi-agent: reasoning"
+        if planning_response:
+            approach_summary += " + planning"
         if tool_response:
             approach_summary += f" + tools({', '.join(tool_response.metadata.get('tools_used', []))})"
         if "knowledge" in enhanced_context:
             approach_summary += " + RAG"
-        if self.enable_reflection:
+        if reflection_response:
             approach_summary += " + reflection"
 
         # Record as successful (we'll update based on feedback later)
@@ -271,7 +459,7 @@ Coordinate these agents effectively to produce the best possible response."""
             metadata={
                 "tools_used": tool_response.metadata.get("tools_used", []) if tool_response else [],
                 "rag_used": "knowledge" in enhanced_context,
-                "reflection_used": self.enable_reflection,
+                "reflection_used": reflection_response is not None,
                 "timestamp": thought.timestamp.isoformat(),
             }
         )
@@ -289,16 +477,35 @@ Coordinate these agents effectively to produce the best possible response."""
             metadata={
                 "reasoning": reasoning_response.content,
                 "reasoning_metadata": reasoning_response.metadata,
-                "plan": planning_response.content,
+                "plan": planning_response.content if planning_response else "",
                 "tools_used": tool_response.metadata.get("tools_used", []) if tool_response else [],
                 "rag_used": "knowledge" in enhanced_context,
                 "iterations": self._iteration_count,
                 "problem_type": problem_type,
                 "approach": approach_summary,
                 "learning_suggestions": suggestions,
+                "schedule": schedule.to_dict(),
             },
         )
 
+    @staticmethod
+    def _is_simple_input(input_text: str, input_type: str) -> bool:
+        """Whether input is a short, single-line question not worth a reflection pass.
+
+        Args:
+            input_text: User input
+            input_type: Type from the reasoning agent's classifier
+
+        Returns:
+            True for simple inputs
+        """
+        return (
+            input_type == "question"
+            and len(input_text.split()) <= SIMPLE_INPUT_MAX_WORDS
+            and "\n" not in input_text.strip()
+            and "```" not in input_text
+        )
+
     async def _generate_response(
         self,
         task: str,
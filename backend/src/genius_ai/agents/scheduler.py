@@ -0,0 +1,185 @@
+"""DAG scheduler for running orchestrator stages concurrently."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from genius_ai.core.logger import logger
+from genius_ai.core.metrics import metrics
+
+
+class StageSkipped(Exception):
+    """Raised by a stage to mark itself as not needed for this request."""
+
+
+@dataclass
+class Stage:
+    """One node of the stage graph."""
+
+    name: str
+    run: Callable[[dict[str, Any]], Awaitable[Any]]  # Receives the results so far
+    deps: tuple[str, ...] = ()
+    optional: bool = False  # May be skipped, cancelled or fail without failing the request
+
+
+@dataclass
+class ScheduleResult:
+    """Outcome of one scheduled run."""
+
+    results: dict[str, Any]
+    completed: list[str] = field(default_factory=list)
+    skipped: dict[str, str] = field(default_factory=dict)  # stage -> reason
+    elapsed_s: float = 0.0
+    budget_s: float | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Summary for response metadata."""
+        return {
+            "completed": self.completed,
+            "skipped": self.skipped,
+            "elapsed_ms": round(self.elapsed_s * 1000, 1),
+            "budget_ms": round(self.budget_s * 1000) if self.budget_s else None,
+        }
+
+
+class StageScheduler:
+    """Runs a graph of async stages, each as soon as its dependencies finish.
+
+    Independent stages run concurrently. With a latency budget, optional
+    stages are not started when their typical duration (an EWMA of past
+    runs) no longer fits, and optional stages still running at the deadline
+    are cancelled; required stages always run to completion.
+    """
+
+    def __init__(self, latency_budget: float | None = None, ewma_alpha: float = 0.3):
+        """Initialize scheduler.
+
+        Args:
+            latency_budget: Seconds per run; None disables budgeting
+            ewma_alpha: Weight of the newest sample in duration estimates
+        """
+        self.latency_budget = latency_budget
+        self.ewma_alpha = ewma_alpha
+        self._estimates: dict[str, float] = {}
+
+    def estimate(self, name: str) -> float | None:
+        """Typical duration of a stage in seconds, if it has run before."""
+        return self._estimates.get(name)
+
+    async def run(self, stages: list[Stage]) -> ScheduleResult:
+        """Run all stages respecting dependencies and the latency budget.
+
+        Args:
+            stages: Stage graph; dependencies must name stages in the list
+
+        Returns:
+            Results of completed stages plus what was skipped and why
+
+        Raises:
+            ValueError: If the graph has unknown dependencies or a cycle
+            Exception: Whatever a required stage raised
+        """
+        names = {stage.name for stage in stages}
+        for stage in stages:
+            unknown = set(stage.deps) - names
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages {sorted(unknown)}")
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + self.latency_budget if self.latency_budget else None
+
+        result = ScheduleResult(results={}, budget_s=self.latency_budget)
+        pending = {stage.name: stage for stage in stages}
+        running: dict[asyncio.Task, Stage] = {}
+
+        def finished(name: str) -> bool:
+            return name in result.results or name in result.skipped
+
+        try:
+            while pending or running:
+                self._launch_ready(pending, running, result, finished, deadline, loop)
+
+                if not running:
+                    if pending:
+                        raise ValueError(f"Stage graph has a cycle: {sorted(pending)}")
+                    break
+
+                timeout = None
+                if deadline is not None and any(stage.optional for stage in running.values()):
+                    timeout = max(0.0, deadline - loop.time())
+
+                done, _ = await asyncio.wait(
+                    running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # Deadline reached: drop optional work, keep required stages
+                    for task, stage in list(running.items()):
+                        if stage.optional:
+                            task.cancel()
+                            del running[task]
+                            result.skipped[stage.name] = "latency budget"
+                    continue
+
+                for task in done:
+                    stage = running.pop(task)
+                    try:
+                        result.results[stage.name] = task.result()
+                        result.completed.append(stage.name)
+                    except StageSkipped as e:
+                        result.skipped[stage.name] = str(e) or "skipped"
+                    except Exception as e:
+                        if not stage.optional:
+                            raise
+                        logger.error(f"Optional stage {stage.name} failed: {e}")
+                        result.skipped[stage.name] = f"error: {e}"
+        finally:
+            for task in running:
+                task.cancel()
+
+        result.elapsed_s = loop.time() - start
+        return result
+
+    def _launch_ready(
+        self,
+        pending: dict[str, Stage],
+        running: dict[asyncio.Task, Stage],
+        result: ScheduleResult,
+        finished: Callable[[str], bool],
+        deadline: float | None,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        """Start (or skip) every stage whose dependencies have all finished."""
+        changed = True
+        while changed:
+            changed = False
+            for name, stage in list(pending.items()):
+                if not all(finished(dep) for dep in stage.deps):
+                    continue
+                del pending[name]
+                changed = True
+
+                if stage.optional and deadline is not None:
+                    remaining = deadline - loop.time()
+                    estimate = self._estimates.get(name)
+                    if remaining <= 0 or (estimate is not None and estimate > remaining):
+                        result.skipped[name] = "latency budget"
+                        continue
+
+                running[asyncio.create_task(self._run_stage(stage, result.results))] = stage
+
+    async def _run_stage(self, stage: Stage, results: dict[str, Any]) -> Any:
+        """Run one stage, timing it into metrics and the duration estimate."""
+        start = time.perf_counter()
+        with metrics.stage(stage.name):
+            value = await stage.run(results)
+        elapsed = time.perf_counter() - start
+
+        previous = self._estimates.get(stage.name)
+        self._estimates[stage.name] = (
+            elapsed if previous is None
+            else self.ewma_alpha * elapsed + (1 - self.ewma_alpha) * previous
+        )
+        return value
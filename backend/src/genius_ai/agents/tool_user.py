@@ -10,9 +10,8 @@ from genius_ai.agents.base import (
     AgentRole,
     AgentAction,
 )
-from genius_ai.core.logger import logger
 from genius_ai.models.base import BaseModel
-from genius_ai.tools.base import tool_registry, ToolResult
+from genius_ai.tools.base import tool_registry, ToolCall, ToolResult
 
 
 class ToolUserAgent(BaseAgent):
@@ -168,39 +167,30 @@ Always think step-by-step about which tools to use and why."""
 
         return {}
 
-    async def _execute_tool_with_params(
-        self,
-        tool_name: str,
-        parameters: dict[str, Any],
-    ) -> ToolResult:
-        """Execute a tool with given parameters.
+    async def _execute_tools(self, calls: list[ToolCall]) -> list[ToolResult]:
+        """Execute independent tool calls as one concurrent batch.
 
         Args:
-            tool_name: Name of the tool
-            parameters: Tool parameters
+            calls: Tool calls
 
         Returns:
-            Tool execution result
+            Results in call order
         """
-        self._add_thought(f"Executing {tool_name} with parameters: {parameters}")
+        if not calls:
+            return []
+
+        for call in calls:
+            self._add_thought(f"Executing {call.name} with parameters: {call.arguments}")
 
-        try:
-            result = await self.tool_registry.execute_tool(tool_name, **parameters)
+        results = await self.tool_registry.execute_batch(calls)
 
+        for call, result in zip(calls, results):
             if result.success:
-                self._add_thought(f"Tool {tool_name} executed successfully")
+                self._add_thought(f"Tool {call.name} executed successfully")
             else:
-                self._add_thought(f"Tool {tool_name} failed: {result.error}")
+                self._add_thought(f"Tool {call.name} failed: {result.error}")
 
-            return result
-
-        except Exception as e:
-            logger.error(f"Tool execution error: {e}")
-            return ToolResult(
-                success=False,
-                result=None,
-                error=str(e),
-            )
+        return results
 
     async def process(
         self,
@@ -227,6 +217,7 @@ Always think step-by-step about which tools to use and why."""
 
         # Step 2: Execute tools if needed
         if tool_analysis["needs_tools"]:
+            calls = []
             for tool_info in tool_analysis["tools"]:
                 tool_name = tool_info["tool"]
 
@@ -243,18 +234,21 @@ Always think step-by-step about which tools to use and why."""
                     self._add_thought(f"Could not extract parameters for {tool_name}, skipping")
                     continue
 
-                # Execute tool
-                result = await self._execute_tool_with_params(tool_name, parameters)
+                calls.append(ToolCall(name=tool_name, arguments=parameters))
+
+            # Execute the (independent) tools concurrently
+            results = await self._execute_tools(calls)
 
+            for call, result in zip(calls, results):
                 # Record action
                 action = AgentAction(
-                    action_type=f"tool_{tool_name}",
-                    parameters=parameters,
+                    action_type=f"tool_{call.name}",
+                    parameters=call.arguments,
                     result=result.result if result.success else result.error,
                 )
                 actions.append(action)
                 tool_results.append({
-                    "tool": tool_name,
+                    "tool": call.name,
                     "success": result.success,
                     "result": result.result,
                     "error": result.error,
@@ -0,0 +1,155 @@
+"""Tiered request classification in front of the orchestrator."""
+
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+
+class RequestTier(str, Enum):
+    """How much machinery a request gets."""
+
+    SOCIAL = "social"  # Canned reply, no model call
+    SIMPLE = "simple"  # One model call
+    FULL = "full"  # Full multi-agent pipeline
+
+
+# Typical model calls per tier (full: reasoning, planning, synthesis, reflection)
+LLM_CALLS = {
+    RequestTier.SOCIAL: 0,
+    RequestTier.SIMPLE: 1,
+    RequestTier.FULL: 4,
+}
+
+
+def _build_social_replies() -> dict[str, str]:
+    """Canned replies keyed by normalized message (greetings, thanks, goodbyes)."""
+    replies: dict[str, str] = {}
+
+    greeting = "Hello! How can I help you today?"
+    for phrase in [
+        "hi", "hello", "hey", "hi there", "hello there", "hey there", "yo",
+        "good morning", "good afternoon", "good evening",
+    ]:
+        replies[phrase] = greeting
+
+    for phrase in [
+        "how are you", "how r u", "how are u", "hows it going", "how is it going",
+        "whats up", "sup", "how you doing", "how are you doing",
+    ]:
+        replies[phrase] = "I'm doing well, thanks for asking! What can I help you with?"
+
+    for phrase in [
+        "thanks", "thank you", "thx", "ty", "thank u", "thanks a lot", "thank you so much",
+        "many thanks", "cheers",
+    ]:
+        replies[phrase] = "You're welcome! Is there anything else I can help with?"
+
+    for phrase in ["bye", "goodbye", "see you", "see ya", "good night"]:
+        replies[phrase] = "Goodbye! Come back anytime you need help."
+
+    # Acknowledgements ("ok", "yes", "no", "sure", "got it") are deliberately
+    # absent: they usually answer the assistant's last question and need the
+    # conversation context, so they go to the model
+    return replies
+
+
+SOCIAL_REPLIES = _build_social_replies()
+
+# Words that open a direct question
+QUESTION_WORDS = (
+    "what", "who", "when", "where", "which", "how", "why", "is", "are", "does", "do", "can",
+    "define",
+)
+
+# Anything asking for work, depth or multi-step output goes to the full pipeline
+COMPLEX_MARKERS = re.compile(
+    r"\b(step[- ]by[- ]step|in detail|detailed|compare|comparison|versus|vs\.?|design|implement|"
+    r"write|build|create|develop|debug|fix|refactor|optimi[sz]e|prove|derive|analy[sz]e|plan|"
+    r"strategy|essay|code|function|algorithm|script|pros and cons|trade-?offs?)\b"
+)
+
+# Inputs that the tool agent would act on
+TOOL_MARKERS = re.compile(r"\d+\s*[-+*/^]\s*\d+|https?://|```|\b(calculate|compute|solve)\b")
+
+
+@dataclass
+class TriageDecision:
+    """Classification result for one message."""
+
+    tier: RequestTier
+    reason: str
+    reply: str | None = None  # Canned reply for the social tier
+
+    @property
+    def llm_calls(self) -> int:
+        return LLM_CALLS[self.tier]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Summary for response metadata."""
+        return {
+            "tier": self.tier.value,
+            "reason": self.reason,
+            "llm_calls": self.llm_calls,
+            "llm_calls_saved": LLM_CALLS[RequestTier.FULL] - self.llm_calls,
+        }
+
+
+class RequestClassifier:
+    """Rule-based triage: social messages, simple questions, everything else.
+
+    Runs in microseconds and errs towards the full pipeline: a message is
+    only downgraded when it clearly is small talk or a short, single-line
+    factual question with nothing that needs tools or multi-step work.
+    """
+
+    def __init__(self, simple_max_words: int = 15):
+        """Initialize classifier.
+
+        Args:
+            simple_max_words: Longest question (in words) for the single-call tier
+        """
+        self.simple_max_words = simple_max_words
+
+    @staticmethod
+    def normalize(message: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace."""
+        text = message.lower().replace("'", "").replace("’", "")
+        text = re.sub(r"[^\w\s]", " ", text)
+        return " ".join(text.split())
+
+    def classify(self, message: str) -> TriageDecision:
+        """Pick the tier for a message.
+
+        Args:
+            message: User message
+
+        Returns:
+            Triage decision
+        """
+        normalized = self.normalize(message)
+
+        reply = SOCIAL_REPLIES.get(normalized)
+        if reply is not None:
+            return TriageDecision(RequestTier.SOCIAL, "social message", reply)
+
+        stripped = message.strip()
+        words = normalized.split()
+        if not words:
+            return TriageDecision(RequestTier.FULL, "no text")
+        if "\n" in stripped:
+            return TriageDecision(RequestTier.FULL, "multi-line input")
+        if len(words) > self.simple_max_words:
+            return TriageDecision(RequestTier.FULL, "long input")
+        if TOOL_MARKERS.search(message.lower()):
+            return TriageDecision(RequestTier.FULL, "needs tools")
+        if COMPLEX_MARKERS.search(normalized):
+            return TriageDecision(RequestTier.FULL, "complex request")
+        if words[0] in QUESTION_WORDS or stripped.endswith("?"):
+            return TriageDecision(RequestTier.SIMPLE, "short factual question")
+
+        return TriageDecision(RequestTier.FULL, "not a simple question")
+
+
+# Global classifier instance
+request_classifier = RequestClassifier()
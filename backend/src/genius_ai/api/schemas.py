@@ -21,6 +21,7 @@ class ChatRequest(BaseModel):
     use_rag: bool = Field(True, description="Use RAG for knowledge retrieval")
     temperature: float = Field(0.7, ge=0.0, le=2.0, description="Generation temperature")
     max_tokens: int = Field(2048, ge=1, le=4096, description="Maximum tokens to generate")
+    include_timing: bool = Field(False, description="Return a per-stage timing breakdown")
 
 
 class ChatResponse(BaseModel):
@@ -31,6 +32,10 @@ class ChatResponse(BaseModel):
     model: str = Field(..., description="Model used")
     tokens_used: int = Field(..., description="Total tokens used")
     metadata: dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
+    timing: dict[str, Any] | None = Field(
+        None,
+        description="Per-stage latency (ms) and token breakdown, when requested",
+    )
     timestamp: datetime = Field(default_factory=datetime.now)
 
 
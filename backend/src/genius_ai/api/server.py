@@ -12,6 +12,7 @@ import uvicorn
 
 from genius_ai import __version__
 from genius_ai.agents.orchestrator import OrchestratorAgent
+from genius_ai.agents.triage import RequestTier, request_classifier
 from genius_ai.api.schemas import (
     ChatRequest,
     ChatResponse,
@@ -25,6 +26,7 @@ from genius_ai.api.schemas import (
 )
 from genius_ai.core.config import settings
 from genius_ai.core.logger import logger
+from genius_ai.core.metrics import metrics, start_metrics_server
 from genius_ai.memory.conversation import ConversationMemory, MessageRole
 from genius_ai.memory.learning import learning_system
 from genius_ai.models.base import ModelFactory, ModelType, GenerationConfig
@@ -37,6 +39,7 @@ app_state = {
     "orchestrator": None,
     "rag_retriever": None,
     "conversations": {},  # conversation_id -> ConversationMemory
+    "metrics_server": None,
 }
 
 
@@ -46,12 +49,15 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Genius AI server...")
 
+    if settings.enable_telemetry:
+        app_state["metrics_server"] = start_metrics_server(settings.metrics_port)
+
     try:
-        # Initialize model - Use our custom trained model!
+        # Initialize model - Use our custom trained model (int8, batched, warm registry)
         logger.info("Loading custom trained model...")
-        from genius_ai.models.custom_trained import CustomTrainedModel
+        from genius_ai.inference.model import LocalTrainedModel
 
-        model = CustomTrainedModel(
+        model = LocalTrainedModel(
             model_path="../genius_model_enhanced",
             device=settings.device,
         )
@@ -88,6 +94,8 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down Genius AI server...")
     if app_state["model"]:
         await app_state["model"].cleanup()
+    if app_state["metrics_server"]:
+        app_state["metrics_server"].shutdown()
     logger.info("Server shutdown complete")
 
 
@@ -129,9 +137,24 @@ async def health_check():
     )
 
 
+@app.get("/metrics/summary")
+async def metrics_summary():
+    """Stage latency percentiles, cache hit rates and in-flight requests."""
+    return metrics.summary()
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest) -> ChatResponse:
     """Chat endpoint - Uses Groq FREE 70B AI first, then fallback to local model."""
+    with metrics.trace_request("chat") as trace:
+        response = await _chat(request)
+        if request.include_timing:
+            response.timing = trace.breakdown()
+        return response
+
+
+async def _chat(request: ChatRequest) -> ChatResponse:
+    """Handle a chat request (timed by the /chat endpoint)."""
     try:
         # Get or create conversation
         conversation_id = request.conversation_id or str(uuid4())
@@ -143,6 +166,22 @@ async def chat(request: ChatRequest) -> ChatResponse:
         # Add user message
         conversation.add_user_message(request.message)
 
+        # Zero-LLM fast path for greetings and acknowledgements
+        decision = request_classifier.classify(request.message)
+        if decision.tier == RequestTier.SOCIAL:
+            metrics.triage_requests.inc(tier=decision.tier.value)
+            conversation.add_assistant_message(decision.reply)
+            return ChatResponse(
+                response=decision.reply,
+                conversation_id=conversation_id,
+                model="fast-path",
+                tokens_used=0,
+                metadata={
+                    "source": "fast_path",
+                    "routing": decision.to_dict(),
+                },
+            )
+
         # TRY GROQ FIRST (FREE 70B AI!)
         try:
             from genius_ai.api.groq_chat import chat_with_groq
@@ -158,18 +197,22 @@ async def chat(request: ChatRequest) -> ChatResponse:
             )
 
             # Use Groq's FREE 70B AI!
-            response_text = await chat_with_groq(
-                message=request.message,
-                system_prompt=system_prompt,
-                temperature=request.temperature,
-                max_tokens=request.max_tokens,
-            )
+            with metrics.stage("groq"):
+                response_text = await chat_with_groq(
+                    message=request.message,
+                    system_prompt=system_prompt,
+                    temperature=request.temperature,
+                    max_tokens=request.max_tokens,
+                )
 
             # Add response to conversation
             conversation.add_assistant_message(response_text)
 
             # Rough token count
-            tokens_used = len(request.message.split()) + len(response_text.split())
+            prompt_tokens = len(request.message.split())
+            completion_tokens = len(response_text.split())
+            tokens_used = prompt_tokens + completion_tokens
+            metrics.record_tokens("groq", prompt_tokens, completion_tokens)
 
             return ChatResponse(
                 response=response_text,
@@ -180,6 +223,11 @@ async def chat(request: ChatRequest) -> ChatResponse:
                     "source": "groq",
                     "intelligence": "8.5/10",
                     "cost": "$0 (FREE!)",
+                    "routing": {
+                        "tier": decision.tier.value,
+                        "reason": decision.reason,
+                        "llm_calls": 1,
+                    },
                 },
             )
 
@@ -192,9 +240,10 @@ async def chat(request: ChatRequest) -> ChatResponse:
 
             # Use RAG if enabled
             if request.use_rag and app_state["rag_retriever"]:
-                retrieved_context = await app_state["rag_retriever"].retrieve_context(
-                    request.message
-                )
+                with metrics.stage("rag"):
+                    retrieved_context = await app_state["rag_retriever"].retrieve_context(
+                        request.message
+                    )
                 if retrieved_context:
                     context["knowledge"] = retrieved_context
 
@@ -243,40 +292,42 @@ async def chat_stream(request: ChatRequest) -> StreamingResponse:
     """Streaming chat endpoint."""
 
     async def generate_stream() -> AsyncIterator[str]:
-        try:
-            # Get or create conversation
-            conversation_id = request.conversation_id or str(uuid4())
-            if conversation_id not in app_state["conversations"]:
-                app_state["conversations"][conversation_id] = ConversationMemory()
-
-            conversation = app_state["conversations"][conversation_id]
-            conversation.add_user_message(request.message)
-
-            # Build prompt with context
-            history = conversation.get_formatted_history(limit=10)
-            prompt = f"{history}\n\nUser: {request.message}\nAssistant:"
+        with metrics.track_stream("chat_stream"):
+            try:
+                # Get or create conversation
+                conversation_id = request.conversation_id or str(uuid4())
+                if conversation_id not in app_state["conversations"]:
+                    app_state["conversations"][conversation_id] = ConversationMemory()
+
+                conversation = app_state["conversations"][conversation_id]
+                conversation.add_user_message(request.message)
+
+                # Build prompt with context
+                history = conversation.get_formatted_history(limit=10)
+                prompt = f"{history}\n\nUser: {request.message}\nAssistant:"
+
+                # Stream response
+                model = app_state["model"]
+                config = GenerationConfig(
+                    temperature=request.temperature,
+                    max_tokens=request.max_tokens,
+                    stream=True,
+                )
 
-            # Stream response
-            model = app_state["model"]
-            config = GenerationConfig(
-                temperature=request.temperature,
-                max_tokens=request.max_tokens,
-                stream=True,
-            )
+                full_response = ""
+                async for chunk in model.generate_stream(prompt, config, session_id=conversation_id):
+                    full_response += chunk
+                    yield f"data: {chunk}\n\n"
 
-            full_response = ""
-            async for chunk in model.generate_stream(prompt, config):
-                full_response += chunk
-                yield f"data: {chunk}\n\n"
+                # Add response to conversation
+                conversation.add_assistant_message(full_response)
 
-            # Add response to conversation
-            conversation.add_assistant_message(full_response)
+                yield "data: [DONE]\n\n"
 
-            yield "data: [DONE]\n\n"
-
-        except Exception as e:
-            logger.error(f"Streaming error: {e}")
-            yield f"data: [ERROR] {str(e)}\n\n"
+            except Exception as e:
+                logger.error(f"Streaming error: {e}")
+                metrics.request_errors.inc(endpoint="chat_stream")
+                yield f"data: [ERROR] {str(e)}\n\n"
 
     return StreamingResponse(
         generate_stream(),
@@ -67,11 +67,25 @@ class Settings(BaseSettings):
     chunk_size: int = 512
     chunk_overlap: int = 50
     top_k_results: int = 5
+    retrieval_mode: Literal["hybrid", "dense", "sparse"] = "hybrid"
+    retrieval_candidates: int = 30  # Per retriever, before fusion
+    rrf_k: int = 60
+    rerank_model: str | None = None  # e.g. "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    rerank_top_n: int = 20
 
     # Agent Settings
     max_agent_iterations: int = 10
     agent_temperature: float = 0.7
     agent_max_tokens: int = 2048
+    agent_latency_budget: float = 60.0  # Seconds; optional stages are skipped past this
+
+    # Tool Settings
+    tool_sandbox_workers: int = 2
+    tool_sandbox_memory_mb: int = 256  # Per execution, on top of the worker's baseline
+    tool_sandbox_max_timeout: float = 30.0
+    tool_default_timeout: float = 30.0  # Per call, unless the tool sets its own
+    tool_batch_concurrency: int = 8
+    tool_cache_size: int = 1024  # Memoized results of deterministic tools
 
     # External APIs
     openai_api_key: str | None = None
@@ -0,0 +1,442 @@
+"""Prometheus-style metrics and per-request stage tracing."""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+
+from genius_ai.core.logger import logger
+
+# Seconds; spans a cached lookup up to a slow multi-agent LLM request
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base for labelled metrics; values are keyed by label values."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        """(name, formatted labels, value) triples for exposition."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    @contextmanager
+    def track_inprogress(self, **labels: Any) -> Iterator[None]:
+        """Increment for the duration of the block."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+@dataclass
+class _HistogramSeries:
+    buckets: list[int]
+    total: float = 0.0
+    count: int = 0
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations (e.g. latencies in seconds)."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(buckets=[0] * (len(self.bounds) + 1))
+            series.buckets[index] += 1
+            series.total += value
+            series.count += 1
+
+    def quantile(self, q: float, **labels: Any) -> float | None:
+        """Estimate a quantile by linear interpolation within buckets.
+
+        Args:
+            q: Quantile in [0, 1] (e.g. 0.99)
+
+        Returns:
+            Estimated value, or None without observations
+        """
+        series = self._series.get(self._key(labels))
+        if series is None or series.count == 0:
+            return None
+
+        rank = q * series.count
+        cumulative = 0
+        for index, bucket_count in enumerate(series.buckets):
+            if bucket_count and cumulative + bucket_count >= rank:
+                if index == len(self.bounds):
+                    return self.bounds[-1]  # Above the highest bound
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.bounds[-1]
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Count, mean and p50/p95/p99 per label set."""
+        result = {}
+        with self._lock:
+            keys = list(self._series)
+        for key in keys:
+            labels = dict(zip(self.labelnames, key))
+            series = self._series[key]
+            result[",".join(key) or self.name] = {
+                "count": series.count,
+                "mean": round(series.total / series.count, 4) if series.count else 0.0,
+                "p50": round(self.quantile(0.5, **labels) or 0.0, 4),
+                "p95": round(self.quantile(0.95, **labels) or 0.0, 4),
+                "p99": round(self.quantile(0.99, **labels) or 0.0, 4),
+            }
+        return result
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        samples = []
+        with self._lock:
+            items = sorted((key, list(s.buckets), s.total, s.count) for key, s in self._series.items())
+        for key, buckets, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.bounds + (float("inf"),), buckets):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                samples.append((f"{self.name}_bucket", labels, cumulative))
+            labels = _format_labels(self.labelnames, key)
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+@dataclass
+class RequestTrace:
+    """Timing and token breakdown of one request."""
+
+    endpoint: str
+    started: float = field(default_factory=time.perf_counter)
+    stages_ms: dict[str, float] = field(default_factory=dict)
+    tokens: dict[str, int] = field(default_factory=dict)
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        self.stages_ms[stage] = self.stages_ms.get(stage, 0.0) + seconds * 1000
+
+    def add_tokens(self, kind: str, count: int) -> None:
+        self.tokens[kind] = self.tokens.get(kind, 0) + count
+
+    def breakdown(self) -> dict[str, Any]:
+        """Timing breakdown for API responses."""
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "stages_ms": {stage: round(ms, 1) for stage, ms in self.stages_ms.items()},
+            "tokens": dict(self.tokens),
+        }
+
+
+_current_trace: ContextVar[RequestTrace | None] = ContextVar("genius_request_trace", default=None)
+
+
+class Metrics:
+    """Process-wide metrics for the API server and orchestrator."""
+
+    def __init__(self):
+        """Initialize metric families."""
+        self.stage_latency = Histogram(
+            "genius_stage_latency_seconds",
+            "Latency of orchestrator pipeline stages",
+            ("stage",),
+        )
+        self.request_latency = Histogram(
+            "genius_request_latency_seconds",
+            "End-to-end request latency",
+            ("endpoint",),
+        )
+        self.requests_in_flight = Gauge(
+            "genius_requests_in_flight",
+            "Requests currently being processed",
+            ("endpoint",),
+        )
+        self.request_errors = Counter(
+            "genius_request_errors_total",
+            "Requests that raised an error",
+            ("endpoint",),
+        )
+        self.llm_tokens = Counter(
+            "genius_llm_tokens_total",
+            "LLM tokens processed",
+            ("source", "kind"),
+        )
+        self.cache_requests = Counter(
+            "genius_cache_requests_total",
+            "Cache lookups by result",
+            ("cache", "result"),
+        )
+        self.triage_requests = Counter(
+            "genius_triage_requests_total",
+            "Requests per triage tier",
+            ("tier",),
+        )
+        self.tool_latency = Histogram(
+            "genius_tool_latency_seconds",
+            "Latency of tool executions (cache hits excluded)",
+            ("tool",),
+        )
+        self.tool_calls = Counter(
+            "genius_tool_calls_total",
+            "Tool calls by outcome",
+            ("tool", "outcome"),
+        )
+        self._metrics: list[_Metric] = [
+            self.stage_latency,
+            self.request_latency,
+            self.requests_in_flight,
+            self.request_errors,
+            self.llm_tokens,
+            self.cache_requests,
+            self.triage_requests,
+            self.tool_latency,
+            self.tool_calls,
+        ]
+
+    @contextmanager
+    def trace_request(self, endpoint: str) -> Iterator[RequestTrace]:
+        """Track an API request: in-flight gauge, latency and a stage trace.
+
+        Args:
+            endpoint: Endpoint label
+
+        Yields:
+            The request's trace (also visible to stage() calls in the same task)
+        """
+        trace = RequestTrace(endpoint=endpoint)
+        token = _current_trace.set(trace)
+        try:
+            with self.requests_in_flight.track_inprogress(endpoint=endpoint):
+                yield trace
+        except Exception:
+            self.request_errors.inc(endpoint=endpoint)
+            raise
+        finally:
+            self.request_latency.observe(time.perf_counter() - trace.started, endpoint=endpoint)
+            _current_trace.reset(token)
+
+    @contextmanager
+    def track_stream(self, endpoint: str) -> Iterator[None]:
+        """Track a streaming response: in-flight gauge and latency until the stream ends.
+
+        Unlike trace_request this sets no per-task trace, because a response
+        generator can be closed outside the task that started it.
+
+        Args:
+            endpoint: Endpoint label
+        """
+        start = time.perf_counter()
+        try:
+            with self.requests_in_flight.track_inprogress(endpoint=endpoint):
+                yield
+        finally:
+            self.request_latency.observe(time.perf_counter() - start, endpoint=endpoint)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a pipeline stage into the histogram and the current trace.
+
+        Only stages that complete are observed: a stage that raises (skipped,
+        failed) or is cancelled at the latency budget would otherwise add
+        near-zero or truncated samples to the distribution.
+
+        Args:
+            name: Stage name (rag, reasoning, tools, planning, ...)
+        """
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        self.stage_latency.observe(elapsed, stage=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_stage(name, elapsed)
+
+    def record_tokens(self, source: str, prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        """Count LLM tokens.
+
+        Args:
+            source: Who made the call (agent role, provider, ...)
+            prompt_tokens: Prompt tokens processed
+            completion_tokens: Tokens generated
+        """
+        trace = _current_trace.get()
+        for kind, count in (("prompt", prompt_tokens), ("completion", completion_tokens)):
+            if count:
+                self.llm_tokens.inc(count, source=source, kind=kind)
+                if trace is not None:
+                    trace.add_tokens(kind, count)
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """Count a cache lookup.
+
+        Args:
+            cache: Cache name
+            hit: Whether the lookup was a hit
+        """
+        self.cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+    def cache_hit_rates(self) -> dict[str, float]:
+        """Hit rate per cache."""
+        caches = {key[0] for key in self.cache_requests._values}
+        rates = {}
+        for cache in sorted(caches):
+            hits = self.cache_requests.get(cache=cache, result="hit")
+            total = hits + self.cache_requests.get(cache=cache, result="miss")
+            rates[cache] = round(hits / total, 3) if total else 0.0
+        return rates
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+    def summary(self) -> dict[str, Any]:
+        """JSON-friendly view: stage/tool percentiles, cache hit rates, in-flight requests."""
+        return {
+            "stages": self.stage_latency.summary(),
+            "requests": self.request_latency.summary(),
+            "tools": self.tool_latency.summary(),
+            "cache_hit_rates": self.cache_hit_rates(),
+            "in_flight": {key[0]: value for key, value in self.requests_in_flight._values.items()},
+        }
+
+
+def current_trace() -> RequestTrace | None:
+    """Trace of the request being handled in this task, if any."""
+    return _current_trace.get()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics from a background thread."""
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # Scrapes are too frequent to log
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer | None:
+    """Serve /metrics on its own port without touching the API event loop.
+
+    Args:
+        port: Port to listen on (settings.metrics_port)
+        host: Interface to bind
+
+    Returns:
+        The running server, or None if the port could not be bound
+    """
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.warning(f"Metrics server not started on port {port}: {e}")
+        return None
+
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    logger.info(f"Metrics available at http://{host}:{port}/metrics")
+    return server
+
+
+# Global metrics instance
+metrics = Metrics()
@@ -0,0 +1 @@
+"""Local CPU inference for fine-tuned checkpoints."""
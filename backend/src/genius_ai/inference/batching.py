@@ -0,0 +1,185 @@
+"""Micro-batching of concurrent generation requests."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator
+
+from genius_ai.core.logger import logger
+from genius_ai.inference.engine import GenerationOutput, LocalInferenceEngine, SamplingParams
+
+
+@dataclass
+class _PendingRequest:
+    """A queued request waiting for a batch."""
+
+    prompt: str
+    params: SamplingParams
+    future: asyncio.Future = field(repr=False)
+
+
+class BatchScheduler:
+    """Collects concurrent requests and runs them as batches on one inference thread.
+
+    Requests arriving within `max_wait_ms` of each other (up to
+    `max_batch_size`) with identical sampling parameters share one batched
+    decode. Session requests (KV-cache reuse) and streams run on the same
+    thread, so the model is only ever driven by a single worker.
+    """
+
+    def __init__(
+        self,
+        engine: LocalInferenceEngine,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+    ):
+        """Initialize scheduler.
+
+        Args:
+            engine: Engine to run batches on
+            max_batch_size: Maximum prompts per batch
+            max_wait_ms: How long to wait for more requests before running a batch
+        """
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self._queue: asyncio.Queue[_PendingRequest] | None = None
+        self._worker: asyncio.Task | None = None
+        self.batches_run = 0
+        self.requests_batched = 0
+
+    async def generate(
+        self,
+        prompt: str,
+        params: SamplingParams | None = None,
+        session_id: str | None = None,
+    ) -> GenerationOutput:
+        """Generate a completion, batching with other concurrent requests.
+
+        Args:
+            prompt: Prompt text
+            params: Sampling parameters
+            session_id: Optional conversation id; session requests skip batching
+
+        Returns:
+            Generation output
+        """
+        params = params or SamplingParams()
+        loop = asyncio.get_running_loop()
+
+        if session_id is not None:
+            return await loop.run_in_executor(
+                self._executor, self.engine.generate, prompt, params, session_id
+            )
+
+        self._ensure_worker()
+        future = loop.create_future()
+        await self._queue.put(_PendingRequest(prompt=prompt, params=params, future=future))
+        return await future
+
+    async def stream(
+        self,
+        prompt: str,
+        params: SamplingParams | None = None,
+        session_id: str | None = None,
+    ) -> AsyncIterator[str]:
+        """Stream a completion from the inference thread.
+
+        Args:
+            prompt: Prompt text
+            params: Sampling parameters
+            session_id: Optional conversation id for KV-cache reuse
+
+        Yields:
+            Text deltas
+        """
+        loop = asyncio.get_running_loop()
+        iterator = self.engine.stream(prompt, params, session_id=session_id)
+        done = object()
+        while True:
+            chunk = await loop.run_in_executor(self._executor, next, iterator, done)
+            if chunk is done:
+                break
+            yield chunk
+
+    async def close(self) -> None:
+        """Stop the batching worker and the inference thread."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Batching statistics.
+
+        Returns:
+            Batch counts and average batch size
+        """
+        return {
+            "batches_run": self.batches_run,
+            "requests_batched": self.requests_batched,
+            "avg_batch_size": (
+                round(self.requests_batched / self.batches_run, 2) if self.batches_run else 0.0
+            ),
+        }
+
+    def _ensure_worker(self) -> None:
+        """Start the batching worker on the running loop."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Drain the queue into batches forever."""
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            batch = [first]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Only requests with identical sampling parameters can share a decode
+            groups: dict[SamplingParams, list[_PendingRequest]] = {}
+            for request in batch:
+                groups.setdefault(request.params, []).append(request)
+
+            for params, requests in groups.items():
+                await self._run_group(loop, params, requests)
+
+    async def _run_group(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        params: SamplingParams,
+        requests: list[_PendingRequest],
+    ) -> None:
+        """Run one batch and resolve its futures."""
+        prompts = [request.prompt for request in requests]
+        try:
+            outputs = await loop.run_in_executor(
+                self._executor, self.engine.generate_batch, prompts, params
+            )
+        except Exception as e:
+            logger.error(f"Batched generation failed: {e}")
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        self.batches_run += 1
+        self.requests_batched += len(requests)
+        for request, output in zip(requests, outputs):
+            if not request.future.done():
+                request.future.set_result(output)
@@ -0,0 +1,474 @@
+"""CPU inference engine for locally fine-tuned checkpoints."""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+import torch
+from torch import nn
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from genius_ai.core.logger import logger
+
+
+@dataclass(frozen=True)
+class SamplingParams:
+    """Decoding parameters for a generation request."""
+
+    max_new_tokens: int = 150
+    temperature: float = 0.7
+    top_p: float = 0.9
+    top_k: int = 50
+    do_sample: bool = True
+
+    @classmethod
+    def from_config(cls, config: Any | None) -> "SamplingParams":
+        """Build params from any config object with temperature/max_tokens attributes.
+
+        Args:
+            config: Generation config (or None for defaults)
+
+        Returns:
+            Sampling parameters
+        """
+        if config is None:
+            return cls()
+        temperature = float(getattr(config, "temperature", cls.temperature))
+        return cls(
+            max_new_tokens=int(getattr(config, "max_tokens", cls.max_new_tokens)),
+            temperature=temperature,
+            top_p=float(getattr(config, "top_p", cls.top_p)),
+            top_k=int(getattr(config, "top_k", cls.top_k)),
+            do_sample=temperature > 0,
+        )
+
+
+@dataclass
+class GenerationOutput:
+    """Result of a single generation."""
+
+    text: str
+    prompt_tokens: int
+    completion_tokens: int
+    reused_tokens: int = 0
+    latency_ms: float = 0.0
+
+    @property
+    def usage(self) -> dict[str, int]:
+        """Token usage in the same shape as model responses."""
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+            "cached_tokens": self.reused_tokens,
+        }
+
+
+@dataclass
+class _Session:
+    """KV cache for one conversation and the token ids it covers."""
+
+    token_ids: list[int] = field(default_factory=list)
+    past_key_values: Any = None
+
+
+def _conv1d_to_linear(module: nn.Module) -> int:
+    """Replace GPT-2 style Conv1D layers with equivalent nn.Linear layers.
+
+    Dynamic quantization only knows nn.Linear; GPT-2 family models use
+    transformers' Conv1D (transposed weights) for attention and MLP.
+
+    Args:
+        module: Root module to convert in place
+
+    Returns:
+        Number of layers converted
+    """
+    try:
+        from transformers.pytorch_utils import Conv1D
+    except ImportError:
+        return 0
+
+    converted = 0
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            in_features, out_features = child.weight.shape
+            linear = nn.Linear(in_features, out_features, bias=child.bias is not None)
+            linear.weight.data = child.weight.data.t().contiguous()
+            if child.bias is not None:
+                linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+            converted += 1
+        else:
+            converted += _conv1d_to_linear(child)
+    return converted
+
+
+class LocalInferenceEngine:
+    """Serves one fine-tuned checkpoint on CPU.
+
+    Features:
+    - int8 dynamic quantization of all Linear layers (except the LM head)
+    - KV-cache reuse across turns of the same session
+    - Batched generation of several prompts in one forward pass per step
+    """
+
+    def __init__(
+        self,
+        model_path: str | Path,
+        quantize: bool = True,
+        max_sessions: int = 32,
+    ):
+        """Initialize engine.
+
+        Args:
+            model_path: Path to a saved Hugging Face checkpoint
+            quantize: Apply int8 dynamic quantization after loading
+            max_sessions: Maximum number of KV caches kept (LRU)
+        """
+        self.model_path = str(model_path)
+        self.quantize = quantize
+        self.max_sessions = max_sessions
+
+        self._model = None
+        self._tokenizer = None
+        self._max_positions = 1024
+        self._sessions: OrderedDict[str, _Session] = OrderedDict()
+        self._sessions_lock = threading.Lock()
+        self.load_seconds = 0.0
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether weights are loaded."""
+        return self._model is not None
+
+    @property
+    def tokenizer(self):
+        """Loaded tokenizer."""
+        if self._tokenizer is None:
+            raise RuntimeError("Engine not loaded")
+        return self._tokenizer
+
+    def load(self) -> "LocalInferenceEngine":
+        """Load tokenizer and weights, then quantize.
+
+        Returns:
+            The engine itself
+        """
+        if self._model is not None:
+            return self
+
+        start = time.perf_counter()
+        logger.info(f"Loading local model from {self.model_path}")
+
+        tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        tokenizer.padding_side = "left"
+
+        model = AutoModelForCausalLM.from_pretrained(self.model_path, torch_dtype=torch.float32)
+        model.eval()
+
+        if self.quantize:
+            converted = _conv1d_to_linear(model)
+            targets = {
+                name
+                for name, module in model.named_modules()
+                if isinstance(module, nn.Linear) and name != "lm_head"
+            }
+            model = torch.ao.quantization.quantize_dynamic(model, targets, dtype=torch.qint8)
+            logger.info(f"Quantized {len(targets)} Linear layers to int8 ({converted} from Conv1D)")
+
+        config = model.config
+        self._max_positions = (
+            getattr(config, "n_positions", None)
+            or getattr(config, "max_position_embeddings", None)
+            or 1024
+        )
+        self._tokenizer = tokenizer
+        self._model = model
+        self.load_seconds = time.perf_counter() - start
+        logger.info(f"Local model ready in {self.load_seconds:.2f}s")
+        return self
+
+    def unload(self) -> None:
+        """Release weights and cached sessions."""
+        self._model = None
+        self._tokenizer = None
+        with self._sessions_lock:
+            self._sessions.clear()
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens in text.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Number of tokens
+        """
+        return len(self.tokenizer.encode(text))
+
+    def reset_session(self, session_id: str) -> None:
+        """Drop the KV cache of a session.
+
+        Args:
+            session_id: Session to reset
+        """
+        with self._sessions_lock:
+            self._sessions.pop(session_id, None)
+
+    def generate(
+        self,
+        prompt: str,
+        params: SamplingParams | None = None,
+        session_id: str | None = None,
+    ) -> GenerationOutput:
+        """Generate a completion for one prompt.
+
+        When session_id is given and the prompt extends the tokens already in
+        that session's KV cache (e.g. the full conversation so far), only the
+        new suffix is prefilled.
+
+        Args:
+            prompt: Full prompt text
+            params: Sampling parameters
+            session_id: Optional conversation id for KV-cache reuse
+
+        Returns:
+            Generation output
+        """
+        start = time.perf_counter()
+        pieces: list[str] = []
+        stats: dict[str, int] = {}
+        for piece in self.stream(prompt, params, session_id=session_id, stats=stats):
+            pieces.append(piece)
+        return GenerationOutput(
+            text="".join(pieces).strip(),
+            prompt_tokens=stats.get("prompt_tokens", 0),
+            completion_tokens=stats.get("completion_tokens", 0),
+            reused_tokens=stats.get("reused_tokens", 0),
+            latency_ms=(time.perf_counter() - start) * 1000,
+        )
+
+    def stream(
+        self,
+        prompt: str,
+        params: SamplingParams | None = None,
+        session_id: str | None = None,
+        stats: dict[str, int] | None = None,
+    ) -> Iterator[str]:
+        """Generate a completion, yielding text as it is decoded.
+
+        Args:
+            prompt: Full prompt text
+            params: Sampling parameters
+            session_id: Optional conversation id for KV-cache reuse
+            stats: Optional dict filled with token counts when the stream ends
+
+        Yields:
+            Text deltas
+        """
+        self.load()
+        params = params or SamplingParams()
+        stats = stats if stats is not None else {}
+
+        prompt_ids = self._fit_context(self.tokenizer.encode(prompt), params.max_new_tokens)
+        session = self._take_session(session_id)
+
+        reused = 0
+        past = None
+        if session.past_key_values is not None and self._is_prefix(session.token_ids, prompt_ids):
+            reused = len(session.token_ids)
+            past = session.past_key_values
+        new_ids = prompt_ids[reused:]
+        if not new_ids:
+            # Nothing new to prefill; re-feed the last token so there are logits to sample from
+            reused, past, new_ids = 0, None, prompt_ids
+
+        input_ids = torch.tensor([new_ids], dtype=torch.long)
+        attention_mask = torch.ones(1, reused + len(new_ids), dtype=torch.long)
+
+        generated: list[int] = []
+        emitted = ""
+        with torch.inference_mode():
+            for next_tokens, past in self._decode(input_ids, attention_mask, past, params):
+                token = int(next_tokens[0])
+                if token == self.tokenizer.eos_token_id:
+                    break
+                generated.append(token)
+                text = self.tokenizer.decode(generated, skip_special_tokens=True)
+                if text.endswith("�"):
+                    # Incomplete multi-byte character; wait for the next token
+                    continue
+                delta, emitted = text[len(emitted):], text
+                if delta:
+                    yield delta
+
+        # The cache covers the prompt plus every generated token that was fed back
+        fed = generated[:-1] if len(generated) == params.max_new_tokens else generated
+        session.token_ids = prompt_ids + fed
+        session.past_key_values = past
+        self._store_session(session_id, session)
+
+        stats.update(
+            prompt_tokens=len(prompt_ids),
+            completion_tokens=len(generated),
+            reused_tokens=reused,
+        )
+
+    def generate_batch(
+        self,
+        prompts: list[str],
+        params: SamplingParams | None = None,
+    ) -> list[GenerationOutput]:
+        """Generate completions for several prompts in one batch.
+
+        Prompts are left-padded so every sequence decodes in lock-step; each
+        step is one forward pass for the whole batch.
+
+        Args:
+            prompts: Prompt texts
+            params: Sampling parameters shared by the batch
+
+        Returns:
+            One output per prompt, in order
+        """
+        self.load()
+        params = params or SamplingParams()
+        if not prompts:
+            return []
+
+        start = time.perf_counter()
+        encoded = [
+            self._fit_context(self.tokenizer.encode(prompt), params.max_new_tokens)
+            for prompt in prompts
+        ]
+        width = max(len(ids) for ids in encoded)
+        pad_id = self.tokenizer.pad_token_id
+        input_ids = torch.tensor(
+            [[pad_id] * (width - len(ids)) + ids for ids in encoded], dtype=torch.long
+        )
+        attention_mask = torch.tensor(
+            [[0] * (width - len(ids)) + [1] * len(ids) for ids in encoded], dtype=torch.long
+        )
+
+        eos_id = self.tokenizer.eos_token_id
+        generated: list[list[int]] = [[] for _ in prompts]
+        finished = [False] * len(prompts)
+        with torch.inference_mode():
+            for next_tokens, _ in self._decode(input_ids, attention_mask, None, params):
+                for i, token in enumerate(next_tokens.tolist()):
+                    if finished[i]:
+                        continue
+                    if token == eos_id:
+                        finished[i] = True
+                    else:
+                        generated[i].append(token)
+                if all(finished):
+                    break
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        return [
+            GenerationOutput(
+                text=self.tokenizer.decode(tokens, skip_special_tokens=True).strip(),
+                prompt_tokens=len(ids),
+                completion_tokens=len(tokens),
+                latency_ms=latency_ms,
+            )
+            for ids, tokens in zip(encoded, generated)
+        ]
+
+    def get_info(self) -> dict[str, Any]:
+        """Describe the loaded model.
+
+        Returns:
+            Model information
+        """
+        info: dict[str, Any] = {
+            "model_path": self.model_path,
+            "loaded": self.is_loaded,
+            "quantized": self.quantize,
+            "max_positions": self._max_positions,
+            "load_seconds": round(self.load_seconds, 2),
+            "cached_sessions": len(self._sessions),
+        }
+        if self._model is not None:
+            info["parameters"] = sum(p.numel() for p in self._model.parameters())
+        return info
+
+    def _decode(
+        self,
+        input_ids: torch.Tensor,
+        attention_mask: torch.Tensor,
+        past_key_values: Any,
+        params: SamplingParams,
+    ) -> Iterator[tuple[torch.Tensor, Any]]:
+        """Run the decode loop, yielding sampled tokens and the updated cache."""
+        for _ in range(params.max_new_tokens):
+            position_ids = (attention_mask.cumsum(-1) - 1).clamp(min=0)[:, -input_ids.shape[1]:]
+            outputs = self._model(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                position_ids=position_ids,
+                past_key_values=past_key_values,
+                use_cache=True,
+            )
+            past_key_values = outputs.past_key_values
+            next_tokens = self._sample(outputs.logits[:, -1, :], params)
+            yield next_tokens, past_key_values
+
+            input_ids = next_tokens.unsqueeze(-1)
+            attention_mask = torch.cat(
+                [attention_mask, attention_mask.new_ones((attention_mask.shape[0], 1))], dim=-1
+            )
+
+    @staticmethod
+    def _sample(logits: torch.Tensor, params: SamplingParams) -> torch.Tensor:
+        """Pick the next token for each row of logits."""
+        if not params.do_sample or params.temperature <= 0:
+            return logits.argmax(dim=-1)
+
+        logits = logits / params.temperature
+        if params.top_k and params.top_k < logits.shape[-1]:
+            kth = torch.topk(logits, params.top_k, dim=-1).values[:, -1, None]
+            logits = logits.masked_fill(logits < kth, float("-inf"))
+        if 0 < params.top_p < 1:
+            sorted_logits, sorted_idx = torch.sort(logits, descending=True, dim=-1)
+            probs = torch.softmax(sorted_logits, dim=-1)
+            drop = probs.cumsum(dim=-1) - probs > params.top_p
+            sorted_logits = sorted_logits.masked_fill(drop, float("-inf"))
+            logits = torch.full_like(logits, float("-inf")).scatter(-1, sorted_idx, sorted_logits)
+
+        probs = torch.softmax(logits, dim=-1)
+        return torch.multinomial(probs, num_samples=1).squeeze(-1)
+
+    def _fit_context(self, token_ids: list[int], max_new_tokens: int) -> list[int]:
+        """Keep the most recent tokens so prompt + completion fits the context window."""
+        budget = max(1, self._max_positions - max_new_tokens)
+        return token_ids[-budget:]
+
+    @staticmethod
+    def _is_prefix(cached: list[int], prompt: list[int]) -> bool:
+        """Whether the cached tokens are a prefix of the prompt."""
+        return 0 < len(cached) <= len(prompt) and prompt[:len(cached)] == cached
+
+    def _take_session(self, session_id: str | None) -> _Session:
+        """Remove and return a session's cache so no other request mutates it."""
+        if session_id is None:
+            return _Session()
+        with self._sessions_lock:
+            return self._sessions.pop(session_id, None) or _Session()
+
+    def _store_session(self, session_id: str | None, session: _Session) -> None:
+        """Put a session back, evicting the least recently used beyond the limit."""
+        if session_id is None:
+            return
+        with self._sessions_lock:
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
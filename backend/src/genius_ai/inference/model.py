@@ -0,0 +1,138 @@
+"""Async model interface over the local inference engine."""
+
+import asyncio
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+from genius_ai.core.logger import logger
+from genius_ai.core.metrics import metrics
+from genius_ai.inference.batching import BatchScheduler
+from genius_ai.inference.engine import GenerationOutput, LocalInferenceEngine, SamplingParams
+from genius_ai.inference.registry import model_registry
+
+
+class LocalTrainedModel:
+    """Serves a locally fine-tuned `genius_model_*` checkpoint.
+
+    Exposes the same surface the API server and agents use for models
+    (initialize, generate, generate_stream, count_tokens, get_model_info,
+    cleanup). Weights come from the process-wide registry, so several
+    instances for the same checkpoint share one loaded copy.
+    """
+
+    def __init__(
+        self,
+        model_path: str | Path,
+        device: str = "cpu",
+        quantize: bool = True,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+    ):
+        """Initialize model.
+
+        Args:
+            model_path: Path to the fine-tuned checkpoint
+            device: Only "cpu" is supported by this backend
+            quantize: Apply int8 dynamic quantization
+            max_batch_size: Maximum concurrent requests per batch
+            max_wait_ms: Batching window in milliseconds
+        """
+        if device != "cpu":
+            logger.warning(f"LocalTrainedModel runs on CPU; ignoring device={device}")
+        self.model_path = str(model_path)
+        self.quantize = quantize
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._engine: LocalInferenceEngine | None = None
+        self._scheduler: BatchScheduler | None = None
+
+    async def initialize(self) -> None:
+        """Load (or reuse) the engine without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        self._engine = await loop.run_in_executor(
+            None, model_registry.get, self.model_path, self.quantize
+        )
+        self._scheduler = BatchScheduler(
+            self._engine,
+            max_batch_size=self.max_batch_size,
+            max_wait_ms=self.max_wait_ms,
+        )
+
+    async def generate(
+        self,
+        prompt: str,
+        config: Any | None = None,
+        session_id: str | None = None,
+    ) -> GenerationOutput:
+        """Generate a completion.
+
+        Args:
+            prompt: Prompt text
+            config: Generation config (temperature, max_tokens, top_p, top_k)
+            session_id: Optional conversation id for KV-cache reuse
+
+        Returns:
+            Output with `.text` and `.usage`
+        """
+        if self._scheduler is None:
+            await self.initialize()
+        params = SamplingParams.from_config(config)
+        output = await self._scheduler.generate(prompt, params, session_id=session_id)
+        if session_id is not None:
+            metrics.record_cache("kv_session", output.reused_tokens > 0)
+        return output
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        config: Any | None = None,
+        session_id: str | None = None,
+    ) -> AsyncIterator[str]:
+        """Stream a completion.
+
+        Args:
+            prompt: Prompt text
+            config: Generation config
+            session_id: Optional conversation id for KV-cache reuse
+
+        Yields:
+            Text deltas
+        """
+        if self._scheduler is None:
+            await self.initialize()
+        params = SamplingParams.from_config(config)
+        async for chunk in self._scheduler.stream(prompt, params, session_id=session_id):
+            yield chunk
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens in text.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Number of tokens
+        """
+        if self._engine is None:
+            return len(text.split())
+        return self._engine.count_tokens(text)
+
+    def get_model_info(self) -> dict[str, Any]:
+        """Describe the served model.
+
+        Returns:
+            Engine and batching information
+        """
+        info: dict[str, Any] = {"backend": "local-cpu", "model_path": self.model_path}
+        if self._engine is not None:
+            info.update(self._engine.get_info())
+        if self._scheduler is not None:
+            info["batching"] = self._scheduler.get_stats()
+        return info
+
+    async def cleanup(self) -> None:
+        """Stop batching; weights stay warm in the registry."""
+        if self._scheduler is not None:
+            await self._scheduler.close()
+            self._scheduler = None
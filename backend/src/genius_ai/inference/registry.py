@@ -0,0 +1,85 @@
+"""Process-wide registry of warm-loaded inference engines."""
+
+import threading
+from pathlib import Path
+from typing import Any
+
+from genius_ai.core.logger import logger
+from genius_ai.inference.engine import LocalInferenceEngine
+
+
+class ModelRegistry:
+    """Keeps loaded engines in memory so weights are loaded once per process."""
+
+    def __init__(self):
+        """Initialize registry."""
+        self._engines: dict[tuple[str, bool], LocalInferenceEngine] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(model_path: str | Path, quantize: bool) -> tuple[str, bool]:
+        """Normalise a registry key."""
+        return str(Path(model_path).resolve()), quantize
+
+    def get(self, model_path: str | Path, quantize: bool = True) -> LocalInferenceEngine:
+        """Get a loaded engine, loading it on first use.
+
+        Args:
+            model_path: Path to a saved checkpoint
+            quantize: Whether the engine should be int8 quantized
+
+        Returns:
+            Loaded engine
+        """
+        key = self._key(model_path, quantize)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                engine = LocalInferenceEngine(model_path, quantize=quantize)
+                self._engines[key] = engine
+        # Loading happens outside the registry lock; the engine is idempotent
+        return engine.load()
+
+    def preload(self, model_paths: list[str | Path], quantize: bool = True) -> None:
+        """Load several checkpoints ahead of the first request.
+
+        Args:
+            model_paths: Checkpoint paths
+            quantize: Whether engines should be int8 quantized
+        """
+        for path in model_paths:
+            try:
+                self.get(path, quantize=quantize)
+            except Exception as e:
+                logger.error(f"Could not preload {path}: {e}")
+
+    def unload(self, model_path: str | Path, quantize: bool = True) -> bool:
+        """Unload a checkpoint.
+
+        Args:
+            model_path: Checkpoint path
+            quantize: Which variant to unload
+
+        Returns:
+            True if an engine was unloaded
+        """
+        with self._lock:
+            engine = self._engines.pop(self._key(model_path, quantize), None)
+        if engine is None:
+            return False
+        engine.unload()
+        return True
+
+    def list_models(self) -> list[dict[str, Any]]:
+        """Describe every registered engine.
+
+        Returns:
+            Info for each engine
+        """
+        with self._lock:
+            engines = list(self._engines.values())
+        return [engine.get_info() for engine in engines]
+
+
+# Global registry instance
+model_registry = ModelRegistry()
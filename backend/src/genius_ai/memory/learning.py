@@ -1,6 +1,11 @@
 """Learning mechanisms for continuous improvement."""
 
+import atexit
 import json
+import os
+import queue
+import threading
+import time
 from collections import defaultdict
 from dataclasses import dataclass, asdict
 from datetime import datetime
@@ -45,90 +50,301 @@ class Feedback:
 
 
 class LearningSystem:
-    """System for learning from interactions and improving over time."""
+    """System for learning from interactions and improving over time.
 
-    def __init__(self, storage_path: Path | None = None):
+    Storage is an append-only event log with periodic compaction:
+
+    - record_strategy / record_feedback update in-memory aggregates
+      and enqueue an event; a background writer appends queued events to
+      events.<generation>.jsonl in batches, off the request path.
+    - Every compact_every events the writer starts a new log generation,
+      writes snapshot.json (aggregates covering all older generations)
+      and deletes the old log. A crash at any point leaves a snapshot plus
+      the logs still to replay, so nothing is counted twice.
+    - Raw feedback is also kept in the append-only feedback.jsonl.
+    - Insights and per-type stats are served from counters, never rescans.
+
+    Legacy strategies.json / feedback.json files are loaded when no
+    snapshot exists yet.
+    """
+
+    def __init__(
+        self,
+        storage_path: Path | None = None,
+        flush_interval: float = 1.0,
+        compact_every: int = 1000,
+    ):
         """Initialize learning system.
 
         Args:
             storage_path: Path to store learning data
+            flush_interval: Seconds the writer waits to batch events
+            compact_every: Logged events between compactions
         """
         self.storage_path = storage_path or Path(settings.data_dir) / "learning"
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
 
+        self.snapshot_file = self.storage_path / "snapshot.json"
+        self.feedback_log_file = self.storage_path / "feedback.jsonl"
+        # Pre-event-log formats
         self.strategies_file = self.storage_path / "strategies.json"
         self.feedback_file = self.storage_path / "feedback.json"
 
-        # In-memory caches
+        # In-memory aggregates (request path)
+        self._lock = threading.Lock()
         self._strategies: dict[str, Strategy] = {}
-        self._feedback: list[Feedback] = []
+        self._strategies_by_type: dict[str, dict[str, Strategy]] = defaultdict(dict)
+        self._feedback_total = 0
+        self._feedback_positive = 0
         self._problem_type_stats: dict[str, dict] = defaultdict(lambda: {
             "total_attempts": 0,
             "successful": 0,
             "failed": 0,
         })
 
+        # Durable state mirrored by the writer thread: exactly what is on disk
+        self._generation = 0
+        self._logged_events = 0
+        self._persisted: dict[str, Any] = {}
+
         # Load existing data
         self._load_data()
 
+        self._queue: queue.Queue[dict[str, Any] | None] = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name="learning-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _log_file(self, generation: int) -> Path:
+        return self.storage_path / f"events.{generation}.jsonl"
+
     def _load_data(self):
-        """Load learning data from disk."""
-        # Load strategies
+        """Load the snapshot and replay the event logs written after it."""
+        strategies: dict[str, Strategy] = {}
+        feedback_total = feedback_positive = 0
+
+        if self.snapshot_file.exists():
+            try:
+                with open(self.snapshot_file, 'r') as f:
+                    data = json.load(f)
+                self._generation = data["generation"]
+                strategies = {sid: Strategy(**sdata) for sid, sdata in data["strategies"].items()}
+                feedback_total = data["feedback_total"]
+                feedback_positive = data["feedback_positive"]
+            except Exception as e:
+                logger.error(f"Error loading learning snapshot: {e}")
+        else:
+            strategies, feedback_total, feedback_positive = self._load_legacy()
+
+        self._persisted = {
+            "strategies": strategies,
+            "feedback_total": feedback_total,
+            "feedback_positive": feedback_positive,
+        }
+
+        # Replay logs not yet folded into the snapshot, oldest first
+        generations = sorted(
+            int(path.name.split(".")[1]) for path in self.storage_path.glob("events.*.jsonl")
+        )
+        replayed = 0
+        for generation in generations:
+            path = self._log_file(generation)
+            if generation < self._generation:
+                path.unlink(missing_ok=True)  # Already in the snapshot
+                continue
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn final line from a crash
+                    self._apply_event(self._persisted, event)
+                    replayed += 1
+            self._generation = generation
+        self._logged_events = replayed
+
+        # Live aggregates start as a copy of the durable state
+        self._strategies = {
+            sid: Strategy(**asdict(strategy)) for sid, strategy in self._persisted["strategies"].items()
+        }
+        self._feedback_total = self._persisted["feedback_total"]
+        self._feedback_positive = self._persisted["feedback_positive"]
+        self._rebuild_stats()
+
+        logger.info(
+            f"Loaded {len(self._strategies)} strategies and {self._feedback_total} feedback entries "
+            f"({replayed} events replayed)"
+        )
+
+    def _load_legacy(self) -> tuple[dict[str, Strategy], int, int]:
+        """Load the full-rewrite JSON files used before the event log."""
+        strategies: dict[str, Strategy] = {}
+        feedback_total = feedback_positive = 0
+
         if self.strategies_file.exists():
             try:
                 with open(self.strategies_file, 'r') as f:
                     data = json.load(f)
-                    self._strategies = {
-                        sid: Strategy(**sdata) for sid, sdata in data.items()
-                    }
-                logger.info(f"Loaded {len(self._strategies)} strategies")
+                strategies = {sid: Strategy(**sdata) for sid, sdata in data.items()}
             except Exception as e:
                 logger.error(f"Error loading strategies: {e}")
 
-        # Load feedback
         if self.feedback_file.exists():
             try:
                 with open(self.feedback_file, 'r') as f:
                     data = json.load(f)
-                    self._feedback = [Feedback(**fdata) for fdata in data]
-                logger.info(f"Loaded {len(self._feedback)} feedback entries")
+                feedback_total = len(data)
+                feedback_positive = sum(1 for fdata in data if fdata.get("is_positive"))
             except Exception as e:
                 logger.error(f"Error loading feedback: {e}")
 
-        # Rebuild stats
-        self._rebuild_stats()
+        return strategies, feedback_total, feedback_positive
+
+    @staticmethod
+    def _apply_event(state: dict[str, Any], event: dict[str, Any]) -> Strategy | None:
+        """Fold one event into a state dict (used for replay and the durable mirror).
 
-    def _save_strategies(self):
-        """Save strategies to disk."""
-        try:
-            with open(self.strategies_file, 'w') as f:
-                data = {sid: asdict(strategy) for sid, strategy in self._strategies.items()}
-                json.dump(data, f, indent=2)
-            logger.debug("Strategies saved to disk")
-        except Exception as e:
-            logger.error(f"Error saving strategies: {e}")
-
-    def _save_feedback(self):
-        """Save feedback to disk."""
-        try:
-            with open(self.feedback_file, 'w') as f:
-                data = [asdict(fb) for fb in self._feedback]
-                json.dump(data, f, indent=2)
-            logger.debug("Feedback saved to disk")
-        except Exception as e:
-            logger.error(f"Error saving feedback: {e}")
+        Returns:
+            The updated strategy for strategy events, else None
+        """
+        if event["type"] == "feedback":
+            state["feedback_total"] += 1
+            if event["is_positive"]:
+                state["feedback_positive"] += 1
+            return None
+
+        return LearningSystem._apply_strategy(state["strategies"], event)
+
+    @staticmethod
+    def _apply_strategy(strategies: dict[str, Strategy], event: dict[str, Any]) -> Strategy:
+        """Apply a strategy-use event to a strategy table."""
+        strategy_id = event["strategy_id"]
+        success = event["success"]
+        confidence = event["confidence"]
+
+        # Get or create strategy
+        if strategy_id in strategies:
+            strategy = strategies[strategy_id]
+            if success:
+                strategy.success_count += 1
+            else:
+                strategy.failure_count += 1
+
+            # Update average confidence
+            total = strategy.success_count + strategy.failure_count
+            strategy.avg_confidence = (
+                (strategy.avg_confidence * (total - 1) + confidence) / total
+            )
+            strategy.last_used = event["timestamp"]
+            strategy.metadata.update(event["metadata"])
+        else:
+            # Create new strategy
+            strategy = Strategy(
+                strategy_id=strategy_id,
+                problem_type=event["problem_type"],
+                approach=event["approach"],
+                success_count=1 if success else 0,
+                failure_count=0 if success else 1,
+                avg_confidence=confidence,
+                last_used=event["timestamp"],
+                metadata=dict(event["metadata"]),
+            )
+            strategies[strategy_id] = strategy
+
+        return strategy
 
     def _rebuild_stats(self):
-        """Rebuild problem type statistics from strategies."""
+        """Rebuild problem type statistics and the per-type index from strategies."""
         self._problem_type_stats.clear()
+        self._strategies_by_type.clear()
 
         for strategy in self._strategies.values():
             pt = strategy.problem_type
+            self._strategies_by_type[pt][strategy.strategy_id] = strategy
             stats = self._problem_type_stats[pt]
             stats["total_attempts"] += strategy.success_count + strategy.failure_count
             stats["successful"] += strategy.success_count
             stats["failed"] += strategy.failure_count
 
+    def _writer_loop(self):
+        """Append queued events to the log in batches; compact periodically."""
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            # Gather whatever else arrives within the flush interval
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            events = [event for event in batch if event is not None]
+            stopping = len(events) < len(batch)
+            try:
+                if events:
+                    self._write_events(events)
+                if self._logged_events >= self.compact_every:
+                    self._compact()
+            except Exception as e:
+                logger.error(f"Error writing learning events: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_events(self, events: list[dict[str, Any]]):
+        """Append a batch of events to the current log generation."""
+        with open(self._log_file(self._generation), 'a') as f:
+            f.write("".join(json.dumps(event) + "\n" for event in events))
+
+        feedback = [event for event in events if event["type"] == "feedback"]
+        if feedback:
+            with open(self.feedback_log_file, 'a') as f:
+                f.write("".join(json.dumps(event) + "\n" for event in feedback))
+
+        for event in events:
+            self._apply_event(self._persisted, event)
+        self._logged_events += len(events)
+        logger.debug(f"Logged {len(events)} learning events")
+
+    def _compact(self):
+        """Fold all logged events into a new snapshot and drop the old logs."""
+        old_generation = self._generation
+        self._generation += 1
+        self._logged_events = 0
+
+        # The snapshot covers every generation below the new one
+        tmp = self.snapshot_file.with_suffix(".json.tmp")
+        with open(tmp, 'w') as f:
+            json.dump({
+                "generation": self._generation,
+                "strategies": {
+                    sid: asdict(strategy) for sid, strategy in self._persisted["strategies"].items()
+                },
+                "feedback_total": self._persisted["feedback_total"],
+                "feedback_positive": self._persisted["feedback_positive"],
+            }, f)
+        os.replace(tmp, self.snapshot_file)
+
+        for generation in range(old_generation + 1):
+            self._log_file(generation).unlink(missing_ok=True)
+        logger.info(f"Compacted learning log into snapshot generation {self._generation}")
+
+    def flush(self):
+        """Block until every queued event has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Write pending events and stop the writer thread."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
     def record_strategy(
         self,
         problem_type: str,
@@ -139,6 +355,9 @@ class LearningSystem:
     ) -> str:
         """Record a strategy use and outcome.
 
+        Updates the in-memory aggregates immediately; the event is persisted
+        by the background writer.
+
         Args:
             problem_type: Type of problem (question/task/problem/analysis)
             approach: Approach taken
@@ -152,45 +371,30 @@ class LearningSystem:
         # Generate strategy ID
         strategy_id = f"{problem_type}_{hash(approach) % 10000}"
 
-        # Get or create strategy
-        if strategy_id in self._strategies:
-            strategy = self._strategies[strategy_id]
-            if success:
-                strategy.success_count += 1
-            else:
-                strategy.failure_count += 1
+        event = {
+            "type": "strategy",
+            "strategy_id": strategy_id,
+            "problem_type": problem_type,
+            "approach": approach,
+            "success": success,
+            "confidence": confidence,
+            "metadata": metadata or {},
+            "timestamp": datetime.now().isoformat(),
+        }
 
-            # Update average confidence
-            total = strategy.success_count + strategy.failure_count
-            strategy.avg_confidence = (
-                (strategy.avg_confidence * (total - 1) + confidence) / total
-            )
-            strategy.last_used = datetime.now().isoformat()
-            strategy.metadata.update(metadata or {})
-        else:
-            # Create new strategy
-            strategy = Strategy(
-                strategy_id=strategy_id,
-                problem_type=problem_type,
-                approach=approach,
-                success_count=1 if success else 0,
-                failure_count=0 if success else 1,
-                avg_confidence=confidence,
-                last_used=datetime.now().isoformat(),
-                metadata=metadata or {},
-            )
-            self._strategies[strategy_id] = strategy
+        with self._lock:
+            strategy = self._apply_strategy(self._strategies, event)
+            self._strategies_by_type[problem_type][strategy_id] = strategy
 
-        # Update stats
-        stats = self._problem_type_stats[problem_type]
-        stats["total_attempts"] += 1
-        if success:
-            stats["successful"] += 1
-        else:
-            stats["failed"] += 1
+            # Update stats
+            stats = self._problem_type_stats[problem_type]
+            stats["total_attempts"] += 1
+            if success:
+                stats["successful"] += 1
+            else:
+                stats["failed"] += 1
 
-        # Save to disk
-        self._save_strategies()
+        self._queue.put(event)
 
         logger.info(f"Recorded strategy {strategy_id}: success={success}, confidence={confidence:.2f}")
 
@@ -214,8 +418,8 @@ class LearningSystem:
         """
         # Filter strategies by problem type
         relevant = [
-            s for s in self._strategies.values()
-            if s.problem_type == problem_type and s.success_rate >= min_success_rate
+            s for s in self._strategies_by_type.get(problem_type, {}).values()
+            if s.success_rate >= min_success_rate
         ]
 
         # Sort by success rate and confidence
@@ -253,8 +457,12 @@ class LearningSystem:
             metadata=metadata or {},
         )
 
-        self._feedback.append(feedback)
-        self._save_feedback()
+        with self._lock:
+            self._feedback_total += 1
+            if feedback.is_positive:
+                self._feedback_positive += 1
+
+        self._queue.put({"type": "feedback", **asdict(feedback)})
 
         logger.info(f"Recorded feedback: rating={rating}, positive={feedback.is_positive}")
 
@@ -268,11 +476,11 @@ class LearningSystem:
             Statistics dictionary
         """
         if problem_type:
-            stats = self._problem_type_stats.get(problem_type, {
+            stats = dict(self._problem_type_stats.get(problem_type, {
                 "total_attempts": 0,
                 "successful": 0,
                 "failed": 0,
-            })
+            }))
             stats["success_rate"] = (
                 stats["successful"] / stats["total_attempts"]
                 if stats["total_attempts"] > 0 else 0.0
@@ -298,8 +506,8 @@ class LearningSystem:
             Dictionary of insights
         """
         total_strategies = len(self._strategies)
-        total_feedback = len(self._feedback)
-        positive_feedback = sum(1 for f in self._feedback if f.is_positive)
+        total_feedback = self._feedback_total
+        positive_feedback = self._feedback_positive
 
         # Calculate overall success rates
         problem_type_success = {}
@@ -364,9 +572,8 @@ class LearningSystem:
 
         # Check for strategies that haven't been tried much
         low_usage_strategies = [
-            s for s in self._strategies.values()
-            if s.problem_type == problem_type
-            and (s.success_count + s.failure_count) < 3
+            s for s in self._strategies_by_type.get(problem_type, {}).values()
+            if (s.success_count + s.failure_count) < 3
         ]
 
         if low_usage_strategies:
@@ -0,0 +1,366 @@
+"""Structure- and token-aware document chunking."""
+
+import json
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable
+
+from genius_ai.core.config import settings
+from genius_ai.core.logger import logger
+
+
+@dataclass
+class Document:
+    """Represents a document chunk."""
+
+    content: str
+    metadata: dict[str, Any]
+    id: str | None = None
+
+
+HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+FENCE = re.compile(r"^\s*(```|~~~)")
+MATH_OPEN = re.compile(r"^\s*(\$\$|\\\[|\\begin\{(\w+\*?)\})")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class Block:
+    """A unit that is only split when it cannot fit a chunk on its own."""
+
+    text: str
+    kind: str  # "heading", "paragraph", "code" or "math"
+    section: str  # Heading path the block belongs to
+    tokens: int = 0
+    lines: list[str] = field(default_factory=list, repr=False)
+
+
+@lru_cache(maxsize=4)
+def load_token_counter(model_name: str) -> tuple[Callable[[str], int], int | None]:
+    """Token counter for an embedding model and its maximum sequence length.
+
+    Uses the model's own tokenizer when transformers is available and falls
+    back to a word/punctuation estimate otherwise.
+
+    Args:
+        model_name: Hugging Face model name
+
+    Returns:
+        (count function, max sequence length or None)
+    """
+    try:
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        max_length = tokenizer.model_max_length
+        # sentence-transformers models truncate well before the tokenizer limit
+        try:
+            from huggingface_hub import hf_hub_download
+
+            with open(hf_hub_download(model_name, "sentence_bert_config.json")) as f:
+                max_length = json.load(f).get("max_seq_length", max_length)
+        except Exception:
+            pass
+
+        def count(text: str) -> int:
+            return len(tokenizer.encode(text, add_special_tokens=False))
+
+        return count, max_length if max_length and max_length < 100_000 else None
+    except Exception as e:
+        logger.warning(f"Tokenizer for {model_name} unavailable, estimating tokens: {e}")
+
+        def estimate(text: str) -> int:
+            # Word pieces: roughly one per short word or symbol, more for long words
+            return sum(1 + len(word) // 8 for word in re.findall(r"\w+|[^\w\s]", text))
+
+        return estimate, None
+
+
+class DocumentChunker:
+    """Splits documents into chunks for embedding.
+
+    Chunks are sized in tokens of the embedding model (capped at the length
+    the model actually embeds) and follow document structure: markdown
+    headings start new sections, and fenced code blocks and LaTeX display
+    blocks are kept whole unless they alone exceed a chunk. Consecutive
+    chunks share up to ``chunk_overlap`` tokens of trailing context.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int | None = None,
+        chunk_overlap: int | None = None,
+        embedding_model: str | None = None,
+        count_tokens: Callable[[str], int] | None = None,
+    ):
+        """Initialize chunker.
+
+        Args:
+            chunk_size: Maximum chunk size in embedding-model tokens
+            chunk_overlap: Tokens of trailing context repeated in the next chunk
+            embedding_model: Model whose tokenizer sizes the chunks
+            count_tokens: Custom token counter (skips loading a tokenizer)
+        """
+        self.chunk_size = chunk_size or settings.chunk_size
+        self.chunk_overlap = settings.chunk_overlap if chunk_overlap is None else chunk_overlap
+        self.embedding_model = embedding_model or settings.embedding_model
+        self._count_tokens = count_tokens
+
+    @property
+    def count_tokens(self) -> Callable[[str], int]:
+        if self._count_tokens is None:
+            count, max_length = load_token_counter(self.embedding_model)
+            if max_length and self.chunk_size > max_length - 2:
+                logger.info(
+                    f"Capping chunk size at {max_length - 2} tokens for {self.embedding_model}"
+                )
+                self.chunk_size = max_length - 2  # Room for [CLS]/[SEP]
+            self._count_tokens = count
+        return self._count_tokens
+
+    def chunk_text(self, text: str, metadata: dict[str, Any] | None = None) -> list[Document]:
+        """Split text into chunks.
+
+        Args:
+            text: Text to chunk
+            metadata: Metadata to attach to chunks
+
+        Returns:
+            List of document chunks
+        """
+        chunks = list(self.iter_chunks(text.splitlines(keepends=True), metadata))
+        logger.info(f"Split text into {len(chunks)} chunks")
+        return chunks
+
+    def chunk_file(
+        self,
+        path: str | Path,
+        metadata: dict[str, Any] | None = None,
+        encoding: str = "utf-8",
+    ) -> Iterator[Document]:
+        """Stream chunks from a file without reading it into memory.
+
+        Args:
+            path: File to chunk
+            metadata: Metadata to attach to chunks (source is added)
+            encoding: File encoding
+
+        Yields:
+            Document chunks
+        """
+        metadata = {"source": str(path), **(metadata or {})}
+        with open(path, encoding=encoding, errors="replace") as f:
+            yield from self.iter_chunks(f, metadata)
+
+    def iter_chunks(
+        self,
+        lines: Iterable[str],
+        metadata: dict[str, Any] | None = None,
+    ) -> Iterator[Document]:
+        """Chunk a stream of lines.
+
+        Args:
+            lines: Lines of the document (with or without line endings)
+            metadata: Metadata to attach to chunks
+
+        Yields:
+            Document chunks with ``section`` and ``chunk_index`` metadata
+        """
+        metadata = metadata or {}
+        count = self.count_tokens
+        budget = self.chunk_size
+
+        current: list[Block] = []
+        carried = 0  # Leading blocks of current repeated from the previous chunk
+        used = 0
+        index = 0
+
+        def emit(blocks: list[Block]) -> Document:
+            nonlocal index
+            content = "\n\n".join(block.text for block in blocks)
+            chunk_metadata = {**metadata, "chunk_index": index}
+            # The chunk belongs to the section of its new content, not the overlap
+            section = next((block.section for block in blocks[carried:] if block.section), "") \
+                or next((block.section for block in blocks if block.section), "")
+            if section:
+                chunk_metadata["section"] = section
+            index += 1
+            return Document(content=content, metadata=chunk_metadata)
+
+        for block in self._blocks(lines):
+            block.tokens = count(block.text)
+
+            # A new top-level section starts a new chunk once the current one is half full
+            if block.kind == "heading" and current and used >= budget // 2 \
+                    and block.text.startswith(("# ", "## ")):
+                yield emit(current)
+                current, carried, used = [], 0, 0
+
+            pieces = [block] if block.tokens <= budget else self._split_block(block, budget)
+            for piece in pieces:
+                if current and used + piece.tokens + 1 > budget:
+                    # Headings belong with the content that follows them
+                    trailing: list[Block] = []
+                    while current and current[-1].kind == "heading":
+                        trailing.insert(0, current.pop())
+                    if current:
+                        yield emit(current)
+                        current = self._overlap(current)
+                        carried = len(current)
+                    if sum(b.tokens + 1 for b in current + trailing) + piece.tokens + 1 > budget:
+                        current, carried = [], 0
+                    current += trailing
+                    used = sum(b.tokens + 1 for b in current)
+                current.append(piece)
+                used += piece.tokens + 1
+
+        if current and any(block.kind != "heading" for block in current):
+            yield emit(current)
+
+    def _blocks(self, lines: Iterable[str]) -> Iterator[Block]:
+        """Group lines into headings, paragraphs, code fences and math blocks."""
+        headings: list[tuple[int, str]] = []  # (level, title) of enclosing headings
+        buffer: list[str] = []
+        closer: re.Pattern[str] | None = None
+        kind = "paragraph"
+
+        def section() -> str:
+            return " > ".join(title for _, title in headings)
+
+        def flush() -> Iterator[Block]:
+            nonlocal buffer, kind
+            text = "\n".join(buffer).strip("\n")
+            if text.strip():
+                yield Block(text=text, kind=kind, section=section(), lines=buffer)
+            buffer, kind = [], "paragraph"
+
+        for raw in lines:
+            line = raw.rstrip("\r\n")
+
+            if closer is not None:  # Inside a code or math block
+                buffer.append(line)
+                if closer.search(line):
+                    closer = None
+                    yield from flush()
+                continue
+
+            fence = FENCE.match(line)
+            math = MATH_OPEN.match(line)
+            if fence or math:
+                yield from flush()
+                buffer.append(line)
+                if fence:
+                    kind = "code"
+                    closer = re.compile(r"^\s*" + re.escape(fence.group(1)) + r"\s*$")
+                else:
+                    kind = "math"
+                    opener = math.group(1)
+                    if opener == "$$":
+                        closer = re.compile(r"\$\$\s*$")
+                        if line.strip() != "$$" and line.rstrip().endswith("$$") and len(line.strip()) > 2:
+                            closer = None  # Single-line $$...$$
+                    elif opener == "\\[":
+                        closer = re.compile(r"\\\]\s*$")
+                        if line.rstrip().endswith("\\]"):
+                            closer = None
+                    else:
+                        closer = re.compile(r"\\end\{" + re.escape(math.group(2)) + r"\}")
+                        if closer.search(line):
+                            closer = None
+                if closer is None:
+                    yield from flush()
+                continue
+
+            heading = HEADING.match(line)
+            if heading:
+                yield from flush()
+                level = len(heading.group(1))
+                while headings and headings[-1][0] >= level:
+                    headings.pop()
+                headings.append((level, heading.group(2)))
+                yield Block(text=line.strip(), kind="heading", section=section())
+                continue
+
+            if not line.strip():
+                yield from flush()
+                continue
+
+            buffer.append(line)
+
+        yield from flush()  # Also closes an unterminated fence
+
+    def _split_block(self, block: Block, budget: int) -> list[Block]:
+        """Split a block that alone exceeds the budget."""
+        count = self.count_tokens
+        if block.kind in ("code", "math"):
+            units = block.lines or block.text.split("\n")
+            joiner = "\n"
+        else:
+            units = SENTENCE_END.split(block.text)
+            joiner = " "
+
+        pieces: list[Block] = []
+        current: list[str] = []
+        used = 0
+        for unit in units:
+            tokens = count(unit)
+            if tokens > budget:  # One enormous line or sentence: split by words
+                words = unit.split(" ")
+                unit_parts, part, part_tokens = [], [], 0
+                for word in words:
+                    word_tokens = count(word) + 1
+                    if part and part_tokens + word_tokens > budget:
+                        unit_parts.append(" ".join(part))
+                        part, part_tokens = [], 0
+                    part.append(word)
+                    part_tokens += word_tokens
+                if part:
+                    unit_parts.append(" ".join(part))
+            else:
+                unit_parts = [unit]
+
+            for unit_part in unit_parts:
+                unit_tokens = count(unit_part) + 1
+                if current and used + unit_tokens > budget:
+                    text = joiner.join(current)
+                    pieces.append(Block(text=text, kind=block.kind, section=block.section, tokens=count(text)))
+                    current, used = [], 0
+                current.append(unit_part)
+                used += unit_tokens
+
+        if current:
+            text = joiner.join(current)
+            pieces.append(Block(text=text, kind=block.kind, section=block.section, tokens=count(text)))
+        return pieces
+
+    def _overlap(self, blocks: list[Block]) -> list[Block]:
+        """Trailing context (up to chunk_overlap tokens) to repeat in the next chunk."""
+        if self.chunk_overlap <= 0:
+            return []
+
+        carried: list[Block] = []
+        used = 0
+        for block in reversed(blocks):
+            if block.kind == "heading":
+                continue
+            if used + block.tokens + 1 <= self.chunk_overlap:
+                carried.insert(0, block)
+                used += block.tokens + 1
+                continue
+            if block.kind == "paragraph" and not carried:
+                # Take whole trailing sentences of the last paragraph
+                tail: list[str] = []
+                for sentence in reversed(SENTENCE_END.split(block.text)):
+                    tokens = self.count_tokens(" ".join([sentence, *tail]))
+                    if tokens > self.chunk_overlap:
+                        break
+                    tail.insert(0, sentence)
+                if tail:
+                    text = " ".join(tail)
+                    carried.insert(0, Block(text=text, kind="paragraph", section=block.section,
+                                            tokens=self.count_tokens(text)))
+            break
+        return carried
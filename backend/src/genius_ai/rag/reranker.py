@@ -0,0 +1,68 @@
+"""Optional cross-encoder reranking of retrieval candidates."""
+
+import asyncio
+from typing import Any
+
+from genius_ai.core.logger import logger
+
+
+class CrossEncoderReranker:
+    """Scores (query, passage) pairs with a local cross-encoder.
+
+    Much more accurate than embedding similarity but costs one forward pass
+    per pair, so it is only applied to the fused top-N candidates.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 32):
+        """Initialize reranker.
+
+        Args:
+            model_name: sentence-transformers CrossEncoder model
+            batch_size: Pairs per forward pass
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model = None
+
+    def _load(self) -> None:
+        from sentence_transformers import CrossEncoder
+
+        logger.info(f"Loading reranker: {self.model_name}")
+        self._model = CrossEncoder(self.model_name)
+
+    def _score(self, query: str, passages: list[str]) -> list[float]:
+        if self._model is None:
+            self._load()
+        scores = self._model.predict(
+            [(query, passage) for passage in passages],
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+        )
+        return [float(score) for score in scores]
+
+    async def rerank(
+        self,
+        query: str,
+        results: list[dict[str, Any]],
+        top_k: int,
+    ) -> list[dict[str, Any]]:
+        """Reorder results by cross-encoder score.
+
+        Args:
+            query: Search query
+            results: Candidates with a ``document`` field
+            top_k: Number of results to keep
+
+        Returns:
+            Best results with ``rerank_score`` added
+        """
+        if not results:
+            return []
+
+        scores = await asyncio.to_thread(
+            self._score, query, [result["document"] for result in results]
+        )
+        for result, score in zip(results, scores):
+            result["rerank_score"] = score
+
+        return sorted(results, key=lambda result: result["rerank_score"], reverse=True)[:top_k]
@@ -1,163 +1,96 @@
 """Document retrieval and chunking for RAG."""
 
-import re
-from dataclasses import dataclass
+import asyncio
+from pathlib import Path
 from typing import Any
 
 from genius_ai.core.config import settings
 from genius_ai.core.logger import logger
+from genius_ai.rag.chunker import Document, DocumentChunker
+from genius_ai.rag.reranker import CrossEncoderReranker
+from genius_ai.rag.sparse import BM25Index
 from genius_ai.rag.vector_store import VectorStore
 
 
-@dataclass
-class Document:
-    """Represents a document chunk."""
+def reciprocal_rank_fusion(
+    rankings: dict[str, list[dict[str, Any]]],
+    k: int = 60,
+) -> list[dict[str, Any]]:
+    """Fuse ranked result lists by reciprocal rank.
 
-    content: str
-    metadata: dict[str, Any]
-    id: str | None = None
+    Args:
+        rankings: Result lists keyed by retriever name, each best first
+        k: Rank constant; larger values flatten the contribution of top ranks
 
+    Returns:
+        Fused results best first, with ``score`` and per-retriever ``ranks``
+    """
+    fused: dict[str, dict[str, Any]] = {}
+    for name, results in rankings.items():
+        for rank, result in enumerate(results, 1):
+            key = result.get("id") or result["document"]
+            entry = fused.get(key)
+            if entry is None:
+                entry = fused[key] = {**result, "score": 0.0, "ranks": {}}
+            entry["score"] += 1.0 / (k + rank)
+            entry["ranks"][name] = rank
+            if "distance" in result:
+                entry["distance"] = result["distance"]
 
-class DocumentChunker:
-    """Splits documents into chunks for embedding."""
-
-    def __init__(
-        self,
-        chunk_size: int | None = None,
-        chunk_overlap: int | None = None,
-    ):
-        """Initialize chunker.
-
-        Args:
-            chunk_size: Maximum chunk size in characters
-            chunk_overlap: Overlap between chunks
-        """
-        self.chunk_size = chunk_size or settings.chunk_size
-        self.chunk_overlap = chunk_overlap or settings.chunk_overlap
-
-    def chunk_text(self, text: str, metadata: dict[str, Any] | None = None) -> list[Document]:
-        """Split text into chunks.
-
-        Args:
-            text: Text to chunk
-            metadata: Metadata to attach to chunks
-
-        Returns:
-            List of document chunks
-        """
-        metadata = metadata or {}
-
-        # Split by paragraphs first
-        paragraphs = re.split(r'\n\s*\n', text)
-
-        chunks = []
-        current_chunk = ""
-
-        for para in paragraphs:
-            para = para.strip()
-            if not para:
-                continue
-
-            # If paragraph fits in current chunk
-            if len(current_chunk) + len(para) + 1 <= self.chunk_size:
-                if current_chunk:
-                    current_chunk += "\n\n" + para
-                else:
-                    current_chunk = para
-            else:
-                # Save current chunk if not empty
-                if current_chunk:
-                    chunks.append(Document(
-                        content=current_chunk,
-                        metadata=metadata.copy(),
-                    ))
-
-                # If paragraph itself is too large, split it
-                if len(para) > self.chunk_size:
-                    sub_chunks = self._split_large_text(para)
-                    chunks.extend([
-                        Document(content=chunk, metadata=metadata.copy())
-                        for chunk in sub_chunks
-                    ])
-                    current_chunk = ""
-                else:
-                    current_chunk = para
-
-        # Add final chunk
-        if current_chunk:
-            chunks.append(Document(
-                content=current_chunk,
-                metadata=metadata.copy(),
-            ))
-
-        logger.info(f"Split text into {len(chunks)} chunks")
-        return chunks
-
-    def _split_large_text(self, text: str) -> list[str]:
-        """Split large text by sentences.
-
-        Args:
-            text: Text to split
-
-        Returns:
-            List of text chunks
-        """
-        # Split by sentences
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-
-        chunks = []
-        current_chunk = ""
-
-        for sentence in sentences:
-            if len(current_chunk) + len(sentence) + 1 <= self.chunk_size:
-                if current_chunk:
-                    current_chunk += " " + sentence
-                else:
-                    current_chunk = sentence
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk)
-
-                # If single sentence is too large, split by words
-                if len(sentence) > self.chunk_size:
-                    words = sentence.split()
-                    temp_chunk = ""
-                    for word in words:
-                        if len(temp_chunk) + len(word) + 1 <= self.chunk_size:
-                            if temp_chunk:
-                                temp_chunk += " " + word
-                            else:
-                                temp_chunk = word
-                        else:
-                            if temp_chunk:
-                                chunks.append(temp_chunk)
-                            temp_chunk = word
-                    current_chunk = temp_chunk
-                else:
-                    current_chunk = sentence
-
-        if current_chunk:
-            chunks.append(current_chunk)
-
-        return chunks
+    return sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)
 
 
 class RAGRetriever:
-    """Retrieval-Augmented Generation system."""
+    """Retrieval-Augmented Generation system.
 
-    def __init__(self, vector_store: VectorStore | None = None):
+    Hybrid retrieval: a BM25 index (exact terms such as formulas or
+    Kiswahili vocabulary) and the dense vector store run concurrently and
+    their rankings are fused with reciprocal rank fusion. An optional
+    cross-encoder then reranks only the fused top-N.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStore | None = None,
+        mode: str | None = None,
+        reranker: CrossEncoderReranker | None = None,
+    ):
         """Initialize RAG retriever.
 
         Args:
             vector_store: Vector store instance
+            mode: "hybrid", "dense" or "sparse" (default from settings)
+            reranker: Reranker (default built from settings.rerank_model)
         """
         self.vector_store = vector_store or VectorStore()
         self.chunker = DocumentChunker()
+        self.sparse_index = BM25Index()
+        self.mode = mode or settings.retrieval_mode
+        if reranker is None and settings.rerank_model:
+            reranker = CrossEncoderReranker(settings.rerank_model)
+        self.reranker = reranker
 
     async def initialize(self) -> None:
-        """Initialize retriever."""
+        """Initialize retriever and rebuild the lexical index from the vector store."""
         await self.vector_store.initialize()
 
+        if self.mode != "dense":
+            stored = await self.vector_store.get_all()
+            self.sparse_index.clear()
+            self.sparse_index.add(
+                ids=[doc["id"] for doc in stored],
+                documents=[doc["document"] for doc in stored],
+                metadatas=[doc["metadata"] for doc in stored],
+            )
+            logger.info(f"Built BM25 index over {len(self.sparse_index)} chunks")
+
+    async def _store(self, chunks: list[Document]) -> None:
+        """Add chunks to the vector store and the lexical index."""
+        documents = [chunk.content for chunk in chunks]
+        metadatas = [chunk.metadata for chunk in chunks]
+        ids = await self.vector_store.add_documents(documents=documents, metadatas=metadatas)
+        self.sparse_index.add(ids=ids, documents=documents, metadatas=metadatas)
+
     async def add_documents(
         self,
         documents: list[str] | list[Document],
@@ -186,20 +119,51 @@ class RAGRetriever:
             else:
                 all_chunks.append(doc)
 
-        # Add to vector store
-        await self.vector_store.add_documents(
-            documents=[chunk.content for chunk in all_chunks],
-            metadatas=[chunk.metadata for chunk in all_chunks],
-        )
+        # Add to vector store and lexical index
+        await self._store(all_chunks)
 
         logger.info(f"Added {len(all_chunks)} document chunks to knowledge base")
         return len(all_chunks)
 
+    async def add_file(
+        self,
+        path: str | Path,
+        metadata: dict[str, Any] | None = None,
+        batch_size: int = 64,
+    ) -> int:
+        """Chunk a file as a stream and add it in batches.
+
+        Args:
+            path: File to add
+            metadata: Metadata to attach to every chunk
+            batch_size: Chunks embedded and stored per batch
+
+        Returns:
+            Number of chunks added
+        """
+        batch: list[Document] = []
+        total = 0
+
+        for chunk in self.chunker.chunk_file(path, metadata):
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                await self._store(batch)
+                total += len(batch)
+                batch = []
+
+        if batch:
+            await self._store(batch)
+            total += len(batch)
+
+        logger.info(f"Added {total} chunks from {path} to knowledge base")
+        return total
+
     async def retrieve(
         self,
         query: str,
         top_k: int | None = None,
         filter_metadata: dict[str, Any] | None = None,
+        mode: str | None = None,
     ) -> list[dict[str, Any]]:
         """Retrieve relevant documents for query.
 
@@ -207,17 +171,47 @@ class RAGRetriever:
             query: Search query
             top_k: Number of results
             filter_metadata: Metadata filters
+            mode: Override the retrieval mode for this query
 
         Returns:
             List of relevant documents
         """
-        results = await self.vector_store.search(
-            query=query,
-            top_k=top_k,
-            filter_metadata=filter_metadata,
-        )
-
-        logger.info(f"Retrieved {len(results)} documents for query")
+        top_k = top_k or settings.top_k_results
+        mode = mode or self.mode
+        # Operator filters ($and, $in, ...) are only understood by Chroma
+        if filter_metadata and any(key.startswith("$") for key in filter_metadata):
+            mode = "dense"
+
+        candidates = max(top_k, settings.retrieval_candidates)
+        if self.reranker:
+            candidates = max(candidates, settings.rerank_top_n)
+
+        rankings: dict[str, list[dict[str, Any]]] = {}
+        if mode == "dense":
+            rankings["dense"] = await self.vector_store.search(
+                query=query, top_k=candidates, filter_metadata=filter_metadata
+            )
+        elif mode == "sparse":
+            rankings["sparse"] = self.sparse_index.search(query, candidates, filter_metadata)
+        else:
+            dense, sparse = await asyncio.gather(
+                self.vector_store.search(
+                    query=query, top_k=candidates, filter_metadata=filter_metadata
+                ),
+                asyncio.to_thread(self.sparse_index.search, query, candidates, filter_metadata),
+            )
+            rankings = {"dense": dense, "sparse": sparse}
+
+        results = reciprocal_rank_fusion(rankings, k=settings.rrf_k)
+
+        if self.reranker and results:
+            results = await self.reranker.rerank(
+                query, results[:settings.rerank_top_n], top_k
+            )
+        else:
+            results = results[:top_k]
+
+        logger.info(f"Retrieved {len(results)} documents for query ({mode})")
         return results
 
     async def retrieve_context(
@@ -0,0 +1,162 @@
+"""In-memory BM25 index for lexical retrieval."""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any
+
+# Unicode words; keeps formulas and codes like H2SO4, CO2, x^2 parts, Kiswahili terms intact
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+STOP_WORDS = frozenset({
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with",
+    "is", "are", "was", "were", "be", "been", "being", "it", "this", "that", "as", "by",
+})
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word tokens without English stop words."""
+    return [token for token in TOKEN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def matches_filter(metadata: dict[str, Any], filter_metadata: dict[str, Any] | None) -> bool:
+    """Equality filter in the simple Chroma ``where`` form ({"key": value})."""
+    if not filter_metadata:
+        return True
+    return all(metadata.get(key) == value for key, value in filter_metadata.items())
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index.
+
+    Documents are identified by the same IDs the vector store uses, so
+    lexical and dense results can be fused. Scoring only touches the
+    postings of the query terms.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """Initialize index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Length normalization strength
+        """
+        self.k1 = k1
+        self.b = b
+
+        self._postings: dict[str, dict[str, int]] = {}  # term -> {doc id: tf}
+        self._lengths: dict[str, int] = {}
+        self._documents: dict[str, str] = {}
+        self._metadatas: dict[str, dict[str, Any]] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(
+        self,
+        ids: list[str],
+        documents: list[str],
+        metadatas: list[dict[str, Any]] | None = None,
+    ) -> None:
+        """Index documents (re-adding an ID replaces it).
+
+        Args:
+            ids: Document IDs
+            documents: Document texts
+            metadatas: Optional metadata per document
+        """
+        metadatas = metadatas or [{} for _ in documents]
+        with self._lock:
+            for doc_id, text, metadata in zip(ids, documents, metadatas):
+                if doc_id in self._documents:
+                    self._remove(doc_id)
+
+                terms = Counter(tokenize(text))
+                for term, tf in terms.items():
+                    self._postings.setdefault(term, {})[doc_id] = tf
+
+                length = sum(terms.values())
+                self._lengths[doc_id] = length
+                self._total_length += length
+                self._documents[doc_id] = text
+                self._metadatas[doc_id] = metadata or {}
+
+    def remove(self, ids: list[str]) -> None:
+        """Drop documents from the index."""
+        with self._lock:
+            for doc_id in ids:
+                if doc_id in self._documents:
+                    self._remove(doc_id)
+
+    def clear(self) -> None:
+        """Drop everything."""
+        with self._lock:
+            self._postings.clear()
+            self._lengths.clear()
+            self._documents.clear()
+            self._metadatas.clear()
+            self._total_length = 0
+
+    def _remove(self, doc_id: str) -> None:
+        for term in set(tokenize(self._documents[doc_id])):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+        del self._documents[doc_id]
+        del self._metadatas[doc_id]
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        filter_metadata: dict[str, Any] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Rank documents for a query.
+
+        Args:
+            query: Search query
+            top_k: Number of results
+            filter_metadata: Equality filters on metadata
+
+        Returns:
+            Results best first, shaped like VectorStore results plus ``score``
+        """
+        with self._lock:
+            n_docs = len(self._documents)
+            if not n_docs:
+                return []
+            avg_length = self._total_length / n_docs
+
+            scores: dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            if filter_metadata:
+                scores = {
+                    doc_id: score for doc_id, score in scores.items()
+                    if matches_filter(self._metadatas[doc_id], filter_metadata)
+                }
+
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            return [
+                {
+                    "document": self._documents[doc_id],
+                    "metadata": self._metadatas[doc_id],
+                    "score": score,
+                    "id": doc_id,
+                }
+                for doc_id, score in best
+            ]
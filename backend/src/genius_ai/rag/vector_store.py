@@ -1,5 +1,6 @@
 """Vector store implementation using ChromaDB."""
 
+import asyncio
 from typing import Any
 from uuid import uuid4
 
@@ -76,6 +77,25 @@ class VectorStore:
         )
         return embedding.tolist()
 
+    def _generate_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for several texts in one batch.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            Embedding vectors
+        """
+        if self._embedding_model is None:
+            raise RuntimeError("Embedding model not initialized")
+
+        embeddings = self._embedding_model.encode(
+            texts,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return embeddings.tolist()
+
     async def add_documents(
         self,
         documents: list[str],
@@ -99,12 +119,13 @@ class VectorStore:
         if ids is None:
             ids = [str(uuid4()) for _ in documents]
 
-        # Generate embeddings
+        # Generate embeddings (one batched encode, off the event loop)
         logger.info(f"Adding {len(documents)} documents to vector store")
-        embeddings = [self._generate_embedding(doc) for doc in documents]
+        embeddings = await asyncio.to_thread(self._generate_embeddings, documents)
 
         # Add to collection
-        self._collection.add(
+        await asyncio.to_thread(
+            self._collection.add,
             documents=documents,
             embeddings=embeddings,
             metadatas=metadatas,
@@ -136,10 +157,11 @@ class VectorStore:
         top_k = top_k or settings.top_k_results
 
         # Generate query embedding
-        query_embedding = self._generate_embedding(query)
+        query_embedding = await asyncio.to_thread(self._generate_embedding, query)
 
         # Search
-        results = self._collection.query(
+        results = await asyncio.to_thread(
+            self._collection.query,
             query_embeddings=[query_embedding],
             n_results=top_k,
             where=filter_metadata,
@@ -158,6 +180,27 @@ class VectorStore:
 
         return formatted_results
 
+    async def get_all(self) -> list[dict[str, Any]]:
+        """Every stored document with its metadata and ID.
+
+        Returns:
+            List of documents
+        """
+        if self._collection is None:
+            await self.initialize()
+
+        results = await asyncio.to_thread(
+            self._collection.get, include=["documents", "metadatas"]
+        )
+        return [
+            {
+                "document": document,
+                "metadata": (results["metadatas"] or [{}] * len(results["ids"]))[i] or {},
+                "id": results["ids"][i],
+            }
+            for i, document in enumerate(results["documents"] or [])
+        ]
+
     async def delete_documents(self, ids: list[str]) -> None:
         """Delete documents by IDs.
 
@@ -175,7 +218,14 @@ class VectorStore:
         if self._collection is None:
             await self.initialize()
 
-        self._collection.delete()
+        # delete() with no ids or filter is rejected by recent ChromaDB
+        # releases, so drop the collection and recreate it empty
+        await asyncio.to_thread(self._client.delete_collection, self.collection_name)
+        self._collection = await asyncio.to_thread(
+            self._client.get_or_create_collection,
+            name=self.collection_name,
+            metadata={"description": "Genius AI knowledge base"},
+        )
         logger.info("Cleared vector store")
 
     def count(self) -> int:
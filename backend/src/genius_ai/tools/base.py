@@ -1,11 +1,19 @@
 """Base tool interface for function calling."""
 
+import asyncio
+import copy
+import json
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
 from typing import Any, Callable
 from enum import Enum
 
+from genius_ai.core.config import settings
 from genius_ai.core.logger import logger
+from genius_ai.core.metrics import metrics
+from genius_ai.tools.sandbox import SandboxError, SandboxPool
 
 
 class ToolCategory(str, Enum):
@@ -39,6 +47,9 @@ class ToolDefinition:
     parameters: list[ToolParameter]
     category: ToolCategory
     returns: str
+    deterministic: bool = False  # Same arguments, same result: memoized by the registry
+    timeout: float | None = None  # Seconds per call (default: settings.tool_default_timeout)
+    max_concurrency: int | None = None  # Concurrent calls of this tool
 
 
 @dataclass
@@ -51,6 +62,33 @@ class ToolResult:
     metadata: dict[str, Any] | None = None
 
 
+@dataclass
+class ToolCall:
+    """A requested tool invocation."""
+
+    name: str
+    arguments: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ToolStats:
+    """Per-tool execution counters."""
+
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    cache_hits: int = 0
+    total_latency: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        executed = self.calls - self.cache_hits
+        return {
+            **asdict(self),
+            "avg_latency": round(self.total_latency / executed, 4) if executed else 0.0,
+            "error_rate": round(self.errors / self.calls, 3) if self.calls else 0.0,
+        }
+
+
 class BaseTool(ABC):
     """Abstract base class for tools."""
 
@@ -123,6 +161,8 @@ class CalculatorTool(BaseTool):
             ],
             category=ToolCategory.COMPUTATION,
             returns="Result of the calculation",
+            deterministic=True,
+            timeout=5.0,
         )
 
     async def execute(self, **kwargs: Any) -> ToolResult:
@@ -174,11 +214,25 @@ class CalculatorTool(BaseTool):
 
 
 class ToolRegistry:
-    """Registry for managing available tools."""
+    """Registry for managing available tools.
 
-    def __init__(self):
-        """Initialize tool registry."""
+    Executes calls with per-tool timeouts and concurrency limits, runs
+    batches of independent calls concurrently, memoizes deterministic
+    tools and keeps per-tool latency/error statistics.
+    """
+
+    def __init__(self, cache_size: int | None = None):
+        """Initialize tool registry.
+
+        Args:
+            cache_size: Memoized results kept for deterministic tools
+        """
         self._tools: dict[str, BaseTool] = {}
+        self._limits: dict[str, asyncio.Semaphore] = {}
+        self._stats: dict[str, ToolStats] = {}
+        self._cache: OrderedDict[str, ToolResult] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[ToolResult | None]] = {}
+        self.cache_size = cache_size if cache_size is not None else settings.tool_cache_size
 
     def register(self, tool: BaseTool) -> None:
         """Register a tool.
@@ -186,8 +240,14 @@ class ToolRegistry:
         Args:
             tool: Tool to register
         """
-        self._tools[tool.definition.name] = tool
-        logger.info(f"Registered tool: {tool.definition.name}")
+        name = tool.definition.name
+        self._tools[name] = tool
+        self._stats.setdefault(name, ToolStats())
+        if tool.definition.max_concurrency:
+            self._limits[name] = asyncio.Semaphore(tool.definition.max_concurrency)
+        else:
+            self._limits.pop(name, None)
+        logger.info(f"Registered tool: {name}")
 
     def get_tool(self, name: str) -> BaseTool | None:
         """Get tool by name.
@@ -216,6 +276,13 @@ class ToolRegistry:
         """
         return [tool.get_schema() for tool in self._tools.values()]
 
+    @staticmethod
+    def _cache_key(name: str, kwargs: dict[str, Any]) -> str | None:
+        try:
+            return f"{name}:{json.dumps(kwargs, sort_keys=True)}"
+        except (TypeError, ValueError):
+            return None  # Unhashable arguments are simply not memoized
+
     async def execute_tool(self, name: str, **kwargs: Any) -> ToolResult:
         """Execute a tool by name.
 
@@ -234,7 +301,124 @@ class ToolRegistry:
                 error=f"Tool '{name}' not found",
             )
 
-        return await tool.execute(**kwargs)
+        key = self._cache_key(name, kwargs) if tool.definition.deterministic else None
+        if key is None:
+            return await self._run(tool, kwargs)
+
+        stats = self._stats[name]
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            stats.calls += 1
+            stats.cache_hits += 1
+            metrics.record_cache("tools", hit=True)
+            return copy.deepcopy(cached)  # Callers may mutate what they get
+
+        # Identical call already running: share its result. None means its
+        # caller was cancelled, so one of the waiters runs the call instead.
+        while (pending := self._inflight.get(key)) is not None:
+            shared = await asyncio.shield(pending)
+            if shared is not None:
+                stats.calls += 1
+                stats.cache_hits += 1
+                metrics.record_cache("tools", hit=True)
+                return copy.deepcopy(shared)
+
+        metrics.record_cache("tools", hit=False)
+        future: asyncio.Future[ToolResult | None] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._run(tool, kwargs)
+        except BaseException:
+            future.set_result(None)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(result)
+        if result.success:
+            self._cache[key] = copy.deepcopy(result)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    async def _run(self, tool: BaseTool, kwargs: dict[str, Any]) -> ToolResult:
+        """Execute with the tool's concurrency limit and timeout, recording stats."""
+        name = tool.definition.name
+        timeout = tool.definition.timeout or settings.tool_default_timeout
+        stats = self._stats[name]
+        limit = self._limits.get(name)
+
+        if limit is not None:
+            await limit.acquire()
+        start = time.perf_counter()
+        outcome = "success"
+        try:
+            result = await asyncio.wait_for(tool.execute(**kwargs), timeout=timeout)
+            if not result.success:
+                outcome = "error"
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            result = ToolResult(
+                success=False,
+                result=None,
+                error=f"Tool '{name}' timed out after {timeout}s",
+            )
+        except Exception as e:
+            logger.error(f"Tool {name} raised: {e}")
+            outcome = "error"
+            result = ToolResult(success=False, result=None, error=str(e))
+        finally:
+            if limit is not None:
+                limit.release()
+
+        elapsed = time.perf_counter() - start
+        stats.calls += 1
+        stats.total_latency += elapsed
+        if outcome != "success":
+            stats.errors += 1
+        if outcome == "timeout":
+            stats.timeouts += 1
+        metrics.tool_latency.observe(elapsed, tool=name)
+        metrics.tool_calls.inc(tool=name, outcome=outcome)
+        return result
+
+    async def execute_batch(
+        self,
+        calls: list[ToolCall],
+        max_concurrency: int | None = None,
+    ) -> list[ToolResult]:
+        """Execute independent tool calls concurrently.
+
+        Args:
+            calls: Tool calls
+            max_concurrency: Calls in flight at once (default: settings.tool_batch_concurrency)
+
+        Returns:
+            Results in the order of ``calls``
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or settings.tool_batch_concurrency)
+
+        async def run(call: ToolCall) -> ToolResult:
+            async with semaphore:
+                return await self.execute_tool(call.name, **call.arguments)
+
+        return list(await asyncio.gather(*(run(call) for call in calls)))
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        """Per-tool calls, errors, timeouts, cache hits and latency percentiles.
+
+        Returns:
+            Stats keyed by tool name
+        """
+        result = {}
+        for name, stats in self._stats.items():
+            entry = stats.to_dict()
+            for label, q in (("p50_latency", 0.5), ("p95_latency", 0.95)):
+                value = metrics.tool_latency.quantile(q, tool=name)
+                entry[label] = round(value, 4) if value is not None else None
+            result[name] = entry
+        return result
 
 
 class SearchTool(BaseTool):
@@ -298,7 +482,23 @@ class SearchTool(BaseTool):
 
 
 class CodeExecutionTool(BaseTool):
-    """Tool for safe code execution (Python)."""
+    """Tool for safe code execution (Python).
+
+    Snippets run in a pool of worker processes with restricted builtins,
+    so timeouts and memory limits are enforced outside the server process.
+    """
+
+    def __init__(self, sandbox: SandboxPool | None = None):
+        """Initialize tool.
+
+        Args:
+            sandbox: Worker pool (default built from settings)
+        """
+        super().__init__()
+        self.sandbox = sandbox or SandboxPool(
+            size=settings.tool_sandbox_workers,
+            memory_limit_mb=settings.tool_sandbox_memory_mb,
+        )
 
     def _get_definition(self) -> ToolDefinition:
         """Get tool definition."""
@@ -321,81 +521,49 @@ class CodeExecutionTool(BaseTool):
             ],
             category=ToolCategory.CODE_EXECUTION,
             returns="Code execution result or error",
+            # The sandbox enforces the snippet's own timeout; this only bounds queueing
+            timeout=settings.tool_sandbox_max_timeout + 10,
         )
 
     async def execute(self, **kwargs: Any) -> ToolResult:
-        """Execute code safely."""
-        try:
-            code = kwargs.get("code", "")
-            timeout = kwargs.get("timeout", 5)
-
-            logger.info(f"Executing code (timeout: {timeout}s)")
-
-            # Create restricted globals with safe builtins
-            import math
-            import datetime
-            import json
-
-            safe_globals = {
-                "__builtins__": {
-                    # Safe built-ins
-                    "abs": abs,
-                    "all": all,
-                    "any": any,
-                    "bool": bool,
-                    "dict": dict,
-                    "enumerate": enumerate,
-                    "filter": filter,
-                    "float": float,
-                    "int": int,
-                    "len": len,
-                    "list": list,
-                    "map": map,
-                    "max": max,
-                    "min": min,
-                    "range": range,
-                    "round": round,
-                    "set": set,
-                    "sorted": sorted,
-                    "str": str,
-                    "sum": sum,
-                    "tuple": tuple,
-                    "zip": zip,
-                    "print": print,
-                },
-                "math": math,
-                "datetime": datetime,
-                "json": json,
-            }
-
-            # Create local namespace for execution
-            local_namespace = {}
-
-            # Execute code
-            exec(code, safe_globals, local_namespace)
+        """Execute code in an isolated worker process."""
+        code = kwargs.get("code", "")
+        timeout = min(float(kwargs.get("timeout") or 5), settings.tool_sandbox_max_timeout)
 
-            # Capture any output or return value
-            result = {
-                "status": "success",
-                "namespace": {k: str(v) for k, v in local_namespace.items() if not k.startswith("_")},
-            }
-
-            logger.info(f"Code executed successfully")
+        logger.info(f"Executing code (timeout: {timeout}s)")
 
+        try:
+            run = await self.sandbox.execute(code, timeout, on_output=kwargs.get("on_output"))
+        except SandboxError as e:
+            logger.warning(f"Code execution stopped: {e}")
             return ToolResult(
-                success=True,
-                result=result,
+                success=False,
+                result=None,
+                error=f"Execution failed: {e}",
                 metadata={"code_length": len(code)},
             )
 
-        except Exception as e:
-            logger.error(f"Code execution error: {e}")
+        if run.error:
+            logger.error(f"Code execution error: {run.error}")
             return ToolResult(
                 success=False,
-                result=None,
-                error=f"Execution failed: {str(e)}",
+                result={"output": run.output} if run.output else None,
+                error=f"Execution failed: {run.error}",
+                metadata={"code_length": len(code), "duration": run.duration},
             )
 
+        logger.info(f"Code executed successfully in {run.duration * 1000:.1f}ms")
+
+        return ToolResult(
+            success=True,
+            result={
+                "status": "success",
+                "output": run.output,
+                "namespace": run.namespace,
+            },
+            metadata={"code_length": len(code), "duration": run.duration},
+        )
+
 
 class WebScrapeTool(BaseTool):
     """Tool for web scraping (placeholder)."""
@@ -0,0 +1,274 @@
+"""Out-of-process sandbox for the code execution tool."""
+
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from genius_ai.core.logger import logger
+
+WORKER_SCRIPT = str(Path(__file__).with_name("sandbox_worker.py"))
+
+OutputCallback = Callable[[str], Awaitable[None] | None]
+
+
+def line_limit(max_output: int) -> int:
+    """Longest protocol line a worker can send for a max_output byte cap.
+
+    The worker caps output, error text and namespace at max_output bytes of
+    UTF-8; JSON escaping grows a byte to at most six (``\\u001f``) and the
+    rest is message framing.
+    """
+    return 6 * max_output + 1024
+
+
+class SandboxError(Exception):
+    """Execution was stopped by the sandbox (timeout, memory, crash)."""
+
+
+def rss_bytes(pid: int) -> int | None:
+    """Resident set size of a process, if it can be read."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+
+        return psutil.Process(pid).memory_info().rss
+    except Exception:
+        return None
+
+
+@dataclass
+class SandboxRun:
+    """Outcome of one sandboxed execution."""
+
+    output: str = ""
+    namespace: dict[str, str] = field(default_factory=dict)
+    error: str | None = None
+    duration: float = 0.0
+
+
+class _Worker:
+    def __init__(self, proc: asyncio.subprocess.Process, reusable: bool):
+        self.proc = proc
+        self.reusable = reusable
+        self.runs = 0
+        self.job_pid: int | None = None  # Forked child running the current job
+
+    async def kill(self) -> None:
+        if self.proc.returncode is None:
+            try:
+                if hasattr(os, "killpg"):
+                    # Takes the forked job child down with the worker
+                    os.killpg(self.proc.pid, signal.SIGKILL)
+                else:
+                    self.proc.kill()
+            except ProcessLookupError:
+                pass
+            await self.proc.wait()
+
+
+class SandboxPool:
+    """Pool of reusable worker processes running untrusted snippets.
+
+    The server's event loop only exchanges JSON lines with the workers, so
+    a runaway snippet can never block it. Each job runs in a child forked
+    from a warm worker, so nothing one snippet changes is visible to the
+    next; where fork is unavailable a worker serves a single job.
+    Wall-clock timeouts and an RSS ceiling (polled while the job runs, plus
+    an address-space rlimit on POSIX) kill the worker and its job, and the
+    worker is then replaced in the background.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        memory_limit_mb: int = 256,
+        max_runs: int = 50,
+        max_output: int = 64 * 1024,
+        poll_interval: float = 0.05,
+    ):
+        """Initialize pool.
+
+        Args:
+            size: Number of workers (concurrent executions)
+            memory_limit_mb: RSS a worker may grow by during a job
+            max_runs: Jobs before a worker is replaced
+            max_output: Bytes (UTF-8) of printed output kept per job
+            poll_interval: Seconds between RSS checks
+        """
+        self.size = size
+        self.memory_limit_mb = memory_limit_mb
+        self.max_runs = max_runs
+        self.max_output = max_output
+        self.poll_interval = poll_interval
+
+        self._idle: asyncio.Queue[_Worker] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._base_rss: int | None = None
+        self.stats = {"runs": 0, "timeouts": 0, "memory_kills": 0, "crashes": 0, "recycled": 0}
+
+    async def _spawn(self) -> _Worker:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, WORKER_SCRIPT, str(self.memory_limit_mb),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=line_limit(self.max_output),
+            start_new_session=hasattr(os, "setsid"),
+        )
+        line = await asyncio.wait_for(proc.stdout.readline(), timeout=30)
+        ready = json.loads(line or "{}")
+        if ready.get("type") != "ready":
+            proc.kill()
+            raise SandboxError("Sandbox worker failed to start")
+        if self._base_rss is None:
+            self._base_rss = rss_bytes(proc.pid)
+        return _Worker(proc, reusable=ready.get("reusable", False))
+
+    async def _ensure_started(self) -> asyncio.Queue[_Worker]:
+        loop = asyncio.get_running_loop()
+        if self._idle is None or self._loop is not loop:
+            # Subprocess pipes are bound to the loop that created them
+            self._loop = loop
+            self._idle = asyncio.Queue()
+            workers = await asyncio.gather(*(self._spawn() for _ in range(self.size)))
+            for worker in workers:
+                self._idle.put_nowait(worker)
+            logger.info(f"Started {self.size} sandbox workers")
+        return self._idle
+
+    def _replace(self, worker: _Worker, reason: str) -> None:
+        self.stats[reason] += 1
+        idle = self._idle
+
+        async def replace() -> None:
+            await worker.kill()
+            try:
+                idle.put_nowait(await self._spawn())
+            except Exception as e:
+                logger.error(f"Could not replace sandbox worker: {e}")
+
+        asyncio.ensure_future(replace())
+
+    async def _watch_memory(self, worker: _Worker) -> None:
+        """Return once the worker exceeds its memory budget."""
+        if self._base_rss is None:
+            await asyncio.Event().wait()  # RSS not observable here; rlimit only
+        limit = self._base_rss + self.memory_limit_mb * 1024 * 1024
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            rss = rss_bytes(worker.job_pid or worker.proc.pid)
+            if rss is not None and rss > limit:
+                return
+
+    async def _read(self, worker: _Worker, on_output: OutputCallback | None) -> SandboxRun:
+        run = SandboxRun()
+        chunks: list[str] = []
+        while True:
+            line = await worker.proc.stdout.readline()
+            if not line:
+                raise SandboxError("Sandbox worker crashed")
+            message = json.loads(line)
+            if message["type"] == "started":
+                worker.job_pid = message["pid"]
+                continue
+            if message["type"] == "output":
+                chunks.append(message["data"])
+                if on_output is not None:
+                    pending = on_output(message["data"])
+                    if asyncio.iscoroutine(pending):
+                        await pending
+                continue
+
+            run.output = "".join(chunks)
+            if message["type"] == "result":
+                run.namespace = message["namespace"]
+            else:
+                run.error = message["error"]
+            return run
+
+    async def execute(
+        self,
+        code: str,
+        timeout: float,
+        on_output: OutputCallback | None = None,
+    ) -> SandboxRun:
+        """Run a snippet in a worker.
+
+        Args:
+            code: Python code (restricted builtins, math/datetime/json available)
+            timeout: Wall-clock limit in seconds
+            on_output: Called with each printed chunk as it arrives
+
+        Returns:
+            Captured output, resulting namespace and any error
+
+        Raises:
+            SandboxError: Timeout, memory limit or worker crash
+        """
+        idle = await self._ensure_started()
+        worker = await idle.get()
+        worker.job_pid = None
+        start = time.perf_counter()
+
+        job = {"code": code, "max_output": self.max_output}
+        worker.proc.stdin.write((json.dumps(job) + "\n").encode())
+
+        reader = asyncio.ensure_future(self._read(worker, on_output))
+        watcher = asyncio.ensure_future(self._watch_memory(worker))
+        try:
+            await worker.proc.stdin.drain()
+            done, _ = await asyncio.wait(
+                {reader, watcher}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+        except BaseException:
+            reader.cancel()
+            watcher.cancel()
+            self._replace(worker, "crashes")
+            raise
+        watcher.cancel()
+
+        if reader not in done:
+            reader.cancel()
+            if watcher in done:
+                self._replace(worker, "memory_kills")
+                raise SandboxError(f"Memory limit of {self.memory_limit_mb} MB exceeded")
+            self._replace(worker, "timeouts")
+            raise SandboxError(f"Execution timed out after {timeout} seconds")
+
+        try:
+            run = reader.result()
+        except (SandboxError, ValueError, KeyError) as e:
+            self._replace(worker, "crashes")
+            raise SandboxError(str(e)) from e
+
+        run.duration = time.perf_counter() - start
+        self.stats["runs"] += 1
+        worker.runs += 1
+        if not worker.reusable or worker.runs >= self.max_runs:
+            self._replace(worker, "recycled")
+        else:
+            idle.put_nowait(worker)
+        return run
+
+    async def close(self) -> None:
+        """Stop idle workers."""
+        if self._idle is None:
+            return
+        while not self._idle.empty():
+            await self._idle.get_nowait().kill()
+        self._idle = None
+
+    def get_stats(self) -> dict[str, Any]:
+        """Execution counters."""
+        return {**self.stats, "size": self.size, "idle": self._idle.qsize() if self._idle else 0}
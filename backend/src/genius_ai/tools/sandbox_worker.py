@@ -0,0 +1,172 @@
+"""Worker process for the code execution sandbox.
+
+Started by ``SandboxPool`` as a standalone script (no genius_ai imports).
+Reads one JSON job per line from stdin and executes it with the same
+restricted builtins the in-process tool used. Where ``os.fork`` exists each
+job runs in a fresh forked child, so nothing a snippet changes (builtins,
+modules, the worker's own globals) survives into the next job; elsewhere
+the worker exits after a single job.
+
+Everything is reported as JSON lines on stdout: a ``started`` message with
+the pid running the job, ``output`` messages as the code prints, then a
+single ``result`` or ``error`` message per job. Printed output, error text
+and the returned namespace are each capped at ``max_output`` bytes of UTF-8,
+which bounds every line the pool has to read.
+"""
+
+import builtins
+import datetime
+import json
+import math
+import os
+import sys
+import traceback
+import types
+
+# Protocol channel; anything else writing to fd 1 would corrupt it
+CHANNEL = os.fdopen(os.dup(1), "w", buffering=1, encoding="utf-8")
+os.dup2(2, 1)
+sys.stdout = sys.stderr
+
+SAFE_BUILTINS = {
+    name: getattr(builtins, name)
+    for name in [
+        "abs", "all", "any", "bool", "dict", "enumerate", "filter", "float", "int", "len",
+        "list", "map", "max", "min", "range", "round", "set", "sorted", "str", "sum",
+        "tuple", "zip",
+    ]
+}
+
+MODULES = [math, datetime, json]
+
+# Per-value cap for the returned namespace
+VALUE_CHARS = 1000
+
+
+def send(message: dict) -> None:
+    CHANNEL.write(json.dumps(message, ensure_ascii=False) + "\n")
+
+
+def clip(text: str, max_bytes: int) -> str:
+    """Truncate text to at most max_bytes of UTF-8."""
+    encoded = text.encode("utf-8", "replace")
+    if len(encoded) <= max_bytes:
+        return text
+    return encoded[:max(max_bytes, 0)].decode("utf-8", "ignore")
+
+
+def limit_memory(memory_mb: int) -> None:
+    """Cap the address space (POSIX); the pool also watches RSS."""
+    try:
+        import resource
+    except ImportError:
+        return
+    try:
+        with open("/proc/self/statm") as f:
+            base = int(f.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError):
+        base = 0
+    limit = base + memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def fresh_module(module: types.ModuleType) -> types.ModuleType:
+    """Per-job copy so one job can't patch math.pi for the next."""
+    copy = types.ModuleType(module.__name__)
+    copy.__dict__.update(module.__dict__)
+    return copy
+
+
+def run(job: dict) -> None:
+    max_output = job.get("max_output", 64 * 1024)
+    sent = 0
+
+    def sandbox_print(*args, sep=" ", end="\n", **_):
+        nonlocal sent
+        if sent >= max_output:
+            return
+        text = sep.join(str(arg) for arg in args) + end
+        size = len(text.encode("utf-8", "replace"))
+        if sent + size > max_output:
+            text = clip(text, max_output - sent) + "\n... [output truncated]\n"
+            size = max_output
+        sent += size
+        send({"type": "output", "data": text})
+
+    safe_globals = {
+        "__builtins__": {**SAFE_BUILTINS, "print": sandbox_print},
+        **{module.__name__: fresh_module(module) for module in MODULES},
+    }
+    local_namespace = {}
+
+    try:
+        exec(job["code"], safe_globals, local_namespace)
+    except MemoryError:
+        send({"type": "error", "error": "Memory limit exceeded"})
+        return
+    except BaseException as e:
+        trace = traceback.extract_tb(e.__traceback__)
+        line = next((frame.lineno for frame in reversed(trace) if frame.filename == "<string>"), None)
+        where = f" (line {line})" if line else ""
+        send({"type": "error", "error": clip(f"{type(e).__name__}: {e}", max_output // 2) + where})
+        return
+
+    namespace = {}
+    budget = max_output
+    for key, value in local_namespace.items():
+        if key.startswith("_"):
+            continue
+        text = clip(str(value)[:VALUE_CHARS], VALUE_CHARS)
+        budget -= len(key.encode("utf-8")) + len(text.encode("utf-8"))
+        if budget < 0:
+            break
+        namespace[key] = text
+    send({"type": "result", "namespace": namespace})
+
+
+def run_child(job: dict) -> None:
+    """Runs in the forked child; never returns."""
+    exit_code = 1
+    try:
+        send({"type": "started", "pid": os.getpid()})
+        run(job)
+        exit_code = 0
+    finally:
+        try:
+            CHANNEL.flush()
+        except BaseException:
+            exit_code = 1
+        os._exit(exit_code)
+
+
+def run_forked(job: dict) -> None:
+    pid = os.fork()
+    if pid == 0:
+        run_child(job)
+
+    _, status = os.waitpid(pid, 0)
+    if os.WIFSIGNALED(status):
+        send({"type": "error", "error": f"Sandbox process killed by signal {os.WTERMSIG(status)}"})
+    elif os.WEXITSTATUS(status) != 0:
+        send({"type": "error", "error": f"Sandbox process exited with code {os.WEXITSTATUS(status)}"})
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        limit_memory(int(sys.argv[1]))
+    forking = hasattr(os, "fork")
+    send({"type": "ready", "reusable": forking})
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        if forking:
+            run_forked(json.loads(line))
+        else:
+            send({"type": "started", "pid": os.getpid()})
+            run(json.loads(line))
+            return
+
+
+if __name__ == "__main__":
+    main()
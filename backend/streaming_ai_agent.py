@@ -11,6 +11,8 @@ import json
 import os
 from groq import Groq
 import asyncio
+import time
+from smart_model_router import ModelProvider, smart_router
 
 router = APIRouter(prefix="/streaming", tags=["Streaming AI"])
 
@@ -33,33 +35,104 @@ class StreamingChatRequest(BaseModel):
     enable_tools: bool = False
 
 
+def completion_tokens(chunk: Any) -> Optional[int]:
+    """Completion tokens reported by the last chunk of a Groq stream, if any"""
+    usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or getattr(chunk, "usage", None)
+    return getattr(usage, "completion_tokens", None)
+
+
 async def stream_groq_response(request: StreamingChatRequest) -> AsyncGenerator[str, None]:
     """
     Stream responses from Groq API token by token
+
+    The requested model goes first; if its circuit breaker is open, or it
+    fails before sending anything, the next routed Groq model takes over.
+    Only time spent waiting on Groq is reported to the router, not time
+    the client takes to read the events.
     """
     try:
         # Convert messages to Groq format
         messages = [{"role": msg.role, "content": msg.content} for msg in request.messages]
-
-        # Create streaming completion
-        stream = groq_client.chat.completions.create(
-            model=request.model,
-            messages=messages,
-            temperature=request.temperature,
-            max_tokens=request.max_tokens,
-            stream=True
+        last_user = next((msg.content for msg in reversed(request.messages) if msg.role == "user"), "")
+        route = smart_router.route_request(
+            last_user,
+            requested_model=request.model,
+            providers=[ModelProvider.GROQ_LLAMA]
         )
 
-        # Stream each chunk
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                content = chunk.choices[0].delta.content
-
-                # Send as SSE format
-                yield f"data: {json.dumps({'type': 'content', 'content': content})}\n\n"
-
-                # Small delay to prevent overwhelming the client
-                await asyncio.sleep(0.001)
+        upstream_ms = 0.0
+
+        async def upstream(fn, *args, **kwargs):
+            """Run a blocking Groq call in a thread, adding its time to upstream_ms"""
+            nonlocal upstream_ms
+            started = time.perf_counter()
+            try:
+                return await asyncio.to_thread(fn, *args, **kwargs)
+            finally:
+                upstream_ms += (time.perf_counter() - started) * 1000
+
+        last_error: Optional[Exception] = None
+        for model in smart_router.models_to_try(route):
+            upstream_ms = 0.0
+            ttft_ms = None
+            text_chars = 0
+            reported_tokens = None
+            sent = False
+            finished = False
+            stream = None
+
+            try:
+                # Create streaming completion
+                stream = await upstream(
+                    groq_client.chat.completions.create,
+                    model=model,
+                    messages=messages,
+                    temperature=request.temperature,
+                    max_tokens=request.max_tokens,
+                    stream=True
+                )
+
+                # Stream each chunk
+                chunks = iter(stream)
+                while True:
+                    chunk = await upstream(next, chunks, None)
+                    if chunk is None:
+                        finished = True
+                        break
+                    reported_tokens = completion_tokens(chunk) or reported_tokens
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        content = chunk.choices[0].delta.content
+                        if ttft_ms is None:
+                            ttft_ms = upstream_ms
+                        text_chars += len(content)
+
+                        # Send as SSE format
+                        sent = True
+                        yield f"data: {json.dumps({'type': 'content', 'content': content})}\n\n"
+
+                        # Small delay to prevent overwhelming the client
+                        await asyncio.sleep(0.001)
+            except Exception as e:
+                smart_router.record_result(model, upstream_ms, error=e)
+                if sent:
+                    raise
+                print(f"Streaming with {model} failed, trying the next model: {e}")
+                last_error = e
+                continue
+            finally:
+                # Error or client gone: release the upstream connection
+                if not finished and stream is not None and hasattr(stream, "close"):
+                    try:
+                        stream.close()
+                    except Exception:
+                        pass
+
+            # Usage from Groq when reported, else ~4 characters per token
+            tokens = reported_tokens or round(text_chars / 4)
+            smart_router.record_result(model, upstream_ms, ttft_ms, tokens)
+            break
+        else:
+            raise last_error or RuntimeError("No model could serve the request")
 
         # Send completion signal
         yield f"data: {json.dumps({'type': 'done'})}\n\n"
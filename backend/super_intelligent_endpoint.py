@@ -5,7 +5,6 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from groq import Groq
 from typing import Optional, List, Dict
-import base64
 import uvicorn
 import os
 from datetime import datetime, timedelta
@@ -17,6 +16,7 @@ import httpx
 import asyncio
 import PyPDF2
 from docx import Document
+from image_pipeline import PreparedImage, prepare_image_async, prepare_pdf_page, vision_cache
 
 # Import RAG system
 try:
@@ -132,7 +132,7 @@ except Exception as e:
 
 # Import smart model router
 try:
-    from smart_model_router import smart_router
+    from smart_model_router import ModelProvider, smart_router
     smart_routing_available = True
 except Exception as e:
     print(f"Smart routing not available: {e}")
@@ -224,6 +224,30 @@ if claude_available:
 if smart_routing_available:
     print("✅ Smart Model Routing enabled!")
 
+
+def record_model_call(model: str, started: datetime, tokens: int = 0, error: Optional[Exception] = None):
+    """Report a non-streaming completion's latency/outcome to the smart router"""
+    if smart_routing_available:
+        duration_ms = (datetime.now() - started).total_seconds() * 1000
+        smart_router.record_result(model, duration_ms, tokens=tokens, error=error)
+
+
+def chat_models(message: str, requested_model: str):
+    """
+    Groq models to try for a chat request, in order
+
+    The requested model first; when its circuit breaker is open (or it
+    fails) the smart router's next Groq model takes over.
+    """
+    if not smart_routing_available:
+        return [requested_model]
+    route = smart_router.route_request(
+        message,
+        requested_model=requested_model,
+        providers=[ModelProvider.GROQ_LLAMA]
+    )
+    return smart_router.models_to_try(route)
+
 # Include simple terminal executor (overrides websocket terminal)
 if simple_terminal_available:
     app.include_router(simple_terminal_router)
@@ -258,7 +282,7 @@ if rag_available:
 
 # Rate limiting
 rate_limit_store = defaultdict(list)
-RATE_LIMIT_REQUESTS = 60
+RATE_LIMIT_REQUESTS = int(os.getenv("RATE_LIMIT_REQUESTS", "60"))  # Env-overridable so load tests can raise it
 RATE_LIMIT_WINDOW = 60
 
 # Super intelligent system prompt - PRACTICAL and DIRECT
@@ -333,68 +357,6 @@ async def rate_limit_middleware(request: Request, call_next):
             raise HTTPException(status_code=429, detail="Rate limit exceeded")
     return await call_next(request)
 
-def extract_image_metadata(image_data: str) -> dict:
-    """Extract comprehensive image metadata"""
-    try:
-        if ',' in image_data:
-            image_data = image_data.split(',')[1]
-
-        image_bytes = base64.b64decode(image_data)
-        image = Image.open(io.BytesIO(image_bytes))
-
-        # Get detailed info
-        width, height = image.size
-        aspect_ratio = width / height if height > 0 else 1
-
-        # Determine aspect ratio name
-        aspect_name = "Unknown"
-        if 1.76 < aspect_ratio < 1.79:
-            aspect_name = "16:9 (Widescreen)"
-        elif 1.32 < aspect_ratio < 1.34:
-            aspect_name = "4:3 (Standard)"
-        elif 0.9 < aspect_ratio < 1.1:
-            aspect_name = "1:1 (Square)"
-        elif 1.49 < aspect_ratio < 1.51:
-            aspect_name = "3:2 (DSLR)"
-
-        # Resolution category
-        pixel_count = width * height
-        if pixel_count >= 8000000:  # 8MP+
-            resolution_category = "Ultra High (4K+)"
-        elif pixel_count >= 2000000:  # 2MP+
-            resolution_category = "High (Full HD)"
-        elif pixel_count >= 500000:
-            resolution_category = "Medium (HD)"
-        else:
-            resolution_category = "Low (SD)"
-
-        metadata = {
-            "format": image.format or "Unknown",
-            "mode": image.mode,
-            "width": width,
-            "height": height,
-            "aspect_ratio": aspect_ratio,
-            "aspect_name": aspect_name,
-            "pixel_count": pixel_count,
-            "resolution_category": resolution_category,
-            "file_size_kb": len(image_bytes) / 1024,
-            "file_size_mb": len(image_bytes) / (1024 * 1024),
-            "has_transparency": image.mode in ('RGBA', 'LA', 'P'),
-            "color_mode_detail": {
-                "RGB": "Full Color",
-                "RGBA": "Full Color with Transparency",
-                "L": "Grayscale",
-                "LA": "Grayscale with Transparency",
-                "P": "Palette Mode"
-            }.get(image.mode, "Other"),
-            "bits_per_pixel": len(image.mode) * 8,
-            "estimated_quality": "High" if len(image_bytes) / pixel_count > 0.5 else "Compressed"
-        }
-
-        return metadata
-    except Exception as e:
-        return {"error": str(e)}
-
 async def multi_model_ensemble(prompt: str, context: str = "") -> Dict[str, any]:
     """Query multiple AI models and synthesize the best answer for maximum intelligence"""
 
@@ -538,10 +500,24 @@ NO "STAGE 1, STAGE 2" nonsense. Just answer the questions properly."""
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-async def super_intelligent_image_analysis(image_data: str, message: str, filename: str = "") -> Dict[str, any]:
-    """Real vision analysis using Groq's Llama 4 Scout Vision model"""
+VISION_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+
+async def super_intelligent_image_analysis(image_data, message: str, filename: str = "", cache_task: Optional[str] = None) -> Dict[str, any]:
+    """Real vision analysis using Groq's Llama 4 Scout Vision model
+
+    image_data is a data URL, raw upload bytes or an already PreparedImage;
+    decoding happens here so a corrupt upload gets the usual error reply.
+    Results are cached per image and task (cache_task, default the
+    message), so re-uploading the same file skips the vision call.
+    """
 
     try:
+        image = image_data if isinstance(image_data, PreparedImage) else await prepare_image_async(image_data)
+        task = cache_task if cache_task is not None else message
+        cached = vision_cache.get(image, VISION_MODEL, task)
+        if cached is not None:
+            return {**cached, "tokens": 0, "metadata": {"cached": True}}
+
         # Use Groq's actual vision model - Llama 4 Scout 17B
         # This model can actually SEE the image!
 
@@ -568,6 +544,7 @@ async def super_intelligent_image_analysis(image_data: str, message: str, filena
 
 Be thorough, specific, and detailed in your initial description. Read and transcribe ALL visible text."""
 
+        image_url = await image.data_url_async(VISION_MODEL)
         messages = [
             {
                 "role": "user",
@@ -579,7 +556,7 @@ Be thorough, specific, and detailed in your initial description. Read and transc
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": image_data
+                            "url": image_url
                         }
                     }
                 ]
@@ -587,7 +564,7 @@ Be thorough, specific, and detailed in your initial description. Read and transc
         ]
 
         completion = groq_client.chat.completions.create(
-            model="meta-llama/llama-4-scout-17b-16e-instruct",
+            model=VISION_MODEL,
             messages=messages,
             temperature=0.7,
             max_tokens=8000,
@@ -596,12 +573,14 @@ Be thorough, specific, and detailed in your initial description. Read and transc
         response_text = completion.choices[0].message.content
         tokens_used = completion.usage.total_tokens if hasattr(completion, 'usage') else 0
 
-        return {
+        result = {
             "response": response_text,
             "reasoning_steps": None,
             "tokens": tokens_used,
             "metadata": {}
         }
+        vision_cache.put(image, VISION_MODEL, task, result)
+        return result
     except Exception as e:
         return {"response": f"Vision analysis error: {str(e)}\n\nPlease make sure the image is in a supported format (JPEG, PNG, GIF, WebP).", "reasoning_steps": None}
 
@@ -630,6 +609,13 @@ def health():
         "reasoning_engine": "chain-of-thought"
     }
 
+@app.get("/routing/stats")
+def routing_stats():
+    """Live per-model latency, throughput, error rate and circuit breaker state"""
+    if not smart_routing_available:
+        raise HTTPException(status_code=503, detail="Smart routing not available")
+    return smart_router.get_stats()
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """Super intelligent chat with chain-of-thought reasoning"""
@@ -710,12 +696,26 @@ async def chat(request: ChatRequest):
             )
         else:
             # Standard super intelligent mode
-            completion = groq_client.chat.completions.create(
-                model=request.model,
-                messages=messages,
-                temperature=request.temperature,
-                max_tokens=request.max_tokens,
-            )
+            completion, last_error = None, None
+            for model in chat_models(request.message, request.model):
+                call_start = datetime.now()
+                try:
+                    completion = await asyncio.to_thread(
+                        groq_client.chat.completions.create,
+                        model=model,
+                        messages=messages,
+                        temperature=request.temperature,
+                        max_tokens=request.max_tokens,
+                    )
+                except Exception as e:
+                    record_model_call(model, call_start, error=e)
+                    last_error = e
+                    continue
+                usage = getattr(completion, "usage", None)
+                record_model_call(model, call_start, tokens=getattr(usage, "completion_tokens", 0) or 0)
+                break
+            if completion is None:
+                raise last_error
 
             processing_time = (datetime.now() - start_time).total_seconds()
 
@@ -751,13 +751,11 @@ async def upload_file(
 
         # Images
         if file.content_type and file.content_type.startswith('image/'):
-            base64_image = base64.b64encode(contents).decode('utf-8')
-            data_url = f"data:{file.content_type};base64,{base64_image}"
-
             result = await super_intelligent_image_analysis(
-                data_url,
+                contents,
                 f"{message}\n\nFilename: {file.filename}",
-                file.filename
+                file.filename,
+                cache_task=message
             )
 
             processing_time = (datetime.now() - start_time).total_seconds()
@@ -809,21 +807,16 @@ async def upload_file(
                         for page_num in range(pages_to_analyze):
                             page = pdf_document[page_num]
 
-                            # Render page to image at 2x resolution
-                            mat = fitz.Matrix(2, 2)
-                            pix = page.get_pixmap(matrix=mat)
-
-                            # Convert to PNG bytes
-                            img_bytes = pix.tobytes("png")
-                            img_base64 = base64.b64encode(img_bytes).decode('utf-8')
-                            data_url = f"data:image/png;base64,{img_base64}"
+                            # Render page just large enough for the vision model
+                            page_image = await asyncio.to_thread(prepare_pdf_page, page)
 
                             print(f"🔍 Analyzing page {page_num+1} with vision AI...")
 
                             vision_result = await super_intelligent_image_analysis(
-                                data_url,
+                                page_image,
                                 f"Read and extract ALL text, questions, and content from this page {page_num+1} of the PDF: {file.filename}",
-                                f"Page {page_num+1}"
+                                f"Page {page_num+1}",
+                                cache_task="extract page content"
                             )
                             vision_responses.append(f"**Page {page_num+1}:**\n{vision_result['response']}")
 
@@ -1149,13 +1142,9 @@ async def vision_analysis(
         if len(image_data) > 20 * 1024 * 1024:
             raise HTTPException(status_code=413, detail="Image too large. Maximum 20MB.")
 
-        # Convert to base64 data URL
-        image_base64 = base64.b64encode(image_data).decode('utf-8')
-        data_url = f"data:{image.content_type};base64,{image_base64}"
-
         # Use existing super_intelligent_image_analysis function
         result = await super_intelligent_image_analysis(
-            data_url,
+            image_data,
             message,
             image.filename
         )
@@ -0,0 +1,10 @@
+"""Shared pytest setup: make ``genius_ai`` (src/) and the flat backend modules importable."""
+
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+for path in (BACKEND / "src", BACKEND):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
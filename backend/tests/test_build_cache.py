@@ -0,0 +1,86 @@
+"""Regression tests for the sandbox build cache."""
+
+import asyncio
+import gc
+import shutil
+
+import pytest
+
+from ultimate_ai.sandbox.build_cache import BuildCache
+from ultimate_ai.sandbox.code_executor import CodeExecutor
+
+
+def store(cache: BuildCache, key: str, size: int):
+    build_dir = cache.new_build_dir()
+    (build_dir / "program.exe").write_bytes(b"x" * size)
+    return cache.put(key, build_dir)
+
+
+def test_locks_are_dropped_once_released(tmp_path):
+    cache = BuildCache(tmp_path)
+
+    async def build(key):
+        async with cache.lock(key):
+            await asyncio.sleep(0)
+
+    async def main():
+        await asyncio.gather(*(build(f"key-{i}") for i in range(50)))
+
+    asyncio.run(main())
+    gc.collect()
+    assert len(cache._locks) == 0
+
+
+def test_put_evicts_lru_without_rescanning(tmp_path, monkeypatch):
+    cache = BuildCache(tmp_path, max_bytes=250)
+    store(cache, "a", 100)
+    store(cache, "b", 100)
+    assert cache.get("a") is not None  # "b" is now least recently used
+
+    measured = []
+    entry_size = BuildCache._entry_size
+    monkeypatch.setattr(BuildCache, "_entry_size",
+                        staticmethod(lambda entry: measured.append(entry.name) or entry_size(entry)))
+    store(cache, "c", 100)
+
+    assert measured == ["c"]
+    assert not (tmp_path / "b").exists()
+    assert (tmp_path / "a").is_dir() and (tmp_path / "c").is_dir()
+    assert cache.stats["evictions"] == 1
+
+
+def test_pinned_entry_survives_eviction(tmp_path):
+    cache = BuildCache(tmp_path, max_bytes=150)
+    with cache.pin("a"):
+        entry = store(cache, "a", 100)
+        store(cache, "b", 100)
+        assert entry.is_dir()
+        assert not (tmp_path / "b").exists()
+    store(cache, "c", 100)
+    assert not entry.exists()
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    cache = BuildCache(tmp_path, max_bytes=150)
+    store(cache, "a", 100)
+    reopened = BuildCache(tmp_path, max_bytes=150)
+    store(reopened, "b", 100)
+    assert not (tmp_path / "a").exists()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc not installed")
+async def test_program_runs_while_other_builds_evict_it(tmp_path):
+    executor = CodeExecutor(python_workers=0, build_cache=BuildCache(tmp_path, max_bytes=1))
+    slow = '#include <unistd.h>\n#include <stdio.h>\nint main() { sleep(1); puts("slow"); return 0; }'
+    fast = '#include <stdio.h>\nint main() { puts("fast"); return 0; }'
+
+    slow_run = asyncio.create_task(executor.execute(slow, "c", timeout=10))
+    for _ in range(200):  # Until the slow build is in the cache and running
+        if any(tmp_path.iterdir()) and not any(p.name.startswith(".build-") for p in tmp_path.iterdir()):
+            break
+        await asyncio.sleep(0.05)
+    fast_result = await executor.execute(fast, "c", timeout=10)
+
+    assert fast_result["stdout"] == "fast\n"
+    assert (await slow_run)["stdout"] == "slow\n"
@@ -0,0 +1,57 @@
+"""Regression tests for Ollama KV context reuse in CoreIntelligence."""
+
+import pytest
+
+from ultimate_ai.core_intelligence import CoreIntelligence, Message
+from ultimate_ai.ollama_client import OllamaChunk
+
+
+class FakeOllama:
+    """Records the context each generation was sent with."""
+
+    def __init__(self):
+        self.contexts = []
+        self.turn = 0
+
+    async def stream_generate(self, prompt, context=None, **_):
+        self.contexts.append(context)
+        self.turn += 1
+        yield OllamaChunk(text=f"reply {self.turn}")
+        yield OllamaChunk(text="", done=True, context=[self.turn])
+
+
+def add_turn(history, user, assistant):
+    history += [Message(role="user", content=user), Message(role="assistant", content=assistant)]
+    del history[:-50]  # Capped like AgentOrchestrator._add_to_history
+
+
+@pytest.fixture
+def core():
+    core = CoreIntelligence()
+    core.client = FakeOllama()
+    return core
+
+
+@pytest.mark.asyncio
+async def test_context_reused_for_the_next_general_turn(core):
+    history = [Message(role="user", content=f"m{i}") for i in range(50)]
+
+    reply = await core.chat("first", history=history, conversation_id="c")
+    add_turn(history, "first", reply)
+    await core.chat("second", history=history, conversation_id="c")
+
+    assert core.client.contexts == [None, [1]]
+
+
+@pytest.mark.asyncio
+async def test_context_dropped_after_a_turn_it_did_not_see(core):
+    history = [Message(role="user", content=f"m{i}") for i in range(50)]
+
+    reply = await core.chat("first", history=history, conversation_id="c")
+    add_turn(history, "first", reply)
+    # Another agent answers; the capped history length stays at 50
+    add_turn(history, "solve x^2 = 4", "x = 2 or x = -2")
+    assert len(history) == 50
+    await core.chat("second", history=history, conversation_id="c")
+
+    assert core.client.contexts == [None, None]
@@ -0,0 +1,70 @@
+"""Regression tests for the background checkpoint writer in cpu_training.py."""
+
+import json
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from transformers import GPT2Config, GPT2LMHeadModel, TrainerState  # noqa: E402
+
+from cpu_training import AsyncCheckpointCallback  # noqa: E402
+
+
+def train_step(model, optimizer, scheduler):
+    input_ids = torch.randint(0, model.config.vocab_size, (2, 8))
+    model(input_ids=input_ids, labels=input_ids).loss.backward()
+    optimizer.step()
+    scheduler.step()
+    optimizer.zero_grad()
+
+
+@pytest.fixture
+def training():
+    torch.manual_seed(0)
+    model = GPT2LMHeadModel(GPT2Config(vocab_size=32, n_positions=16, n_embd=16, n_layer=1, n_head=2))
+    optimizer = torch.optim.AdamW(model.parameters(), lr=1e-3)
+    scheduler = torch.optim.lr_scheduler.LambdaLR(optimizer, lambda step: 1.0 / (step + 1))
+    train_step(model, optimizer, scheduler)
+    return model, optimizer, scheduler
+
+
+def test_checkpoint_holds_everything_resume_needs(tmp_path, training):
+    model, optimizer, scheduler = training
+    callback = AsyncCheckpointCallback(str(tmp_path), save_steps=2)
+    state = TrainerState(global_step=2, max_steps=10)
+
+    callback.on_step_end(None, state, None, model=model, optimizer=optimizer, lr_scheduler=scheduler)
+    expected_weights = {name: tensor.clone() for name, tensor in model.state_dict().items()}
+    expected_optimizer = optimizer.state_dict()["state"][0]["exp_avg"].clone()
+    # Training carries on while the checkpoint is written
+    train_step(model, optimizer, scheduler)
+    state.global_step = 3
+    callback.on_train_end(None, state, None)
+
+    target = tmp_path / "checkpoint-2"
+    for name in ("optimizer.pt", "scheduler.pt", "rng_state.pth", "trainer_state.json"):
+        assert (target / name).is_file(), name
+
+    assert json.loads((target / "trainer_state.json").read_text())["global_step"] == 2
+    saved_optimizer = torch.load(target / "optimizer.pt", weights_only=False)
+    assert torch.equal(saved_optimizer["state"][0]["exp_avg"], expected_optimizer)
+    assert torch.load(target / "scheduler.pt", weights_only=False)["last_epoch"] == 1
+    assert set(torch.load(target / "rng_state.pth", weights_only=False)) >= {"python", "numpy", "cpu"}
+
+    restored = GPT2LMHeadModel.from_pretrained(target)
+    for name, tensor in restored.state_dict().items():
+        assert torch.equal(tensor, expected_weights[name]), name
+
+
+def test_save_total_limit_rotates_old_checkpoints(tmp_path, training):
+    model, optimizer, scheduler = training
+    callback = AsyncCheckpointCallback(str(tmp_path), save_steps=1, save_total_limit=2)
+
+    for step in range(1, 4):
+        state = TrainerState(global_step=step)
+        callback.on_step_end(None, state, None, model=model, optimizer=optimizer, lr_scheduler=scheduler)
+    callback.on_train_end(None, state, None)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["checkpoint-2", "checkpoint-3"]
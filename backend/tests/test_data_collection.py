@@ -0,0 +1,121 @@
+"""Regression tests for resumable data collection (data_collection/)."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "data_collection"))
+
+from crawler import Checkpoint, JsonlWriter  # noqa: E402
+from stackoverflow_scraper import StackOverflowScraper  # noqa: E402
+from wikipedia_downloader import WikipediaDownloader  # noqa: E402
+
+
+class FakeStackOverflow(StackOverflowScraper):
+    """Serves one page of questions; can stop the crawl after N answers."""
+
+    def __init__(self, output_dir, questions, crash_after=None):
+        super().__init__(output_dir)
+        self.questions = questions
+        self.crash_after = crash_after
+        self.answered = 0
+
+    async def fetch_json(self, url, params=None):
+        if url.endswith("/questions"):
+            return {"items": self.questions, "has_more": False}
+        if self.crash_after is not None and self.answered >= self.crash_after:
+            raise ConnectionResetError("crawl killed")
+        self.answered += 1
+        question_id = int(url.split("/")[-2])
+        return {"items": [{"answer_id": question_id * 10, "score": 50, "is_accepted": True,
+                           "body": "<p>answer</p>"}]}
+
+
+class FakeWikipedia(WikipediaDownloader):
+    def __init__(self, output_dir, titles):
+        super().__init__(output_dir)
+        self.titles = titles
+        self.fetched = []
+
+    async def fetch_json(self, url, params=None):
+        if params["action"] == "opensearch":
+            return [params["search"], self.titles]
+        self.fetched.append(params["titles"])
+        # The API normalises the title it was asked for
+        title = params["titles"].replace("_", " ")
+        return {"query": {"pages": {"1": {"title": title, "extract": f"{title} text"}}}}
+
+
+def read_ids(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["metadata"]["question_id"] for line in f if line.strip()]
+
+
+@pytest.mark.asyncio
+async def test_stackoverflow_resume_after_crash_writes_no_duplicates(tmp_path):
+    questions = [{"question_id": i, "title": f"Q{i}", "body": "<p>q</p>", "score": 20}
+                 for i in range(1, 41)]
+    combined = JsonlWriter(tmp_path / "combined_stackoverflow.jsonl")
+
+    with pytest.raises(ConnectionResetError):
+        await FakeStackOverflow(tmp_path, questions, crash_after=30).scrape_by_tags(
+            ["python"], combined=combined)
+
+    # A hard kill can leave written records whose keys never reached the log
+    done_log = tmp_path / "python_checkpoint_done.jsonl"
+    done_log.write_text("".join(done_log.read_text().splitlines(True)[:10]))
+
+    await FakeStackOverflow(tmp_path, questions).scrape_by_tags(["python"], combined=combined)
+    combined.close()
+
+    assert sorted(read_ids(tmp_path / "python.jsonl")) == list(range(1, 41))
+    assert sorted(read_ids(combined.path)) == list(range(1, 41))
+
+
+@pytest.mark.asyncio
+async def test_record_written_but_not_logged_counts_as_done(tmp_path):
+    output = tmp_path / "python.jsonl"
+    output.write_text(json.dumps({"metadata": {"question_id": 7}}) + "\n", encoding="utf-8")
+
+    checkpoint = Checkpoint(tmp_path / "python_checkpoint.json", records=output,
+                            record_key=lambda record: record["metadata"]["question_id"])
+
+    assert checkpoint.is_done(7)
+
+
+def test_done_keys_are_appended_not_rewritten(tmp_path):
+    checkpoint = Checkpoint(tmp_path / "state.json")
+    for key in range(100):
+        checkpoint.mark_done(key)
+
+    lines = checkpoint.done_path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 100
+    assert Checkpoint(tmp_path / "state.json").done == set(range(100))
+
+
+def test_legacy_checkpoint_keys_are_kept(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"done": [1, 2], "state": {"next_page": 3}}), encoding="utf-8")
+
+    checkpoint = Checkpoint(path)
+
+    assert checkpoint.done == {1, 2}
+    assert checkpoint.state == {"next_page": 3}
+    assert Checkpoint(path).done == {1, 2}
+
+
+@pytest.mark.asyncio
+async def test_wikipedia_rerun_uses_requested_titles(tmp_path):
+    titles = ["Python_(language)", "Guido_van_Rossum"]
+    first = FakeWikipedia(tmp_path, titles)
+    await first.download_topics(["Python"])
+
+    # Only the output survives (e.g. the done log was lost)
+    Checkpoint(tmp_path / "wikipedia_checkpoint.json").done_path.unlink()
+    second = FakeWikipedia(tmp_path, titles)
+    total = await second.download_topics(["Python"])
+
+    assert second.fetched == []
+    assert total == 2
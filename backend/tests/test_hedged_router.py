@@ -0,0 +1,54 @@
+"""Regression tests for the hedged vision router."""
+
+import asyncio
+
+import pytest
+
+from hedged_router import HedgedRouter
+
+
+def tripped_router(model_id: str) -> HedgedRouter:
+    """A router whose circuit for model_id has opened and cooled down, plus a slow backup"""
+    router = HedgedRouter(hedge_delay=10, failure_threshold=1, cooldown=60)
+    router.record_failure(model_id, 1.0)
+    router.health[model_id].open_until = 1.0  # Cooldown long over
+    router.record_success("backup", 100.0)  # Slow, so the tripped model ranks first
+    return router
+
+
+@pytest.mark.asyncio
+async def test_half_open_admits_a_single_probe():
+    router = tripped_router("flaky")
+    release = asyncio.Event()
+    calls = []
+
+    async def call(model_id):
+        calls.append(model_id)
+        if model_id == "flaky":
+            await release.wait()
+        return f"answer from {model_id}"
+
+    probe = asyncio.create_task(router.run(["flaky", "backup"], call))
+    await asyncio.sleep(0)
+    others = await asyncio.gather(*(router.run(["flaky", "backup"], call) for _ in range(3)))
+
+    assert calls.count("flaky") == 1
+    assert others == [("backup", "answer from backup")] * 3
+
+    release.set()
+    assert await probe == ("flaky", "answer from flaky")
+    assert router.health["flaky"].state(0) == "closed"
+    assert await router.run(["flaky"], call) == ("flaky", "answer from flaky")
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_reopens_the_circuit():
+    router = tripped_router("flaky")
+
+    async def call(model_id):
+        return None if model_id == "flaky" else "ok"
+
+    assert await router.run(["flaky", "backup"], call) == ("backup", "ok")
+    health = router.health["flaky"]
+    assert not health.probing
+    assert router.rank(["flaky", "backup"]) == ["backup"]
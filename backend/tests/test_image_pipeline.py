@@ -0,0 +1,63 @@
+"""Regression tests for the shared image pipeline."""
+
+import asyncio
+import io
+import threading
+
+import pytest
+from PIL import Image
+
+import image_pipeline
+from image_pipeline import prepare_image, prepare_image_async
+
+
+def png_bytes(size=(3000, 2000)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_prepare_and_encode_run_off_the_event_loop(monkeypatch):
+    loop_thread = threading.get_ident()
+    threads = []
+
+    prepare = image_pipeline.prepare_image
+    encode = image_pipeline.PreparedImage._encode
+
+    def recording_prepare(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return prepare(*args, **kwargs)
+
+    def recording_encode(self, max_side):
+        threads.append(threading.get_ident())
+        return encode(self, max_side)
+
+    monkeypatch.setattr(image_pipeline, "prepare_image", recording_prepare)
+    monkeypatch.setattr(image_pipeline.PreparedImage, "_encode", recording_encode)
+
+    data = png_bytes()
+    image = await prepare_image_async(data, "image/png")
+    url = await image.data_url_async()
+
+    assert len(threads) == 2
+    assert loop_thread not in threads
+    assert url == prepare(data, "image/png").data_url_for()
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_while_encoding():
+    image = prepare_image(png_bytes((4000, 4000)), "image/png")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    task = asyncio.create_task(ticker())
+    await image.data_url_async()
+    task.cancel()
+
+    assert ticks > 1
@@ -0,0 +1,72 @@
+"""Regression tests for the int8 CPU inference engine and its KV-cache reuse."""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+tokenizers = pytest.importorskip("tokenizers")
+
+from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast  # noqa: E402
+from transformers.pytorch_utils import Conv1D  # noqa: E402
+
+from genius_ai.inference.engine import LocalInferenceEngine, SamplingParams  # noqa: E402
+
+GREEDY = SamplingParams(max_new_tokens=6, do_sample=False)
+WORDS = "the cat dog sat on a mat and ran far away home".split()
+
+
+@pytest.fixture(scope="module")
+def checkpoint(tmp_path_factory):
+    """Tiny random GPT-2 with a word-level tokenizer, saved like a fine-tuned run"""
+    from tokenizers.models import WordLevel
+    from tokenizers.pre_tokenizers import WhitespaceSplit
+
+    path = tmp_path_factory.mktemp("tiny-gpt2")
+    vocab = {token: i for i, token in enumerate(["[UNK]", "<eos>", *WORDS])}
+    backend = tokenizers.Tokenizer(WordLevel(vocab, unk_token="[UNK]"))
+    backend.pre_tokenizer = WhitespaceSplit()
+    PreTrainedTokenizerFast(tokenizer_object=backend, unk_token="[UNK]", eos_token="<eos>").save_pretrained(path)
+
+    torch.manual_seed(0)
+    config = GPT2Config(vocab_size=len(vocab), n_positions=64, n_embd=32, n_layer=2, n_head=2,
+                        bos_token_id=1, eos_token_id=1)
+    GPT2LMHeadModel(config).save_pretrained(path)
+    return path
+
+
+def test_load_quantizes_conv1d_layers(checkpoint):
+    engine = LocalInferenceEngine(checkpoint, quantize=True).load()
+    modules = list(engine._model.modules())
+
+    assert not any(isinstance(module, Conv1D) for module in modules)
+    assert any(isinstance(module, torch.ao.nn.quantized.dynamic.Linear) for module in modules)
+    assert isinstance(engine._model.lm_head, torch.nn.Linear)
+
+
+@pytest.mark.parametrize("quantize", [True, False])
+def test_follow_up_turn_prefills_only_the_new_suffix(checkpoint, quantize):
+    engine = LocalInferenceEngine(checkpoint, quantize=quantize)
+    first = engine.generate("the cat sat on a mat", GREEDY, session_id="chat")
+    cached_ids = list(engine._sessions["chat"].token_ids)
+
+    history = engine.tokenizer.decode(cached_ids)
+    follow_up = engine.generate(f"{history} and ran far", GREEDY, session_id="chat")
+
+    assert first.reused_tokens == 0
+    assert follow_up.reused_tokens == len(cached_ids)
+    assert follow_up.prompt_tokens == len(cached_ids) + 3
+
+    if not quantize:
+        # Unquantized decoding is exact: the cached turn matches a cold prefill
+        cold = LocalInferenceEngine(checkpoint, quantize=False).generate(f"{history} and ran far", GREEDY)
+        assert follow_up.text == cold.text
+
+
+def test_diverging_prompt_drops_the_cache(checkpoint):
+    engine = LocalInferenceEngine(checkpoint, quantize=True)
+    engine.generate("the cat sat on a mat", GREEDY, session_id="chat")
+
+    other = engine.generate("a dog ran home", GREEDY, session_id="chat")
+
+    assert other.reused_tokens == 0
+    assert engine._sessions["chat"].token_ids[:4] == engine.tokenizer.encode("a dog ran home")
@@ -0,0 +1,83 @@
+"""Regression tests for the Gemini long-context pipeline."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import long_context
+from long_context import ContextPiece, LongContextPipeline, RateLimiter
+
+
+class FakeModel:
+    """count_tokens / generate_content with ~4 chars per token; tracks concurrency."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def count_tokens(self, text):
+        return SimpleNamespace(total_tokens=len(text) // 4)
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return SimpleNamespace(text="answer")
+
+
+def render(pieces, question):
+    return "".join(f"## {piece.name}\n{piece.text}\n" for piece in pieces) + question
+
+
+@pytest.mark.asyncio
+async def test_select_counts_source_files_not_split_parts():
+    pipeline = LongContextPipeline(FakeModel(), "test-select", context_window=20000)
+    # One huge file (split into many parts) and a few small ones
+    files = {"big.py": "def auth():\n    pass\n\n" * 12000}
+    files.update({f"small{i}.py": "x = 1\n" for i in range(3)})
+    pieces = [ContextPiece(name=name, text=text) for name, text in files.items()]
+
+    result = await pipeline.run(pieces, "How does auth work?", render, mode="select")
+
+    assert len(result.pieces_skipped) > len(files)  # More skipped parts than files
+    assert 1 <= result.sources_used <= len(files)
+
+
+@pytest.mark.asyncio
+async def test_pipelines_for_one_model_share_the_limiter(monkeypatch):
+    monkeypatch.setitem(long_context._limiters, "test-shared", RateLimiter(concurrency=1, per_minute=100))
+    model = FakeModel(delay=0.05)
+    pipelines = [LongContextPipeline(model, "test-shared") for _ in range(3)]
+
+    await asyncio.gather(*(pipeline.generate("hi") for pipeline in pipelines))
+
+    assert pipelines[0].limiter is pipelines[2].limiter
+    assert model.peak == 1
+
+
+@pytest.mark.asyncio
+async def test_limiter_waits_for_the_per_minute_window(monkeypatch):
+    now = [1000.0]
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(long_context.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(long_context.asyncio, "sleep", fake_sleep)
+    limiter = RateLimiter(concurrency=4, per_minute=2)
+
+    for _ in range(3):
+        async with limiter.slot():
+            pass
+
+    assert slept == [60.0]
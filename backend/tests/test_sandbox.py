@@ -0,0 +1,62 @@
+"""Regression tests for the out-of-process code sandbox."""
+
+import pytest
+import pytest_asyncio
+
+from genius_ai.tools.sandbox import SandboxPool
+
+
+@pytest_asyncio.fixture
+async def pool():
+    pool = SandboxPool(size=1, max_output=64 * 1024)
+    yield pool
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_job_cannot_patch_builtins_for_the_next_job(pool):
+    escape = 'g = print.__globals__\ng["SAFE_BUILTINS"]["open"] = g["builtins"].open'
+    await pool.execute(escape, timeout=5)
+
+    run = await pool.execute('open("/etc/hostname")', timeout=5)
+
+    assert run.error is not None
+    assert "NameError" in run.error
+
+
+@pytest.mark.asyncio
+async def test_job_cannot_patch_modules_for_the_next_job(pool):
+    await pool.execute("math.pi = 3", timeout=5)
+
+    run = await pool.execute("x = math.pi", timeout=5)
+
+    assert run.namespace["x"].startswith("3.14")
+
+
+@pytest.mark.asyncio
+async def test_wide_characters_are_capped_in_bytes(pool):
+    run = await pool.execute('print("中" * 60000)', timeout=5)
+
+    assert run.error is None
+    assert run.output.endswith("[output truncated]\n")
+    assert len(run.output.encode("utf-8")) <= pool.max_output + 64
+    assert pool.stats["crashes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_control_characters_fit_the_reader_limit(pool):
+    run = await pool.execute('print("\\x01" * 200000)', timeout=5)
+
+    assert run.error is None
+    assert pool.stats["crashes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_the_job_and_worker_recovers(pool):
+    from genius_ai.tools.sandbox import SandboxError
+
+    with pytest.raises(SandboxError):
+        await pool.execute("while True:\n    pass", timeout=0.5)
+
+    run = await pool.execute("x = 1 + 1", timeout=5)
+    assert run.namespace == {"x": "2"}
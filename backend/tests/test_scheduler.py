@@ -0,0 +1,43 @@
+"""Regression tests for the orchestrator stage scheduler."""
+
+import asyncio
+
+import pytest
+
+from genius_ai.agents.scheduler import Stage, StageScheduler, StageSkipped
+from genius_ai.core.metrics import metrics
+
+
+def observed(stage: str) -> int:
+    series = metrics.stage_latency._series.get((stage,))
+    return series.count if series else 0
+
+
+@pytest.mark.asyncio
+async def test_only_completed_stages_are_observed():
+    async def done(_):
+        return "ok"
+
+    async def skip(_):
+        raise StageSkipped("not needed")
+
+    async def slow(_):
+        await asyncio.sleep(10)
+
+    before = {name: observed(name) for name in ("t_done", "t_skip", "t_slow")}
+    scheduler = StageScheduler(latency_budget=0.05)
+
+    result = await scheduler.run([
+        Stage("t_done", done),
+        Stage("t_skip", skip, optional=True),
+        Stage("t_slow", slow, optional=True),
+    ])
+
+    await asyncio.sleep(0.01)  # Let the cancelled stage unwind
+
+    assert result.completed == ["t_done"]
+    assert set(result.skipped) == {"t_skip", "t_slow"}
+    assert observed("t_done") == before["t_done"] + 1
+    assert observed("t_skip") == before["t_skip"]
+    assert observed("t_slow") == before["t_slow"]
+    assert scheduler.estimate("t_skip") is None
@@ -0,0 +1,142 @@
+"""Regression tests for SmartModelRouter breakers and the routed Groq call sites."""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+import streaming_ai_agent  # noqa: E402
+from smart_model_router import ModelProvider, SmartModelRouter, TaskType  # noqa: E402
+
+MODEL = "llama-3.3-70b-versatile"
+FALLBACK = "llama-3.1-8b-instant"
+
+
+def trip(router: SmartModelRouter, model_id: str) -> None:
+    """Open the breaker with a 429, then let its cooldown pass (half-open)"""
+    router.record_result(model_id, 100.0, status_code=429, retry_after=0.0001)
+    health = router.health[model_id]
+    health.open_until -= 1
+    assert health.breaker_state() == "half_open"
+
+
+def route(router: SmartModelRouter):
+    return router.route_request("hello there", requested_model=MODEL, providers=[ModelProvider.GROQ_LLAMA])
+
+
+def test_ranking_does_not_claim_the_probe():
+    router = SmartModelRouter()
+    trip(router, MODEL)
+
+    for _ in range(3):
+        decision = router.rank_models(TaskType.CODING, providers=[ModelProvider.GROQ_LLAMA])
+        assert decision["model"] == MODEL
+
+    assert router.health[MODEL].probe_started == 0.0
+
+
+def test_half_open_admits_one_probe_and_others_fall_back():
+    router = SmartModelRouter()
+    trip(router, MODEL)
+
+    first = router.models_to_try(route(router))
+    second = router.models_to_try(route(router))
+
+    assert next(first) == MODEL  # The probe
+    assert next(second) == FALLBACK  # Probe in flight: skip the model
+
+
+def test_route_is_limited_to_reachable_providers():
+    router = SmartModelRouter()
+    decision = route(router)
+
+    assert {decision["model"], *decision["fallbacks"]} <= {MODEL, FALLBACK}
+
+
+class FakeStream:
+    def __init__(self, pieces, usage_tokens=None):
+        self.chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))], x_groq=None)
+            for piece in pieces
+        ]
+        if usage_tokens is not None:
+            self.chunks.append(SimpleNamespace(
+                choices=[], x_groq=SimpleNamespace(usage=SimpleNamespace(completion_tokens=usage_tokens))
+            ))
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCompletions:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.models = []
+
+    def create(self, model, **_):
+        self.models.append(model)
+        if model in self.failing:
+            raise RuntimeError(f"{model} unavailable")
+        return FakeStream(["Hel", "lo", " world"], usage_tokens=7)
+
+
+@pytest.fixture
+def fake_groq(monkeypatch):
+    router = SmartModelRouter()
+    completions = FakeCompletions()
+    monkeypatch.setattr(streaming_ai_agent, "smart_router", router)
+    monkeypatch.setattr(streaming_ai_agent, "groq_client",
+                        SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    return router, completions
+
+
+def stream_request():
+    return streaming_ai_agent.StreamingChatRequest(
+        messages=[streaming_ai_agent.StreamingChatMessage(role="user", content="hello")],
+        model=MODEL,
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_counts_reported_tokens_not_chunks(fake_groq):
+    router, completions = fake_groq
+    recorded = []
+    router.record_result = lambda model, duration_ms, ttft_ms=None, tokens=0, **_: \
+        recorded.append((model, ttft_ms, tokens))
+
+    events = [event async for event in streaming_ai_agent.stream_groq_response(stream_request())]
+
+    assert events[-1] == 'data: {"type": "done"}\n\n'
+    [(model, ttft_ms, tokens)] = recorded
+    assert model == MODEL
+    assert ttft_ms is not None
+    assert tokens == 7  # From usage, not the three content chunks
+
+
+@pytest.mark.asyncio
+async def test_stream_falls_back_when_the_requested_model_fails(fake_groq):
+    router, completions = fake_groq
+    completions.failing.add(MODEL)
+
+    events = [event async for event in streaming_ai_agent.stream_groq_response(stream_request())]
+
+    assert completions.models == [MODEL, FALLBACK]
+    assert "Hel" in events[0]
+    assert router.health[MODEL].errors == 1
+    assert router.health[FALLBACK].requests == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_skips_a_model_with_an_open_breaker(fake_groq):
+    router, completions = fake_groq
+    router.record_result(MODEL, 100.0, status_code=429, retry_after=60)
+
+    [event async for event in streaming_ai_agent.stream_groq_response(stream_request())]
+
+    assert completions.models == [FALLBACK]
@@ -0,0 +1,81 @@
+"""Regression tests for tool execution: memoization and in-flight dedupe."""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from genius_ai.tools.base import (
+    BaseTool,
+    ToolCategory,
+    ToolDefinition,
+    ToolRegistry,
+    ToolResult,
+)
+
+
+class SlowTool(BaseTool):
+    """Deterministic tool that blocks until released and counts its runs."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+        self.runs = 0
+
+    def _get_definition(self) -> ToolDefinition:
+        return ToolDefinition(
+            name="slow",
+            description="Slow deterministic tool",
+            parameters=[],
+            category=ToolCategory.COMPUTATION,
+            returns="A list",
+            deterministic=True,
+            timeout=5.0,
+        )
+
+    async def execute(self, **kwargs: Any) -> ToolResult:
+        self.runs += 1
+        await self.release.wait()
+        return ToolResult(success=True, result={"items": [1, 2]})
+
+
+@pytest.fixture
+def registry():
+    registry = ToolRegistry(cache_size=8)
+    registry.register(SlowTool())
+    return registry
+
+
+@pytest.mark.asyncio
+async def test_waiter_takes_over_when_the_owner_is_cancelled(registry):
+    tool = registry.get_tool("slow")
+    owner = asyncio.create_task(registry.execute_tool("slow", x=1))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(registry.execute_tool("slow", x=1))
+    await asyncio.sleep(0)
+
+    owner.cancel()
+    await asyncio.sleep(0)
+    tool.release.set()
+
+    result = await waiter
+    assert result.success and result.result == {"items": [1, 2]}
+    assert tool.runs == 2
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+
+
+@pytest.mark.asyncio
+async def test_callers_get_their_own_copy_of_a_memoized_result(registry):
+    registry.get_tool("slow").release.set()
+    first, shared = await asyncio.gather(
+        registry.execute_tool("slow", x=1), registry.execute_tool("slow", x=1)
+    )
+    first.result["items"].append("mutated")
+    shared.result["items"].append("mutated")
+
+    cached = await registry.execute_tool("slow", x=1)
+    assert cached.result == {"items": [1, 2]}
+    cached.result["items"].clear()
+    assert (await registry.execute_tool("slow", x=1)).result == {"items": [1, 2]}
+    assert registry.get_tool("slow").runs == 1
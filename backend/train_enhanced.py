@@ -266,7 +266,11 @@ except ImportError:
     subprocess.run([sys.executable, "-m", "pip", "install", "datasets"], check=True)
     from datasets import Dataset
 
+from cpu_training import CPUTrainingProfile
+
+cpu_profile = CPUTrainingProfile().apply()
 print(f"\nPyTorch {torch.__version__} ready (CPU mode)")
+print(cpu_profile.describe())
 
 print(f"\n[2/6] Loading training data...")
 print(f"Loaded {len(TRAINING_DATA)} examples")
@@ -315,20 +319,19 @@ print("-" * 70)
 print("\nTraining started (this takes 5-10 minutes on CPU)...")
 print("With 50+ examples, your model will be MUCH smarter!\n")
 
-training_args = TrainingArguments(
+training_args = cpu_profile.training_arguments(
     output_dir="./genius_model_enhanced",
     num_train_epochs=5,  # More epochs for better learning
     per_device_train_batch_size=1,
     save_strategy="epoch",
     logging_steps=5,
-    no_cuda=True,  # CPU mode
-    report_to="none",
 )
 
 trainer = Trainer(
     model=model,
     args=training_args,
     train_dataset=tokenized_dataset,
+    callbacks=cpu_profile.callbacks(),
 )
 
 result = trainer.train()
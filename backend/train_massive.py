@@ -3,10 +3,12 @@ Train Genius AI with a MASSIVE dataset for real intelligence
 Uses HuggingFace datasets for quick, high-quality data
 """
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer, Trainer, TrainingArguments
+from transformers import AutoModelForCausalLM, AutoTokenizer, Trainer
 from datasets import load_dataset
 import sys
 
+from cpu_training import CPUTrainingProfile
+
 print("=" * 70)
 print("GENIUS AI - MASSIVE TRAINING")
 print("=" * 70)
@@ -16,6 +18,11 @@ print("This will make your AI MUCH smarter!")
 print("=" * 70)
 print()
 
+# Configure CPU threads before the model is loaded
+cpu_profile = CPUTrainingProfile().apply()
+print(cpu_profile.describe())
+print()
+
 # Load model
 print("[1/6] Loading DistilGPT-2 model...")
 model_name = "distilgpt2"
@@ -102,7 +109,7 @@ print()
 
 # Training arguments
 print("[5/6] Configuring training...")
-training_args = TrainingArguments(
+training_args = cpu_profile.training_arguments(
     output_dir="./genius_model_massive",
     num_train_epochs=3,  # 3 epochs on 10k examples = very good
     per_device_train_batch_size=4,
@@ -113,8 +120,6 @@ training_args = TrainingArguments(
     warmup_steps=500,
     weight_decay=0.01,
     logging_dir="./logs",
-    no_cuda=True,  # CPU training
-    report_to="none",
 )
 print("Training configured")
 print()
@@ -130,6 +135,7 @@ trainer = Trainer(
     model=model,
     args=training_args,
     train_dataset=tokenized_dataset,
+    callbacks=cpu_profile.callbacks(),
 )
 
 # Train the model
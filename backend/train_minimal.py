@@ -66,12 +66,16 @@ import torch
 from transformers import (
     AutoTokenizer,
     AutoModelForCausalLM,
-    TrainingArguments,
     Trainer,
 )
 from datasets import Dataset
 
+from cpu_training import CPUTrainingProfile
+
+cpu_profile = CPUTrainingProfile().apply()
+
 print(f"\n✓ PyTorch {torch.__version__} loaded (CPU mode)")
+print(f"✓ {cpu_profile.describe()}")
 print(f"✓ All dependencies ready!\n")
 
 
@@ -280,7 +284,7 @@ output_dir = Path("./genius_ai_tiny_model")
 output_dir.mkdir(exist_ok=True)
 
 # Minimal training args for low RAM
-training_args = TrainingArguments(
+training_args = cpu_profile.training_arguments(
     output_dir=str(output_dir),
     num_train_epochs=3,
     per_device_train_batch_size=1,  # Minimal batch size for RAM
@@ -290,9 +294,6 @@ training_args = TrainingArguments(
     logging_steps=1,
     save_steps=100,
     save_total_limit=1,
-    no_cuda=True,  # Force CPU
-    fp16=False,    # CPU doesn't support fp16
-    report_to="none",  # No external reporting
 )
 
 # Test before training
@@ -310,6 +311,7 @@ trainer = Trainer(
     model=model,
     args=training_args,
     train_dataset=tokenized_dataset,
+    callbacks=cpu_profile.callbacks(),
 )
 
 # Train!
@@ -5,7 +5,7 @@ All specialized agents inherit from this
 
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -18,9 +18,27 @@ class AgentResponse:
     metadata: Optional[Dict[str, Any]] = None
 
 
+@dataclass
+class RoutingRule:
+    """
+    One routing rule for an agent
+
+    The rule fires when every term group has at least one term in the
+    (lowercased) message and every regex pattern matches. Rules are checked
+    in order; the first one that fires sets the agent's confidence.
+    """
+    score: float
+    groups: List[List[str]] = field(default_factory=list)
+    patterns: List[str] = field(default_factory=list)
+
+
 class BaseAgent(ABC):
     """
     Base class for all specialized agents
+
+    Agents describe how to recognise their messages declaratively through
+    `routing_rules` and `expertise_keywords`; the AgentRouter compiles every
+    agent's rules into one index so routing is a single pass per message.
     """
 
     def __init__(self, name: str, core_intelligence):
@@ -28,7 +46,16 @@ class BaseAgent(ABC):
         self.core = core_intelligence
         self.expertise_keywords = []
 
-    @abstractmethod
+        # High-confidence rules, checked before keyword matching
+        self.routing_rules: List[RoutingRule] = []
+
+        # Optional boost to the keyword score when this pattern also matches
+        self.keyword_boost_pattern: Optional[str] = None
+        self.keyword_boost = 0.0
+        self.keyword_boost_cap = 1.0
+
+        self._router = None
+
     async def can_handle(self, message: str) -> float:
         """
         Determine if this agent can handle the message
@@ -39,7 +66,10 @@ class BaseAgent(ABC):
         Returns:
             Confidence score (0.0 - 1.0) that this agent should handle it
         """
-        pass
+        if self._router is None:
+            from ..router import AgentRouter
+            self._router = AgentRouter([self], cache_size=0)
+        return self._router.score(message)[0]
 
     @abstractmethod
     async def process(self, message: str, context: Optional[Dict] = None) -> AgentResponse:
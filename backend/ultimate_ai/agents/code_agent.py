@@ -5,7 +5,7 @@ Handles programming, coding, technical questions
 
 from typing import Optional, Dict
 import re
-from .base_agent import BaseAgent, AgentResponse
+from .base_agent import BaseAgent, AgentResponse, RoutingRule
 
 
 class CodeAgent(BaseAgent):
@@ -29,35 +29,18 @@ class CodeAgent(BaseAgent):
             "html", "css", "react", "vue", "angular", "node"
         ]
 
-    async def can_handle(self, message: str) -> float:
-        """
-        Check if this is a coding question
-        """
-        msg_lower = message.lower()
-
-        # Check for code blocks
-        if "```" in message or re.search(r'`[^`]+`', message):
-            return 0.98
-
-        # Check for programming language mentions
-        if any(lang in msg_lower for lang in self.languages):
-            return 0.95
-
-        # Check for coding phrases
-        coding_phrases = [
-            "write a function", "create a program", "how do i code",
-            "implement", "algorithm for", "code to", "script that",
-            "fix this error", "debug", "why isn't this working"
+        # Routing: code blocks, language mentions, coding phrases
+        self.routing_rules = [
+            RoutingRule(0.98, groups=[["```"]]),
+            RoutingRule(0.98, patterns=[r'`[^`]+`']),
+            RoutingRule(0.95, groups=[self.languages]),
+            RoutingRule(0.95, groups=[[
+                "write a function", "create a program", "how do i code",
+                "implement", "algorithm for", "code to", "script that",
+                "fix this error", "debug", "why isn't this working"
+            ]]),
         ]
 
-        if any(phrase in msg_lower for phrase in coding_phrases):
-            return 0.95
-
-        # Standard keyword matching
-        confidence = self._calculate_keyword_confidence(message)
-
-        return confidence
-
     async def process(self, message: str, context: Optional[Dict] = None) -> AgentResponse:
         """
         Process coding question
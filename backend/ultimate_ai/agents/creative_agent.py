@@ -4,7 +4,7 @@ Handles creative writing, brainstorming, storytelling
 """
 
 from typing import Optional, Dict
-from .base_agent import BaseAgent, AgentResponse
+from .base_agent import BaseAgent, AgentResponse, RoutingRule
 
 
 class CreativeAgent(BaseAgent):
@@ -21,35 +21,22 @@ class CreativeAgent(BaseAgent):
             "essay", "article", "blog", "content"
         ]
 
-    async def can_handle(self, message: str) -> float:
-        """
-        Check if this is a creative request
-        """
-        msg_lower = message.lower()
-
-        # High confidence creative phrases
-        creative_phrases = [
-            "write a story", "write a poem", "create a character",
-            "help me brainstorm", "give me ideas", "be creative",
-            "imagine", "what if", "tell me a story", "compose"
+        # Routing: creative phrases, or a content type plus a writing verb
+        self.routing_rules = [
+            RoutingRule(0.95, groups=[[
+                "write a story", "write a poem", "create a character",
+                "help me brainstorm", "give me ideas", "be creative",
+                "imagine", "what if", "tell me a story", "compose"
+            ]]),
+            RoutingRule(0.9, groups=[
+                [
+                    "story", "poem", "essay", "article", "blog post",
+                    "script", "dialogue", "narrative", "tale"
+                ],
+                ["write", "create", "compose", "draft"],
+            ]),
         ]
 
-        if any(phrase in msg_lower for phrase in creative_phrases):
-            return 0.95
-
-        # Check for creative content types
-        content_types = [
-            "story", "poem", "essay", "article", "blog post",
-            "script", "dialogue", "narrative", "tale"
-        ]
-
-        if any(ctype in msg_lower for ctype in content_types):
-            if any(word in msg_lower for word in ["write", "create", "compose", "draft"]):
-                return 0.9
-
-        # Standard keyword matching
-        return self._calculate_keyword_confidence(message)
-
     async def process(self, message: str, context: Optional[Dict] = None) -> AgentResponse:
         """
         Process creative request
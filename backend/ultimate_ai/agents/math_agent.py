@@ -8,7 +8,7 @@ import operator
 import math
 import re
 from typing import Optional, Dict, Any
-from .base_agent import BaseAgent, AgentResponse
+from .base_agent import BaseAgent, AgentResponse, RoutingRule
 
 
 class MathAgent(BaseAgent):
@@ -35,34 +35,19 @@ class MathAgent(BaseAgent):
             ast.USub: operator.neg,
         }
 
-    async def can_handle(self, message: str) -> float:
-        """
-        Check if this is a math question
-        """
-        msg_lower = message.lower()
-
-        # Check for explicit math expressions (numbers with operators)
-        if re.search(r'\d+\s*[\+\-\*\/\^]\s*\d+', message):
-            return 0.98
-
-        # Check for math keywords
-        math_phrases = [
-            "calculate", "what is", "solve", "how much is",
-            "what's", "compute", "find the", "determine"
+        # Routing: explicit expressions, or math phrases together with numbers
+        self.routing_rules = [
+            RoutingRule(0.98, patterns=[r'\d+\s*[\+\-\*\/\^]\s*\d+']),
+            RoutingRule(0.95, groups=[[
+                "calculate", "what is", "solve", "how much is",
+                "what's", "compute", "find the", "determine"
+            ]], patterns=[r'\d+']),
         ]
-        if any(phrase in msg_lower for phrase in math_phrases):
-            # Check if numbers are involved
-            if re.search(r'\d+', message):
-                return 0.95
-
-        # Standard keyword matching
-        confidence = self._calculate_keyword_confidence(message)
-
-        # Boost confidence if numbers are present
-        if confidence > 0 and re.search(r'\d+', message):
-            confidence = min(0.95, confidence + 0.3)
 
-        return confidence
+        # Boost keyword confidence if numbers are present
+        self.keyword_boost_pattern = r'\d+'
+        self.keyword_boost = 0.3
+        self.keyword_boost_cap = 0.95
 
     def _safe_eval_math(self, expr: str) -> Any:
         """
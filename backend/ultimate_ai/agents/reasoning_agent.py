@@ -4,7 +4,7 @@ Handles complex logical problems, philosophy, deep thinking
 """
 
 from typing import Optional, Dict
-from .base_agent import BaseAgent, AgentResponse
+from .base_agent import BaseAgent, AgentResponse, RoutingRule
 
 
 class ReasoningAgent(BaseAgent):
@@ -21,33 +21,19 @@ class ReasoningAgent(BaseAgent):
             "argument", "paradox", "dilemma", "ethics", "morality"
         ]
 
-    async def can_handle(self, message: str) -> float:
-        """
-        Check if this is a reasoning/philosophical question
-
-        Returns confidence score
-        """
-        msg_lower = message.lower()
-
-        # High confidence indicators
-        if any(phrase in msg_lower for phrase in [
-            "why is", "why does", "why do", "how does", "how do",
-            "what is the meaning", "what is consciousness", "what is reality",
-            "explain why", "explain how", "help me understand"
-        ]):
-            return 0.95
-
-        # Check for philosophical concepts
-        philosophy_terms = [
-            "consciousness", "free will", "reality", "existence", "meaning of life",
-            "ethics", "morality", "truth", "knowledge", "perception", "mind",
-            "soul", "purpose", "destiny", "fate"
+        # Routing: explanation phrases, then philosophical concepts
+        self.routing_rules = [
+            RoutingRule(0.95, groups=[[
+                "why is", "why does", "why do", "how does", "how do",
+                "what is the meaning", "what is consciousness", "what is reality",
+                "explain why", "explain how", "help me understand"
+            ]]),
+            RoutingRule(0.9, groups=[[
+                "consciousness", "free will", "reality", "existence", "meaning of life",
+                "ethics", "morality", "truth", "knowledge", "perception", "mind",
+                "soul", "purpose", "destiny", "fate"
+            ]]),
         ]
-        if any(term in msg_lower for term in philosophy_terms):
-            return 0.9
-
-        # Standard keyword matching
-        return self._calculate_keyword_confidence(message)
 
     async def process(self, message: str, context: Optional[Dict] = None) -> AgentResponse:
         """
@@ -4,7 +4,7 @@ Handles image analysis, visual understanding
 """
 
 from typing import Optional, Dict, List
-from .base_agent import BaseAgent, AgentResponse
+from .base_agent import BaseAgent, AgentResponse, RoutingRule
 
 
 class VisionAgent(BaseAgent):
@@ -20,28 +20,16 @@ class VisionAgent(BaseAgent):
             "illustration", "infographic", "plot", "figure"
         ]
 
-    async def can_handle(self, message: str) -> float:
-        """
-        Check if this requires image understanding
-        """
-        # If images are present in context, high confidence
-        # This will be checked by orchestrator
-
-        msg_lower = message.lower()
-
-        # Phrases indicating image analysis
-        vision_phrases = [
-            "what is in", "what's in", "describe this", "analyze this image",
-            "what do you see", "look at", "in this image", "in this picture",
-            "in this photo", "what does this show"
+        # Routing: phrases indicating image analysis (images themselves are
+        # checked by the orchestrator)
+        self.routing_rules = [
+            RoutingRule(0.95, groups=[[
+                "what is in", "what's in", "describe this", "analyze this image",
+                "what do you see", "look at", "in this image", "in this picture",
+                "in this photo", "what does this show"
+            ]]),
         ]
 
-        if any(phrase in msg_lower for phrase in vision_phrases):
-            return 0.95
-
-        # Standard keyword matching
-        return self._calculate_keyword_confidence(message)
-
     async def process(self, message: str, context: Optional[Dict] = None) -> AgentResponse:
         """
         Process image-related question
@@ -5,7 +5,7 @@ Browses the internet to get current, real-time information
 
 from typing import Optional, Dict, List
 import asyncio
-from .base_agent import BaseAgent, AgentResponse
+from .base_agent import BaseAgent, AgentResponse, RoutingRule
 from ..tools import WebBrowser
 
 
@@ -30,40 +30,17 @@ class WebAgent(BaseAgent):
             "browse", "website", "url", "online", "internet"
         ]
 
-    async def can_handle(self, message: str) -> float:
-        """
-        Check if this requires web browsing
-
-        High confidence for:
-        - Current events
-        - Latest information
-        - Explicit web searches
-        - Recent data requests
-        """
-        msg_lower = message.lower()
-
-        # Very high confidence indicators
-        high_confidence_phrases = [
-            "latest", "current", "recent", "today", "now",
-            "what's happening", "search for", "look up",
-            "find information", "browse", "check online"
+        # Routing: current events, time-based queries, news/updates
+        self.routing_rules = [
+            RoutingRule(0.95, groups=[[
+                "latest", "current", "recent", "today", "now",
+                "what's happening", "search for", "look up",
+                "find information", "browse", "check online"
+            ]]),
+            RoutingRule(0.9, groups=[["today", "this week", "this month", "this year", "right now"]]),
+            RoutingRule(0.85, groups=[["news", "update"]]),
         ]
 
-        if any(phrase in msg_lower for phrase in high_confidence_phrases):
-            return 0.95
-
-        # Time-based queries
-        time_words = ["today", "this week", "this month", "this year", "right now"]
-        if any(word in msg_lower for word in time_words):
-            return 0.9
-
-        # News/updates
-        if "news" in msg_lower or "update" in msg_lower:
-            return 0.85
-
-        # Standard keyword matching
-        return self._calculate_keyword_confidence(message)
-
     async def process(self, message: str, context: Optional[Dict] = None) -> AgentResponse:
         """
         Process web research request
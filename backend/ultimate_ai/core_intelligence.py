@@ -4,11 +4,14 @@ Manages the base AI model (LLaMA 3.2) and orchestrates agent communication
 """
 
 import requests
+import hashlib
 import json
-from typing import List, Dict, Optional, Any
+from typing import AsyncIterator, List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass
 import asyncio
 
+from .ollama_client import OllamaClient, OllamaConnectionError, OllamaError
+
 
 @dataclass
 class Message:
@@ -29,6 +32,19 @@ class CoreIntelligence:
         self.model = model
         self.conversation_history: List[Message] = []
 
+        # Pooled async client shared by every agent (keeps the model loaded)
+        self.client = OllamaClient(ollama_url, model)
+
+        # conversation_id -> (Ollama KV context, fingerprint of the turn it ends with)
+        self._contexts: Dict[str, Tuple[List[int], str]] = {}
+
+    @staticmethod
+    def _options(temperature: float, max_tokens: int) -> Dict[str, Any]:
+        return {
+            "temperature": temperature,
+            "num_predict": max_tokens,
+        }
+
     async def generate(
         self,
         prompt: str,
@@ -56,75 +72,166 @@ class CoreIntelligence:
             if system_prompt:
                 full_prompt = f"{system_prompt}\n\nUser: {prompt}\n\nAssistant:"
 
-            # Prepare request payload
-            payload = {
-                "model": self.model,
-                "prompt": full_prompt,
-                "stream": False,
-                "options": {
-                    "temperature": temperature,
-                    "num_predict": max_tokens,
-                }
-            }
-
-            # Add images if provided (for multimodal models)
-            if images:
-                payload["images"] = images
-
-            # Call Ollama API
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json=payload,
-                timeout=120
+            result = await self.client.generate(
+                full_prompt,
+                options=self._options(temperature, max_tokens),
+                images=images,
             )
+            return result.text.strip()
 
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("response", "").strip()
-            else:
-                return f"Error: AI model returned status {response.status_code}"
-
-        except requests.exceptions.ConnectionError:
+        except OllamaConnectionError:
             return "Error: Cannot connect to AI model. Please ensure Ollama is running."
+        except OllamaError as e:
+            if e.status:
+                return f"Error: AI model returned status {e.status}"
+            return f"Error generating response: {str(e)}"
         except Exception as e:
             return f"Error generating response: {str(e)}"
 
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.8,
+        max_tokens: int = 2000,
+        images: Optional[List[str]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response token by token
+
+        Args:
+            Same as generate
+
+        Yields:
+            Text pieces as the model produces them
+        """
+        full_prompt = prompt
+        if system_prompt:
+            full_prompt = f"{system_prompt}\n\nUser: {prompt}\n\nAssistant:"
+
+        try:
+            async for chunk in self.client.stream_generate(
+                full_prompt,
+                options=self._options(temperature, max_tokens),
+                images=images,
+            ):
+                if chunk.text:
+                    yield chunk.text
+        except OllamaConnectionError:
+            yield "Error: Cannot connect to AI model. Please ensure Ollama is running."
+        except Exception as e:
+            yield f"Error generating response: {str(e)}"
+
     async def chat(
         self,
         message: str,
         history: Optional[List[Message]] = None,
         images: Optional[List[str]] = None,
-        temperature: float = 0.8
+        temperature: float = 0.8,
+        conversation_id: Optional[str] = None
     ) -> str:
         """
         Chat interface that maintains conversation context
 
+        When a conversation_id is given and the previous turn also came
+        through chat(), Ollama's KV context from that turn is reused and only
+        the new message is sent, so the history is not re-prefilled.
+
         Args:
             message: User's message
             history: Previous conversation messages
             images: Optional images for this message
             temperature: Response creativity
+            conversation_id: Optional conversation ID for KV context reuse
 
         Returns:
             AI response
         """
+        pieces = []
+        async for piece in self.chat_stream(message, history, images, temperature, conversation_id):
+            pieces.append(piece)
+        return "".join(pieces).strip()
+
+    async def chat_stream(
+        self,
+        message: str,
+        history: Optional[List[Message]] = None,
+        images: Optional[List[str]] = None,
+        temperature: float = 0.8,
+        conversation_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Streaming version of chat()
+
+        Yields:
+            Text pieces as the model produces them
+        """
+        history = history or []
+        prompt, context = self._chat_prompt(message, history, conversation_id)
+        pieces = []
+
+        try:
+            async for chunk in self.client.stream_generate(
+                prompt,
+                options=self._options(temperature, 2000),
+                images=images,
+                context=context,
+            ):
+                if chunk.text:
+                    pieces.append(chunk.text)
+                    yield chunk.text
+                if chunk.done and conversation_id and chunk.context:
+                    # Valid while the caller's history ends with this exchange
+                    self._contexts[conversation_id] = (
+                        chunk.context,
+                        self._turn_fingerprint(message, "".join(pieces)),
+                    )
+        except OllamaConnectionError:
+            self._contexts.pop(conversation_id, None)
+            yield "Error: Cannot connect to AI model. Please ensure Ollama is running."
+        except Exception as e:
+            self._contexts.pop(conversation_id, None)
+            yield f"Error generating response: {str(e)}"
+
+    def _chat_prompt(
+        self,
+        message: str,
+        history: List[Message],
+        conversation_id: Optional[str]
+    ) -> Tuple[str, Optional[List[int]]]:
+        """Build the prompt, reusing the KV context when it covers the whole history"""
+        cached = self._contexts.get(conversation_id) if conversation_id else None
+        if cached and len(history) >= 2 and \
+                cached[1] == self._turn_fingerprint(history[-2].content, history[-1].content):
+            return f"User: {message}\nAssistant:", cached[0]
+
         # Build context from history
         context = ""
-        if history:
-            for msg in history[-10:]:  # Keep last 10 messages for context
-                context += f"{msg.role.capitalize()}: {msg.content}\n"
+        for msg in history[-10:]:  # Keep last 10 messages for context
+            context += f"{msg.role.capitalize()}: {msg.content}\n"
 
         # Add current message
-        full_prompt = f"{context}User: {message}\nAssistant:"
+        return f"{context}User: {message}\nAssistant:", None
 
-        # Generate response
-        response = await self.generate(
-            full_prompt,
-            temperature=temperature,
-            images=images
-        )
+    @staticmethod
+    def _turn_fingerprint(user_message: str, assistant_response: str) -> str:
+        """
+        Identify the exchange a KV context ends with
+
+        History is capped (its length stops changing) and other agents append
+        turns the context never saw, so the context is only reused while the
+        history still ends with the exchange that produced it.
+        """
+        turn = f"{user_message}\x00{assistant_response.strip()}"
+        return hashlib.sha1(turn.encode("utf-8")).hexdigest()
+
+    def forget_conversation(self, conversation_id: str):
+        """Drop the cached KV context for a conversation"""
+        self._contexts.pop(conversation_id, None)
 
-        return response
+    async def close(self):
+        """Close the pooled Ollama connection"""
+        await self.client.close()
 
     async def think_deeply(self, problem: str) -> Dict[str, Any]:
         """
@@ -4,5 +4,7 @@ Long-term and short-term memory for the AI
 """
 
 from .long_term_memory import LongTermMemory
+from .vector_index import IVFIndex
+from .session_store import SessionStore
 
-__all__ = ["LongTermMemory"]
+__all__ = ["LongTermMemory", "IVFIndex", "SessionStore"]
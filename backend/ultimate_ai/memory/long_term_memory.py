@@ -4,11 +4,19 @@ Persistently stores and retrieves knowledge across sessions
 """
 
 import json
+import re
 import sqlite3
+import threading
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+
+from .vector_index import IVFIndex, Embedder, from_blob, quantize, sentence_transformer_embedder, to_blob
+
+_AUTO = object()
+
 
 class LongTermMemory:
     """
@@ -17,10 +25,39 @@ class LongTermMemory:
     - Past conversations
     - Learned facts
     - Important context
+
+    Knowledge is recalled semantically: embeddings are stored quantized
+    (int8 or float16) as BLOBs in knowledge.embedding and served from an
+    in-process IVF index. SQLite FTS5 is the lexical fallback when no
+    embedding model is available or nothing scores min_similarity.
+
+    The index (model load plus embedding of any rows that lack vectors) is
+    built on first use, or ahead of time with load_index().
     """
 
-    def __init__(self, db_path: str = "data/memory.db"):
+    def __init__(
+        self,
+        db_path: str = "data/memory.db",
+        embedder: Optional[Embedder] = _AUTO,
+        embedding_dtype: str = "int8",
+        min_similarity: float = 0.35
+    ):
+        """
+        Args:
+            db_path: SQLite database file
+            embedder: texts -> (n, dim) embeddings; default is a local
+                sentence-transformers model if installed, None disables vectors
+            embedding_dtype: "int8" or "float16" storage for embeddings
+            min_similarity: Cosine similarity below which a semantic hit is ignored
+        """
         self.db_path = db_path
+        self.embedder = sentence_transformer_embedder() if embedder is _AUTO else embedder
+        self.embedding_dtype = embedding_dtype
+        self.min_similarity = min_similarity
+        self.index: Optional[IVFIndex] = None
+        self.fts_enabled = False
+        self._index_lock = threading.Lock()
+        self._index_loaded = False
 
         # Ensure data directory exists
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
@@ -80,9 +117,118 @@ class LongTermMemory:
             )
         """)
 
+        # Settings of the stored embeddings (dtype, dimension)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS memory_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+
+        # Full-text index over knowledge, kept in sync by triggers
+        try:
+            exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'knowledge_fts'"
+            ).fetchone()
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_fts
+                USING fts5(topic, content, content='knowledge', content_rowid='id')
+            """)
+            cursor.executescript("""
+                CREATE TRIGGER IF NOT EXISTS knowledge_fts_insert AFTER INSERT ON knowledge BEGIN
+                    INSERT INTO knowledge_fts(rowid, topic, content) VALUES (new.id, new.topic, new.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS knowledge_fts_delete AFTER DELETE ON knowledge BEGIN
+                    INSERT INTO knowledge_fts(knowledge_fts, rowid, topic, content)
+                    VALUES ('delete', old.id, old.topic, old.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS knowledge_fts_update AFTER UPDATE OF topic, content ON knowledge BEGIN
+                    INSERT INTO knowledge_fts(knowledge_fts, rowid, topic, content)
+                    VALUES ('delete', old.id, old.topic, old.content);
+                    INSERT INTO knowledge_fts(rowid, topic, content) VALUES (new.id, new.topic, new.content);
+                END;
+            """)
+            if not exists:
+                # Index rows stored before FTS existed
+                cursor.execute("INSERT INTO knowledge_fts(knowledge_fts) VALUES ('rebuild')")
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 unavailable, knowledge search falls back to LIKE: {e}")
+
+        conn.commit()
+        conn.close()
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        return quantize(self.embedder(texts), self.embedding_dtype)
+
+    def load_index(self) -> Optional[IVFIndex]:
+        """
+        Build the vector index now instead of on first use
+
+        Loads the embedding model and embeds rows stored without a vector,
+        so servers call it at startup (off the event loop).
+
+        Returns:
+            The index, or None when no embedder is configured
+        """
+        if self.embedder is None:
+            return None
+        with self._index_lock:
+            if not self._index_loaded:
+                self._load_index()
+                self._index_loaded = True
+        return self.index
+
+    def _load_index(self, batch_size: int = 256):
+        """Build the vector index from stored embeddings, embedding any rows without one"""
+        # Dimension of the current model, to detect vectors from another model
+        dim = self._embed(["dimension probe"]).shape[1]
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        meta = dict(cursor.execute("SELECT key, value FROM memory_meta").fetchall())
+        if meta.get("embedding_dtype", self.embedding_dtype) != self.embedding_dtype or \
+                int(meta.get("embedding_dim", dim)) != dim:
+            # Stored in another format or by another model: re-embed everything
+            cursor.execute("UPDATE knowledge SET embedding = NULL")
+        else:
+            # Blobs of the wrong size (e.g. from before dimensions were recorded)
+            cursor.execute(
+                "UPDATE knowledge SET embedding = NULL WHERE typeof(embedding) = 'blob' AND length(embedding) != ?",
+                (dim * np.dtype(self.embedding_dtype).itemsize,)
+            )
+
+        # Rows without a BLOB embedding (new, legacy TEXT or reset above)
+        missing = cursor.execute(
+            "SELECT id, topic, content FROM knowledge WHERE embedding IS NULL OR typeof(embedding) != 'blob'"
+        ).fetchall()
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            vectors = self._embed([f"{topic}\n{content}" for _, topic, content in batch])
+            cursor.executemany(
+                "UPDATE knowledge SET embedding = ? WHERE id = ?",
+                [(to_blob(vector), row[0]) for vector, row in zip(vectors, batch)]
+            )
+
+        ids, vectors = [], []
+        for row_id, blob in cursor.execute(
+            "SELECT id, embedding FROM knowledge WHERE typeof(embedding) = 'blob'"
+        ):
+            ids.append(row_id)
+            vectors.append(from_blob(blob, self.embedding_dtype))
+
+        cursor.executemany(
+            "INSERT OR REPLACE INTO memory_meta (key, value) VALUES (?, ?)",
+            [("embedding_dtype", self.embedding_dtype), ("embedding_dim", str(dim))]
+        )
         conn.commit()
         conn.close()
 
+        self.index = IVFIndex(dim, dtype=self.embedding_dtype)
+        if ids:
+            self.index.add(ids, np.stack(vectors))
+
     def store_conversation(
         self,
         conversation_id: str,
@@ -297,32 +443,58 @@ class LongTermMemory:
             topic: Topic/subject
             content: Knowledge content
         """
+        index = self.load_index()
+        vector = self._embed([f"{topic}\n{content}"])[0] if index is not None else None
+
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
         cursor.execute("""
-            INSERT INTO knowledge (topic, content)
-            VALUES (?, ?)
-        """, (topic, content))
+            INSERT INTO knowledge (topic, content, embedding)
+            VALUES (?, ?, ?)
+        """, (topic, content, to_blob(vector) if vector is not None else None))
+        row_id = cursor.lastrowid
 
         conn.commit()
         conn.close()
 
-    def search_knowledge(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        if vector is not None:
+            index.add([row_id], vector[None, :])
+
+    def search_knowledge(
+        self,
+        query: str,
+        limit: int = 5,
+        min_similarity: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Search knowledge base (simple text search for now)
+        Search knowledge base: semantic first, full-text as fallback
 
         Args:
             query: Search query
             limit: Maximum results
+            min_similarity: Override the instance's semantic score threshold
 
         Returns:
-            Relevant knowledge entries
+            Relevant knowledge entries (with a score)
         """
+        threshold = self.min_similarity if min_similarity is None else min_similarity
+        index = self.load_index()
+        if index is not None and len(index):
+            query_vector = self.embedder([query])[0]
+            # Nearest neighbours always exist; only close ones are relevant
+            hits = [(row_id, score) for row_id, score in index.search(query_vector, limit)
+                    if score >= threshold]
+            if hits:
+                return self._fetch_knowledge(hits)
+
+        if self.fts_enabled:
+            return self._search_knowledge_fts(query, limit)
+
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
-        # Simple text search (can be upgraded to vector search later)
+        # Simple text search
         cursor.execute("""
             SELECT topic, content, timestamp
             FROM knowledge
@@ -344,6 +516,57 @@ class LongTermMemory:
 
         return knowledge
 
+    def _fetch_knowledge(self, hits: List[tuple]) -> List[Dict[str, Any]]:
+        """Rows for (id, score) hits, in hit order"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        placeholders = ",".join("?" * len(hits))
+        cursor.execute(f"""
+            SELECT id, topic, content, timestamp
+            FROM knowledge
+            WHERE id IN ({placeholders})
+        """, [row_id for row_id, _ in hits])
+        rows = {row[0]: row for row in cursor.fetchall()}
+        conn.close()
+
+        return [
+            {
+                "topic": rows[row_id][1],
+                "content": rows[row_id][2],
+                "timestamp": rows[row_id][3],
+                "score": score
+            }
+            for row_id, score in hits if row_id in rows
+        ]
+
+    def _search_knowledge_fts(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """BM25-ranked full-text search over topic and content"""
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in terms)
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT k.topic, k.content, k.timestamp, bm25(knowledge_fts) AS rank
+            FROM knowledge_fts
+            JOIN knowledge k ON k.id = knowledge_fts.rowid
+            WHERE knowledge_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        """, (match, limit))
+
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [
+            {"topic": row[0], "content": row[1], "timestamp": row[2], "score": -row[3]}
+            for row in rows
+        ]
+
     def get_statistics(self) -> Dict[str, int]:
         """
         Get memory statistics
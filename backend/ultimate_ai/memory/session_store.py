@@ -0,0 +1,346 @@
+"""
+Session Store
+Bounded in-process session state with LRU/TTL eviction and spill-to-disk
+
+Long-running servers keep per-session state (conversation histories, agent
+sessions, codebase indexes) keyed by an id the client picks. A plain dict
+only ever grows; SessionStore caps it by count and approximate bytes, drops
+sessions nobody has touched for ttl seconds, and can move idle sessions to
+disk so they cost no RAM until the client comes back.
+"""
+
+import atexit
+import hashlib
+import os
+import pickle
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+DEFAULT_SPILL_DIR = Path(os.environ.get(
+    "SESSION_SPILL_DIR",
+    Path.home() / ".cache" / "ultimate_ai" / "sessions"
+))
+
+
+def approximate_size(value: Any) -> int:
+    """
+    Approximate memory footprint of a session value in bytes
+
+    The pickled size tracks the payload (strings, lists, nested objects)
+    closely enough for budgeting; values that can't be pickled fall back
+    to a recursive sys.getsizeof walk.
+    """
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return _deep_sizeof(value, set())
+
+
+def _deep_sizeof(value: Any, seen: set) -> int:
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value, 0)
+    if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(item, seen) for item in value)
+    if hasattr(value, "__dict__"):
+        size += _deep_sizeof(vars(value), seen)
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "size", "last_access")
+
+    def __init__(self, value: Any, size: int, last_access: float):
+        self.value = value
+        self.size = size
+        self.last_access = last_access
+
+
+class SessionStore(MutableMapping):
+    """
+    Dict-like, thread-safe session map with bounded memory
+
+    - Entries are kept in LRU order. Past max_sessions or max_bytes the
+      least recently used ones leave memory.
+    - Entries idle for idle_after seconds are spilled to disk (when a
+      spill_dir is set) and transparently loaded on next access.
+    - Entries idle for ttl seconds are dropped, in memory or on disk.
+    - Without a spill_dir, anything that would be spilled is dropped.
+
+    Sizes are measured once, when a value is assigned or reloaded from
+    disk, so lookups never re-serialize large values. Growth from in-place
+    mutation is only counted when reported through touch(key, grown_by)
+    or by assigning the value again.
+
+    Spill files live in a per-process subdirectory, so several workers can
+    share one spill_dir without reading or deleting each other's sessions.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_sessions: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: Optional[float] = 24 * 3600,
+        idle_after: Optional[float] = None,
+        spill_dir: Optional[Path] = None,
+        on_evict: Optional[Callable[[Hashable], None]] = None,
+        sizer: Callable[[Any], int] = approximate_size
+    ):
+        """
+        Args:
+            name: Store name (stats label and spill subdirectory)
+            max_sessions: Sessions kept in memory
+            max_bytes: Approximate bytes kept in memory
+            ttl: Seconds without access before a session is forgotten (None = never)
+            idle_after: Seconds without access before a session is spilled (None = only on pressure)
+            spill_dir: Directory for spilled sessions (None = drop instead)
+            on_evict: Called with the key whenever a session leaves memory other than by del
+            sizer: Byte estimate for a value
+        """
+        self.name = name
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.idle_after = idle_after
+        self.on_evict = on_evict
+        self.sizer = sizer
+
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        # key -> (path, last_access, bytes on disk); oldest first
+        self._spilled: "OrderedDict[Hashable, Tuple[Path, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.stats = {"evictions": 0, "expired": 0, "spills": 0, "restores": 0, "spill_errors": 0}
+
+        self._spill_root = Path(spill_dir) / name if spill_dir is not None else None
+        self._spill_pid: Optional[int] = None
+        self.spill_dir: Optional[Path] = None
+        if self._spill_root is not None:
+            self._process_spill_dir()
+            atexit.register(self._remove_spill_dir)
+
+    # ---- mapping interface ----
+
+    def __getitem__(self, key: Hashable) -> Any:
+        with self._lock:
+            now = time.time()
+            self._sweep(now)
+
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._restore(key)
+                if entry is None:
+                    raise KeyError(key)
+            self._entries.move_to_end(key)
+            entry.last_access = now
+            return entry.value
+
+    def __setitem__(self, key: Hashable, value: Any):
+        size = self.sizer(value)
+        with self._lock:
+            now = time.time()
+            self._discard_spilled(key)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = _Entry(value, size, now)
+            self._bytes += size
+            self._sweep(now)
+            self._enforce_limits(keep=key)
+
+    def __delitem__(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+            elif key not in self._spilled:
+                raise KeyError(key)
+            self._discard_spilled(key)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            self._sweep(time.time())
+            return key in self._entries or key in self._spilled
+
+    def __iter__(self) -> Iterator[Hashable]:
+        with self._lock:
+            keys: List[Hashable] = list(self._entries) + list(self._spilled)
+        return iter(keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries) + len(self._spilled)
+
+    def touch(self, key: Hashable, grown_by: int = 0):
+        """
+        Mark a session as used, optionally after growing it in place
+
+        Args:
+            key: Session key
+            grown_by: Approximate bytes added to the value since it was stored
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.size += grown_by
+            self._bytes += grown_by
+            entry.last_access = time.time()
+            self._entries.move_to_end(key)
+            self._enforce_limits(keep=key)
+
+    def sweep(self):
+        """Apply TTL and idle policies now (also done on every access)"""
+        with self._lock:
+            self._sweep(time.time())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for key in list(self._spilled):
+                self._discard_spilled(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gauges (sessions, bytes, spilled) and eviction counters"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "sessions": len(self._entries),
+                "bytes": self._bytes,
+                "spilled": len(self._spilled),
+                "spilled_bytes": sum(size for _, _, size in self._spilled.values()),
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                **self.stats
+            }
+
+    # ---- eviction ----
+
+    def _sweep(self, now: float):
+        if self._spill_root is not None:
+            self._process_spill_dir()
+        if self.ttl is not None:
+            cutoff = now - self.ttl
+            while self._spilled:
+                key, (_, last_access, _) = next(iter(self._spilled.items()))
+                if last_access > cutoff:
+                    break
+                self._discard_spilled(key)
+                self.stats["expired"] += 1
+
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            idle = now - entry.last_access
+            if self.ttl is not None and idle >= self.ttl:
+                self._evict(key, spill=False)
+                self.stats["expired"] += 1
+            elif self.idle_after is not None and self.spill_dir is not None and idle >= self.idle_after:
+                self._evict(key, spill=True)
+            else:
+                break
+
+    def _enforce_limits(self, keep: Hashable):
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_sessions or self._bytes > self.max_bytes
+        ):
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            self._evict(key, spill=self.spill_dir is not None)
+            self.stats["evictions"] += 1
+
+    def _evict(self, key: Hashable, spill: bool):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        if spill:
+            self._spill(key, entry)
+        if self.on_evict is not None:
+            try:
+                self.on_evict(key)
+            except Exception as e:
+                print(f"Session store {self.name}: on_evict failed for {key!r}: {e}")
+
+    # ---- disk ----
+
+    def _process_spill_dir(self) -> Path:
+        """This process's spill directory, recreated after a fork"""
+        pid = os.getpid()
+        if self._spill_pid != pid:
+            if self._spill_pid is not None:
+                # Forked child: the spilled files belong to the parent
+                self._spilled.clear()
+            self.spill_dir = self._spill_root / str(pid)
+            # Leftovers from an earlier process that had the same pid
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
+            self._spill_pid = pid
+        return self.spill_dir
+
+    def _remove_spill_dir(self):
+        if self._spill_pid == os.getpid():
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def _path(self, key: Hashable) -> Path:
+        name = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        return self._process_spill_dir() / f"{name}.pkl"
+
+    def _spill(self, key: Hashable, entry: _Entry):
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        try:
+            data = pickle.dumps((key, entry.value), protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except Exception as e:
+            # Unpicklable or disk trouble: the session is dropped instead
+            print(f"Session store {self.name}: could not spill {key!r}: {e}")
+            tmp.unlink(missing_ok=True)
+            self.stats["spill_errors"] += 1
+            return
+        self._spilled[key] = (path, entry.last_access, len(data))
+        self.stats["spills"] += 1
+
+    def _restore(self, key: Hashable) -> Optional[_Entry]:
+        spilled = self._spilled.pop(key, None)
+        if spilled is None:
+            return None
+        path = spilled[0]
+        try:
+            data = path.read_bytes()
+            stored_key, value = pickle.loads(data)
+        except Exception as e:
+            print(f"Session store {self.name}: could not restore {key!r}: {e}")
+            return None
+        finally:
+            path.unlink(missing_ok=True)
+        if stored_key != key:
+            return None
+
+        # The pickle just read is the default size estimate; no need to redo it
+        size = len(data) if self.sizer is approximate_size else self.sizer(value)
+        entry = _Entry(value, size, time.time())
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self.stats["restores"] += 1
+        self._enforce_limits(keep=key)
+        return entry
+
+    def _discard_spilled(self, key: Hashable):
+        spilled = self._spilled.pop(key, None)
+        if spilled is not None:
+            spilled[0].unlink(missing_ok=True)
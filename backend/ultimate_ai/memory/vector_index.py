@@ -0,0 +1,273 @@
+"""
+Vector Index
+Quantized embeddings and an in-process IVF index for semantic memory recall
+"""
+
+import threading
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+Embedder = Callable[[List[str]], np.ndarray]
+
+DTYPES = ("int8", "float16")
+
+
+def quantize(vectors: np.ndarray, dtype: str = "int8") -> np.ndarray:
+    """
+    Normalize and quantize embeddings
+
+    Vectors are L2-normalized first, so every component lies in [-1, 1]
+    and int8 needs no per-vector scale: q = round(v * 127).
+
+    Args:
+        vectors: (n, dim) float array
+        dtype: "int8" (4x smaller) or "float16" (2x smaller)
+
+    Returns:
+        Quantized (n, dim) array
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.maximum(norms, 1e-12)
+    if dtype == "int8":
+        return np.round(vectors * 127).astype(np.int8)
+    if dtype == "float16":
+        return vectors.astype(np.float16)
+    raise ValueError(f"Unsupported dtype {dtype}; use one of {DTYPES}")
+
+
+def to_blob(vector: np.ndarray) -> bytes:
+    return np.ascontiguousarray(vector).tobytes()
+
+
+def from_blob(blob: bytes, dtype: str) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.dtype(dtype))
+
+
+def sentence_transformer_embedder(model_name: str = "all-MiniLM-L6-v2") -> Optional[Embedder]:
+    """
+    Local embedding function, or None if sentence-transformers is missing
+
+    Args:
+        model_name: sentence-transformers model
+
+    Returns:
+        Function mapping texts to an (n, dim) float32 array
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+
+    model = None
+    lock = threading.Lock()
+
+    def embed(texts: List[str]) -> np.ndarray:
+        nonlocal model
+        with lock:
+            if model is None:
+                model = SentenceTransformer(model_name)
+        return model.encode(texts, convert_to_numpy=True, show_progress_bar=False).astype(np.float32)
+
+    return embed
+
+
+class IVFIndex:
+    """
+    Inverted-file index over quantized vectors
+
+    Vectors are bucketed by their nearest k-means centroid. A query scores
+    the centroids, then only the vectors in the nprobe closest buckets, so
+    a lookup touches ~nprobe/nlist of the data (under 1% at defaults for
+    hundreds of thousands of vectors).
+
+    Until min_train_size vectors exist the index is a flat scan. After
+    that, new vectors go straight into the bucket of their nearest
+    centroid, and the centroids are refitted whenever the index has
+    doubled since the last training.
+    """
+
+    def __init__(self, dim: int, dtype: str = "int8", nprobe: int = 16, min_train_size: int = 2048):
+        """
+        Args:
+            dim: Embedding dimension
+            dtype: Storage dtype of the vectors ("int8" or "float16")
+            nprobe: Buckets scanned per query (recall vs latency)
+            min_train_size: Below this the index is a flat scan
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype {dtype}; use one of {DTYPES}")
+        self.dim = dim
+        self.dtype = dtype
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+
+        self._centroids: Optional[np.ndarray] = None  # (nlist, dim) float32
+        self._lists: List[np.ndarray] = []  # Quantized vectors per bucket
+        self._list_ids: List[np.ndarray] = []  # int64 ids per bucket
+        self._buffer_vectors: List[np.ndarray] = []  # Blocks not yet bucketed
+        self._buffer_ids: List[np.ndarray] = []
+        self._trained_size = 0
+        self._size = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def _scale(self) -> float:
+        # int8 codes are vectors * 127
+        return 1.0 / 127 if self.dtype == "int8" else 1.0
+
+    def add(self, ids: List[int], vectors: np.ndarray) -> None:
+        """
+        Add quantized vectors
+
+        Args:
+            ids: Row ids
+            vectors: (n, dim) array from quantize()
+        """
+        vectors = np.asarray(vectors, dtype=np.dtype(self.dtype)).reshape(-1, self.dim)
+        with self._lock:
+            ids = np.asarray(ids, dtype=np.int64)
+            if self._centroids is None:
+                self._buffer_vectors.append(vectors)
+                self._buffer_ids.append(ids)
+            else:
+                assignments = self._assign(vectors)
+                for bucket in np.unique(assignments):
+                    mask = assignments == bucket
+                    self._lists[bucket] = np.concatenate([self._lists[bucket], vectors[mask]])
+                    self._list_ids[bucket] = np.concatenate([self._list_ids[bucket], ids[mask]])
+            self._size += len(vectors)
+
+            if self._needs_training():
+                self.train()
+
+    def _needs_training(self) -> bool:
+        if self._size < self.min_train_size:
+            return False
+        # First training, or the data has doubled since the centroids were fitted
+        return self._centroids is None or self._size >= 2 * self._trained_size
+
+    def train(self, iterations: int = 8, sample_size: int = 32768, seed: int = 0) -> None:
+        """
+        (Re)fit centroids with k-means and rebucket every vector
+
+        Args:
+            iterations: k-means iterations
+            sample_size: Vectors used to fit the centroids
+            seed: Random seed
+        """
+        with self._lock:
+            ids, vectors = self._all()
+            if len(ids) == 0:
+                return
+
+            # Small buckets keep each probe cheap; nprobe buys the recall back
+            nlist = max(1, min(4 * int(np.sqrt(len(ids))), len(ids) // 32))
+            rng = np.random.default_rng(seed)
+            sample = vectors[rng.choice(len(ids), min(sample_size, len(ids)), replace=False)]
+            sample = sample.astype(np.float32) * self._scale
+            centroids = sample[rng.choice(len(sample), min(nlist, len(sample)), replace=False)].copy()
+
+            for _ in range(iterations):
+                assignments = np.argmax(sample @ centroids.T, axis=1)  # Spherical k-means
+                for c in range(len(centroids)):
+                    members = sample[assignments == c]
+                    if len(members):
+                        centroid = members.mean(axis=0)
+                        centroids[c] = centroid / max(np.linalg.norm(centroid), 1e-12)
+
+            self._centroids = centroids
+            assignments = self._assign(vectors)
+            order = np.argsort(assignments, kind="stable")
+            bounds = np.searchsorted(assignments[order], np.arange(len(centroids) + 1))
+            self._lists = [vectors[order[bounds[c]:bounds[c + 1]]] for c in range(len(centroids))]
+            self._list_ids = [ids[order[bounds[c]:bounds[c + 1]]] for c in range(len(centroids))]
+            self._buffer_vectors, self._buffer_ids = [], []
+            self._trained_size = len(ids)
+
+    def _all(self) -> Tuple[np.ndarray, np.ndarray]:
+        parts = [v for v in self._lists if len(v)]
+        id_parts = [i for i in self._list_ids if len(i)]
+        parts.extend(self._buffer_vectors)
+        id_parts.extend(self._buffer_ids)
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty((0, self.dim), dtype=np.dtype(self.dtype))
+        return np.concatenate(id_parts), np.concatenate(parts)
+
+    def _assign(self, vectors: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+        """Nearest centroid per vector, in batches to bound memory"""
+        return np.concatenate([
+            np.argmax((vectors[i:i + batch_size].astype(np.float32) * self._scale) @ self._centroids.T, axis=1)
+            for i in range(0, len(vectors), batch_size)
+        ])
+
+    def _nearest_centroids(self, data: np.ndarray, count: int) -> np.ndarray:
+        scores = data @ self._centroids.T
+        if count >= scores.shape[1]:
+            return np.argsort(-scores, axis=1)
+        top = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+        return np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+
+    def remove(self, ids: List[int]) -> None:
+        """Drop vectors by id"""
+        drop = np.asarray(ids, dtype=np.int64)
+        with self._lock:
+            for c in range(len(self._lists)):
+                keep = ~np.isin(self._list_ids[c], drop)
+                if not keep.all():
+                    self._size -= int((~keep).sum())
+                    self._lists[c] = self._lists[c][keep]
+                    self._list_ids[c] = self._list_ids[c][keep]
+            for b in range(len(self._buffer_ids)):
+                keep = ~np.isin(self._buffer_ids[b], drop)
+                if not keep.all():
+                    self._size -= int((~keep).sum())
+                    self._buffer_vectors[b] = self._buffer_vectors[b][keep]
+                    self._buffer_ids[b] = self._buffer_ids[b][keep]
+
+    def search(self, query: np.ndarray, k: int = 5, nprobe: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Top-k by cosine similarity
+
+        Args:
+            query: (dim,) float embedding (normalized here)
+            k: Results to return
+            nprobe: Override buckets scanned
+
+        Returns:
+            (id, similarity) pairs, best first
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        query = query / max(np.linalg.norm(query), 1e-12)
+
+        with self._lock:
+            blocks, id_blocks = [], []
+            if self._centroids is not None:
+                probe = self._nearest_centroids(query[None, :], min(nprobe or self.nprobe, len(self._centroids)))[0]
+                blocks = [self._lists[c] for c in probe if len(self._lists[c])]
+                id_blocks = [self._list_ids[c] for c in probe if len(self._list_ids[c])]
+            blocks.extend(block for block in self._buffer_vectors if len(block))
+            id_blocks.extend(block for block in self._buffer_ids if len(block))
+        if not blocks:
+            return []
+
+        # Score bucket by bucket: dequantizing small blocks stays in cache
+        scores = np.concatenate([block.astype(np.float32) @ query for block in blocks]) * self._scale
+        candidate_ids = np.concatenate(id_blocks)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(candidate_ids[i]), float(scores[i])) for i in top]
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by vectors and ids"""
+        total = sum(v.nbytes for v in self._lists) + sum(i.nbytes for i in self._list_ids)
+        total += sum(v.nbytes for v in self._buffer_vectors) + sum(i.nbytes for i in self._buffer_ids)
+        if self._centroids is not None:
+            total += self._centroids.nbytes
+        return total
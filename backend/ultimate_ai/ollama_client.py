@@ -0,0 +1,247 @@
+"""
+Async Ollama Client
+Pooled, non-blocking access to the Ollama API with token streaming
+"""
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import aiohttp
+
+
+DEFAULT_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+
+class OllamaError(Exception):
+    """Ollama returned an error response"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class OllamaConnectionError(OllamaError):
+    """Ollama could not be reached"""
+
+
+@dataclass
+class OllamaChunk:
+    """One streamed piece of a generation"""
+    text: str
+    done: bool = False
+    context: Optional[List[int]] = None
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class OllamaResult:
+    """A complete generation"""
+    text: str
+    context: Optional[List[int]] = None
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+
+class OllamaClient:
+    """
+    Shared async client for the Ollama HTTP API
+
+    - One pooled aiohttp session per client (connection reuse, no per-call handshakes)
+    - Token streaming via /api/generate NDJSON
+    - keep_alive so the model stays loaded between requests
+    - Passes Ollama's KV `context` tokens between turns so history is not re-prefilled
+    """
+
+    STAT_KEYS = (
+        "total_duration",
+        "load_duration",
+        "prompt_eval_count",
+        "prompt_eval_duration",
+        "eval_count",
+        "eval_duration",
+    )
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        model: str = "llama3.2",
+        keep_alive: Optional[str] = DEFAULT_KEEP_ALIVE,
+        timeout: float = 120,
+        max_connections: int = 16,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.keep_alive = keep_alive
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=5)
+        self.max_connections = max_connections
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Create the pooled session lazily, inside the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._session_loop = loop
+        return self._session
+
+    def _build_payload(
+        self,
+        prompt: str,
+        stream: bool,
+        model: Optional[str],
+        system: Optional[str],
+        options: Optional[Dict[str, Any]],
+        images: Optional[List[str]],
+        context: Optional[List[int]],
+        keep_alive: Optional[str],
+    ) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "model": model or self.model,
+            "prompt": prompt,
+            "stream": stream,
+        }
+        if system:
+            payload["system"] = system
+        if options:
+            payload["options"] = options
+        if images:
+            payload["images"] = images
+        if context:
+            payload["context"] = context
+        keep_alive = keep_alive if keep_alive is not None else self.keep_alive
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        return payload
+
+    async def stream_generate(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        system: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        images: Optional[List[str]] = None,
+        context: Optional[List[int]] = None,
+        keep_alive: Optional[str] = None,
+    ) -> AsyncIterator[OllamaChunk]:
+        """
+        Stream a completion token by token
+
+        Args:
+            prompt: Prompt text (only the new turn when `context` is given)
+            model: Model name (defaults to the client's model)
+            system: Optional system prompt
+            options: Ollama options (temperature, num_predict, ...)
+            images: Optional base64 images for multimodal models
+            context: KV context tokens returned by the previous turn
+            keep_alive: How long Ollama keeps the model loaded
+
+        Yields:
+            OllamaChunk pieces; the last one has done=True and carries context/stats
+        """
+        payload = self._build_payload(prompt, True, model, system, options, images, context, keep_alive)
+        session = await self._get_session()
+        try:
+            async with session.post(f"{self.base_url}/api/generate", json=payload) as response:
+                if response.status != 200:
+                    body = await response.text()
+                    raise OllamaError(f"Ollama returned status {response.status}: {body[:200]}", response.status)
+
+                # NDJSON: one JSON object per line
+                buffer = b""
+                async for data in response.content.iter_any():
+                    buffer += data
+                    while b"\n" in buffer:
+                        line, buffer = buffer.split(b"\n", 1)
+                        chunk = self._parse_line(line)
+                        if chunk is not None:
+                            yield chunk
+                chunk = self._parse_line(buffer)
+                if chunk is not None:
+                    yield chunk
+        except aiohttp.ClientConnectionError as e:
+            raise OllamaConnectionError(f"Cannot connect to Ollama at {self.base_url}: {e}") from e
+        except asyncio.TimeoutError as e:
+            raise OllamaConnectionError(f"Ollama timed out after {self.timeout.total}s") from e
+
+    def _parse_line(self, line: bytes) -> Optional[OllamaChunk]:
+        line = line.strip()
+        if not line:
+            return None
+        data = json.loads(line)
+        if "error" in data:
+            raise OllamaError(data["error"])
+        done = bool(data.get("done"))
+        return OllamaChunk(
+            text=data.get("response", ""),
+            done=done,
+            context=data.get("context") if done else None,
+            stats={k: data[k] for k in self.STAT_KEYS if k in data} if done else {},
+        )
+
+    async def generate(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        system: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        images: Optional[List[str]] = None,
+        context: Optional[List[int]] = None,
+        keep_alive: Optional[str] = None,
+    ) -> OllamaResult:
+        """
+        Generate a complete response (non-blocking)
+
+        Args:
+            Same as stream_generate
+
+        Returns:
+            OllamaResult with text, KV context and timing stats
+        """
+        payload = self._build_payload(prompt, False, model, system, options, images, context, keep_alive)
+        session = await self._get_session()
+        try:
+            async with session.post(f"{self.base_url}/api/generate", json=payload) as response:
+                if response.status != 200:
+                    body = await response.text()
+                    raise OllamaError(f"Ollama returned status {response.status}: {body[:200]}", response.status)
+                data = await response.json(content_type=None)
+        except aiohttp.ClientConnectionError as e:
+            raise OllamaConnectionError(f"Cannot connect to Ollama at {self.base_url}: {e}") from e
+        except asyncio.TimeoutError as e:
+            raise OllamaConnectionError(f"Ollama timed out after {self.timeout.total}s") from e
+
+        if "error" in data:
+            raise OllamaError(data["error"])
+        return OllamaResult(
+            text=data.get("response", ""),
+            context=data.get("context"),
+            stats={k: data[k] for k in self.STAT_KEYS if k in data},
+        )
+
+    async def list_models(self) -> List[str]:
+        """Names of the models Ollama has available"""
+        session = await self._get_session()
+        try:
+            async with session.get(f"{self.base_url}/api/tags") as response:
+                if response.status != 200:
+                    raise OllamaError(f"Ollama returned status {response.status}", response.status)
+                data = await response.json(content_type=None)
+        except aiohttp.ClientConnectionError as e:
+            raise OllamaConnectionError(f"Cannot connect to Ollama at {self.base_url}: {e}") from e
+        return [m.get("name", "") for m in data.get("models", [])]
+
+    async def warm_up(self, model: Optional[str] = None) -> None:
+        """Load the model into memory ahead of the first request"""
+        # An empty prompt just loads the model and applies keep_alive
+        await self.generate("", model=model)
+
+    async def close(self) -> None:
+        """Close the pooled session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
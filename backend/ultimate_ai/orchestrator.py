@@ -3,7 +3,7 @@ Agent Orchestrator
 Routes requests to the best agent and combines their expertise
 """
 
-from typing import List, Dict, Optional, Any
+from typing import AsyncIterator, List, Dict, Optional, Any
 import asyncio
 from .core_intelligence import CoreIntelligence, Message
 from .agents import (
@@ -14,6 +14,58 @@ from .agents import (
     CreativeAgent
 )
 from .agents.base_agent import AgentResponse
+from .router import AgentRouter
+from .memory.session_store import DEFAULT_SPILL_DIR, SessionStore
+
+
+def _build_social_responses() -> Dict[str, str]:
+    """Exact-match table for simple social messages (human-like conversation)"""
+    responses: Dict[str, str] = {}
+
+    # Greetings (also with a trailing "!")
+    greetings = {
+        "hi": "Hey! How can I help you today?",
+        "hello": "Hello! What can I do for you?",
+        "hey": "Hey there! What's on your mind?",
+        "good morning": "Good morning! How can I assist you today?",
+        "good afternoon": "Good afternoon! What can I help you with?",
+        "good evening": "Good evening! How may I help you?"
+    }
+    for greeting, response in greetings.items():
+        responses[greeting] = response
+        responses[greeting + "!"] = response
+
+    # How are you variations
+    for phrase in [
+        "how are you", "how are you?", "how r u", "how are u",
+        "how's it going", "how is it going", "what's up", "whats up",
+        "sup", "how you doing"
+    ]:
+        responses[phrase] = "I'm doing great, thanks for asking! I'm excited to help you with whatever you need. What's on your mind today?"
+
+    # Thank you
+    for phrase in ["thank you", "thanks", "thx", "ty", "thank u", "thank you!", "thanks!"]:
+        responses[phrase] = "You're very welcome! Happy to help anytime. Is there anything else you'd like to explore?"
+
+    # Affirmations (also with a trailing "!")
+    for phrase in ["ok", "okay", "cool", "nice", "great", "awesome", "perfect"]:
+        responses[phrase] = "Sounds good! Anything else I can help you with?"
+        responses[phrase + "!"] = "Sounds good! Anything else I can help you with?"
+
+    # Goodbye
+    for phrase in ["bye", "goodbye", "see you", "see ya", "later", "bye!"]:
+        responses[phrase] = "Goodbye! Feel free to come back anytime you need help. Have a great day!"
+
+    # Simple yes/no
+    for phrase in ["yes", "yeah", "yep", "yup", "sure"]:
+        responses[phrase] = "Great! What would you like to do?"
+    for phrase in ["no", "nope", "nah"]:
+        responses[phrase] = "No problem! Let me know if you need anything else."
+
+    return responses
+
+
+SOCIAL_RESPONSES = _build_social_responses()
 
 
 class AgentOrchestrator:
@@ -34,8 +86,19 @@ class AgentOrchestrator:
             ReasoningAgent(self.core),      # Reasoning last (catches everything else)
         ]
 
-        # Conversation memory
-        self.conversations: Dict[str, List[Message]] = {}
+        # One compiled index over every agent's routing rules
+        self.router = AgentRouter(self.agents)
+
+        # Conversation memory: bounded, idle conversations go to disk, stale ones expire
+        self.conversations = SessionStore(
+            "conversations",
+            max_sessions=1000,
+            max_bytes=64 * 1024 * 1024,
+            ttl=24 * 3600,
+            idle_after=30 * 60,
+            spill_dir=DEFAULT_SPILL_DIR,
+            on_evict=self.core.forget_conversation
+        )
 
     async def process_message(
         self,
@@ -80,24 +143,16 @@ class AgentOrchestrator:
             "temperature": temperature
         }
 
+        # Score every agent in one pass over the message
+        routing = self.router.route(message)
+        agent_scores = routing.scores
+
         # If images are present, boost vision agent confidence
         if images:
-            # Ask all agents if they can handle this
-            agent_scores = await asyncio.gather(*[
-                agent.can_handle(message) for agent in self.agents
-            ])
-
-            # Boost vision agent score if images present
             for i, agent in enumerate(self.agents):
                 if isinstance(agent, VisionAgent):
                     agent_scores[i] = max(agent_scores[i], 0.8)
 
-        else:
-            # Ask all agents if they can handle this
-            agent_scores = await asyncio.gather(*[
-                agent.can_handle(message) for agent in self.agents
-            ])
-
         # Find the best agent
         best_agent_idx = agent_scores.index(max(agent_scores))
         best_agent = self.agents[best_agent_idx]
@@ -110,8 +165,10 @@ class AgentOrchestrator:
                 message,
                 history=history,
                 images=images,
-                temperature=temperature
+                temperature=temperature,
+                conversation_id=conversation_id
             )
+            general = True
 
             agent_response = AgentResponse(
                 content=response_text,
@@ -123,10 +180,11 @@ class AgentOrchestrator:
         else:
             # Let the best agent handle it
             agent_response = await best_agent.process(message, context)
+            general = False
 
         # Add to conversation history
         if conversation_id:
-            self._add_to_history(conversation_id, message, agent_response.content, "user")
+            self._add_to_history(conversation_id, message, agent_response.content, "user", general)
 
         return {
             "response": agent_response.content,
@@ -136,88 +194,99 @@ class AgentOrchestrator:
             "metadata": agent_response.metadata or {},
             "all_agent_scores": {
                 agent.name: score for agent, score in zip(self.agents, agent_scores)
-            }
+            },
+            "routing": routing.to_dict()
         }
 
-    def _handle_social_message(self, message: str) -> Optional[str]:
-        """
-        Handle simple social messages for human-like conversation
-
-        Returns response if it's a social message, None otherwise
+    async def stream_message(
+        self,
+        message: str,
+        conversation_id: Optional[str] = None,
+        images: Optional[List[str]] = None,
+        temperature: float = 0.8
+    ) -> AsyncIterator[Dict[str, Any]]:
         """
-        msg_lower = message.lower().strip()
-
-        # Greetings
-        greetings = {
-            "hi": "Hey! How can I help you today?",
-            "hello": "Hello! What can I do for you?",
-            "hey": "Hey there! What's on your mind?",
-            "good morning": "Good morning! How can I assist you today?",
-            "good afternoon": "Good afternoon! What can I help you with?",
-            "good evening": "Good evening! How may I help you?"
-        }
-
-        for greeting, response in greetings.items():
-            if msg_lower == greeting or msg_lower == greeting + "!":
-                return response
-
-        # How are you variations
-        how_are_you = [
-            "how are you", "how are you?", "how r u", "how are u",
-            "how's it going", "how is it going", "what's up", "whats up",
-            "sup", "how you doing"
-        ]
-        if msg_lower in how_are_you:
-            return "I'm doing great, thanks for asking! I'm excited to help you with whatever you need. What's on your mind today?"
+        Streaming version of process_message
 
-        # Thank you
-        thanks = ["thank you", "thanks", "thx", "ty", "thank u", "thank you!", "thanks!"]
-        if msg_lower in thanks:
-            return "You're very welcome! Happy to help anytime. Is there anything else you'd like to explore?"
+        General chat streams tokens as Ollama produces them; specialised
+        agents still answer in one piece.
 
-        # Affirmations
-        affirmations = ["ok", "okay", "cool", "nice", "great", "awesome", "perfect"]
-        if msg_lower in affirmations or msg_lower in [a + "!" for a in affirmations]:
-            return "Sounds good! Anything else I can help you with?"
-
-        # Goodbye
-        goodbyes = ["bye", "goodbye", "see you", "see ya", "later", "bye!"]
-        if msg_lower in goodbyes:
-            return "Goodbye! Feel free to come back anytime you need help. Have a great day!"
+        Yields:
+            {"type": "token", "content": ...} events, then a final
+            {"type": "done", ...} event with the same fields as process_message
+        """
+        history = self.conversations.get(conversation_id, []) if conversation_id else []
 
-        # Simple yes/no
-        if msg_lower in ["yes", "yeah", "yep", "yup", "sure"]:
-            return "Great! What would you like to do?"
+        if not self._handle_social_message(message):
+            agent_scores = self.router.score(message)
+            if images:
+                for i, agent in enumerate(self.agents):
+                    if isinstance(agent, VisionAgent):
+                        agent_scores[i] = max(agent_scores[i], 0.8)
+
+            if max(agent_scores) < 0.3:
+                pieces = []
+                async for piece in self.core.chat_stream(
+                    message,
+                    history=history,
+                    images=images,
+                    temperature=temperature,
+                    conversation_id=conversation_id
+                ):
+                    pieces.append(piece)
+                    yield {"type": "token", "content": piece}
+
+                response_text = "".join(pieces).strip()
+                if conversation_id:
+                    self._add_to_history(conversation_id, message, response_text, "user", general=True)
+
+                yield {
+                    "type": "done",
+                    "response": response_text,
+                    "agent": "GeneralAgent",
+                    "confidence": 0.5,
+                    "reasoning": "General conversation mode",
+                    "metadata": {},
+                    "all_agent_scores": {
+                        agent.name: score for agent, score in zip(self.agents, agent_scores)
+                    }
+                }
+                return
+
+        result = await self.process_message(message, conversation_id, images, temperature)
+        yield {"type": "token", "content": result["response"]}
+        yield {"type": "done", **result}
 
-        if msg_lower in ["no", "nope", "nah"]:
-            return "No problem! Let me know if you need anything else."
+    def _handle_social_message(self, message: str) -> Optional[str]:
+        """
+        Handle simple social messages for human-like conversation
 
-        return None
+        Returns response if it's a social message, None otherwise
+        """
+        return SOCIAL_RESPONSES.get(message.lower().strip())
 
     def _add_to_history(
         self,
         conversation_id: str,
         user_message: str,
         assistant_response: str,
-        role: str = "user"
+        role: str = "user",
+        general: bool = False
     ):
         """Add message to conversation history"""
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = []
+        history = self.conversations.get(conversation_id, [])
+        if not general:
+            # The core's KV context never saw this turn
+            self.core.forget_conversation(conversation_id)
 
         # Add user message
-        self.conversations[conversation_id].append(
-            Message(role="user", content=user_message)
-        )
+        history.append(Message(role="user", content=user_message))
 
         # Add assistant response
-        self.conversations[conversation_id].append(
-            Message(role="assistant", content=assistant_response)
-        )
+        history.append(Message(role="assistant", content=assistant_response))
 
-        # Keep only last 50 messages to manage memory
-        if len(self.conversations[conversation_id]) > 50:
-            self.conversations[conversation_id] = self.conversations[conversation_id][-50:]
+        # Keep only last 50 messages; assigning re-measures the session's size
+        self.conversations[conversation_id] = history[-50:]
 
     def get_health_status(self) -> Dict[str, Any]:
         """
@@ -233,10 +302,13 @@ class AgentOrchestrator:
             "core_intelligence": core_health,
             "agents": [agent.name for agent in self.agents],
             "agent_count": len(self.agents),
-            "conversations_active": len(self.conversations)
+            "conversations_active": len(self.conversations),
+            "conversations": self.conversations.get_stats(),
+            "routing": self.router.get_stats()
         }
 
     def clear_conversation(self, conversation_id: str):
         """Clear conversation history"""
         if conversation_id in self.conversations:
             del self.conversations[conversation_id]
+        self.core.forget_conversation(conversation_id)
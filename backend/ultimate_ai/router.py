@@ -0,0 +1,284 @@
+"""
+Agent Router
+Compiles every agent's routing rules into one index and scores all agents in a single pass
+"""
+
+import re
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed set of terms
+
+    Finds every term occurring anywhere in a text (including overlapping
+    ones) in one pass, so the cost depends on the text length, not on how
+    many terms are registered.
+    """
+
+    def __init__(self, terms: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+
+        for term in terms:
+            if term:
+                self._insert(term)
+        self._build_failure_links()
+
+    def _insert(self, term: str):
+        state = 0
+        for ch in term:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        if term not in self._out[state]:
+            self._out[state] = self._out[state] + (term,)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> Set[str]:
+        """Every registered term that occurs in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[str] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+@dataclass
+class _CompiledRule:
+    score: float
+    group_ids: Tuple[int, ...]
+    pattern_ids: Tuple[int, ...]
+
+
+@dataclass
+class _CompiledAgent:
+    name: str
+    rules: List[_CompiledRule]
+    boost_pattern_id: Optional[int]
+    boost: float
+    boost_cap: float
+
+
+@dataclass
+class RoutingDecision:
+    """Scores for every agent plus how the decision was made"""
+    scores: List[float]
+    agent_names: List[str]
+    cached: bool = False
+    latency_us: float = 0.0
+    matched_terms: List[str] = field(default_factory=list)
+
+    @property
+    def best_agent(self) -> str:
+        return self.agent_names[self.scores.index(max(self.scores))]
+
+    def to_dict(self) -> Dict:
+        return {
+            "best_agent": self.best_agent,
+            "cached": self.cached,
+            "latency_us": round(self.latency_us, 1),
+            "matched_terms": self.matched_terms,
+        }
+
+
+class AgentRouter:
+    """
+    Routing engine for the orchestrator
+
+    - All terms from all agents' rules and expertise keywords go into one
+      Aho-Corasick automaton; regex patterns are compiled once
+    - A message is lowercased and scanned once; each agent's score is then
+      derived from the set of matched terms (no per-agent rescans)
+    - Decisions are cached per normalised message (LRU)
+    - Scan time and per-agent scoring time are recorded
+    """
+
+    def __init__(self, agents: List, cache_size: int = 1024):
+        self.agent_names = [agent.name for agent in agents]
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[List[float], List[str]]]" = OrderedDict()
+
+        terms: Set[str] = set()
+        pattern_index: Dict[str, int] = {}
+        group_index: Dict[Tuple[str, ...], int] = {}
+        self._term_groups: Dict[str, List[int]] = {}
+        self._term_keyword_agents: Dict[str, List[int]] = {}
+
+        def pattern_id(pattern: str) -> int:
+            if pattern not in pattern_index:
+                pattern_index[pattern] = len(pattern_index)
+            return pattern_index[pattern]
+
+        def group_id(group: List[str]) -> int:
+            key = tuple(sorted(set(term.lower() for term in group)))
+            if key not in group_index:
+                gid = len(group_index)
+                group_index[key] = gid
+                for term in key:
+                    terms.add(term)
+                    self._term_groups.setdefault(term, []).append(gid)
+            return group_index[key]
+
+        self._agents: List[_CompiledAgent] = []
+        for idx, agent in enumerate(agents):
+            rules = [
+                _CompiledRule(
+                    score=rule.score,
+                    group_ids=tuple(group_id(group) for group in rule.groups),
+                    pattern_ids=tuple(pattern_id(p) for p in rule.patterns),
+                )
+                for rule in getattr(agent, "routing_rules", [])
+            ]
+            for keyword in set(k.lower() for k in agent.expertise_keywords):
+                terms.add(keyword)
+                self._term_keyword_agents.setdefault(keyword, []).append(idx)
+
+            boost_pattern = getattr(agent, "keyword_boost_pattern", None)
+            self._agents.append(_CompiledAgent(
+                name=agent.name,
+                rules=rules,
+                boost_pattern_id=pattern_id(boost_pattern) if boost_pattern else None,
+                boost=getattr(agent, "keyword_boost", 0.0),
+                boost_cap=getattr(agent, "keyword_boost_cap", 1.0),
+            ))
+
+        self._automaton = KeywordAutomaton(sorted(terms))
+        self._patterns = [re.compile(p) for p, _ in sorted(pattern_index.items(), key=lambda kv: kv[1])]
+
+        # Stats
+        self.routes = 0
+        self.cache_hits = 0
+        self._scan_seconds = 0.0
+        self._agent_seconds = [0.0] * len(self._agents)
+
+    @staticmethod
+    def _keyword_confidence(matches: int) -> float:
+        """Same mapping as BaseAgent._calculate_keyword_confidence"""
+        if matches == 0:
+            return 0.0
+        elif matches == 1:
+            return 0.5
+        elif matches == 2:
+            return 0.7
+        return 0.9
+
+    def route(self, message: str) -> RoutingDecision:
+        """
+        Score every agent for a message
+
+        Args:
+            message: User's message
+
+        Returns:
+            RoutingDecision with one score per agent (same order as the agents)
+        """
+        start = time.perf_counter()
+        self.routes += 1
+        text = message.lower()
+
+        cached = self._cache.get(text) if self.cache_size else None
+        if cached is not None:
+            self._cache.move_to_end(text)
+            self.cache_hits += 1
+            return RoutingDecision(
+                scores=list(cached[0]),
+                agent_names=self.agent_names,
+                cached=True,
+                latency_us=(time.perf_counter() - start) * 1e6,
+                matched_terms=list(cached[1]),
+            )
+
+        # One pass: every term, every pattern
+        matched = self._automaton.find_all(text)
+        pattern_hits = [pattern.search(text) is not None for pattern in self._patterns]
+
+        satisfied_groups: Set[int] = set()
+        keyword_counts = [0] * len(self._agents)
+        for term in matched:
+            satisfied_groups.update(self._term_groups.get(term, ()))
+            for idx in self._term_keyword_agents.get(term, ()):
+                keyword_counts[idx] += 1
+        scan_done = time.perf_counter()
+        self._scan_seconds += scan_done - start
+
+        scores = []
+        for idx, agent in enumerate(self._agents):
+            agent_start = time.perf_counter()
+            scores.append(self._score_agent(agent, satisfied_groups, pattern_hits, keyword_counts[idx]))
+            self._agent_seconds[idx] += time.perf_counter() - agent_start
+
+        terms = sorted(matched)
+        if self.cache_size:
+            self._cache[text] = (scores, terms)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return RoutingDecision(
+            scores=list(scores),
+            agent_names=self.agent_names,
+            latency_us=(time.perf_counter() - start) * 1e6,
+            matched_terms=terms,
+        )
+
+    def score(self, message: str) -> List[float]:
+        """Scores for every agent (same order as the agents)"""
+        return self.route(message).scores
+
+    def _score_agent(
+        self,
+        agent: _CompiledAgent,
+        satisfied_groups: Set[int],
+        pattern_hits: List[bool],
+        keyword_matches: int
+    ) -> float:
+        for rule in agent.rules:
+            if all(gid in satisfied_groups for gid in rule.group_ids) and \
+                    all(pattern_hits[pid] for pid in rule.pattern_ids):
+                return rule.score
+
+        confidence = self._keyword_confidence(keyword_matches)
+        if confidence > 0 and agent.boost_pattern_id is not None and pattern_hits[agent.boost_pattern_id]:
+            confidence = min(agent.boost_cap, confidence + agent.boost)
+        return confidence
+
+    def get_stats(self) -> Dict:
+        """Routing latency and cache statistics"""
+        computed = self.routes - self.cache_hits
+        return {
+            "routes": self.routes,
+            "cache_hits": self.cache_hits,
+            "cache_hit_rate": round(self.cache_hits / self.routes, 3) if self.routes else 0.0,
+            "avg_scan_us": round(self._scan_seconds / computed * 1e6, 1) if computed else 0.0,
+            "per_agent_avg_us": {
+                agent.name: round(seconds / computed * 1e6, 2) if computed else 0.0
+                for agent, seconds in zip(self._agents, self._agent_seconds)
+            },
+            "terms_indexed": len(self._term_groups.keys() | self._term_keyword_agents.keys()),
+        }
@@ -2,6 +2,8 @@
 Code Execution Sandbox
 """
 
+from .build_cache import BuildCache
 from .code_executor import CodeExecutor
+from .worker_pool import PythonWorkerPool
 
-__all__ = ["CodeExecutor"]
+__all__ = ["BuildCache", "CodeExecutor", "PythonWorkerPool"]
@@ -0,0 +1,191 @@
+"""
+Build Cache
+Content-addressed cache of compiled programs for the code sandbox
+
+Entries are keyed by the source, the compile command and the toolchain
+version, so a rerun of the same code skips the compiler entirely while
+any change to the code, flags or compiler produces a fresh build.
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    "SANDBOX_BUILD_CACHE",
+    Path.home() / ".cache" / "ultimate_ai" / "build-cache"
+))
+
+
+class BuildCache:
+    """
+    Bounded LRU directory of build outputs
+
+    Each entry is a directory (binary, class files) named by its key.
+    Entry sizes are tracked in memory in LRU order (seeded from disk at
+    startup, mtime order), so a put only measures the new entry; when the
+    total grows past max_bytes the least recently used entries are deleted.
+    Pinned entries (in use by a run) are never evicted.
+    """
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Args:
+            root: Cache directory
+            max_bytes: Size limit for all entries together
+        """
+        self.root = Path(root or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        self._versions: Dict[str, str] = {}
+        # Only held while someone waits on or holds the lock
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._pins: Dict[str, int] = {}
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()  # LRU first
+        self._total = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self.clean_stale_builds()
+        self._scan()
+
+    async def toolchain_version(self, command: List[str]) -> str:
+        """
+        Version banner of a compiler, looked up once per process
+
+        Raises:
+            FileNotFoundError: If the tool is not installed
+        """
+        name = " ".join(command)
+        if name not in self._versions:
+            proc = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT
+            )
+            output, _ = await proc.communicate()
+            self._versions[name] = output.decode("utf-8", errors="ignore").strip()
+        return self._versions[name]
+
+    @staticmethod
+    def key(source: str, command: List[str], version: str) -> str:
+        digest = hashlib.sha256()
+        for part in [version, "\0".join(command), source]:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0\0")
+        return digest.hexdigest()
+
+    def lock(self, key: str) -> asyncio.Lock:
+        """Per-key lock so concurrent identical builds compile once"""
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    @contextmanager
+    def pin(self, key: str) -> Iterator[None]:
+        """Keep key's entry from being evicted until the block exits"""
+        self._pins[key] = self._pins.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            self._pins[key] -= 1
+            if not self._pins[key]:
+                del self._pins[key]
+
+    def get(self, key: str) -> Optional[Path]:
+        """Entry directory for key, or None"""
+        entry = self.root / key
+        if not entry.is_dir():
+            self._forget(key)
+            self.stats["misses"] += 1
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        self._track(key)
+        self.stats["hits"] += 1
+        return entry
+
+    def new_build_dir(self) -> Path:
+        """Scratch directory on the cache's filesystem, so put() is a rename"""
+        return Path(tempfile.mkdtemp(prefix=".build-", dir=self.root))
+
+    def put(self, key: str, build_dir: Path) -> Path:
+        """
+        Move a finished build into the cache
+
+        Args:
+            key: Cache key
+            build_dir: Directory from new_build_dir() holding the outputs
+
+        Returns:
+            The entry directory
+        """
+        entry = self.root / key
+        try:
+            os.rename(build_dir, entry)
+        except OSError:
+            # Someone else stored the same build first
+            shutil.rmtree(build_dir, ignore_errors=True)
+        self._track(key)
+        self._evict()
+        return entry
+
+    def discard(self, build_dir: Path):
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+    @staticmethod
+    def _entry_size(entry: Path) -> int:
+        return sum(f.stat().st_size for f in entry.rglob("*") if f.is_file())
+
+    def _scan(self):
+        """Seed the in-memory index from the entries already on disk"""
+        entries = []
+        for entry in self.root.iterdir():
+            if entry.name.startswith(".build-") or not entry.is_dir():
+                continue
+            entries.append((entry.stat().st_mtime, entry.name, self._entry_size(entry)))
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+            self._total += size
+
+    def _track(self, key: str):
+        """Mark key most recently used, measuring it if it is new to this process"""
+        if key in self._sizes:
+            self._sizes.move_to_end(key)
+            return
+        size = self._entry_size(self.root / key)
+        self._sizes[key] = size
+        self._total += size
+
+    def _forget(self, key: str):
+        self._total -= self._sizes.pop(key, 0)
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+        for key in list(self._sizes):
+            if self._total <= self.max_bytes:
+                break
+            if key in self._pins:
+                continue
+            shutil.rmtree(self.root / key, ignore_errors=True)
+            self._forget(key)
+            self.stats["evictions"] += 1
+
+    def clean_stale_builds(self, max_age: float = 3600):
+        """Remove scratch dirs left behind by interrupted builds"""
+        cutoff = time.time() - max_age
+        for entry in self.root.glob(".build-*"):
+            if entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry, ignore_errors=True)
@@ -4,13 +4,30 @@ Safely execute code in isolated environments
 """
 
 import asyncio
+import importlib.metadata
+import re
 import subprocess
+import sys
 import tempfile
+import time
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
 import shutil
 
+from .build_cache import BuildCache
+from .worker_pool import PythonWorkerPool
+
+
+# Packages requested by snippets, installed once and shared by every run
+PACKAGE_DIR = Path(os.environ.get(
+    "SANDBOX_PACKAGE_DIR",
+    Path.home() / ".cache" / "ultimate_ai" / "sandbox-packages"
+))
+
+COMPILE_TIMEOUT = 120
+
 
 class CodeExecutor:
     """
@@ -22,9 +39,30 @@ class CodeExecutor:
     - Can install packages
     - File system access
     - Persistent environments
+
+    Python runs in a pool of warm, pre-imported workers (POSIX) and falls
+    back to a fresh interpreter elsewhere.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        python_workers: int = 2,
+        package_dir: Optional[Path] = None,
+        build_cache: Optional[BuildCache] = None
+    ):
+        """
+        Args:
+            python_workers: Warm Python workers (0 disables the pool)
+            package_dir: Shared install target for requested packages
+            build_cache: Cache of compiled C/C++/Java/Go programs
+        """
+        self.python_pool = (
+            PythonWorkerPool(size=python_workers)
+            if python_workers and PythonWorkerPool.supported() else None
+        )
+        self.package_dir = Path(package_dir or PACKAGE_DIR)
+        self._install_lock = asyncio.Lock()
+        self.build_cache = build_cache or BuildCache()
         self.supported_languages = {
             "python": {"extension": ".py", "command": "python"},
             "javascript": {"extension": ".js", "command": "node"},
@@ -77,6 +115,44 @@ class CodeExecutor:
         else:
             return await self._execute_generic(code, language, timeout)
 
+    def _is_installed(self, package: str) -> bool:
+        """Whether a requirement's distribution is in the shared dir or the base env"""
+        name = re.split(r"[<>=!~\[;@ ]", package, 1)[0]
+        paths = [str(self.package_dir)] + sys.path
+        return next(importlib.metadata.distributions(name=name, path=paths), None) is not None
+
+    async def _ensure_packages(self, packages: List[str]) -> Optional[str]:
+        """
+        Install missing packages into the shared package dir
+
+        Returns:
+            pip's error output on failure, else None
+        """
+        async with self._install_lock:
+            missing = [p for p in packages if not self._is_installed(p)]
+            if not missing:
+                return None
+
+            self.package_dir.mkdir(parents=True, exist_ok=True)
+            try:
+                # One pip run for all of them; pip's download cache is shared too
+                proc = await asyncio.create_subprocess_exec(
+                    sys.executable, "-m", "pip", "install", "--quiet",
+                    "--target", str(self.package_dir), *missing,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                _, stderr = await asyncio.wait_for(proc.communicate(), timeout=300)
+            except asyncio.TimeoutError:
+                proc.kill()
+                return "Package installation timed out"
+            except Exception as e:
+                return str(e)
+
+            if proc.returncode != 0:
+                return stderr.decode("utf-8", errors="ignore")
+            return None
+
     async def _execute_python(
         self,
         code: str,
@@ -84,63 +160,99 @@ class CodeExecutor:
         install_packages: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Execute Python code"""
+        install_error = await self._ensure_packages(install_packages) if install_packages else None
+
         with tempfile.TemporaryDirectory() as tmpdir:
-            # Create code file
-            code_file = Path(tmpdir) / "script.py"
+            # Create code file (outputs are captured next to the work dir)
+            workdir = Path(tmpdir) / "work"
+            workdir.mkdir()
+            code_file = workdir / "script.py"
             code_file.write_text(code)
 
-            # Install packages if needed
-            if install_packages:
-                for package in install_packages:
-                    try:
-                        proc = await asyncio.create_subprocess_exec(
-                            "pip", "install", "--user", package,
-                            stdout=asyncio.subprocess.PIPE,
-                            stderr=asyncio.subprocess.PIPE
-                        )
-                        await asyncio.wait_for(proc.wait(), timeout=60)
-                    except:
-                        pass
-
-            # Execute code
-            try:
-                proc = await asyncio.create_subprocess_exec(
-                    "python", str(code_file),
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    cwd=tmpdir
-                )
+            result = None
+            if self.python_pool:
+                try:
+                    run = await self.python_pool.run(code_file, timeout, [str(self.package_dir)])
+                except RuntimeError as e:
+                    print(f"Sandbox pool unavailable, using a fresh interpreter: {e}")
+                else:
+                    if run["timed_out"]:
+                        return {
+                            "error": f"Execution timed out after {timeout} seconds",
+                            "language": "python"
+                        }
+                    result = {
+                        "stdout": run["stdout"],
+                        "stderr": run["stderr"],
+                        "exit_code": run["exit_code"],
+                        "execution_time_ms": run["duration_ms"]
+                    }
+                    if run["cpu_limited"]:
+                        result["error"] = f"CPU time limit of {timeout} seconds exceeded"
+
+            if result is None:
+                result = await self._execute_python_cold(code_file, timeout)
+                if "error" in result and "stdout" not in result:
+                    return result
+
+            # Check for generated files
+            result["files_created"] = [
+                f.name for f in workdir.iterdir()
+                if f.is_file() and f.name != "script.py"
+            ]
+            result["language"] = "python"
+            if install_error:
+                result["install_error"] = install_error
+            return result
+
+    async def _execute_python_cold(self, code_file: Path, timeout: int) -> Dict[str, Any]:
+        """Run a script in a fresh interpreter"""
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(self.package_dir), env.get("PYTHONPATH")]))
+
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, str(code_file),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=str(code_file.parent),
+                env=env
+            )
+
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(),
+                timeout=timeout
+            )
 
-                stdout, stderr = await asyncio.wait_for(
-                    proc.communicate(),
-                    timeout=timeout
-                )
+            return {
+                "stdout": stdout.decode('utf-8', errors='ignore'),
+                "stderr": stderr.decode('utf-8', errors='ignore'),
+                "exit_code": proc.returncode
+            }
 
-                # Check for generated files
-                files_created = [
-                    f.name for f in Path(tmpdir).iterdir()
-                    if f.is_file() and f.name != "script.py"
-                ]
+        except asyncio.TimeoutError:
+            proc.kill()
+            return {
+                "error": f"Execution timed out after {timeout} seconds",
+                "language": "python"
+            }
+        except Exception as e:
+            return {
+                "error": str(e),
+                "language": "python"
+            }
 
-                return {
-                    "stdout": stdout.decode('utf-8', errors='ignore'),
-                    "stderr": stderr.decode('utf-8', errors='ignore'),
-                    "exit_code": proc.returncode,
-                    "files_created": files_created,
-                    "language": "python"
-                }
+    async def close(self):
+        """Stop the warm Python workers"""
+        if self.python_pool:
+            await self.python_pool.close()
 
-            except asyncio.TimeoutError:
-                proc.kill()
-                return {
-                    "error": f"Execution timed out after {timeout} seconds",
-                    "language": "python"
-                }
-            except Exception as e:
-                return {
-                    "error": str(e),
-                    "language": "python"
-                }
+    def get_stats(self) -> Dict[str, Any]:
+        """Sandbox pool and build cache statistics"""
+        return {
+            "python_pool": self.python_pool.get_stats() if self.python_pool else None,
+            "build_cache": dict(self.build_cache.stats)
+        }
 
     async def _execute_javascript(self, code: str, timeout: int) -> Dict[str, Any]:
         """Execute JavaScript code"""
@@ -176,151 +288,182 @@ class CodeExecutor:
             except Exception as e:
                 return {"error": str(e)}
 
-    async def _execute_java(self, code: str, timeout: int) -> Dict[str, Any]:
-        """Execute Java code"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Extract class name from code
-            import re
-            class_match = re.search(r'public\s+class\s+(\w+)', code)
-            if not class_match:
-                return {"error": "No public class found in Java code"}
-
-            class_name = class_match.group(1)
-            code_file = Path(tmpdir) / f"{class_name}.java"
-            code_file.write_text(code)
+    @asynccontextmanager
+    async def _build(
+        self,
+        code: str,
+        filename: str,
+        compile_command: List[str],
+        version_command: List[str]
+    ) -> AsyncIterator[Tuple[Optional[Path], Dict[str, Any]]]:
+        """
+        Compile through the build cache
+
+        The entry stays pinned (safe from eviction) until the block exits,
+        so run the program inside it.
+
+        Args:
+            code: Source code
+            filename: Source file name (Java needs the class name)
+            compile_command: argv with {src} and {out} (output dir) placeholders
+            version_command: argv printing the toolchain version
+
+        Yields:
+            (cache entry with the outputs, or None on failure; build info)
+        """
+        version = await self.build_cache.toolchain_version(version_command)
+        key = self.build_cache.key(f"{filename}\0{code}", compile_command, version)
+
+        with self.build_cache.pin(key):
+            yield await self._compile(key, code, filename, compile_command)
 
+    async def _compile(
+        self,
+        key: str,
+        code: str,
+        filename: str,
+        compile_command: List[str]
+    ) -> Tuple[Optional[Path], Dict[str, Any]]:
+        """Build into the cache unless key is already there (see _build)"""
+        async with self.build_cache.lock(key):
+            entry = self.build_cache.get(key)
+            if entry is not None:
+                return entry, {"cache_hit": True, "compile_time_ms": 0.0}
+
+            build_dir = self.build_cache.new_build_dir()
+            source = build_dir / filename
+            source.write_text(code)
+            argv = [arg.format(src=source, out=build_dir) for arg in compile_command]
+
+            start = time.perf_counter()
             try:
-                # Compile
                 proc = await asyncio.create_subprocess_exec(
-                    "javac", str(code_file),
+                    *argv,
                     stdout=asyncio.subprocess.PIPE,
                     stderr=asyncio.subprocess.PIPE,
-                    cwd=tmpdir
+                    cwd=str(build_dir)
                 )
-                compile_out, compile_err = await proc.communicate()
+                _, compile_err = await asyncio.wait_for(proc.communicate(), timeout=COMPILE_TIMEOUT)
+            except asyncio.TimeoutError:
+                proc.kill()
+                self.build_cache.discard(build_dir)
+                return None, {"error": f"Compilation timed out after {COMPILE_TIMEOUT} seconds"}
+            except BaseException:
+                self.build_cache.discard(build_dir)
+                raise
+            compile_time = round((time.perf_counter() - start) * 1000, 2)
+
+            if proc.returncode != 0:
+                self.build_cache.discard(build_dir)
+                return None, {
+                    "error": "Compilation failed",
+                    "stderr": compile_err.decode('utf-8', errors='ignore'),
+                    "compile_time_ms": compile_time
+                }
 
-                if proc.returncode != 0:
-                    return {
-                        "error": "Compilation failed",
-                        "stderr": compile_err.decode('utf-8', errors='ignore')
-                    }
+            source.unlink()
+            entry = self.build_cache.put(key, build_dir)
+            return entry, {"cache_hit": False, "compile_time_ms": compile_time}
 
-                # Run
-                proc = await asyncio.create_subprocess_exec(
-                    "java", class_name,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    cwd=tmpdir
-                )
+    async def _run_program(self, argv: List[str], timeout: int, language: str) -> Dict[str, Any]:
+        """Run a built program in a fresh working directory"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            start = time.perf_counter()
+            proc = await asyncio.create_subprocess_exec(
+                *argv,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=tmpdir
+            )
 
+            try:
                 stdout, stderr = await asyncio.wait_for(
                     proc.communicate(),
                     timeout=timeout
                 )
-
-                return {
-                    "stdout": stdout.decode('utf-8', errors='ignore'),
-                    "stderr": stderr.decode('utf-8', errors='ignore'),
-                    "exit_code": proc.returncode,
-                    "language": "java"
-                }
-
             except asyncio.TimeoutError:
                 proc.kill()
                 return {"error": f"Execution timed out after {timeout} seconds"}
-            except FileNotFoundError:
-                return {"error": "Java not installed. Install JDK to run Java code."}
-            except Exception as e:
-                return {"error": str(e)}
 
-    async def _execute_compiled(self, code: str, language: str, timeout: int) -> Dict[str, Any]:
-        """Execute C/C++ code"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            extension = self.supported_languages[language]["extension"]
-            code_file = Path(tmpdir) / f"program{extension}"
-            output_file = Path(tmpdir) / "program.exe"
+            return {
+                "stdout": stdout.decode('utf-8', errors='ignore'),
+                "stderr": stderr.decode('utf-8', errors='ignore'),
+                "exit_code": proc.returncode,
+                "language": language,
+                "run_time_ms": round((time.perf_counter() - start) * 1000, 2)
+            }
 
-            code_file.write_text(code)
+    async def _execute_java(self, code: str, timeout: int) -> Dict[str, Any]:
+        """Execute Java code"""
+        # Extract class name from code
+        class_match = re.search(r'public\s+class\s+(\w+)', code)
+        if not class_match:
+            return {"error": "No public class found in Java code"}
+
+        class_name = class_match.group(1)
+
+        try:
+            # Compile (or reuse cached class files)
+            async with self._build(
+                code, f"{class_name}.java",
+                ["javac", "-d", "{out}", "{src}"],
+                ["javac", "-version"]
+            ) as (classes, build):
+                if classes is None:
+                    return build
 
-            compiler = "g++" if language == "cpp" else "gcc"
+                # Run
+                result = await self._run_program(["java", "-cp", str(classes), class_name], timeout, "java")
+                return {**result, **build}
 
-            try:
-                # Compile
-                proc = await asyncio.create_subprocess_exec(
-                    compiler, str(code_file), "-o", str(output_file),
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    cwd=tmpdir
-                )
-                compile_out, compile_err = await proc.communicate()
+        except FileNotFoundError:
+            return {"error": "Java not installed. Install JDK to run Java code."}
+        except Exception as e:
+            return {"error": str(e)}
 
-                if proc.returncode != 0:
-                    return {
-                        "error": "Compilation failed",
-                        "stderr": compile_err.decode('utf-8', errors='ignore')
-                    }
+    async def _execute_compiled(self, code: str, language: str, timeout: int) -> Dict[str, Any]:
+        """Execute C/C++ code"""
+        extension = self.supported_languages[language]["extension"]
+        compiler = "g++" if language == "cpp" else "gcc"
+
+        try:
+            # Compile (or reuse the cached binary)
+            async with self._build(
+                code, f"program{extension}",
+                [compiler, "{src}", "-o", "{out}/program.exe"],
+                [compiler, "--version"]
+            ) as (output_dir, build):
+                if output_dir is None:
+                    return build
 
                 # Run
-                proc = await asyncio.create_subprocess_exec(
-                    str(output_file),
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    cwd=tmpdir
-                )
-
-                stdout, stderr = await asyncio.wait_for(
-                    proc.communicate(),
-                    timeout=timeout
-                )
+                result = await self._run_program([str(output_dir / "program.exe")], timeout, language)
+                return {**result, **build}
 
-                return {
-                    "stdout": stdout.decode('utf-8', errors='ignore'),
-                    "stderr": stderr.decode('utf-8', errors='ignore'),
-                    "exit_code": proc.returncode,
-                    "language": language
-                }
-
-            except asyncio.TimeoutError:
-                proc.kill()
-                return {"error": f"Execution timed out after {timeout} seconds"}
-            except FileNotFoundError:
-                return {"error": f"{compiler} not installed. Install it to run {language.upper()} code."}
-            except Exception as e:
-                return {"error": str(e)}
+        except FileNotFoundError:
+            return {"error": f"{compiler} not installed. Install it to run {language.upper()} code."}
+        except Exception as e:
+            return {"error": str(e)}
 
     async def _execute_go(self, code: str, timeout: int) -> Dict[str, Any]:
         """Execute Go code"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            code_file = Path(tmpdir) / "main.go"
-            code_file.write_text(code)
-
-            try:
-                proc = await asyncio.create_subprocess_exec(
-                    "go", "run", str(code_file),
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    cwd=tmpdir
-                )
-
-                stdout, stderr = await asyncio.wait_for(
-                    proc.communicate(),
-                    timeout=timeout
-                )
-
-                return {
-                    "stdout": stdout.decode('utf-8', errors='ignore'),
-                    "stderr": stderr.decode('utf-8', errors='ignore'),
-                    "exit_code": proc.returncode,
-                    "language": "go"
-                }
-
-            except asyncio.TimeoutError:
-                proc.kill()
-                return {"error": f"Execution timed out after {timeout} seconds"}
-            except FileNotFoundError:
-                return {"error": "Go not installed. Install it to run Go code."}
-            except Exception as e:
-                return {"error": str(e)}
+        try:
+            # Build once instead of `go run` compiling on every execution
+            async with self._build(
+                code, "main.go",
+                ["go", "build", "-o", "{out}/main.exe", "{src}"],
+                ["go", "version"]
+            ) as (output_dir, build):
+                if output_dir is None:
+                    return build
+
+                result = await self._run_program([str(output_dir / "main.exe")], timeout, "go")
+                return {**result, **build}
+
+        except FileNotFoundError:
+            return {"error": "Go not installed. Install it to run Go code."}
+        except Exception as e:
+            return {"error": str(e)}
 
     async def _execute_generic(self, code: str, language: str, timeout: int) -> Dict[str, Any]:
         """Execute code in other languages"""
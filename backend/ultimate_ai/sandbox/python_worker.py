@@ -0,0 +1,198 @@
+"""
+Python Sandbox Worker
+Warm interpreter that forks a fresh child for every snippet
+
+Run as a standalone script by WorkerPool. It imports the common modules
+once, then reads one JSON job per line from stdin. Each job runs in a
+forked child under CPU / memory / file-size rlimits, so the snippet gets
+a pre-imported interpreter but can never leak state into the next run.
+One JSON result line is written back to stdout per job.
+"""
+
+import json
+import os
+import signal
+import sys
+import time
+
+# Sandboxed code runs single-threaded; also keeps BLAS from reserving huge stacks
+for _var in ("OPENBLAS_NUM_THREADS", "OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(_var, "1")
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import importlib
+import pkgutil  # noqa: F401  (used by runpy.run_path; importing it per child costs ~2ms)
+import random
+import resource
+import runpy
+import select
+import traceback
+
+CHANNEL_FD = None  # Protocol pipe; closed in children
+
+
+def preload(modules):
+    """Import modules so forked children get them for free"""
+    loaded = []
+    for name in modules:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception:
+            pass
+    return loaded
+
+
+def address_space():
+    """Current virtual memory size in bytes (Linux), else 0"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def set_limits(job):
+    cpu = int(job["timeout"]) + 1
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+
+    if job.get("memory_mb"):
+        # On top of what the preloaded interpreter already maps
+        limit = address_space() + int(job["memory_mb"]) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    if job.get("max_file_mb"):
+        size = int(job["max_file_mb"]) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_FSIZE, (size, size))
+
+
+def print_user_traceback(error, script):
+    """Print a traceback starting at the snippet, without worker/runpy frames"""
+    tb = error.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename != script:
+        tb = tb.tb_next
+    traceback.print_exception(type(error), error, tb or error.__traceback__)
+
+
+def run_child(job):
+    """Runs in the forked child; never returns"""
+    exit_code = 0
+    try:
+        os.setsid()
+        os.close(CHANNEL_FD)
+        set_limits(job)
+
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        stdout = os.open(job["stdout"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        stderr = os.open(job["stderr"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.dup2(stdout, 1)
+        os.dup2(stderr, 2)
+        sys.stdin = open(0, closefd=False)
+        sys.stdout = open(1, "w", closefd=False)
+        sys.stderr = open(2, "w", closefd=False)
+
+        os.chdir(job["cwd"])
+        sys.path[0] = job["cwd"]
+        sys.path[1:1] = job.get("path", [])
+        sys.argv = [job["script"]]
+        random.seed()
+        importlib.invalidate_caches()
+
+        runpy.run_path(job["script"], run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException as e:
+        print_user_traceback(e, job["script"])
+        exit_code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except Exception:
+            pass
+        os._exit(exit_code)
+
+
+def wait_for_exit(pid, timeout):
+    """True if the child exits within timeout (does not reap it)"""
+    try:
+        # Wakes up exactly on exit (Linux 5.3+)
+        pidfd = os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        pidfd = None
+
+    if pidfd is not None:
+        try:
+            return bool(select.select([pidfd], [], [], timeout)[0])
+        finally:
+            os.close(pidfd)
+
+    deadline = time.monotonic() + timeout
+    delay = 0.0005
+    while time.monotonic() < deadline:
+        if os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None:
+            return True
+        time.sleep(delay)
+        delay = min(delay * 2, 0.005)
+    return False
+
+
+def run_job(job):
+    start = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        run_child(job)
+
+    timed_out = not wait_for_exit(pid, float(job["timeout"]))
+    if timed_out:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    _, status = os.waitpid(pid, 0)
+
+    if os.WIFSIGNALED(status):
+        exit_code = -os.WTERMSIG(status)
+    else:
+        exit_code = os.WEXITSTATUS(status)
+
+    return {
+        "exit_code": exit_code,
+        "timed_out": timed_out,
+        "cpu_limited": os.WIFSIGNALED(status) and os.WTERMSIG(status) == signal.SIGXCPU,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+
+
+def main():
+    global CHANNEL_FD
+    modules = [name for name in sys.argv[1:] if name]
+    # Protocol channel; children get their own stdout
+    CHANNEL_FD = os.dup(1)
+    channel = os.fdopen(CHANNEL_FD, "w")
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    loaded = preload(modules)
+    channel.write(json.dumps({"ready": True, "preloaded": loaded}) + "\n")
+    channel.flush()
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            result = run_job(json.loads(line))
+        except Exception as e:
+            result = {"error": str(e)}
+        channel.write(json.dumps(result) + "\n")
+        channel.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Sandbox Worker Pool
+Warm, pre-imported Python interpreters for fast snippet execution
+
+A cold `python script.py` spends most of a short snippet's runtime on
+interpreter startup and imports. Each pool worker (python_worker.py) has
+already imported the common modules and forks a fresh child per snippet,
+so a run costs a fork instead of a full startup. Workers are recycled
+after max_runs jobs, and replaced immediately if they stop responding.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+WORKER_SCRIPT = str(Path(__file__).with_name("python_worker.py"))
+
+# Imported once per worker; missing ones are skipped
+DEFAULT_PRELOAD = [
+    "collections", "datetime", "decimal", "fractions", "functools", "itertools",
+    "json", "math", "random", "re", "statistics", "string", "time", "typing",
+    "numpy", "pandas", "matplotlib.pyplot", "sympy",
+]
+
+MAX_OUTPUT_BYTES = 1024 * 1024
+
+
+def read_output(path: Path, limit: int = MAX_OUTPUT_BYTES) -> str:
+    """Read captured output, truncated to limit bytes"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read(limit + 1)
+    except FileNotFoundError:
+        return ""
+    text = data[:limit].decode("utf-8", errors="ignore")
+    if len(data) > limit:
+        text += "\n... [output truncated]"
+    return text
+
+
+class _Worker:
+    def __init__(self, proc: asyncio.subprocess.Process, preloaded: List[str]):
+        self.proc = proc
+        self.preloaded = preloaded
+        self.runs = 0
+
+    def kill(self):
+        if self.proc.returncode is None:
+            try:
+                self.proc.kill()
+            except ProcessLookupError:
+                pass
+
+
+class PythonWorkerPool:
+    """
+    Pool of warm Python sandbox workers (POSIX only)
+
+    Every run gets a forked child with its own process group, working
+    directory and CPU / memory / file-size rlimits.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        preload: Optional[List[str]] = None,
+        max_runs: int = 200,
+        memory_mb: int = 512,
+        max_file_mb: int = 50
+    ):
+        """
+        Args:
+            size: Number of workers (concurrent snippets)
+            preload: Modules each worker imports up front
+            max_runs: Jobs before a worker is replaced
+            memory_mb: Address space a snippet may add on top of the worker
+            max_file_mb: Largest file a snippet may write
+        """
+        self.size = size
+        self.preload = DEFAULT_PRELOAD if preload is None else preload
+        self.max_runs = max_runs
+        self.memory_mb = memory_mb
+        self.max_file_mb = max_file_mb
+
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[_Worker] = []
+        self._loop = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self.stats = {"runs": 0, "recycled": 0, "replaced": 0, "spawned": 0}
+
+    @staticmethod
+    def supported() -> bool:
+        """Forking workers need a POSIX system"""
+        return os.name == "posix" and hasattr(os, "fork")
+
+    async def _spawn(self) -> _Worker:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, WORKER_SCRIPT, *self.preload,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        try:
+            # Heavy preloads (pandas, sympy) can take a few seconds
+            ready = json.loads(await asyncio.wait_for(proc.stdout.readline(), timeout=120))
+        except Exception:
+            if proc.returncode is None:
+                proc.kill()
+            raise RuntimeError("Sandbox worker failed to start")
+
+        worker = _Worker(proc, ready.get("preloaded", []))
+        self._workers.append(worker)
+        self.stats["spawned"] += 1
+        return worker
+
+    async def start(self):
+        """Spawn the workers (called automatically on first run)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._idle is not None:
+            return
+        if self._loop is not loop:
+            # Subprocess pipes belong to the loop that created them
+            await self.close()
+            self._loop = loop
+            self._start_lock = asyncio.Lock()
+
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            idle = asyncio.Queue()
+            for worker in await asyncio.gather(*(self._spawn() for _ in range(self.size))):
+                idle.put_nowait(worker)
+            self._idle = idle
+
+    def _retire(self, worker: _Worker, reason: str):
+        """Kill a worker and put a fresh one in its place"""
+        worker.kill()
+        if worker in self._workers:
+            self._workers.remove(worker)
+        self.stats[reason] += 1
+
+        idle = self._idle
+
+        async def respawn():
+            for attempt in range(3):
+                try:
+                    idle.put_nowait(await self._spawn())
+                    return
+                except RuntimeError:
+                    await asyncio.sleep(attempt + 1)
+            print("Sandbox worker could not be respawned; pool shrinks by one")
+
+        asyncio.ensure_future(respawn())
+
+    async def run(
+        self,
+        script: Path,
+        timeout: int,
+        extra_path: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run a script in a warm worker
+
+        Args:
+            script: Python file; its directory is the working directory
+            timeout: Wall-clock limit (seconds); CPU is limited to the same
+            extra_path: Directories prepended to sys.path (shared packages)
+
+        Returns:
+            Dict with stdout, stderr, exit_code, timed_out, duration_ms
+        """
+        await self.start()
+        try:
+            worker = await asyncio.wait_for(self._idle.get(), timeout=timeout + 30)
+        except asyncio.TimeoutError:
+            raise RuntimeError("No sandbox worker available")
+
+        output_dir = script.parent.parent
+        job = {
+            "script": str(script),
+            "cwd": str(script.parent),
+            "stdout": str(output_dir / "stdout.txt"),
+            "stderr": str(output_dir / "stderr.txt"),
+            "timeout": timeout,
+            "memory_mb": self.memory_mb,
+            "max_file_mb": self.max_file_mb,
+            "path": extra_path or []
+        }
+
+        start = time.perf_counter()
+        try:
+            worker.proc.stdin.write((json.dumps(job) + "\n").encode())
+            await worker.proc.stdin.drain()
+            line = await asyncio.wait_for(worker.proc.stdout.readline(), timeout=timeout + 10)
+            result = json.loads(line)
+            if "error" in result:
+                raise RuntimeError(result["error"])
+        except BaseException:
+            # No answer (or cancelled mid-job): the worker can't be trusted
+            self._retire(worker, "replaced")
+            raise
+
+        worker.runs += 1
+        self.stats["runs"] += 1
+        if worker.runs >= self.max_runs:
+            self._retire(worker, "recycled")
+        else:
+            self._idle.put_nowait(worker)
+
+        result["stdout"] = read_output(Path(job["stdout"]))
+        result["stderr"] = read_output(Path(job["stderr"]))
+        result["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    async def close(self):
+        """Stop all workers"""
+        for worker in self._workers:
+            worker.kill()
+        self._workers = []
+        self._idle = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "size": self.size,
+            "alive": len(self._workers),
+            "preloaded": self._workers[0].preloaded if self._workers else []
+        }
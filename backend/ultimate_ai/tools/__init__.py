@@ -2,6 +2,7 @@
 Tools and Utilities
 """
 
+from .http_cache import HTTPCache
 from .web_browser import WebBrowser
 
-__all__ = ["WebBrowser"]
+__all__ = ["HTTPCache", "WebBrowser"]
@@ -0,0 +1,170 @@
+"""
+HTTP Cache
+On-disk cache of parsed pages with ETag / Last-Modified revalidation
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    "WEB_CACHE_DIR",
+    Path.home() / ".cache" / "ultimate_ai" / "web"
+))
+
+
+class HTTPCache:
+    """
+    Parsed pages keyed by URL, stored as one JSON file each
+
+    Entries keep the response validators (ETag, Last-Modified) and a
+    freshness deadline from Cache-Control. Fresh entries are served without
+    a request; stale ones are revalidated with a conditional GET, and a
+    304 reuses the stored parse. A small in-memory LRU sits in front of
+    the disk, and the directory is trimmed to max_bytes (oldest first).
+    """
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        default_ttl: float = 600,
+        memory_entries: int = 128
+    ):
+        """
+        Args:
+            root: Cache directory
+            max_bytes: Disk budget
+            default_ttl: Freshness (seconds) for responses without max-age or validators
+            memory_entries: Entries kept in memory
+        """
+        self.root = Path(root or DEFAULT_CACHE_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._writes = 0
+
+    def _path(self, url: str) -> Path:
+        return self.root / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Cached entry (validators, expires, page) or None"""
+        entry = self._memory.get(url)
+        if entry is not None:
+            self._memory.move_to_end(url)
+            return entry
+
+        path = self._path(url)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        self._remember(url, entry)
+        return entry
+
+    @staticmethod
+    def is_fresh(entry: Dict[str, Any]) -> bool:
+        return time.time() < entry.get("expires", 0)
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _freshness(self, headers) -> Optional[float]:
+        """Seconds the response may be reused without revalidation; None = don't store"""
+        cache_control = headers.get("Cache-Control", "").lower()
+        if "no-store" in cache_control:
+            return None
+        if "no-cache" in cache_control:
+            return 0
+        match = re.search(r"max-age=(\d+)", cache_control)
+        if match:
+            return int(match.group(1))
+        if headers.get("ETag") or headers.get("Last-Modified"):
+            return 0  # Cheap to revalidate
+        return self.default_ttl
+
+    def store(self, url: str, headers, page: Dict[str, Any]) -> None:
+        """
+        Cache a parsed 200 response
+
+        Args:
+            url: Request URL
+            headers: Response headers
+            page: Parsed page
+        """
+        freshness = self._freshness(headers)
+        if freshness is None:
+            return
+
+        entry = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "expires": time.time() + freshness,
+            "freshness": freshness,
+            "page": page
+        }
+        self._write(url, entry)
+
+    def refresh(self, url: str, entry: Dict[str, Any], headers) -> Dict[str, Any]:
+        """Extend an entry after a 304 Not Modified"""
+        freshness = self._freshness(headers)
+        if freshness is None:
+            freshness = entry.get("freshness", 0)
+        entry = {**entry, "expires": time.time() + freshness}
+        for header, key in (("ETag", "etag"), ("Last-Modified", "last_modified")):
+            if headers.get(header):
+                entry[key] = headers[header]
+        self._write(url, entry)
+        return entry
+
+    def _write(self, url: str, entry: Dict[str, Any]) -> None:
+        path = self._path(url)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp.write_text(json.dumps(entry), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Web cache write failed for {url}: {e}")
+            return
+        self._remember(url, entry)
+
+        self._writes += 1
+        if self._writes % 50 == 0:
+            self._trim()
+
+    def _remember(self, url: str, entry: Dict[str, Any]) -> None:
+        self._memory[url] = entry
+        self._memory.move_to_end(url)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _trim(self) -> None:
+        files = []
+        for path in self.root.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
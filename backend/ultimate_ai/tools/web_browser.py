@@ -8,8 +8,43 @@ import aiohttp
 from bs4 import BeautifulSoup
 from typing import List, Dict, Optional
 import re
+import weakref
 from urllib.parse import urljoin, urlparse
 
+from .http_cache import HTTPCache
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Bytes read per page; the rest of the body is never downloaded
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+
+DROPPED_TAGS = ["script", "style", "nav", "footer", "header"]
+
+# One pooled session per event loop, shared by every WebBrowser
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Process-wide session: keep-alive, DNS cache and per-host connection limits"""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=64, limit_per_host=6, ttl_dns_cache=300)
+        session = aiohttp.ClientSession(connector=connector)
+        _sessions[loop] = session
+    return session
+
+
+async def close_sessions():
+    """Close the shared session of the running loop (call on shutdown)"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
 
 class WebBrowser:
     """
@@ -22,42 +57,105 @@ class WebBrowser:
     - Handle JavaScript (with playwright)
     """
 
-    def __init__(self):
+    def __init__(self, cache: Optional[HTTPCache] = None, max_page_bytes: int = MAX_PAGE_BYTES):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         self.timeout = aiohttp.ClientTimeout(total=10)
+        self.cache = cache or HTTPCache()
+        self.max_page_bytes = max_page_bytes
+        self._inflight: Dict[str, asyncio.Future] = {}
 
     async def fetch_page(self, url: str) -> Dict[str, any]:
         """
         Fetch a web page and extract content
 
+        Served from the cache while fresh, revalidated with a conditional
+        GET once stale. Concurrent requests for the same URL share one fetch.
+
         Args:
             url: URL to fetch
 
         Returns:
             Dict with title, content, links, images
         """
+        pending = self._inflight.get(url)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[url] = future
         try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.get(url, headers=self.headers) as response:
-                    if response.status != 200:
-                        return {"error": f"HTTP {response.status}"}
+            page = await self._fetch_page(url)
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._inflight.pop(url, None)
+        future.set_result(page)
+        return page
+
+    async def _fetch_page(self, url: str) -> Dict[str, any]:
+        entry = self.cache.get(url)
+        if entry is not None and self.cache.is_fresh(entry):
+            return entry["page"]
+
+        headers = dict(self.headers)
+        if entry is not None:
+            headers.update(self.cache.conditional_headers(entry))
 
-                    html = await response.text()
-                    return self._parse_html(html, url)
+        try:
+            async with get_session().get(url, headers=headers, timeout=self.timeout) as response:
+                if response.status == 304 and entry is not None:
+                    return self.cache.refresh(url, entry, response.headers)["page"]
+                if response.status != 200:
+                    return {"error": f"HTTP {response.status}"}
+
+                body, truncated = await self._read_capped(response)
+                page = await asyncio.to_thread(self._parse_html, body, str(response.url), response.charset)
+                if truncated:
+                    page["truncated"] = True
+                self.cache.store(url, response.headers, page)
+                return page
 
         except asyncio.TimeoutError:
             return {"error": "Timeout fetching page"}
         except Exception as e:
             return {"error": str(e)}
 
-    def _parse_html(self, html: str, base_url: str) -> Dict:
-        """Parse HTML and extract useful content"""
+    async def _read_capped(self, response: aiohttp.ClientResponse) -> tuple:
+        """Read at most max_page_bytes of the body, streaming"""
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.max_page_bytes:
+                return b"".join(chunks)[:self.max_page_bytes], True
+        return b"".join(chunks), False
+
+    def _parse_html(self, html, base_url: str, charset: Optional[str] = None) -> Dict:
+        """
+        Parse HTML and extract useful content
+
+        Args:
+            html: Markup as str, or raw bytes (encoding detected from the page)
+            base_url: URL for resolving relative links
+            charset: Encoding from the Content-Type header, if any
+        """
+        if isinstance(html, bytes) and charset:
+            html = html.decode(charset, errors="replace")
+
+        if LXML_AVAILABLE:
+            try:
+                return self._parse_html_lxml(html, base_url)
+            except Exception:
+                pass  # Unparseable for lxml (e.g. empty document)
+
         soup = BeautifulSoup(html, 'html.parser')
 
         # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header"]):
+        for script in soup(DROPPED_TAGS):
             script.decompose()
 
         # Extract title
@@ -85,17 +183,63 @@ class WebBrowser:
             "metadata": metadata
         }
 
-    def _extract_main_content(self, soup: BeautifulSoup) -> str:
-        """Extract main readable content"""
-        # Try to find main content area
-        main_content = soup.find('main') or soup.find('article') or soup.find('body')
+    def _parse_html_lxml(self, html, base_url: str) -> Dict:
+        """Same extraction as the BeautifulSoup path, on lxml's C parser"""
+        doc = lxml.html.document_fromstring(html)
 
-        if not main_content:
-            return ""
+        for element in doc.xpath("|".join(f"//{tag}" for tag in DROPPED_TAGS) + "|//comment()"):
+            element.drop_tree()
 
-        # Get text
-        text = main_content.get_text(separator='\n', strip=True)
+        title = doc.findtext(".//title")
+        title = title.strip() if title else "No title"
+
+        main = doc.find(".//main")
+        if main is None:
+            main = doc.find(".//article")
+        if main is None:
+            main = doc.find(".//body")
+        content = self._clean_text(
+            "\n".join(text.strip() for text in main.itertext() if text.strip()) if main is not None else ""
+        )
+
+        links = []
+        for a_tag in doc.iterfind(".//a[@href]"):
+            absolute_url = urljoin(base_url, a_tag.get("href"))
+            if absolute_url.startswith(('http://', 'https://')):
+                links.append({
+                    "url": absolute_url,
+                    "text": "".join(text.strip() for text in a_tag.itertext())[:100]
+                })
+                if len(links) >= 20:
+                    break
+
+        images = []
+        for img_tag in doc.iterfind(".//img[@src]"):
+            absolute_url = urljoin(base_url, img_tag.get("src"))
+            if absolute_url.startswith(('http://', 'https://')):
+                images.append({"url": absolute_url, "alt": img_tag.get("alt", "")})
+                if len(images) >= 10:
+                    break
+
+        metadata = {}
+        for name in ("description", "keywords"):
+            meta = doc.find(f".//meta[@name='{name}']")
+            if meta is not None:
+                metadata[name] = meta.get("content", "")
+        for og_tag in doc.xpath("//meta[starts-with(@property, 'og:')]"):
+            metadata[f"og_{og_tag.get('property')[3:]}"] = og_tag.get("content", "")
 
+        return {
+            "url": base_url,
+            "title": title,
+            "content": content,
+            "links": links,
+            "images": images,
+            "metadata": metadata
+        }
+
+    @staticmethod
+    def _clean_text(text: str) -> str:
         # Clean up whitespace
         text = re.sub(r'\n\s*\n+', '\n\n', text)
 
@@ -105,6 +249,17 @@ class WebBrowser:
 
         return text
 
+    def _extract_main_content(self, soup: BeautifulSoup) -> str:
+        """Extract main readable content"""
+        # Try to find main content area
+        main_content = soup.find('main') or soup.find('article') or soup.find('body')
+
+        if not main_content:
+            return ""
+
+        # Get text
+        return self._clean_text(main_content.get_text(separator='\n', strip=True))
+
     def _extract_links(self, soup: BeautifulSoup, base_url: str) -> List[Dict]:
         """Extract all links from page"""
         links = []
@@ -5,14 +5,18 @@ The most advanced AI system with multi-agent intelligence, memory, and learning
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import uvicorn
 from datetime import datetime
+import asyncio
+import json
 import uuid
 
 from ultimate_ai.orchestrator import AgentOrchestrator
 from ultimate_ai.memory import LongTermMemory
+from ultimate_ai.tools.web_browser import close_sessions
 from ultimate_ai.training import FineTuner
 
 # Initialize FastAPI app
@@ -151,6 +155,53 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat endpoint - server-sent events with tokens as they are generated
+    """
+    conversation_id = request.conversation_id or str(uuid.uuid4())
+
+    async def event_stream():
+        try:
+            async for event in orchestrator.stream_message(
+                message=request.message,
+                conversation_id=conversation_id,
+                images=request.images,
+                temperature=request.temperature
+            ):
+                if event["type"] == "done":
+                    memory.store_conversation(
+                        conversation_id=conversation_id,
+                        user_message=request.message,
+                        assistant_response=event["response"],
+                        metadata={
+                            "agent": event["agent"],
+                            "confidence": event["confidence"],
+                            "all_scores": event.get("all_agent_scores", {})
+                        }
+                    )
+                    event = {**event, "conversation_id": conversation_id}
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.on_event("startup")
+async def startup():
+    """Load the embedding model and knowledge index before serving"""
+    await asyncio.to_thread(memory.load_index)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close the pooled Ollama and web connections"""
+    await orchestrator.core.close()
+    await close_sessions()
+
+
 @app.get("/api/health", response_model=HealthStatus)
 async def health():
     """
@@ -187,6 +238,14 @@ async def memory_stats():
         raise HTTPException(status_code=500, detail=f"Error getting stats: {str(e)}")
 
 
+@app.get("/api/memory/sessions")
+async def session_stats():
+    """
+    Active conversation state: count, approximate bytes, spilled and evicted
+    """
+    return orchestrator.conversations.get_stats()
+
+
 @app.get("/api/memory/conversation/{conversation_id}")
 async def get_conversation(conversation_id: str, limit: int = 50):
     """
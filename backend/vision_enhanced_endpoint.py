@@ -4,13 +4,15 @@ from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from groq import Groq
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import base64
 import uvicorn
 import os
 from datetime import datetime, timedelta
 from collections import defaultdict
 import asyncio
+from image_pipeline import PreparedImage, prepare_image_async, vision_cache
+from hedged_router import HedgedRouter
 
 app = FastAPI(title="Genius AI Vision API", version="3.0")
 
@@ -48,6 +50,32 @@ VISION_MODELS = {
     }
 }
 
+# Vision models race with hedging: the next candidate starts if the current
+# one has not answered within VISION_HEDGE_DELAY seconds. A hedged loser runs
+# in a thread and can't be cancelled, so its upstream call still completes
+# and spends quota.
+vision_router = HedgedRouter(
+    hedge_delay=float(os.getenv("VISION_HEDGE_DELAY", "4")),
+    attempt_timeout=float(os.getenv("VISION_TIMEOUT", "60"))
+)
+
+def vision_candidates() -> List[str]:
+    """Usable vision models in preference order"""
+    return [model_id for model_id, model_data in VISION_MODELS.items()
+            if model_data.get("status") != "deprecated"]
+
+def cached_vision_answer(image: PreparedImage, task: str) -> Tuple[Optional[str], Optional[str]]:
+    """A cached answer from any candidate model, looked up before routing
+
+    Served outside the router so cache hits don't count as fast, healthy
+    calls in its latency and circuit-breaker stats.
+    """
+    for model_id in vision_candidates():
+        result = vision_cache.get(image, model_id, task)
+        if result:
+            return model_id, result
+    return None, None
+
 # Text models for fallback
 TEXT_MODELS = {
     "llama-3.3-70b-versatile": {
@@ -147,11 +175,20 @@ def get_vision_models():
         if model_data.get("status") != "deprecated"
     ]
 
-async def try_vision_model(image_data: str, message: str, model_id: str) -> Optional[str]:
-    """Try to analyze image with a specific vision model"""
+async def try_vision_model(image_data, message: str, model_id: str, cache_task: Optional[str] = None) -> Optional[str]:
+    """Try to analyze image with a specific vision model
+
+    image_data may be a data URL or a PreparedImage; the image is resized for
+    the model and the answer is cached per image and task (default: message).
+    Callers check cached_vision_answer() first.
+    """
     try:
+        image = image_data if isinstance(image_data, PreparedImage) else await prepare_image_async(image_data)
+        task = cache_task if cache_task is not None else message
+
         print(f"Trying vision model: {model_id}")
 
+        image_url = await image.data_url_async(model_id)
         messages = [
             {
                 "role": "user",
@@ -163,32 +200,39 @@ async def try_vision_model(image_data: str, message: str, model_id: str) -> Opti
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": image_data
+                            "url": image_url
                         }
                     }
                 ]
             }
         ]
 
-        completion = groq_client.chat.completions.create(
+        # Off the event loop so hedged attempts really run side by side
+        completion = await asyncio.to_thread(
+            groq_client.chat.completions.create,
             model=model_id,
             messages=messages,
             temperature=0.7,
             max_tokens=VISION_MODELS[model_id]["max_tokens"],
         )
 
-        return completion.choices[0].message.content
+        result = completion.choices[0].message.content
+        if result:
+            vision_cache.put(image, model_id, task, result)
+        return result
     except Exception as e:
         print(f"Vision model {model_id} failed: {str(e)}")
         return None
 
-async def fallback_image_description(image_data: str, message: str) -> str:
+async def fallback_image_description(image_data, message: str) -> str:
     """Fallback: Use text model with image metadata"""
     try:
         # Extract image metadata
-        image_base64 = image_data.split(',')[1] if ',' in image_data else image_data
-        image_bytes = base64.b64decode(image_base64)
-        image_size = len(image_bytes)
+        if isinstance(image_data, PreparedImage):
+            image_size = len(image_data.raw_bytes)
+        else:
+            image_base64 = image_data.split(',')[1] if ',' in image_data else image_data
+            image_size = len(base64.b64decode(image_base64))
 
         # Create descriptive prompt for text model
         fallback_message = f"""I've received an image upload with the following characteristics:
@@ -235,18 +279,28 @@ async def chat(request: ChatRequest):
     try:
         # Check if image included
         if request.image_data:
-            # Try vision models in order of preference
-            for model_id in ["llava-v1.5-7b-4096-preview", "llama-3.2-11b-vision-preview"]:
-                if VISION_MODELS.get(model_id, {}).get("status") != "deprecated":
-                    result = await try_vision_model(request.image_data, request.message, model_id)
-                    if result:
-                        processing_time = (datetime.now() - start_time).total_seconds()
-                        return ChatResponse(
-                            response=result,
-                            model=VISION_MODELS[model_id]["name"],
-                            processing_time=processing_time,
-                            vision_method="direct"
-                        )
+            # Decode once for every model tried; undecodable data would only
+            # fail every model and trip their circuit breakers
+            try:
+                image = await prepare_image_async(request.image_data)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Invalid image data: {str(e)}")
+
+            model_id, result = cached_vision_answer(image, request.message)
+            if not result:
+                # Race vision models, healthiest first
+                model_id, result = await vision_router.run(
+                    vision_candidates(),
+                    lambda model_id: try_vision_model(image, request.message, model_id)
+                )
+            if result:
+                processing_time = (datetime.now() - start_time).total_seconds()
+                return ChatResponse(
+                    response=result,
+                    model=VISION_MODELS[model_id]["name"],
+                    processing_time=processing_time,
+                    vision_method="direct"
+                )
 
             # If all vision models failed, use fallback
             print("All vision models failed, using intelligent fallback")
@@ -302,6 +356,8 @@ Respond as a world-class expert would."""
                 processing_time=processing_time
             )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -324,25 +380,30 @@ async def upload_file(
 
         # Handle images
         if file.content_type and file.content_type.startswith('image/'):
-            base64_image = base64.b64encode(contents).decode('utf-8')
-            data_url = f"data:{file.content_type};base64,{base64_image}"
-
-            # Try vision models
-            for model_id in ["llava-v1.5-7b-4096-preview", "llama-3.2-11b-vision-preview"]:
-                if VISION_MODELS.get(model_id, {}).get("status") != "deprecated":
-                    result = await try_vision_model(data_url, f"{message}\n\nFilename: {file.filename}", model_id)
-                    if result:
-                        processing_time = (datetime.now() - start_time).total_seconds()
-                        return ChatResponse(
-                            response=result,
-                            model=VISION_MODELS[model_id]["name"],
-                            analyzed_file=file.filename,
-                            processing_time=processing_time,
-                            vision_method="direct"
-                        )
+            try:
+                image = await prepare_image_async(contents, file.content_type)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Invalid image file: {str(e)}")
+
+            # Cache keyed on the message, not the filename
+            model_id, result = cached_vision_answer(image, message)
+            if not result:
+                model_id, result = await vision_router.run(
+                    vision_candidates(),
+                    lambda model_id: try_vision_model(image, f"{message}\n\nFilename: {file.filename}", model_id, cache_task=message)
+                )
+            if result:
+                processing_time = (datetime.now() - start_time).total_seconds()
+                return ChatResponse(
+                    response=result,
+                    model=VISION_MODELS[model_id]["name"],
+                    analyzed_file=file.filename,
+                    processing_time=processing_time,
+                    vision_method="direct"
+                )
 
             # Fallback for images
-            fallback_response = await fallback_image_description(data_url, f"{message}\n\nFilename: {file.filename}")
+            fallback_response = await fallback_image_description(image, f"{message}\n\nFilename: {file.filename}")
             processing_time = (datetime.now() - start_time).total_seconds()
 
             return ChatResponse(
@@ -405,7 +466,9 @@ def get_stats():
         "active_clients": len(rate_limit_store),
         "rate_limit": f"{RATE_LIMIT_REQUESTS}/min",
         "vision_models": len([m for m in VISION_MODELS.values() if m.get("status") != "deprecated"]),
-        "text_models": len(TEXT_MODELS)
+        "text_models": len(TEXT_MODELS),
+        "vision_cache": vision_cache.get_stats(),
+        "vision_routing": vision_router.get_stats()
     }
 
 if __name__ == "__main__":
@@ -4,7 +4,7 @@ from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from groq import Groq
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import base64
 import uvicorn
 import os
@@ -12,6 +12,9 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 from PIL import Image
 import io
+import asyncio
+from image_pipeline import PreparedImage, prepare_image_async, vision_cache
+from hedged_router import HedgedRouter
 
 app = FastAPI(title="Genius AI - Working Vision API", version="4.0")
 
@@ -72,23 +75,18 @@ async def rate_limit_middleware(request: Request, call_next):
             raise HTTPException(status_code=429, detail="Rate limit exceeded")
     return await call_next(request)
 
-def extract_image_metadata(image_data: str) -> dict:
-    """Extract detailed metadata from image"""
+def extract_image_metadata(prepared: PreparedImage) -> dict:
+    """Extract detailed metadata from an already decoded image"""
     try:
-        # Decode base64
-        if ',' in image_data:
-            image_data = image_data.split(',')[1]
-
-        image_bytes = base64.b64decode(image_data)
-        image = Image.open(io.BytesIO(image_bytes))
+        image = prepared.image
 
         metadata = {
-            "format": image.format,
+            "format": prepared.metadata["format"],
             "mode": image.mode,
             "size": image.size,
             "width": image.width,
             "height": image.height,
-            "file_size_kb": len(image_bytes) / 1024,
+            "file_size_kb": len(prepared.raw_bytes) / 1024,
             "has_transparency": image.mode in ('RGBA', 'LA', 'P'),
             "color_mode": "Color" if image.mode == "RGB" else "Grayscale" if image.mode == "L" else "Other"
         }
@@ -105,39 +103,75 @@ def extract_image_metadata(image_data: str) -> dict:
     except Exception as e:
         return {"error": str(e)}
 
-async def analyze_with_gpt4_vision(image_data: str, message: str) -> Optional[str]:
-    """Try GPT-4 Vision API if available"""
-    if not OPENAI_API_KEY:
-        return None
+# Vision models that can actually see the image. With more than one entry
+# the router hedges between them; a hedged loser runs in a thread and can't
+# be cancelled, so its upstream call still completes and spends quota.
+VISION_MODELS = {
+    "gpt-4-vision-preview": {"name": "GPT-4 Vision", "provider": "openai", "method": "gpt4-vision"},
+}
+
+vision_router = HedgedRouter(
+    hedge_delay=float(os.getenv("VISION_HEDGE_DELAY", "4")),
+    attempt_timeout=float(os.getenv("VISION_TIMEOUT", "60"))
+)
 
+def vision_candidates() -> List[str]:
+    """Configured vision models in preference order"""
+    return [model_id for model_id, model_data in VISION_MODELS.items()
+            if model_data["provider"] != "openai" or OPENAI_API_KEY]
+
+def cached_vision_answer(image: PreparedImage, task: str) -> Tuple[Optional[str], Optional[str]]:
+    """A cached answer from any candidate model, looked up before routing
+
+    Served outside the router so cache hits don't count as fast, healthy
+    calls in its latency and circuit-breaker stats.
+    """
+    for model_id in vision_candidates():
+        result = vision_cache.get(image, model_id, task)
+        if result:
+            return model_id, result
+    return None, None
+
+async def analyze_with_vision_model(image_data, message: str, model_id: str, cache_task: Optional[str] = None) -> Optional[str]:
+    """Analyze with one vision model (answer cached per image and task; callers check cached_vision_answer() first)"""
     try:
+        image = image_data if isinstance(image_data, PreparedImage) else await prepare_image_async(image_data)
+        task = cache_task if cache_task is not None else message
+        image_url = await image.data_url_async(model_id)
+
+        messages = [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": message},
+                    {"type": "image_url", "image_url": {"url": image_url}}
+                ]
+            }
+        ]
+
+        # Off the event loop so slow calls don't stall other requests
         import openai
         openai.api_key = OPENAI_API_KEY
+        response = await asyncio.to_thread(openai.chat.completions.create, model=model_id,
+                                           messages=messages, max_tokens=4096)
 
-        response = openai.chat.completions.create(
-            model="gpt-4-vision-preview",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": message},
-                        {"type": "image_url", "image_url": {"url": image_data}}
-                    ]
-                }
-            ],
-            max_tokens=4096
-        )
-
-        return response.choices[0].message.content
+        result = response.choices[0].message.content
+        if result:
+            vision_cache.put(image, model_id, task, result)
+        return result
     except Exception as e:
-        print(f"GPT-4 Vision failed: {str(e)}")
+        print(f"{VISION_MODELS[model_id]['name']} failed: {str(e)}")
         return None
 
-async def intelligent_image_analysis(image_data: str, message: str, filename: str = "") -> str:
+async def intelligent_image_analysis(image_data, message: str, filename: str = "") -> str:
     """Intelligent image analysis using metadata + AI reasoning"""
 
-    # Extract image metadata
-    metadata = extract_image_metadata(image_data)
+    # Extract image metadata (getcolors scans every pixel: off the event loop)
+    try:
+        prepared = image_data if isinstance(image_data, PreparedImage) else await prepare_image_async(image_data)
+        metadata = await asyncio.to_thread(extract_image_metadata, prepared)
+    except Exception as e:
+        metadata = {"error": str(e)}
 
     # Create comprehensive analysis prompt
     analysis_prompt = f"""I need you to analyze an image based on the following technical information:
@@ -252,7 +286,8 @@ def health():
     return {
         "status": "healthy",
         "gpt4_vision": bool(OPENAI_API_KEY),
-        "intelligent_fallback": True
+        "intelligent_fallback": True,
+        "vision_routing": vision_router.get_stats()
     }
 
 @app.post("/chat", response_model=ChatResponse)
@@ -262,21 +297,32 @@ async def chat(request: ChatRequest):
 
     try:
         if request.image_data:
-            # Method 1: Try GPT-4 Vision if available
-            if OPENAI_API_KEY:
-                result = await analyze_with_gpt4_vision(request.image_data, request.message)
-                if result:
-                    processing_time = (datetime.now() - start_time).total_seconds()
-                    return ChatResponse(
-                        response=result,
-                        model="GPT-4 Vision",
-                        processing_time=processing_time,
-                        vision_method="gpt4-vision"
-                    )
+            # Decode once for both methods; undecodable data would only fail
+            # every model and trip their circuit breakers
+            try:
+                image = await prepare_image_async(request.image_data)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Invalid image data: {str(e)}")
+
+            # Method 1: Race the vision models, healthiest first
+            model_id, result = cached_vision_answer(image, request.message)
+            if not result:
+                model_id, result = await vision_router.run(
+                    vision_candidates(),
+                    lambda model_id: analyze_with_vision_model(image, request.message, model_id)
+                )
+            if result:
+                processing_time = (datetime.now() - start_time).total_seconds()
+                return ChatResponse(
+                    response=result,
+                    model=VISION_MODELS[model_id]["name"],
+                    processing_time=processing_time,
+                    vision_method=VISION_MODELS[model_id]["method"]
+                )
 
             # Method 2: Intelligent analysis with metadata + 70B reasoning
             print("Using intelligent metadata-based analysis")
-            analysis = await intelligent_image_analysis(request.image_data, request.message)
+            analysis = await intelligent_image_analysis(image, request.message)
             processing_time = (datetime.now() - start_time).total_seconds()
 
             return ChatResponse(
@@ -309,6 +355,8 @@ async def chat(request: ChatRequest):
                 processing_time=processing_time
             )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -329,24 +377,30 @@ async def upload_file(
 
         # Handle images
         if file.content_type and file.content_type.startswith('image/'):
-            base64_image = base64.b64encode(contents).decode('utf-8')
-            data_url = f"data:{file.content_type};base64,{base64_image}"
-
-            # Try GPT-4 Vision first
-            if OPENAI_API_KEY:
-                result = await analyze_with_gpt4_vision(data_url, f"{message}\n\nFilename: {file.filename}")
-                if result:
-                    processing_time = (datetime.now() - start_time).total_seconds()
-                    return ChatResponse(
-                        response=result,
-                        model="GPT-4 Vision",
-                        analyzed_file=file.filename,
-                        processing_time=processing_time,
-                        vision_method="gpt4-vision"
-                    )
+            try:
+                image = await prepare_image_async(contents, file.content_type)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Invalid image file: {str(e)}")
+
+            # Race the vision models first (cache keyed on the message, not the filename)
+            model_id, result = cached_vision_answer(image, message)
+            if not result:
+                model_id, result = await vision_router.run(
+                    vision_candidates(),
+                    lambda model_id: analyze_with_vision_model(image, f"{message}\n\nFilename: {file.filename}", model_id, cache_task=message)
+                )
+            if result:
+                processing_time = (datetime.now() - start_time).total_seconds()
+                return ChatResponse(
+                    response=result,
+                    model=VISION_MODELS[model_id]["name"],
+                    analyzed_file=file.filename,
+                    processing_time=processing_time,
+                    vision_method=VISION_MODELS[model_id]["method"]
+                )
 
             # Intelligent analysis
-            analysis = await intelligent_image_analysis(data_url, f"{message}\n\nFilename: {file.filename}", file.filename)
+            analysis = await intelligent_image_analysis(image, f"{message}\n\nFilename: {file.filename}", file.filename)
             processing_time = (datetime.now() - start_time).total_seconds()
 
             return ChatResponse(